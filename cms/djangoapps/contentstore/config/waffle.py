@@ -9,6 +9,8 @@ WAFFLE_NAMESPACE = u'studio'
 
 # Switches
 ENABLE_ACCESSIBILITY_POLICY_PAGE = u'enable_policy_page'
+STREAM_EXPORT = u'stream_export'
+ASYNC_THUMBNAILS = u'async_thumbnails'
 
 
 def waffle():
@@ -25,7 +25,7 @@ from django.test import RequestFactory
 from django.utils.text import get_valid_filename
 from django.utils.translation import ugettext as _
 from djcelery.common import respect_language
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import AssetKey, CourseKey
 from opaque_keys.edx.locator import LibraryLocator
 from organizations.models import OrganizationCourse
 from path import Path as path
@@ -35,11 +35,13 @@ from user_tasks.models import UserTaskArtifact, UserTaskStatus
 from user_tasks.tasks import UserTask
 
 import dogstats_wrapper as dog_stats_api
+from contentstore.config.waffle import STREAM_EXPORT, waffle
 from contentstore.courseware_index import CoursewareSearchIndexer, LibrarySearchIndexer, SearchIndexingError
 from contentstore.storage import course_import_export_storage
 from contentstore.utils import initialize_permissions, reverse_usage_url
 from course_action_state.models import CourseRerunState
 from models.settings.course_metadata import CourseMetadata
+from openedx.core.djangoapps.contentserver.caching import del_cached_content
 from openedx.core.djangoapps.embargo.models import CountryAccessRule, RestrictedCourse
 from openedx.core.lib.extract_tar import safetar_extractall
 from student.auth import has_course_author_access
@@ -49,6 +51,7 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
+from xmodule.modulestore.tarball_fs import TarballFS
 from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 from xmodule.video_module.transcripts_utils import (
@@ -432,6 +435,29 @@ def push_course_update_task(course_key_string, course_subscription_id, course_di
     send_push_course_update(course_key_string, course_subscription_id, course_display_name)
 
 
+@task()
+def generate_asset_thumbnails(asset_key_strings):
+    """
+    Generates the thumbnails of the given uploaded assets, at each of the sizes in
+    ASSET_THUMBNAIL_DIMENSIONS, and points each image at its first thumbnail.
+    """
+    store = contentstore()
+    contents = []
+    for asset_key_string in asset_key_strings:
+        try:
+            contents.append(store.find(AssetKey.from_string(asset_key_string)))
+        except NotFoundError:
+            LOGGER.warning(u'Asset %s was deleted before its thumbnails were generated', asset_key_string)
+
+    thumbnails = store.generate_thumbnails(contents, dimensions_list=settings.ASSET_THUMBNAIL_DIMENSIONS)
+    for content, (thumbnail_content, thumbnail_location) in zip(contents, thumbnails):
+        # delete cached thumbnail even if one couldn't be created this time (else the old thumbnail will continue to show)
+        del_cached_content(thumbnail_location)
+        if thumbnail_content is not None:
+            store.set_attr(content.location, 'thumbnail_location', thumbnail_location.to_deprecated_list_repr())
+            del_cached_content(content.location)
+
+
 class CourseExportTask(UserTask):  # pylint: disable=abstract-method
     """
     Base class for course and library export tasks.
@@ -512,17 +538,28 @@ def create_export_tarball(course_module, course_key, context, status=None):
     root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+        if waffle().is_enabled(STREAM_EXPORT):
+            # Write the exported files straight into the tarball, rather than
+            # exporting to a temporary directory and compressing it afterwards.
+            LOGGER.debug(u'tar file being streamed to %s', export_file.name)
+            tarball_fs = TarballFS(export_file)
+            try:
+                _export_to_xml(course_module, course_key, tarball_fs, name)
+            finally:
+                tarball_fs.close()
+            export_file.seek(0)
+            if status:
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
         else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
+            _export_to_xml(course_module, course_key, root_dir, name)
 
-        if status:
-            status.set_state(u'Compressing')
-            status.increment_completed_steps()
-        LOGGER.debug(u'tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+            if status:
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
+            LOGGER.debug(u'tar file being generated at %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                tar_file.add(root_dir / name, arcname=name)
 
     except SerializationError as exc:
         LOGGER.exception(u'There was an error exporting %s', course_key, exc_info=True)
@@ -562,6 +599,17 @@ def create_export_tarball(course_module, course_key, context, status=None):
     return export_file
 
 
+def _export_to_xml(course_module, course_key, root_dir, name):
+    """
+    Export the course or library to the directory name within root_dir, which
+    is either a path or a pyfilesystem FS.
+    """
+    if isinstance(course_key, LibraryLocator):
+        export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+    else:
+        export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
+
+
 class CourseImportTask(UserTask):  # pylint: disable=abstract-method
     """
     Base class for course and library import tasks.
@@ -20,6 +20,8 @@ from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
+from contentstore.config.waffle import ASYNC_THUMBNAILS, waffle
+from contentstore.tasks import generate_asset_thumbnails
 from contentstore.utils import reverse_course_url
 from contentstore.views.exception import AssetNotFoundException, AssetSizeTooLargeException
 from edxmako.shortcuts import render_to_response
@@ -37,6 +39,7 @@ REQUEST_DEFAULTS = {
     'direction': '',
     'asset_type': '',
     'text_search': '',
+    'cursor': None,
 }
 
 
@@ -58,6 +61,8 @@ def assets_handler(request, course_key_string=None, asset_key_string=None):
             direction: the sort direction (defaults to 'descending')
             asset_type: the file type to filter items to (defaults to All)
             text_search: string to filter results by file name (defaults to '')
+            cursor: the nextCursor of the previous page, to read the page which follows it without
+                counting through the earlier pages (optional)
     POST
         json: create (or update?) an asset. The only updating that can be done is changing the lock state.
     PUT
@@ -140,16 +145,17 @@ def _assets_json(request, course_key):
         'current_page': current_page,
         'page_size': requested_page_size,
         'sort': sort_type_and_direction,
-        'filter_params': filter_parameters
+        'filter_params': filter_parameters,
+        'cursor': request_options['requested_cursor'],
     }
 
-    assets, total_count = _get_assets_for_page(course_key, query_options)
+    assets, total_count, next_cursor = _get_assets_for_page(course_key, query_options)
 
     if request_options['requested_page'] > 0 and first_asset_to_display_index >= total_count and total_count > 0:
         _update_options_to_requery_final_page(query_options, total_count)
         current_page = query_options['current_page']
         first_asset_to_display_index = _get_first_asset_index(current_page, requested_page_size)
-        assets, total_count = _get_assets_for_page(course_key, query_options)
+        assets, total_count, next_cursor = _get_assets_for_page(course_key, query_options)
 
     last_asset_to_display_index = first_asset_to_display_index + len(assets)
     assets_in_json_format = _get_assets_in_json_format(assets, course_key)
@@ -165,6 +171,7 @@ def _assets_json(request, course_key):
         'direction': request_options['requested_sort_direction'],
         'assetTypes': _get_requested_file_types_from_requested_filter(request_options['requested_asset_type']),
         'textSearch': request_options['requested_text_search'],
+        'nextCursor': next_cursor,
     }
 
     return JsonResponse(response_payload)
@@ -178,6 +185,7 @@ def _parse_request_to_dictionary(request):
         'requested_sort_direction': _get_requested_attribute(request, 'direction'),
         'requested_asset_type': _get_requested_attribute(request, 'asset_type'),
         'requested_text_search': _get_requested_attribute(request, 'text_search'),
+        'requested_cursor': _get_requested_attribute(request, 'cursor'),
     }
 
 
@@ -325,13 +333,15 @@ def _get_assets_for_page(course_key, options):
     sort = options['sort']
     filter_params = options['filter_params'] if options['filter_params'] else None
     start = current_page * page_size
-    return contentstore().get_all_content_for_course(
-        course_key, start=start, maxresults=page_size, sort=sort, filter_params=filter_params
+    return contentstore().get_asset_page(
+        course_key, page_size, start=start, cursor=options.get('cursor'), sort=sort, filter_params=filter_params
     )
 
 
 def _update_options_to_requery_final_page(query_options, total_asset_count):
     query_options['current_page'] = int(math.floor((total_asset_count - 1) / query_options['page_size']))
+    # The cursor points past the final page, so requery by page number instead.
+    query_options['cursor'] = None
 
 
 def _get_assets_in_json_format(assets, course_key):
@@ -369,6 +379,13 @@ def update_course_run_asset(course_key, upload_file):
 
     content, temporary_file_path = _get_file_content_and_path(file_metadata, course_key)
 
+    if waffle().is_enabled(ASYNC_THUMBNAILS):
+        # save the asset right away, and generate its thumbnails in the background
+        contentstore().save(content)
+        del_cached_content(content.location)
+        generate_asset_thumbnails.delay([text_type(content.location)])
+        return content
+
     (thumbnail_content, thumbnail_location) = contentstore().generate_thumbnail(content,
                                                                                 tempfile_path=temporary_file_path)
 
@@ -311,7 +311,9 @@ def xblock_view_handler(request, usage_key_string, view_name):
 
     if 'application/json' in accept_header:
         store = modulestore()
-        xblock = store.get_item(usage_key)
+        # Rendering the view accesses the content of the block's children,
+        # so load all of their definitions at once.
+        xblock = store.get_item(usage_key, depth=1, prefetch_definitions=True)
         container_views = ['container_preview', 'reorderable_container_child_preview', 'container_child_preview']
 
         # wrap the generated fragment in the xmodule_editor div so that the javascript
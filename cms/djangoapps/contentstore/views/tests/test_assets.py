@@ -15,6 +15,7 @@ from opaque_keys.edx.locator import CourseLocator
 from PIL import Image
 from pytz import UTC
 
+from contentstore.config.waffle import ASYNC_THUMBNAILS, waffle
 from contentstore.tests.utils import CourseTestCase
 from contentstore.utils import reverse_course_url
 from contentstore.views import assets
@@ -206,8 +207,30 @@ class PaginationTestCase(AssetsTestCase):
         self.assert_correct_asset_response(
             self.url + "?page_size=1&page=5&asset_type=Images", 5, 0, 0)
 
-    @mock.patch('xmodule.contentstore.mongo.MongoContentStore.get_all_content_for_course')
-    def test_mocked_filtered_response(self, mock_get_all_content_for_course):
+    def test_cursor_responses(self):
+        """
+        Test paging through the assets with the cursor of each page
+        """
+        for index in range(5):
+            self.upload_asset("asset-{}".format(index))
+
+        display_names = []
+        url = self.url + "?page_size=2&sort=display_name&direction=asc"
+        cursor = None
+        for page in range(3):
+            page_url = url + "&page={}".format(page)
+            if cursor is not None:
+                page_url += "&cursor=" + cursor
+            json_response = json.loads(self.client.get(page_url, HTTP_ACCEPT='application/json').content)
+            self.assertEquals(json_response['totalCount'], 5)
+            display_names.extend(asset['display_name'] for asset in json_response['assets'])
+            cursor = json_response['nextCursor']
+
+        self.assertEquals(display_names, ["asset-{}.txt".format(index) for index in range(5)])
+        self.assertIsNone(cursor)
+
+    @mock.patch('xmodule.contentstore.mongo.MongoContentStore.get_asset_page')
+    def test_mocked_filtered_response(self, mock_get_asset_page):
         """
         Test the ajax asset interfaces
         """
@@ -217,7 +240,7 @@ class PaginationTestCase(AssetsTestCase):
         thumbnail_location = [
             'c4x', 'edX', 'toy', 'thumbnail', 'test_thumb.jpg', None]
 
-        mock_get_all_content_for_course.return_value = [
+        mock_get_asset_page.return_value = [
             [
                 {
                     "asset_key": asset_key,
@@ -232,7 +255,8 @@ class PaginationTestCase(AssetsTestCase):
                     "locked": None
                 }
             ],
-            1
+            1,
+            None
         ]
         # Verify valid page requests
         self.assert_correct_filter_response(self.url, 'asset_type', 'OTHER')
@@ -349,6 +373,18 @@ class UploadTestCase(AssetsTestCase):
         resp = self.upload_asset("test_image", asset_type="image")
         self.assertEquals(resp.status_code, 200)
 
+    @mock.patch('contentstore.views.assets.generate_asset_thumbnails')
+    def test_upload_image_async_thumbnails(self, generate_asset_thumbnails):
+        with waffle().override(ASYNC_THUMBNAILS, active=True):
+            resp = self.upload_asset("test_image", asset_type="image")
+        self.assertEquals(resp.status_code, 200)
+        asset = json.loads(resp.content)['asset']
+        self.assertIsNone(asset['thumbnail'])
+
+        asset_key = self.course.id.make_asset_key('asset', 'test_image.jpg')
+        generate_asset_thumbnails.delay.assert_called_once_with([unicode(asset_key)])
+        self.assertIsNotNone(contentstore().find(asset_key))
+
     def test_no_file(self):
         resp = self.client.post(self.url, {"name": "file.txt"}, "application/json")
         self.assertEquals(resp.status_code, 400)
@@ -160,6 +160,9 @@ ALLOWED_HOSTS = [
 
 LOG_DIR = ENV_TOKENS['LOG_DIR']
 
+COURSE_ASSETS_CHUNK_CACHE = ENV_TOKENS.get('COURSE_ASSETS_CHUNK_CACHE', COURSE_ASSETS_CHUNK_CACHE)
+ASSET_THUMBNAIL_DIMENSIONS = ENV_TOKENS.get('ASSET_THUMBNAIL_DIMENSIONS', ASSET_THUMBNAIL_DIMENSIONS)
+
 CACHES = ENV_TOKENS['CACHES']
 # Cache used for location mapping -- called many times with the same key/value
 # in a given request.
@@ -168,6 +171,9 @@ if 'loc_cache' not in CACHES:
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     }
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE', COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE
+)
 
 SESSION_COOKIE_DOMAIN = ENV_TOKENS.get('SESSION_COOKIE_DOMAIN')
 SESSION_COOKIE_HTTPONLY = ENV_TOKENS.get('SESSION_COOKIE_HTTPONLY', True)
@@ -585,6 +585,10 @@ MODULESTORE = {
     }
 }
 
+# Maximum total size, in bytes of pickled data, of the split modulestore course
+# structures kept in each process's in-memory cache.  0 disables the cache.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE = 0
+
 # Modulestore-level field override providers. These field override providers don't
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
@@ -645,6 +649,14 @@ STATICFILES_DIRS = [
     # ("book", ENV_ROOT / "book_images"),
 ]
 
+# Local disk cache of the chunks of course assets too large to cache whole, used by the
+# StaticContentServer middleware.  Disabled unless DIRECTORY is set.
+COURSE_ASSETS_CHUNK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_BYTES': 1024 * 1024 * 1024,
+    'CHUNK_SIZE': 1024 * 1024,
+}
+
 # Locale/Internationalization
 TIME_ZONE = 'America/New_York'  # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 LANGUAGE_CODE = 'en'  # http://www.i18nguy.com/unicode/language-identifiers.html
@@ -1292,6 +1304,10 @@ MAX_ASSET_UPLOAD_FILE_SIZE_IN_MB = 10
 # a file that exceeds the above size
 MAX_ASSET_UPLOAD_FILE_SIZE_URL = ""
 
+### Sizes of the thumbnails generated for uploaded images, as [width, height] pairs
+# The first size is the thumbnail shown in Studio; None is the default of 128x128 pixels.
+ASSET_THUMBNAIL_DIMENSIONS = [None]
+
 ### Default value for entrance exam minimum score
 ENTRANCE_EXAM_MIN_SCORE_PCT = 50
 
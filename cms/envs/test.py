@@ -170,6 +170,10 @@ CACHES = {
     },
 }
 
+# Don't share course structures between tests through the in-process cache, which would change
+# the mongo queries counted by tests; TestStructureProcessCache enables it to test its behavior.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE = 0
+
 ################################# CELERY ######################################
 
 CELERY_ALWAYS_EAGER = True
@@ -7,3 +7,24 @@ def use_read_replica_if_available(queryset):
     If there is a database called 'read_replica', use that database for the queryset.
     """
     return queryset.using("read_replica") if "read_replica" in settings.DATABASES else queryset
+
+
+def iterate_in_pk_order(queryset, batch_size):
+    """
+    Yield the objects of the queryset in order of their primary keys, reading
+    ``batch_size`` of them at a time.
+
+    Each batch is read with a query for the objects after the last primary key of
+    the batch before, rather than at an OFFSET, so that no query rereads the rows
+    before it, and only one batch is held in memory at a time.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch_queryset[:batch_size])
+        for obj in batch:
+            yield obj
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
@@ -12,8 +12,12 @@ VERSIONED_ASSETS_PREFIX = '/assets/courseware'
 VERSIONED_ASSETS_PATTERN = r'/assets/courseware/(v[\d]/)?([a-f0-9]{32})'
 
 import os
+import hashlib
 import logging
+import multiprocessing
 import StringIO
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from urlparse import urlparse, urlunparse, parse_qsl
 from urllib import urlencode, quote_plus
 
@@ -347,6 +351,110 @@ class StaticContentStream(StaticContent):
                                 content_digest=self.content_digest)
         return content
 
+    def copy_metadata(self):
+        """
+        Return a StaticContent with this content's attributes, but without its data.
+        """
+        return StaticContent(self.location, self.name, self.content_type, None,
+                             last_modified_at=self.last_modified_at, thumbnail_location=self.thumbnail_location,
+                             import_path=self.import_path, length=self.length, locked=self.locked,
+                             content_digest=self.content_digest)
+
+
+def render_thumbnail(content_type, dimensions=None, data=None, path=None):
+    """
+    Render a thumbnail of an image, given either its data or the path of a file holding it,
+    and return a tuple of the thumbnail's data and its content type.
+
+    Raises an exception if the image can't be rendered.
+    """
+    if content_type == 'image/svg+xml':
+        # for svg simply store the provided svg file, since vector graphics should be good enough
+        # for downscaling client-side
+        if path is not None:
+            with open(path) as f:
+                data = f.read()
+        return data, 'image/svg+xml'
+
+    # use PIL to do the thumbnail generation (http://www.pythonware.com/products/pil/)
+    # My understanding is that PIL will maintain aspect ratios while restricting
+    # the max-height/width to be whatever you pass in as 'size'
+    source = path if path is not None else StringIO.StringIO(data)
+
+    # We use the context manager here to avoid leaking the inner file descriptor
+    # of the Image object -- this way it gets closed after we're done with using it.
+    thumbnail_file = StringIO.StringIO()
+    with Image.open(source) as image:
+        # I've seen some exceptions from the PIL library when trying to save palletted
+        # PNG files to JPEG. Per the google-universe, they suggest converting to RGB first.
+        thumbnail_image = image.convert('RGB')
+
+        if not dimensions:
+            dimensions = (128, 128)
+
+        thumbnail_image.thumbnail(dimensions, Image.ANTIALIAS)
+        thumbnail_image.save(thumbnail_file, 'JPEG')
+
+    return thumbnail_file.getvalue(), 'image/jpeg'
+
+
+class ThumbnailRenderer(object):
+    """
+    Renders thumbnails with render_thumbnail in a pool of processes, so that many images can
+    be rendered in parallel, and renders each distinct image at each size only once.
+
+    Use it as a context manager, to shut the pool down once the thumbnails are rendered.
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        if multiprocessing.current_process().daemon:
+            # Daemonic processes can't have children; so, render in the calling thread instead.
+            self._executor = None
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        # Maps the digest, content type and dimensions of each image rendered to the future of its thumbnail.
+        self._renders = {}
+        self._lock = threading.Lock()
+
+    def render(self, content_type, dimensions=None, data=None, path=None):
+        """
+        Render a thumbnail as render_thumbnail does, reusing the thumbnail of any identical image
+        which was rendered at the same size.
+        """
+        if path is not None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        dimensions = tuple(dimensions) if dimensions else None
+        key = (hashlib.sha1(data).hexdigest(), content_type, dimensions)
+
+        with self._lock:
+            future = self._renders.get(key)
+            if future is None:
+                if self._executor is not None:
+                    future = self._executor.submit(render_thumbnail, content_type, dimensions, data=data)
+                else:
+                    future = Future()
+                    try:
+                        future.set_result(render_thumbnail(content_type, dimensions, data=data))
+                    except Exception as exc:  # pylint: disable=broad-except
+                        future.set_exception(exc)
+                self._renders[key] = future
+
+        return future.result()
+
+    def close(self):
+        """
+        Shut down the pool of processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
 
 class ContentStore(object):
     '''
@@ -373,6 +481,22 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_asset_page(self, course_key, page_size, start=0, cursor=None, sort=None, filter_params=None):
+        '''
+        Returns a page of a course's static assets, followed by the total number of assets and a cursor
+        to the next page.
+
+        The assets are in the format of :meth:`get_all_content_for_course`. If a cursor returned for the
+        previous page is given, the page starts after that page's last asset and start is ignored; the
+        returned cursor is None if there may be no further assets.
+
+        By default, this reads the page through :meth:`get_all_content_for_course`, and returns no cursor.
+        '''
+        assets, total_count = self.get_all_content_for_course(
+            course_key, start=start, maxresults=page_size, sort=sort, filter_params=filter_params
+        )
+        return assets, total_count, None
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
@@ -386,7 +510,7 @@ class ContentStore(object):
         """
         raise NotImplementedError
 
-    def generate_thumbnail(self, content, tempfile_path=None, dimensions=None):
+    def generate_thumbnail(self, content, tempfile_path=None, dimensions=None, renderer=None):
         """Create a thumbnail for a given image.
 
         Returns a tuple of (StaticContent, AssetKey)
@@ -399,6 +523,9 @@ class ContentStore(object):
 
         `dimensions` is an optional param that represents (width, height) in
         pixels. It defaults to None.
+
+        `renderer` is an optional ThumbnailRenderer to render the thumbnail with,
+        when thumbnails of many images are being generated at once.
         """
         thumbnail_content = None
         is_svg = content.content_type == 'image/svg+xml'
@@ -413,45 +540,17 @@ class ContentStore(object):
         # if we're uploading an image, then let's generate a thumbnail so that we can
         # serve it up when needed without having to rescale on the fly
         try:
-            if is_svg:
-                # for svg simply store the provided svg file, since vector graphics should be good enough
-                # for downscaling client-side
-                if tempfile_path is None:
-                    thumbnail_file = StringIO.StringIO(content.data)
-                else:
-                    with open(tempfile_path) as f:
-                        thumbnail_file = StringIO.StringIO(f.read())
-                thumbnail_content = StaticContent(thumbnail_file_location, thumbnail_name,
-                                                  'image/svg+xml', thumbnail_file)
-                self.save(thumbnail_content)
-            elif content.content_type is not None and content.content_type.split('/')[0] == 'image':
-                # use PIL to do the thumbnail generation (http://www.pythonware.com/products/pil/)
-                # My understanding is that PIL will maintain aspect ratios while restricting
-                # the max-height/width to be whatever you pass in as 'size'
-                # @todo: move the thumbnail size to a configuration setting?!?
+            if is_svg or (content.content_type is not None and content.content_type.split('/')[0] == 'image'):
                 if tempfile_path is None:
-                    source = StringIO.StringIO(content.data)
+                    source = {'data': content.data}
                 else:
-                    source = tempfile_path
-
-                # We use the context manager here to avoid leaking the inner file descriptor
-                # of the Image object -- this way it gets closed after we're done with using it.
-                thumbnail_file = StringIO.StringIO()
-                with Image.open(source) as image:
-                    # I've seen some exceptions from the PIL library when trying to save palletted
-                    # PNG files to JPEG. Per the google-universe, they suggest converting to RGB first.
-                    thumbnail_image = image.convert('RGB')
-
-                    if not dimensions:
-                        dimensions = (128, 128)
-
-                    thumbnail_image.thumbnail(dimensions, Image.ANTIALIAS)
-                    thumbnail_image.save(thumbnail_file, 'JPEG')
-                    thumbnail_file.seek(0)
+                    source = {'path': tempfile_path}
+                render = renderer.render if renderer is not None else render_thumbnail
+                thumbnail_data, thumbnail_type = render(content.content_type, dimensions, **source)
 
                 # store this thumbnail as any other piece of content
                 thumbnail_content = StaticContent(thumbnail_file_location, thumbnail_name,
-                                                  'image/jpeg', thumbnail_file)
+                                                  thumbnail_type, StringIO.StringIO(thumbnail_data))
 
                 self.save(thumbnail_content)
 
@@ -463,6 +562,36 @@ class ContentStore(object):
 
         return thumbnail_content, thumbnail_file_location
 
+    def generate_thumbnails(self, contents, dimensions_list=None, max_workers=None):
+        """
+        Create thumbnails of the given images at each of the given sizes, rendering them in a
+        pool of up to max_workers processes, and rendering each distinct image at each size
+        only once.
+
+        Returns a list of the (StaticContent, AssetKey) tuples returned by `generate_thumbnail`
+        for the first size of each image, which is the thumbnail that should be referenced by
+        the image's `thumbnail_location`.
+
+        `dimensions_list` is a list of `dimensions`, as passed to `generate_thumbnail`. It
+        defaults to [None], which generates only the default thumbnail.
+        """
+        dimensions_list = dimensions_list or [None]
+        with ThumbnailRenderer(max_workers=max_workers) as renderer:
+
+            def generate_all(content):
+                """
+                Generate the thumbnails of content at every size.
+                """
+                thumbnails = [
+                    self.generate_thumbnail(content, dimensions=dimensions, renderer=renderer)
+                    for dimensions in dimensions_list
+                ]
+                return thumbnails[0]
+
+            # The threads only wait on the renders; the images are rendered by the renderer's processes.
+            with ThreadPoolExecutor(max_workers=renderer.max_workers) as executor:
+                return list(executor.map(generate_all, contents))
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
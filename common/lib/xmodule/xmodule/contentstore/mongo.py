@@ -3,11 +3,23 @@ MongoDB/GridFS-level code for the contentstore.
 """
 import os
 import json
+import base64
+import datetime
+import hashlib
+import logging
+import tempfile
+import threading
+import time
 import pymongo
 import gridfs
-from gridfs.errors import NoFile
+from gridfs.errors import FileExists, NoFile
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from fs.osfs import OSFS
+from fs.path import join as fs_join
+from bson import json_util
+from bson.objectid import ObjectId
 from bson.son import SON
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import AssetKey
@@ -18,6 +30,53 @@ from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 from .content import StaticContent, ContentStore, StaticContentStream
 
+log = logging.getLogger(__name__)
+
+# Default maximum number of assets to read from GridFS at a time when exporting.
+DEFAULT_EXPORT_WORKERS = 4
+
+# Default maximum number of batches of assets to copy at a time when copying a course's assets.
+DEFAULT_COPY_WORKERS = 4
+
+# The number of assets in each batch copied by copy_all_course_assets.
+ASSET_COPY_BATCH_SIZE = 100
+
+# The number of bytes of chunks to read before they're inserted with a bulk write, when copying assets.
+CHUNK_COPY_BATCH_BYTES = 8 * 1024 * 1024
+
+# The codes of the write errors of inserting documents with existing _ids.
+DUPLICATE_KEY_CODES = (11000, 11001)
+
+# The fields of the fs.files documents which are copied into the asset index.
+ASSET_INDEX_FIELDS = [
+    'filename', 'displayname', 'contentType', 'uploadDate', 'length', 'chunkSize', 'md5', 'locked',
+    'thumbnail_location', 'import_path', 'content_son',
+]
+
+# The attributes of assets which aren't exported to the assets policy file.
+NON_POLICY_ATTRS = ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'blob_id']
+
+# Assets larger than this are spooled to disk while they're hashed, before they're stored as blobs.
+BLOB_SPOOL_SIZE = 1024 * 1024
+
+# The number of times to try to store a blob which another process is storing or deleting at the same time.
+BLOB_WRITE_ATTEMPTS = 3
+
+# The number of seconds to wait for another process to delete a blob before storing its data again.
+BLOB_DELETE_WAIT = 0.2
+
+# The number of seconds after which the deletion of a blob is assumed to have been abandoned, and can be
+# finished by another process.
+BLOB_DELETE_TIMEOUT = 60
+
+# The number of seconds to wait at first, and at most, between checks that another process storing the same
+# data has finished uploading its blob.
+BLOB_UPLOAD_WAIT = 0.05
+BLOB_UPLOAD_MAX_WAIT = 2
+
+# The number of seconds to wait for another process to finish uploading a blob before storing its data again.
+BLOB_UPLOAD_TIMEOUT = 60
+
 
 class MongoContentStore(ContentStore):
     """
@@ -26,12 +85,15 @@ class MongoContentStore(ContentStore):
     # pylint: disable=unused-argument, bad-continuation
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None,
+        content_addressed=False, **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param content_addressed: if True, store the data of new assets in blobs shared by all of the
+            assets with the same data, so that copying a course's assets only copies their metadata
         """
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         # The appropriate methods below are marked as autoretry_read - those methods will handle
@@ -46,6 +108,20 @@ class MongoContentStore(ContentStore):
 
         self.fs_files = mongo_db[bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[bucket + ".chunks"]
+        # The metadata of every asset, keyed by course, so that a page of a course's assets can be read
+        # without scanning and sorting all of the course's fs.files documents.
+        self.asset_index = mongo_db[bucket + ".asset_index"]
+        # One document per course, recording whether the course's assets have been added to the asset
+        # index, and caching the counts of its assets.
+        self.asset_index_courses = mongo_db[bucket + ".asset_index_courses"]
+
+        # In content addressed mode, the fs.files document of an asset has no chunks of its own, but
+        # names the blob holding its data by the blob_id field. Each blob is a GridFS file whose _id
+        # is the SHA-256 digest of its data, and which counts the assets referencing it.
+        self.content_addressed = content_addressed
+        self.blobs = gridfs.GridFS(mongo_db, bucket + ".blobs")
+        self.blobs_files = mongo_db[bucket + ".blobs.files"]
+        self.blobs_chunks = mongo_db[bucket + ".blobs.chunks"]
 
     def close_connections(self):
         """
@@ -72,9 +148,17 @@ class MongoContentStore(ContentStore):
         elif collections:
             self.fs_files.drop()
             self.chunks.drop()
+            self.asset_index.drop()
+            self.asset_index_courses.drop()
+            self.blobs_files.drop()
+            self.blobs_chunks.drop()
         else:
             self.fs_files.remove({})
             self.chunks.remove({})
+            self.asset_index.remove({})
+            self.asset_index_courses.remove({})
+            self.blobs_files.remove({})
+            self.blobs_chunks.remove({})
 
         if connections:
             self.close_connections()
@@ -82,6 +166,21 @@ class MongoContentStore(ContentStore):
     def save(self, content):
         content_id, content_son = self.asset_db_key(content.location)
 
+        if self.content_addressed:
+            # Reference the new data before releasing the old, in case they're the same blob.
+            blob = self._store_blob(content.data)
+            self.delete(content_id)
+            self._put_blob_reference(
+                content_id, blob, filename=unicode(content.location), contentType=content.content_type,
+                displayname=content.name, content_son=content_son,
+                thumbnail_location=(
+                    content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
+                ),
+                import_path=content.import_path, locked=getattr(content, 'locked', False),
+            )
+            self._index_asset(content_id)
+            return content
+
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
@@ -100,6 +199,7 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        self._index_asset(content_id)
         return content
 
     def delete(self, location_or_id):
@@ -108,8 +208,12 @@ class MongoContentStore(ContentStore):
         """
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
+        asset = self.fs_files.find_one({'_id': location_or_id}, {'blob_id': True})
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        if asset is not None and asset.get('blob_id'):
+            self._release_blob(asset['blob_id'])
+        self._unindex_asset(location_or_id)
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -118,6 +222,7 @@ class MongoContentStore(ContentStore):
         try:
             if as_stream:
                 fp = self.fs.get(content_id)
+                data_fp = self._open_data(fp)
                 thumbnail_location = getattr(fp, 'thumbnail_location', None)
                 if thumbnail_location:
                     thumbnail_location = location.course_key.make_asset_key(
@@ -125,14 +230,14 @@ class MongoContentStore(ContentStore):
                         thumbnail_location[4]
                     )
                 return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                    location, fp.displayname, fp.content_type, data_fp, last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
                     length=fp.length, locked=getattr(fp, 'locked', False),
                     content_digest=getattr(fp, 'md5', None),
                 )
             else:
-                with self.fs.get(content_id) as fp:
+                with self.fs.get(content_id) as fp, self._open_data(fp) as data_fp:
                     thumbnail_location = getattr(fp, 'thumbnail_location', None)
                     if thumbnail_location:
                         thumbnail_location = location.course_key.make_asset_key(
@@ -140,7 +245,7 @@ class MongoContentStore(ContentStore):
                             thumbnail_location[4]
                         )
                     return StaticContent(
-                        location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
+                        location, fp.displayname, fp.content_type, data_fp.read(), last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
                         length=fp.length, locked=getattr(fp, 'locked', False),
@@ -195,12 +300,66 @@ class MongoContentStore(ContentStore):
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
             for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in NON_POLICY_ATTRS:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def export_to_fs(self, location, export_fs, static_dir):
+        """
+        Export the asset at location into the static_dir directory of the given
+        filesystem, streaming its content from GridFS.
+        """
+        content = self.find(location, as_stream=True)
+        try:
+            output_dir = static_dir
+            if content.import_path is not None:
+                output_dir = fs_join(static_dir, os.path.dirname(content.import_path))
+            export_fs.makedirs(output_dir, recreate=True)
+
+            # Escape invalid char from filename.
+            export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+
+            with export_fs.open(fs_join(output_dir, export_name), 'wb') as asset_file:
+                for chunk in content.stream_data():
+                    asset_file.write(chunk)
+        finally:
+            content.close()
+
+    def export_all_for_course_to_fs(
+        self, course_key, export_fs, static_dir, assets_policy_path, max_workers=DEFAULT_EXPORT_WORKERS
+    ):
+        """
+        Export all of this course's assets into a directory of the given filesystem,
+        reading up to max_workers of them from GridFS at a time. Export all of the
+        assets' attributes to the policy file.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            export_fs (fs.base.FS): the filesystem to export to
+            static_dir: the path in export_fs of the directory under which to put all the asset files
+            assets_policy_path: the path in export_fs of the policy file
+            max_workers: the maximum number of assets to export concurrently
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        for asset in assets:
+            for attr, value in asset.iteritems():
+                if attr not in NON_POLICY_ATTRS:
+                    policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consume the results to re-raise any export errors.
+            list(executor.map(
+                lambda asset: self.export_to_fs(asset['asset_key'], export_fs, static_dir),
+                assets,
+            ))
+
+        with export_fs.open(assets_policy_path, 'wb') as policy_file:
+            policy_file.write(json.dumps(policy, sort_keys=True, indent=4))
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -209,6 +368,134 @@ class MongoContentStore(ContentStore):
             course_key, start=start, maxresults=maxresults, get_thumbnails=False, sort=sort, filter_params=filter_params
         )
 
+    @autoretry_read()
+    def get_asset_page(self, course_key, page_size, start=0, cursor=None, sort=None, filter_params=None):
+        """
+        See :meth:`.ContentStore.get_asset_page`
+
+        The page is read from the asset index, which has an index per course on each of the sort fields, so
+        neither the page nor the cursor requires reading any of the course's other assets.  The total count
+        is cached per course and filter until the course's assets next change.
+        """
+        course_doc = self._ensure_course_asset_index(course_key)
+        query = {'course_id': course_doc['_id'], 'category': 'asset'}
+        if filter_params:
+            query.update(filter_params)
+        total_count = self._count_asset_index(course_doc, query)
+
+        sort_field, direction = sort[0] if sort else ('uploadDate', pymongo.DESCENDING)
+        if sort_field == 'displayname':
+            sort_field = 'displayname_lower'
+        if cursor is not None:
+            # Page from the last asset of the previous page, rather than skipping over the earlier pages.
+            last_value, last_name = json_util.loads(base64.urlsafe_b64decode(str(cursor)))
+            operator = '$lt' if direction == pymongo.DESCENDING else '$gt'
+            query = {'$and': [query, {'$or': [
+                {sort_field: {operator: last_value}},
+                {sort_field: last_value, 'name': {operator: last_name}},
+            ]}]}
+            start = 0
+
+        # The asset name is unique within the course, so it makes the order, and so the cursor, total.
+        items = self.asset_index.find(query).sort([(sort_field, direction), ('name', direction)])
+        if start > 0:
+            items = items.skip(start)
+        assets = list(items.limit(page_size))
+
+        next_cursor = None
+        if len(assets) == page_size:
+            last_asset = assets[-1]
+            next_cursor = base64.urlsafe_b64encode(
+                json_util.dumps([last_asset.get(sort_field), last_asset['name']])
+            )
+
+        for asset in assets:
+            asset['asset_key'] = course_key.make_asset_key(asset['category'], asset['name'])
+        return assets, total_count, next_cursor
+
+    def _ensure_course_asset_index(self, course_key):
+        """
+        Return the asset index document of the course, first adding all of the course's assets to the asset
+        index if they haven't been yet.
+        """
+        course_id = asset_index_course_id(course_key)
+        course_doc = self.asset_index_courses.find_one({'_id': course_id})
+        if course_doc is None or not course_doc.get('built'):
+            for fs_entry in self.fs_files.find(query_for_course(course_key)):
+                self._index_fs_entry(fs_entry)
+            self.asset_index_courses.update(
+                {'_id': course_id},
+                {'$set': {'built': True}, '$inc': {'generation': 1}, '$unset': {'counts': ''}},
+                upsert=True,
+            )
+            course_doc = self.asset_index_courses.find_one({'_id': course_id})
+        return course_doc
+
+    def _count_asset_index(self, course_doc, query):
+        """
+        Return the number of the course's assets which match query, caching the count in the course's asset
+        index document for as long as the course's assets are unchanged.
+        """
+        count_key = hashlib.md5(json_util.dumps(query, sort_keys=True)).hexdigest()
+        count = course_doc.get('counts', {}).get(count_key)
+        if count is None:
+            count = self.asset_index.find(query).count()
+            # Only cache the count if no asset was changed while it was counted.
+            self.asset_index_courses.update(
+                {'_id': course_doc['_id'], 'generation': course_doc.get('generation')},
+                {'$set': {'counts.{}'.format(count_key): count}},
+            )
+        return count
+
+    def _index_asset(self, content_id):
+        """
+        Add the asset with the given fs.files _id to the asset index, or update its entry.
+        """
+        fs_entry = self.fs_files.find_one({'_id': content_id})
+        if fs_entry is not None:
+            self._asset_index_changed(self._index_fs_entry(fs_entry))
+
+    def _index_fs_entry(self, fs_entry):
+        """
+        Add the asset described by the given fs.files document to the asset index, or update its entry, and
+        return the asset index id of its course.
+        """
+        content_id, entry = self._asset_index_entry(fs_entry)
+        self.asset_index.update({'_id': content_id}, entry, upsert=True)
+        return entry['course_id']
+
+    def _asset_index_entry(self, fs_entry):
+        """
+        Return the _id and the asset index entry of the asset described by the given fs.files document.
+        """
+        content_id = self.make_id_son(fs_entry)
+        asset_son = fs_entry.get('content_son') or content_id
+        entry = {field: fs_entry.get(field) for field in ASSET_INDEX_FIELDS}
+        entry.update({
+            'course_id': asset_index_course_id(asset_son),
+            'category': asset_son['category'],
+            'name': asset_son['name'],
+            'displayname_lower': (fs_entry.get('displayname') or u'').lower(),
+        })
+        return content_id, entry
+
+    def _unindex_asset(self, content_id):
+        """
+        Remove the asset with the given fs.files _id from the asset index.
+        """
+        entry = self.asset_index.find_and_modify({'_id': content_id}, remove=True)
+        if entry is not None:
+            self._asset_index_changed(entry['course_id'])
+
+    def _asset_index_changed(self, course_id):
+        """
+        Invalidate the cached counts of the assets of the course with the given asset index id.
+        """
+        self.asset_index_courses.update(
+            {'_id': course_id},
+            {'$inc': {'generation': 1}, '$unset': {'counts': ''}},
+        )
+
     def remove_redundant_content_for_courses(self):
         """
         Finds and removes all redundant files (Mac OS metadata files with filename ".DS_Store"
@@ -225,8 +512,16 @@ class MongoContentStore(ContentStore):
             assets_to_delete = assets_to_delete + items.count()
             for asset in items:
                 self.fs.delete(asset[prefix])
+                if asset.get('blob_id'):
+                    self._release_blob(asset['blob_id'])
 
             self.fs_files.remove(query)
+
+        if assets_to_delete:
+            self.asset_index.remove({'category': 'asset', 'name': {'$regex': ASSET_IGNORE_REGEX}})
+            self.asset_index_courses.update(
+                {}, {'$inc': {'generation': 1}, '$unset': {'counts': ''}}, multi=True
+            )
         return assets_to_delete
 
     @autoretry_read()
@@ -350,13 +645,14 @@ class MongoContentStore(ContentStore):
         :param location:  a c4x asset location
         """
         for attr in attr_dict.iterkeys():
-            if attr in ['_id', 'md5', 'uploadDate', 'length']:
+            if attr in ['_id', 'md5', 'uploadDate', 'length', 'blob_id']:
                 raise AttributeError("{} is a protected attribute.".format(attr))
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        self._index_asset(asset_db_key)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -375,21 +671,85 @@ class MongoContentStore(ContentStore):
             raise NotFoundError(asset_db_key)
         return item
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(
+        self, source_course_key, dest_course_key, max_workers=DEFAULT_COPY_WORKERS, progress_callback=None
+    ):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation streams the course's assets in batches of ASSET_COPY_BATCH_SIZE, copying up to
+        max_workers batches at a time. Each batch is copied with unordered bulk inserts of the assets'
+        fs.files documents and chunks, whose keys are rewritten for the destination course, so that no
+        asset's data is reassembled on the way. In content addressed mode, the copies instead reference
+        the blobs holding the data of the originals.
+
+        Args:
+            source_course_key (CourseKey): the course to copy the assets of
+            dest_course_key (CourseKey): the course to copy the assets to
+            max_workers: the maximum number of batches to copy concurrently
+            progress_callback: if given, called with the number of assets copied so far and the total
+                number of assets to copy, after each batch is copied
+
+        Raises:
+            FileExists: if any of the copies already exists, after copying all of the other assets
         """
         source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
-        for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
+        total = self.fs_files.find(source_query).count()
+        progress = {'copied': 0, 'existing': []}
+        progress_lock = threading.Lock()
+
+        def copy_batch(assets):
+            """
+            Copy a batch of assets, and report the progress.
+            """
+            existing = self._copy_asset_batch(assets, dest_course_key)
+            with progress_lock:
+                progress['copied'] += len(assets)
+                progress['existing'].extend(existing)
+                log.info(
+                    u"Copied %d of %d assets from %s to %s",
+                    progress['copied'], total, source_course_key, dest_course_key
+                )
+                if progress_callback is not None:
+                    progress_callback(progress['copied'], total)
+
+        pending = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batch = []
+            for asset in self.fs_files.find(source_query).batch_size(ASSET_COPY_BATCH_SIZE):
+                batch.append(asset)
+                if len(batch) < ASSET_COPY_BATCH_SIZE:
+                    continue
+                if len(pending) >= max_workers:
+                    # Don't read more batches than can be copied at once.
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(copy_batch, batch))
+                batch = []
+            if batch:
+                pending.add(executor.submit(copy_batch, batch))
+            # Re-raise any copy errors.
+            for future in pending:
+                future.result()
+
+        self._asset_index_changed(asset_index_course_id(dest_course_key))
+        if progress['existing']:
+            raise FileExists("file with _id %r already exists" % progress['existing'][0])
+
+    def _copy_asset_batch(self, assets, dest_course_key):
+        """
+        Copy the assets described by the given fs.files documents to the destination course, and return
+        the _ids of the copies which already existed, and so weren't copied.
+        """
+        copies = []
+        for asset in assets:
+            source_id = self.make_id_son(asset)
+            asset_key = source_id
             if isinstance(asset_key, basestring):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
+                __, asset_key = self.asset_db_key(AssetKey.from_string(asset_key))
+            else:
+                asset_key = SON(asset_key)
             asset_key['org'] = dest_course_key.org
             asset_key['course'] = dest_course_key.course
             if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
@@ -402,17 +762,101 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                displayname=asset['displayname'], content_son=asset_key,
+            copy = {
+                '_id': asset_id,
+                'filename': asset.get('filename'),
+                'contentType': asset.get('contentType'),
+                'displayname': asset.get('displayname'),
+                'content_son': asset_key,
                 # thumbnail is not technically correct but will be functionally correct as the code
                 # only looks at the name which is not course relative.
-                thumbnail_location=asset['thumbnail_location'],
-                import_path=asset['import_path'],
+                'thumbnail_location': asset.get('thumbnail_location'),
+                'import_path': asset.get('import_path'),
                 # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
-            )
+                'locked': asset.get('locked', False),
+                'length': asset['length'],
+                'chunkSize': asset['chunkSize'],
+                'md5': asset.get('md5'),
+                'uploadDate': datetime.datetime.utcnow(),
+            }
+            if self.content_addressed:
+                blob = self._reference_blob(asset['blob_id']) if asset.get('blob_id') else None
+                if blob is None:
+                    # The original isn't in a blob yet, so read its data once to store it in one.
+                    blob = self._store_blob(self._open_data(self.fs.get(source_id)))
+                copy.update({
+                    'blob_id': blob['_id'], 'length': blob['length'], 'chunkSize': blob['chunkSize'],
+                    'md5': blob['md5'],
+                })
+                chunk_source = None
+            elif asset.get('blob_id'):
+                # The original's data is in a blob, but the copy gets chunks of its own.
+                chunk_source = (self.blobs_chunks, asset['blob_id'])
+            else:
+                chunk_source = (self.chunks, source_id)
+            copies.append((copy, chunk_source))
+
+        existing = self._bulk_insert(self.fs_files, [copy for copy, __ in copies])
+        for copy, __ in copies:
+            if copy['_id'] in existing and copy.get('blob_id'):
+                self._release_blob(copy['blob_id'])
+        copies = [(copy, chunk_source) for copy, chunk_source in copies if copy['_id'] not in existing]
+
+        for collection in (self.chunks, self.blobs_chunks):
+            # The files_id of the chunks of each source in collection, and the _ids of the copies of its data.
+            sources = {}
+            for copy, chunk_source in copies:
+                if chunk_source is not None and chunk_source[0] is collection:
+                    files_id = chunk_source[1]
+                    sources.setdefault(_id_key(files_id), (files_id, []))[1].append(copy['_id'])
+            if sources:
+                self._copy_chunks(collection, sources)
+
+        index_entries = [self._asset_index_entry(copy) for copy, __ in copies]
+        if index_entries:
+            bulk = self.asset_index.initialize_unordered_bulk_op()
+            for content_id, entry in index_entries:
+                bulk.find({'_id': content_id}).upsert().replace_one(entry)
+            bulk.execute()
+
+        return existing
+
+    def _copy_chunks(self, collection, sources):
+        """
+        Copy the chunks in collection of each source to the fs.chunks of its copies, where sources maps
+        the _id_key of the files_id of each source's chunks to that files_id and the _ids of its copies.
+        """
+        files_ids = [files_id for files_id, __ in sources.itervalues()]
+        batch, batch_bytes = [], 0
+        for chunk in collection.find({'files_id': {'$in': files_ids}}).batch_size(ASSET_COPY_BATCH_SIZE):
+            for copy_id in sources[_id_key(chunk['files_id'])][1]:
+                batch.append({'files_id': copy_id, 'n': chunk['n'], 'data': chunk['data']})
+                batch_bytes += len(chunk['data'])
+            if batch_bytes >= CHUNK_COPY_BATCH_BYTES:
+                self._bulk_insert(self.chunks, batch)
+                batch, batch_bytes = [], 0
+        if batch:
+            self._bulk_insert(self.chunks, batch)
+
+    @staticmethod
+    def _bulk_insert(collection, documents):
+        """
+        Insert the documents into collection with an unordered bulk write, and return the _ids of those
+        which already existed.
+        """
+        if not documents:
+            return []
+        bulk = collection.initialize_unordered_bulk_op()
+        for document in documents:
+            bulk.insert(document)
+        try:
+            bulk.execute()
+        except BulkWriteError as error:
+            errors = error.details['writeErrors']
+            if any(write_error['code'] not in DUPLICATE_KEY_CODES for write_error in errors):
+                raise
+            return [documents[write_error['index']]['_id'] for write_error in errors]
+        return []
 
     def delete_all_course_assets(self, course_key):
         """
@@ -425,6 +869,148 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+            if asset.get('blob_id'):
+                self._release_blob(asset['blob_id'])
+
+        course_id = asset_index_course_id(course_key)
+        self.asset_index.remove({'course_id': course_id})
+        self.asset_index_courses.remove({'_id': course_id})
+
+    def _open_data(self, fp):
+        """
+        Return a file-like object reading the data of the asset whose GridFS file is fp, which is
+        the asset's blob if it has one.
+        """
+        blob_id = getattr(fp, 'blob_id', None)
+        if blob_id is None:
+            return fp
+        return self.blobs.get(blob_id)
+
+    def _store_blob(self, data):
+        """
+        Add a reference to the blob holding the given data, storing the data in a new blob if no
+        blob holds it yet, and return the blob's document.
+
+        :param data: a string, an iterable of strings, or a file-like object
+        """
+        with tempfile.SpooledTemporaryFile(max_size=BLOB_SPOOL_SIZE) as data_file:
+            digest = hashlib.sha256()
+            if hasattr(data, 'read'):
+                data = iter(lambda: data.read(BLOB_SPOOL_SIZE), b'')
+            elif not hasattr(data, '__iter__'):
+                data = [data]
+            for chunk in data:
+                digest.update(chunk)
+                data_file.write(chunk)
+            blob_id = digest.hexdigest()
+
+            for __ in range(BLOB_WRITE_ATTEMPTS):
+                blob = self._reference_blob(blob_id)
+                if blob is not None:
+                    return blob
+                deleted_blob = self.blobs_files.find_one({'_id': blob_id}, {'deleting': True})
+                if deleted_blob is not None:
+                    # The blob is being deleted. Its document is removed after its chunks, so its data
+                    # can be stored again once the document is gone.
+                    deleting = deleted_blob.get('deleting')
+                    if deleting is not None and self._is_blob_deletion_abandoned(deleting):
+                        self._delete_blob(blob_id, deleting)
+                    else:
+                        time.sleep(BLOB_DELETE_WAIT)
+                    continue
+                data_file.seek(0)
+                try:
+                    self.blobs.put(data_file, _id=blob_id, refcount=1)
+                except FileExists:
+                    # Another process is storing the same data, so reference its blob once it's uploaded.
+                    blob = self._wait_for_blob_upload(blob_id)
+                    if blob is not None:
+                        return blob
+                    continue
+                return self.blobs_files.find_one({'_id': blob_id})
+            raise FileExists("blob with _id %r is being stored or deleted by another process" % blob_id)
+
+    def _wait_for_blob_upload(self, blob_id):
+        """
+        Wait, with backoff, for another process to finish uploading the blob with the given id, then
+        add a reference to it and return its document. Return None if it isn't uploaded within
+        BLOB_UPLOAD_TIMEOUT seconds, or is being deleted.
+        """
+        wait = BLOB_UPLOAD_WAIT
+        waited = 0
+        while waited < BLOB_UPLOAD_TIMEOUT:
+            time.sleep(wait)
+            waited += wait
+            wait = min(wait * 2, BLOB_UPLOAD_MAX_WAIT)
+            blob = self._reference_blob(blob_id)
+            if blob is not None:
+                return blob
+            if self.blobs_files.find_one({'_id': blob_id}, {'_id': True}) is not None:
+                # The blob was uploaded, but it's already being deleted.
+                return None
+        return None
+
+    def _reference_blob(self, blob_id):
+        """
+        Add a reference to the blob with the given id, and return its document, or None if there's
+        no such blob, or it's being deleted.
+        """
+        return self.blobs_files.find_and_modify(
+            {'_id': blob_id, 'deleting': {'$exists': False}}, {'$inc': {'refcount': 1}}, new=True
+        )
+
+    def _release_blob(self, blob_id):
+        """
+        Remove a reference to the blob with the given id, and delete the blob if that was its last
+        reference.
+        """
+        blob = self.blobs_files.find_and_modify({'_id': blob_id}, {'$inc': {'refcount': -1}}, new=True)
+        if blob is not None and blob['refcount'] <= 0:
+            # Mark the blob as being deleted, unless it was referenced again since, so that it isn't
+            # referenced while its chunks are removed.
+            deleting = ObjectId()
+            marked = self.blobs_files.find_and_modify(
+                {'_id': blob_id, 'refcount': {'$lte': 0}, 'deleting': {'$exists': False}},
+                {'$set': {'deleting': deleting}},
+            )
+            if marked is not None:
+                self._delete_blob(blob_id, deleting)
+
+    def _delete_blob(self, blob_id, deleting):
+        """
+        Delete the blob with the given id, which was marked as being deleted with the given ObjectId.
+        The chunks are removed before the document, so that no chunks outlive it.
+        """
+        self.blobs_chunks.remove({'files_id': blob_id})
+        self.blobs_files.remove({'_id': blob_id, 'deleting': deleting})
+
+    @staticmethod
+    def _is_blob_deletion_abandoned(deleting):
+        """
+        Return whether the deletion of a blob marked with the given ObjectId has taken so long that the
+        process deleting it must have stopped.
+        """
+        marked_on = deleting.generation_time.replace(tzinfo=None)
+        return datetime.datetime.utcnow() - marked_on > datetime.timedelta(seconds=BLOB_DELETE_TIMEOUT)
+
+    def _put_blob_reference(self, content_id, blob, **attrs):
+        """
+        Store the fs.files document of an asset whose data is the given blob, which must already count
+        the reference.
+        """
+        attrs.update({
+            '_id': content_id,
+            'blob_id': blob['_id'],
+            'length': blob['length'],
+            'chunkSize': blob['chunkSize'],
+            'md5': blob['md5'],
+            'uploadDate': datetime.datetime.utcnow(),
+        })
+        try:
+            self.fs_files.insert(attrs)
+        except DuplicateKeyError:
+            self._release_blob(blob['_id'])
+            raise FileExists("file with _id %r already exists" % content_id)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -557,6 +1143,32 @@ class MongoContentStore(ContentStore):
             sparse=True,
             background=True
         )
+        # The asset index is read a page at a time by `get_asset_page`, which sorts on one of these fields,
+        # followed by the asset name.
+        for sort_field in ['uploadDate', 'displayname_lower', 'contentType']:
+            create_collection_index(
+                self.asset_index,
+                [
+                    ('course_id', pymongo.ASCENDING),
+                    ('category', pymongo.ASCENDING),
+                    (sort_field, pymongo.ASCENDING),
+                    ('name', pymongo.ASCENDING)
+                ],
+                background=True
+            )
+
+
+def asset_index_course_id(course_key):
+    """
+    Return the id by which the asset index identifies the course, given either its key or the SON
+    identifying one of its assets.  Courses with deprecated keys have no run.
+    """
+    if isinstance(course_key, dict):
+        org, course, run = course_key['org'], course_key['course'], course_key.get('run')
+    else:
+        org, course = course_key.org, course_key.course
+        run = None if getattr(course_key, 'deprecated', False) else course_key.run
+    return u'/'.join([org, course, run or u''])
 
 
 def query_for_course(course_key, category=None):
@@ -580,3 +1192,12 @@ def query_for_course(course_key, category=None):
     else:
         dbkey['{}.run'.format(prefix)] = course_key.run
     return dbkey
+
+
+def _id_key(files_id):
+    """
+    Return a hashable key for the given fs.files _id, which may be a SON.
+    """
+    if isinstance(files_id, dict):
+        return tuple(sorted(files_id.items()))
+    return files_id
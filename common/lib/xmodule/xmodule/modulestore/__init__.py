@@ -19,7 +19,7 @@ from abc import ABCMeta, abstractmethod
 from contracts import contract, new_contract
 from xblock.plugin import default_select
 
-from .exceptions import InvalidLocationError, InsufficientSpecificationError
+from .exceptions import InvalidLocationError, InsufficientSpecificationError, ItemNotFoundError
 from xmodule.errortracker import make_error_tracker
 from xmodule.assetstore import AssetMetadata
 from opaque_keys.edx.keys import CourseKey, UsageKey, AssetKey
@@ -1212,6 +1212,31 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
         """
         return {}
 
+    def get_items_by_keys(self, usage_keys, depth=0, **kwargs):
+        """
+        Returns a dict mapping each of the given usage keys which is found to its
+        XModuleDescriptor. Keys which aren't found are omitted.
+
+        Default impl--get_item for each key, within a bulk operation per course.
+        Modulestores which can load many items of a course at once override this.
+
+        Args:
+            usage_keys (list): the :class:`.UsageKey` of each item to load
+            depth (int): how deep below each item to prefetch descendants, as for get_item
+        """
+        items = {}
+        keys_by_course = defaultdict(list)
+        for usage_key in usage_keys:
+            keys_by_course[usage_key.course_key].append(usage_key)
+        for course_key, course_usage_keys in keys_by_course.iteritems():
+            with self.bulk_operations(course_key):
+                for usage_key in course_usage_keys:
+                    try:
+                        items[usage_key] = self.get_item(usage_key, depth, **kwargs)
+                    except ItemNotFoundError:
+                        pass
+        return items
+
     def get_course(self, course_id, depth=0, **kwargs):
         """
         See ModuleStoreRead.get_course
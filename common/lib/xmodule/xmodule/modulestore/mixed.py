@@ -6,6 +6,7 @@ In this way, courses can be served up via either SplitMongoModuleStore or MongoM
 """
 
 import logging
+from collections import OrderedDict
 from contextlib import contextmanager
 import itertools
 import functools
@@ -254,6 +255,29 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._get_modulestore_for_courselike(usage_key.course_key)
         return store.get_item(usage_key, depth, **kwargs)
 
+    @strip_key
+    def get_items_by_keys(self, usage_keys, depth=0, **kwargs):
+        """
+        Returns a dict mapping each of the given usage keys which is found to its
+        XModuleDescriptor. Keys which aren't found are omitted.
+
+        The keys are grouped by the modulestore backing their course, and each
+        modulestore loads its group at once.
+
+        Args:
+            usage_keys (list): the :class:`.UsageKey` of each item to load
+            depth (int): how deep below each item to prefetch descendants, as for get_item
+        """
+        keys_by_store = OrderedDict()
+        for usage_key in usage_keys:
+            store = self._get_modulestore_for_courselike(usage_key.course_key)
+            keys_by_store.setdefault(store, []).append(usage_key)
+
+        items = {}
+        for store, store_keys in keys_by_store.iteritems():
+            items.update(store.get_items_by_keys(store_keys, depth, **kwargs))
+        return items
+
     @strip_key
     def get_items(self, course_key, **kwargs):
         """
@@ -606,6 +630,22 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except NotImplementedError:
             return None, None
 
+    def get_changed_blocks_since_version(self, course_key, previous_version):
+        """
+        Returns the (changed, removed) blocks of the given course since
+        previous_version of its structure, as sets of branch and version
+        agnostic usage keys.
+
+        Raises NotImplementedError if the course's modulestore does not
+        version its structures.
+        """
+        store = self._verify_modulestore_support(course_key, 'get_changed_blocks_since_version')
+        changed, removed = store.get_changed_blocks_since_version(course_key, previous_version)
+        return (
+            {usage_key.for_branch(None).version_agnostic() for usage_key in changed},
+            {usage_key.for_branch(None).version_agnostic() for usage_key in removed},
+        )
+
     def get_modulestore_type(self, course_id):
         """
         Returns a type which identifies which modulestore is servicing the given course_id.
@@ -12,7 +12,6 @@ structure:
 }
 """
 
-import copy
 from datetime import datetime
 from importlib import import_module
 import logging
@@ -46,6 +45,7 @@ from xmodule.modulestore.draft_and_published import ModuleStoreDraftAndPublished
 from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError, ReferentialIntegrityError
 from xmodule.modulestore.inheritance import InheritanceMixin, inherit_metadata, InheritanceKeyValueStore
+from xmodule.modulestore.mongo.inheritance_tree import MetadataInheritanceTree
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.xml import CourseLocationManager
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
@@ -260,9 +260,10 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 ]
 
                 parent = None
-                if self.cached_metadata is not None:
+                if isinstance(self.cached_metadata, MetadataInheritanceTree):
                     # fish the parent out of here if it's available
-                    parent_url = self.cached_metadata.get(unicode(location), {}).get('parent', {}).get(
+                    parent_url = self.cached_metadata.get_parent(
+                        unicode(location),
                         ModuleStoreEnum.Branch.published_only if location.branch is None
                         else ModuleStoreEnum.Branch.draft_preferred
                     )
@@ -709,61 +710,30 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
         # is a dictionary relative to that course
-        results_by_url = {}
+        containers = {}
         root = None
 
-        # now go through the results and order them by the location url
+        # now go through the results and index their children and metadata by the location url
         for result in resultset:
             # manually pick it apart b/c the db has tag and we want as_published revision regardless
             location = as_published(BlockUsageLocator._from_deprecated_son(result['_id'], course_id.run))
 
             location_url = unicode(location)
-            if location_url in results_by_url:
+            children = result.get('definition', {}).get('children', [])
+            if location_url in containers:
                 # found either draft or live to complement the other revision
                 # FIXME this is wrong. If the child was moved in draft from one parent to the other, it will
                 # show up under both in this logic: https://openedx.atlassian.net/browse/TNL-1075
-                existing_children = results_by_url[location_url].get('definition', {}).get('children', [])
-                additional_children = result.get('definition', {}).get('children', [])
-                total_children = existing_children + additional_children
+                existing_children, metadata = containers[location_url]
                 # use set to get rid of duplicates. We don't care about order; so, it shouldn't matter.
-                results_by_url[location_url].setdefault('definition', {})['children'] = set(total_children)
+                containers[location_url] = (list(set(existing_children) | set(children)), metadata)
             else:
-                results_by_url[location_url] = result
+                containers[location_url] = (children, result.get('metadata', {}))
             if location.block_type == 'course':
                 root = location_url
 
         # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
-
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
-
-        if root is not None:
-            _compute_inherited_metadata(root)
-
-        return metadata_to_inherit
+        return MetadataInheritanceTree(self.get_branch_setting(), root, containers)
 
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
@@ -780,6 +750,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             # then look in any caching subsystem (e.g. memcached)
             if self.metadata_inheritance_cache_subsystem is not None:
                 tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
+                if not isinstance(tree, MetadataInheritanceTree):
+                    # cached by an earlier release, before trees could be updated in place
+                    tree = {}
             else:
                 logging.warning(
                     'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
@@ -794,9 +767,13 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             if self.metadata_inheritance_cache_subsystem is not None:
                 self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
 
-        # now populate a request_cache, if available. NOTE, we are outside of the
-        # scope of the above if: statement so that after a memcache hit, it'll get
-        # put into the request_cache
+        self._set_request_cached_metadata_inheritance_tree(course_id, tree)
+        return tree
+
+    def _set_request_cached_metadata_inheritance_tree(self, course_id, tree):
+        """
+        Populate the request_cache, if available, with the metadata inheritance tree for the course.
+        """
         if self.request_cache is not None:
             # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
             # defined
@@ -804,23 +781,108 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 self.request_cache.data['metadata_inheritance'] = {}
             self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
 
-        return tree
-
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, xblock=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If given the xblock which was just updated, the cached tree is updated in place for the change
+        to that xblock when possible, rather than recomputed for the whole course.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
             # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            cached_metadata = None
+            if xblock is not None:
+                cached_metadata = self._update_cached_metadata_inheritance_tree(course_id, xblock)
+            if cached_metadata is None:
+                self._mark_metadata_inheritance_tree_conflicted(course_id)
+                cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
+    def _update_cached_metadata_inheritance_tree(self, course_id, xblock):
+        """
+        Update the cached metadata inheritance tree for the change just persisted to xblock, recomputing
+        only the entries of its subtree. Returns the updated tree, or None if the change can't be applied
+        incrementally, in which case the whole tree must be recomputed.
+
+        Only edits of containers affect the tree. The change can't be applied if it removes children from
+        the container, or adds children which are containers not yet in the tree, or if the tree was
+        computed under another branch setting or another process has updated the same version of the tree.
+
+        Since the cache has no compare-and-set, each process claims the version of the tree it updates with
+        an atomic add before writing its update, so only one update is made from each version. A process
+        whose claim fails, like any process about to recompute the whole tree, marks the version as
+        conflicted; the process which won the claim checks for the mark after writing its update, so
+        whichever of them writes last writes a tree recomputed from the modulestore.
+        """
+        course_id = self.fill_in_run(course_id)
+        tree = self._get_cached_metadata_inheritance_tree(course_id)
+        if not isinstance(tree, MetadataInheritanceTree) or tree.branch != self.get_branch_setting():
+            return None
+
+        location = as_published(xblock.location)
+        if location.block_type not in BLOCK_TYPES_WITH_CHILDREN:
+            return tree
+        url = unicode(location)
+        if location.block_type == 'course' and tree.root != url:
+            return None
+
+        children = self._serialize_scope(xblock, Scope.children).get('children', [])
+        for child_url in children:
+            if (
+                    child_url not in tree.children and
+                    UsageKey.from_string(child_url).block_type in BLOCK_TYPES_WITH_CHILDREN
+            ):
+                return None
+        metadata = {
+            field_name: value
+            for field_name, value in self._serialize_scope(xblock, Scope.settings).iteritems()
+            if field_name in InheritanceMixin.fields
+        }
+
+        read_version = tree.version
+        if not tree.update_container(url, children, metadata):
+            return None
+
+        cache = self.metadata_inheritance_cache_subsystem
+        if cache is not None:
+            claim_key = self._metadata_inheritance_tree_version_key(course_id, read_version, 'claimed')
+            conflict_key = self._metadata_inheritance_tree_version_key(course_id, read_version, 'conflicted')
+            if not cache.add(claim_key, tree.version):
+                # another process has updated the same version of the tree, so neither update includes
+                # the other's change
+                cache.set(conflict_key, True)
+                return None
+            cache.set(unicode(course_id), tree)
+            if cache.get(conflict_key):
+                return None
+        self._set_request_cached_metadata_inheritance_tree(course_id, tree)
+        return tree
+
+    def _mark_metadata_inheritance_tree_conflicted(self, course_id):
+        """
+        Mark the version of the course's metadata inheritance tree which is in the cache as conflicted, so that
+        a process updating that version in place doesn't leave its update over the tree about to be recomputed.
+        """
+        cache = self.metadata_inheritance_cache_subsystem
+        if cache is not None:
+            course_id = self.fill_in_run(course_id)
+            tree = cache.get(unicode(course_id))
+            if isinstance(tree, MetadataInheritanceTree):
+                cache.set(self._metadata_inheritance_tree_version_key(course_id, tree.version, 'conflicted'), True)
+
+    @staticmethod
+    def _metadata_inheritance_tree_version_key(course_id, version, suffix):
+        """
+        Returns the cache key of the given entry about a version of the metadata inheritance tree of the course.
+        """
+        return u'{}.{}.{}'.format(course_id, version, suffix)
+
     def _clean_item_data(self, item):
         """
         Renames the '_id' field in item to 'location'
@@ -950,7 +1012,10 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             system = using_descriptor_system
             system.module_data.update(data_cache)
-            system.cached_metadata.update(cached_metadata)
+            if not system.cached_metadata:
+                system.cached_metadata = cached_metadata
+            else:
+                system.cached_metadata.update(cached_metadata)
 
         item = system.load_item(location, for_parent=for_parent)
 
@@ -1564,8 +1629,10 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             # update the edit info of the instantiated xblock
             xblock._edit_info = payload['edit_info']
 
-            # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            # update the metadata inheritance tree which is cached
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, xblock=xblock
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
@@ -0,0 +1,151 @@
+"""
+The metadata inheritance tree of an old Mongo course.
+
+The tree maps the url of each block reachable from the course root to the
+inheritable metadata it inherits from its ancestors.  Alongside that map it
+keeps the children and the own inheritable metadata of every container in
+the course, so that an edit to one container can be applied by recomputing
+the entries of that container's subtree, rather than by querying every
+container in the course again.
+
+Blocks which inherit the same metadata share the same dict, so a tree for
+a course with many leaves under each container stays compact when pickled
+into the cache.
+"""
+from uuid import uuid4
+
+
+class MetadataInheritanceTree(dict):
+    """
+    Maps the urls of the blocks of a course, other than the course root, to
+    the inheritable metadata they inherit.  The values are shared between
+    blocks and must not be modified.
+
+    Attributes:
+        branch: The branch setting under which the parents were computed.
+        root (unicode): The url of the course root, or None.
+        parents (dict): Maps the url of each child of a container to the url
+            of the container.
+        children (dict): Maps the url of each container to the list of urls of
+            its children.
+        own_metadata (dict): Maps the url of each container which sets any
+            inheritable metadata to that metadata.
+        version (unicode): Identifies this version of the tree, and changes
+            whenever the tree is updated.
+    """
+    def __init__(self, branch=None, root=None, containers=None):
+        """
+        Arguments:
+            branch: The branch setting under which the tree is computed.
+            root (unicode): The url of the course root.
+            containers (dict): Maps the url of each container in the course to a
+                tuple of the list of urls of its children and its own
+                inheritable metadata.
+        """
+        super(MetadataInheritanceTree, self).__init__()
+        self.branch = branch
+        self.root = root
+        self.parents = {}
+        self.children = {}
+        self.own_metadata = {}
+        self.version = uuid4().hex
+
+        for url, (children, metadata) in (containers or {}).iteritems():
+            self.children[url] = list(children)
+            if metadata:
+                self.own_metadata[url] = metadata
+            for child_url in children:
+                self.parents[child_url] = url
+
+        if root is not None:
+            self._update_subtree(root)
+
+    def get_parent(self, url, branch):
+        """
+        Return the url of the parent of the block at url, if it is reachable
+        from the course root and the tree was computed under the given branch
+        setting, or None otherwise.
+        """
+        if branch != self.branch or url not in self:
+            return None
+        return self.parents.get(url)
+
+    def update(self, other=(), **kwargs):
+        """
+        Add the entries of another tree or dict to this one, including the
+        parents of another tree.
+        """
+        super(MetadataInheritanceTree, self).update(other, **kwargs)
+        if isinstance(other, MetadataInheritanceTree) and other is not self:
+            self.parents.update(other.parents)
+
+    def update_container(self, url, children, metadata):
+        """
+        Apply an edit of the container at url, setting its children and its own
+        inheritable metadata, and recompute the entries of its subtree.
+
+        The edit can't be applied if it removes any children, since a removed
+        child may still be the child of the other revision of the container; in
+        that case the tree is left unchanged and False is returned so that the
+        caller can recompute the whole tree.  Any children which are containers
+        must already be in the tree, for their subtrees to be recomputed.
+        """
+        old_children = self.children.get(url, [])
+        if set(old_children) - set(children):
+            return False
+
+        self.children[url] = list(children)
+        if metadata:
+            self.own_metadata[url] = metadata
+        else:
+            self.own_metadata.pop(url, None)
+        for child_url in children:
+            self.parents[child_url] = url
+
+        if url == self.root or url in self:
+            if url != self.root:
+                self[url] = self._inherited_by(self._metadata_of(self.parents[url]), url)
+            self._update_subtree(url)
+        self.version = uuid4().hex
+        return True
+
+    def _metadata_of(self, url):
+        """
+        Return the metadata which the children of the container at url inherit.
+        """
+        if url == self.root:
+            return self.own_metadata.get(url, {})
+        return self.get(url, {})
+
+    def _inherited_by(self, parent_metadata, url):
+        """
+        Return the metadata inherited by the block at url, given the metadata its
+        parent passes down.  If the block sets no inheritable metadata of its
+        own, it shares its parent's dict.
+        """
+        own_metadata = self.own_metadata.get(url)
+        if not own_metadata:
+            return parent_metadata
+        metadata = dict(parent_metadata)
+        metadata.update(own_metadata)
+        return metadata
+
+    def _update_subtree(self, url):
+        """
+        Recompute the entries of the descendants of the container at url, whose
+        own entry must be up to date.
+        """
+        visited = set()
+        pending = [url]
+        while pending:
+            parent_url = pending.pop()
+            if parent_url in visited:
+                continue
+            visited.add(parent_url)
+
+            parent_metadata = self._metadata_of(parent_url)
+            for child_url in self.children.get(parent_url, []):
+                self.parents[child_url] = parent_url
+                self[child_url] = self._inherited_by(parent_metadata, child_url)
+                if child_url in self.children:
+                    pending.append(child_url)
@@ -0,0 +1,63 @@
+"""
+Generates synthetic courses of a given number of blocks, for benchmarking the modulestore.
+"""
+
+from xmodule.modulestore import ModuleStoreEnum
+
+# The block types of each level of a synthetic course, below the course block.
+COURSE_LEVELS = ('chapter', 'sequential', 'vertical', 'problem')
+
+# The data of each problem in a synthetic course.
+PROBLEM_DATA = u"""<problem>
+<multiplechoiceresponse>
+  <choicegroup type="MultipleChoice">
+    <choice correct="true">Correct</choice>
+    <choice correct="false">Incorrect</choice>
+  </choicegroup>
+</multiplechoiceresponse>
+</problem>"""
+
+
+def branching_for(num_blocks, num_levels=len(COURSE_LEVELS)):
+    """
+    Return the smallest number of children per block which gives a tree of num_levels levels (not
+    counting the root) at least num_blocks blocks.
+    """
+    branching = 1
+    while sum(branching ** level for level in range(1, num_levels + 1)) < num_blocks:
+        branching += 1
+    return branching
+
+
+def make_course(store, course_key, num_blocks, user_id=ModuleStoreEnum.UserID.test):
+    """
+    Create a course with exactly num_blocks blocks below its course block, in the levels of COURSE_LEVELS,
+    and return a dict of the usage keys of the course's blocks by block type.
+
+    Each level is filled in before the next, with up to the same number of children per block, so only
+    the last level may be partly empty. The block ids are derived from the blocks' positions, so that
+    courses of the same size are identical from run to run.
+    """
+    branching = branching_for(num_blocks)
+    with store.bulk_operations(course_key):
+        course = store.create_course(course_key.org, course_key.course, course_key.run, user_id)
+        usage_keys = {'course': [course.location]}
+        parents = [course.location]
+        remaining = num_blocks
+        for block_type in COURSE_LEVELS:
+            children = []
+            for parent in parents:
+                for index in range(min(branching, remaining)):
+                    fields = {'display_name': u'{} {}'.format(block_type, len(children))}
+                    if block_type == 'problem':
+                        fields['data'] = PROBLEM_DATA
+                    child = store.create_child(
+                        user_id, parent, block_type,
+                        block_id=u'{}_{}_{}'.format(parent.block_id, block_type, index),
+                        fields=fields,
+                    )
+                    children.append(child.location)
+                    remaining -= 1
+            usage_keys[block_type] = children
+            parents = children
+    return usage_keys
@@ -5,6 +5,7 @@ report which can be viewed over time to examine the performance effects of code
 various parts of the system.
 """
 
+import json
 import sqlite3
 from lxml.builder import E
 import lxml.html
@@ -16,6 +17,9 @@ except ImportError:
 
 DB_NAME = 'block_times.db'
 
+# Ratio of a timing to the same timing in the previous run over which it's reported as a regression.
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+
 
 class HTMLTable(object):
     """
@@ -265,12 +269,146 @@ class FindReportGen(ReportGenerator):
         return html
 
 
+class ReadPathReportGen(ReportGenerator):
+    """
+    Class which generates report for modulestore read path performance test data, comparing the
+    latest run with the one before it.
+    """
+    def __init__(self, db_name, threshold=DEFAULT_REGRESSION_THRESHOLD):
+        super(ReadPathReportGen, self).__init__(db_name)
+        self.threshold = threshold
+        self._read_timing_data()
+
+    def _read_timing_data(self):
+        """
+        Read in the timing data from the sqlite DB and save into a dict.
+        """
+        self.run_data = {}
+        self.run_timestamps = {}
+
+        self.all_modulestores = set()
+        for row in self.all_rows:
+            run_id, time_taken = row[1], row[3]
+
+            # Split apart the description into its parts.
+            desc_parts = row[2].split(':')
+            if desc_parts[0] != 'ReadPathTest':
+                continue
+            modulestore, num_blocks = desc_parts[1:3]
+            self.all_modulestores.add(modulestore)
+            test_phase = ':'.join(desc_parts[3:]) or 'all'
+            self.run_timestamps.setdefault(run_id, row[4])
+
+            # Save the data in a multi-level dict:
+            #   { run1: { phase1: { num_blocks1: { modulestore1: duration, ...}, ...}, ...}, ...}.
+            phase_data = self.run_data.setdefault(run_id, {}).setdefault(test_phase, {})
+            block_data = phase_data.setdefault(num_blocks, {})
+            __ = block_data.setdefault(modulestore, time_taken)
+
+        # The rows are read latest run first.
+        self.run_ids = sorted(self.run_data.keys(), reverse=True)
+
+    def comparisons(self):
+        """
+        Return a list of dicts comparing each timing of the latest run with the same timing of the
+        run before it, sorted by phase, course size and modulestore.
+        """
+        if not self.run_ids:
+            return []
+        latest = self.run_data[self.run_ids[0]]
+        previous = self.run_data[self.run_ids[1]] if len(self.run_ids) > 1 else {}
+
+        results = []
+        for phase in sorted(latest.keys()):
+            for num_blocks in sorted(latest[phase].keys(), key=int):
+                for modulestore in sorted(latest[phase][num_blocks].keys()):
+                    duration = latest[phase][num_blocks][modulestore]
+                    previous_duration = previous.get(phase, {}).get(num_blocks, {}).get(modulestore)
+                    ratio = None
+                    if previous_duration:
+                        ratio = duration / float(previous_duration)
+                    results.append({
+                        'phase': phase,
+                        'num_blocks': int(num_blocks),
+                        'modulestore': modulestore,
+                        'duration': duration,
+                        'previous_duration': previous_duration,
+                        'ratio': ratio,
+                        'regression': ratio is not None and ratio > self.threshold,
+                    })
+        return results
+
+    def generate_json(self):
+        """
+        Generate JSON.
+        """
+        comparisons = self.comparisons()
+        return json.dumps({
+            'runs': [
+                {'run_id': run_id, 'timestamp': self.run_timestamps[run_id], 'timings': self.run_data[run_id]}
+                for run_id in self.run_ids
+            ],
+            'comparisons': comparisons,
+            'regressions': [comparison for comparison in comparisons if comparison['regression']],
+        }, sort_keys=True, indent=4)
+
+    def generate_html(self):
+        """
+        Generate HTML.
+        """
+        html = HTMLDocument("Results")
+        comparisons = self.comparisons()
+        if not comparisons:
+            return html
+
+        html.add_header(1, "Run {} compared with the run before it".format(self.run_ids[0]))
+        ms_keys = sorted(self.all_modulestores)
+        columns = ["Number of Blocks", ]
+        for k in ms_keys:
+            columns.extend([
+                "Time Taken (ms) ({})".format(k),
+                "Previous Time Taken (ms) ({})".format(k),
+                "Ratio ({})".format(k),
+            ])
+
+        per_phase = {}
+        for comparison in comparisons:
+            per_phase.setdefault(comparison['phase'], {}).setdefault(
+                comparison['num_blocks'], {}
+            )[comparison['modulestore']] = comparison
+
+        for phase in sorted(per_phase.keys()):
+            phase_table = HTMLTable(columns)
+            for num_blocks in sorted(per_phase[phase].keys()):
+                per_size = per_phase[phase][num_blocks]
+                row = [num_blocks, ]
+                for modulestore in ms_keys:
+                    comparison = per_size.get(modulestore, {})
+                    ratio = comparison.get('ratio')
+                    row.extend([
+                        "{}".format(comparison.get('duration')),
+                        "{}".format(comparison.get('previous_duration')),
+                        "{:.2f}{}".format(ratio, " (regression)" if comparison['regression'] else "")
+                        if ratio is not None else "",
+                    ])
+                phase_table.add_row(row)
+            html.add_header(2, phase)
+            html.add_to_body(phase_table.table)
+
+        return html
+
+
 if click is not None:
     @click.command()
     @click.argument('outfile', type=click.File('w'), default='-', required=False)
     @click.option('--db_name', help='Name of sqlite database from which to read data.', default=DB_NAME)
-    @click.option('--data_type', help='Data type to process. One of: "imp_exp" or "find"', default="find")
-    def cli(outfile, db_name, data_type):
+    @click.option('--data_type', help='Data type to process. One of: "imp_exp", "find" or "read"', default="find")
+    @click.option('--output_format', help='Format of the "read" report. One of: "html" or "json"', default="html")
+    @click.option(
+        '--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+        help='Ratio to the previous run over which a "read" timing is reported as a regression.',
+    )
+    def cli(outfile, db_name, data_type, output_format, threshold):
         """
         Generate an HTML report from the sqlite timing data.
         """
@@ -280,6 +418,12 @@ if click is not None:
         elif data_type == 'find':
             f_gen = FindReportGen(db_name)
             html = f_gen.generate_html()
+        elif data_type == 'read':
+            r_gen = ReadPathReportGen(db_name, threshold=threshold)
+            if output_format == 'json':
+                click.echo(r_gen.generate_json(), file=outfile)
+                return
+            html = r_gen.generate_html()
         click.echo(html.tostring(), file=outfile)
 
 if __name__ == '__main__':
@@ -0,0 +1,125 @@
+"""
+Performance tests of the read paths of the modulestore, on synthetic courses of various sizes.
+
+Each timing is recorded by CodeBlockTimer under a description of the form
+"ReadPathTest:<modulestore>:<number of blocks>:<phase>[:<variant>]", which the "read" report
+of generate_report.py compares from run to run.
+"""
+import itertools
+import random
+import unittest
+
+import ddt
+from nose.plugins.skip import SkipTest
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.perf_tests.generate_course import make_course
+from xmodule.modulestore.tests.utils import (
+    DRAFT_MODULESTORE_SETUP,
+    SHORT_NAME_MAP,
+    SPLIT_MODULESTORE_SETUP,
+)
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# The modulestores to time, old Mongo and split, each beneath a MixedModuleStore as in production.
+READ_PATH_SETUPS = (DRAFT_MODULESTORE_SETUP, SPLIT_MODULESTORE_SETUP)
+
+# Number of blocks in the synthetic course of each test run.
+COURSE_SIZES = (1000, 10000, 50000)
+
+# The depths at which to time loading the course.
+COURSE_DEPTHS = (0, 1, 2, None)
+
+# Number of blocks to read in each of the per-block phases. The same blocks are sampled in every run.
+SAMPLE_SIZE = 100
+RANDOM_SEED = 1
+
+
+@ddt.ddt
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class ModulestoreReadPathTest(unittest.TestCase):
+    """
+    This class exists to time the hottest read paths of the modulestore, and publishing, in different
+    modulestore classes with courses of different sizes.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*itertools.product(
+        READ_PATH_SETUPS,
+        COURSE_SIZES,
+    ))
+    @ddt.unpack
+    def test_generate_read_path_timings(self, source_ms, num_blocks):
+        """
+        Generate timings of the read paths for a course of num_blocks blocks in the given modulestore.
+        """
+        if CodeBlockTimer is None:
+            raise SkipTest("CodeBlockTimer undefined.")
+
+        desc = "ReadPathTest:{}:{}".format(
+            SHORT_NAME_MAP[source_ms],
+            num_blocks,
+        )
+        user_id = ModuleStoreEnum.UserID.test
+        sampler = random.Random(RANDOM_SEED)
+
+        with CodeBlockTimer(desc):
+            with source_ms.build() as (__, store):
+                course_key = store.make_course_key('perf', 'read_paths', 'run_{}'.format(num_blocks))
+
+                with CodeBlockTimer("make_course"):
+                    usage_keys = make_course(store, course_key, num_blocks, user_id=user_id)
+
+                problem_keys = sampler.sample(usage_keys['problem'], min(SAMPLE_SIZE, len(usage_keys['problem'])))
+                vertical_keys = sampler.sample(usage_keys['vertical'], min(SAMPLE_SIZE, len(usage_keys['vertical'])))
+
+                for depth in COURSE_DEPTHS:
+                    with CodeBlockTimer("get_course:depth-{}".format('all' if depth is None else depth)):
+                        store.get_course(course_key, depth=depth)
+
+                with CodeBlockTimer("get_item:problem"):
+                    for usage_key in problem_keys:
+                        store.get_item(usage_key)
+
+                with CodeBlockTimer("get_item:vertical"):
+                    for usage_key in vertical_keys:
+                        store.get_item(usage_key, depth=None)
+
+                with CodeBlockTimer("get_items:category"):
+                    store.get_items(course_key, qualifiers={'category': 'problem'})
+
+                with CodeBlockTimer("get_items:name"):
+                    for usage_key in problem_keys:
+                        store.get_items(course_key, qualifiers={'category': 'problem', 'name': usage_key.block_id})
+
+                with CodeBlockTimer("get_items:settings"):
+                    store.get_items(course_key, settings={'display_name': 'problem 0'})
+
+                with CodeBlockTimer("get_parent_location"):
+                    for usage_key in problem_keys:
+                        store.get_parent_location(usage_key)
+
+                with CodeBlockTimer("has_changes:course"):
+                    store.has_changes(store.get_course(course_key))
+
+                with CodeBlockTimer("has_changes:vertical"):
+                    for usage_key in vertical_keys:
+                        store.has_changes(store.get_item(usage_key))
+
+                with CodeBlockTimer("publish:vertical"):
+                    for usage_key in vertical_keys:
+                        store.publish(usage_key, user_id)
+
+                with CodeBlockTimer("publish:course"):
+                    store.publish(usage_keys['course'][0], user_id)
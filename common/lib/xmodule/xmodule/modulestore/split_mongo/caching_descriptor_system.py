@@ -85,13 +85,11 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         self._services['library_tools'] = LibraryToolsService(modulestore)
 
     @lazy
-    @contract(returns="dict(BlockKey: BlockKey)")
-    def _parent_map(self):
-        parent_map = {}
-        for block_key, block in self.course_entry.structure['blocks'].iteritems():
-            for child in block.fields.get('children', []):
-                parent_map[child] = block_key
-        return parent_map
+    def _structure_index(self):
+        """
+        The StructureIndex of the structure of this runtime's course.
+        """
+        return self.modulestore.get_structure_index(self.course_entry.structure)
 
     @contract(usage_key="BlockUsageLocator | BlockKey", course_entry_override="CourseEnvelope | None")
     def _load_item(self, usage_key, course_entry_override=None, **kwargs):
@@ -214,8 +212,12 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
 
         converted_fields = convert_fields(block_data.fields)
         converted_defaults = convert_fields(block_data.defaults)
-        if block_key in self._parent_map:
-            parent_key = self._parent_map[block_key]
+        # prefer a parent which isn't an orphan
+        parent_key = (
+            self._structure_index.get_parent(block_key) or
+            self._structure_index.get_parent(block_key, require_path_to_root=False)
+        )
+        if parent_key is not None:
             parent = course_key.make_usage_key(parent_key.type, parent_key.id)
         else:
             parent = None
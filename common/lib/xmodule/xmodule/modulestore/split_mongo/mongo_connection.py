@@ -4,17 +4,19 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 import datetime
 import cPickle as pickle
 import math
-import zlib
 import pymongo
 import pytz
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
+from threading import Lock
 from time import time
 
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -25,6 +27,7 @@ import logging
 
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
+from openedx.core.lib.chunked_storage import ChunkedCache
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
@@ -225,19 +228,156 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class StructureProcessCache(object):
+    """
+    A least-recently-used cache, local to the process, of pickled course
+    structures keyed by their ids, bounded by the total size of its
+    entries.
+
+    A structure is never modified once it is saved; every change to a
+    course is saved as a new structure with a new id.  So the entries of
+    this cache never need to be invalidated.  Readers do modify the
+    structures they are given, though (e.g. to note the subtree edit
+    info of their blocks), so the structures are cached pickled, and
+    each reader unpickles its own copy.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int): The maximum total size of the entries in the
+                cache.  Least recently used entries are evicted to stay
+                within it.
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """
+        The total size of the entries in the cache.
+        """
+        return self._size
+
+    def get(self, key):
+        """
+        Return the cached pickled structure whose id is the given key, or
+        None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, structure, size):
+        """
+        Cache the given pickled structure, whose id is the given key, and
+        whose size is given, evicting least recently used entries as
+        needed.  Structures larger than the maximum size of the cache are
+        not cached.
+
+        Returns:
+            The number of entries that were evicted.
+        """
+        if size > self.max_size:
+            return 0
+
+        with self._lock:
+            previous_entry = self._entries.pop(key, None)
+            if previous_entry is not None:
+                self._size -= previous_entry[1]
+
+            num_evicted = 0
+            while self._entries and self._size + size > self.max_size:
+                _evicted_key, (_evicted_structure, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                num_evicted += 1
+
+            self._entries[key] = (structure, size)
+            self._size += size
+            self.evictions += num_evicted
+            return num_evicted
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics of the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Return a dict of the statistics of the cache.
+        """
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                num_entries=len(self._entries),
+                size=self._size,
+                max_size=self.max_size,
+            )
+
+
+_structure_process_cache = None  # pylint: disable=invalid-name
+
+
+def get_structure_process_cache():
+    """
+    Return the process-wide StructureProcessCache, sized by the
+    COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE setting, or None if the
+    setting is 0 or django isn't available.
+    """
+    global _structure_process_cache  # pylint: disable=global-statement
+    if not DJANGO_AVAILABLE:
+        return None
+
+    max_size = getattr(settings, 'COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE', 0)
+    if not max_size:
+        return None
+
+    if _structure_process_cache is None or _structure_process_cache.max_size != max_size:
+        _structure_process_cache = StructureProcessCache(max_size)
+    return _structure_process_cache
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are pickled and compressed when cached.  Large
+    course structures are cached as compressed content-addressed chunks,
+    so that no cached item exceeds the item size limit of the cache, and
+    chunks that are unchanged between versions of a course are shared.
+
+    If a StructureProcessCache is given, pickled structures are also kept
+    in it, and are read from it before the django cache.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
-    def __init__(self):
+    def __init__(self, process_cache=None):
         self.cache = None
+        self.chunked_cache = None
+        self.process_cache = process_cache
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
+                self.chunked_cache = ChunkedCache(self.cache, compress_chunks=True)
             except InvalidCacheBackendError:
                 pass
 
@@ -247,19 +387,26 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
-
-            if compressed_pickled_data is None:
+            if self.process_cache is not None:
+                pickled_data = self.process_cache.get(key)
+                tagger.tag(from_process_cache=str(pickled_data is not None).lower())
+                if pickled_data is not None:
+                    tagger.tag(from_cache='true')
+                    tagger.measure('uncompressed_size', len(pickled_data))
+                    return pickle.loads(pickled_data)
+
+            pickled_data, compressed_size = self.chunked_cache.get_with_size(key)
+            tagger.tag(from_cache=str(pickled_data is not None).lower())
+
+            if pickled_data is None:
                 # Always log cache misses, because they are unexpected
                 tagger.sample_rate = 1
                 return None
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
-
-            pickled_data = zlib.decompress(compressed_pickled_data)
+            tagger.measure('compressed_size', compressed_size)
             tagger.measure('uncompressed_size', len(pickled_data))
 
+            self._set_in_process_cache(key, pickled_data, tagger)
             return pickle.loads(pickled_data)
 
     def set(self, key, structure, course_context=None):
@@ -271,12 +418,23 @@ class CourseStructureCache(object):
             pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
-
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            tagger.measure('compressed_size', self.chunked_cache.set(key, pickled_data, None))
+            self._set_in_process_cache(key, pickled_data, tagger)
+
+    def _set_in_process_cache(self, key, pickled_data, tagger):
+        """
+        Keep the given pickled structure in the process cache, if there is
+        one, recording the evictions and the resulting size of the cache.
+        """
+        if self.process_cache is None:
+            return
+
+        tagger.measure(
+            'process_cache_evictions',
+            self.process_cache.set(key, pickled_data, len(pickled_data)),
+        )
+        tagger.measure('process_cache_size', self.process_cache.size)
 
 
 class MongoConnection(object):
@@ -320,7 +478,7 @@ class MongoConnection(object):
         This method will use a cached version of the structure if it is available.
         """
         with TIMER.timer("get_structure", course_context) as tagger_get_structure:
-            cache = CourseStructureCache()
+            cache = CourseStructureCache(get_structure_process_cache())
 
             structure = cache.get(key, course_context)
             tagger_get_structure.tag(from_cache=str(bool(structure)).lower())
@@ -88,9 +88,10 @@ from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, get_structure_index
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from types import NoneType
 from xmodule.assetstore import AssetMetadata
 
@@ -131,6 +132,8 @@ class SplitBulkWriteRecord(BulkOpsRecord):
         self.index = None
         self.structures = {}
         self.structures_in_db = set()
+        # dict(version_guid, (structure, StructureIndex)) of the structures being edited
+        self.structure_indexes = {}
         # dict(version_guid, dict(BlockKey, module))
         self.modules = defaultdict(dict)
         self.definitions = {}
@@ -169,6 +172,7 @@ class SplitBulkWriteRecord(BulkOpsRecord):
         if self.index is not None:
             self.index.setdefault('versions', {})[branch] = structure['_id']
         self.structures[structure['_id']] = structure
+        self.structure_indexes.pop(structure['_id'], None)
 
     def __repr__(self):
         return u"SplitBulkWriteRecord<{!r}, {!r}, {!r}, {!r}, {!r}>".format(
@@ -349,9 +353,27 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         bulk_write_record = self._get_bulk_ops_record(course_key)
         if bulk_write_record.active:
             bulk_write_record.structures[structure['_id']] = structure
+            bulk_write_record.structure_indexes.pop(structure['_id'], None)
         else:
             self.db_connection.insert_structure(structure, course_key)
 
+    def get_structure_index(self, structure):
+        """
+        Return the StructureIndex of the given structure, for parent queries.
+        The index of a structure which is saved is shared, since the structure
+        never changes; that of a structure being edited in a bulk operation is
+        kept in the bulk operation's record until the structure is updated.
+        """
+        structure_id = structure['_id']
+        for bulk_write_record in self._active_bulk_ops.records.itervalues():
+            if structure_id in bulk_write_record.structures and structure_id not in bulk_write_record.structures_in_db:
+                indexed_structure, index = bulk_write_record.structure_indexes.get(structure_id, (None, None))
+                if indexed_structure is not structure:
+                    index = StructureIndex(structure)
+                    bulk_write_record.structure_indexes[structure_id] = (structure, index)
+                return index
+        return get_structure_index(structure)
+
     def get_cached_block(self, course_key, version_guid, block_id):
         """
         If there's an active bulk_operation, see if it's cached this module and just return it
@@ -781,31 +803,84 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                     new_module_data
                 )
 
+            # start from the blocks already cached, whose definitions may be loaded
+            for block_id in new_module_data:
+                new_module_data[block_id] = system.module_data.get(block_id, new_module_data[block_id])
+
             # This method supports lazy loading, where the descendent definitions aren't loaded
             # until they're actually needed.
             if not lazy:
                 # Non-lazy loading: Load all descendants by id.
-                descendent_definitions = self.get_definitions(
-                    course_key,
-                    [
-                        block.definition
-                        for block in new_module_data.itervalues()
-                    ]
-                )
-                # Turn definitions into a map.
-                definitions = {definition['_id']: definition
-                               for definition in descendent_definitions}
-
-                for block in new_module_data.itervalues():
-                    if block.definition in definitions:
-                        definition = definitions[block.definition]
-                        # convert_fields gets done later in the runtime's xblock_from_json
-                        block.fields.update(definition.get('fields'))
-                        block.definition_loaded = True
+                self._load_definitions(course_key, new_module_data)
 
             system.module_data.update(new_module_data)
             return system.module_data
 
+    def prefetch_definitions(self, system, base_block_ids, course_key, depth=0):
+        """
+        Loads, with a single query, the definitions of the given blocks and
+        their descendants out to depth that are not loaded yet, so that the
+        blocks' lazily loaded fields do not each need a separate query.
+        The definitions are also added to the bulk operation's cache.
+
+        Arguments:
+            system: a CachingDescriptorSystem
+            base_block_ids: list of BlockKeys whose definitions to load
+            course_key: the destination course providing the context
+            depth: how deep below these to load definitions
+
+        Returns:
+            The number of definitions that were loaded.
+        """
+        with self.bulk_operations(course_key, emit_signals=False):
+            blocks = {}
+            for block_id in base_block_ids:
+                blocks = self.descendants(system.course_entry.structure['blocks'], block_id, depth, blocks)
+
+            # start from the blocks already cached, whose definitions may be loaded
+            for block_id in blocks:
+                blocks[block_id] = system.module_data.get(block_id, blocks[block_id])
+            num_loaded = self._load_definitions(course_key, blocks)
+            system.module_data.update(blocks)
+            return num_loaded
+
+    def _load_definitions(self, course_key, blocks):
+        """
+        Loads the definitions of the given blocks whose definitions are not
+        loaded yet with a single call to get_definitions.  Since the blocks
+        may belong to a structure shared with other readers, each block whose
+        definition is loaded is replaced by a copy of it into which the
+        definition's fields are merged, rather than being modified.
+
+        Arguments:
+            blocks: dict {BlockKey: BlockData} of the blocks, updated in place
+
+        Returns:
+            The number of definitions that were loaded.
+        """
+        unloaded_blocks = {
+            block_key: block for block_key, block in blocks.iteritems()
+            if block.definition is not None and not block.definition_loaded
+        }
+        if not unloaded_blocks:
+            return 0
+
+        definitions = {
+            definition['_id']: definition
+            for definition in self.get_definitions(
+                course_key, [block.definition for block in unloaded_blocks.itervalues()]
+            )
+        }
+        for block_key, block in unloaded_blocks.iteritems():
+            if block.definition in definitions:
+                loaded_block = copy.copy(block)
+                loaded_block.fields = dict(block.fields)
+                # convert_fields gets done later in the runtime's xblock_from_json
+                loaded_block.fields.update(definitions[block.definition].get('fields'))
+                loaded_block.definition_loaded = True
+                blocks[block_key] = loaded_block
+        return len(definitions)
+
     @contract(course_entry=CourseEnvelope, block_keys="list(BlockKey)", depth="int | None")
     def _load_items(self, course_entry, block_keys, depth=0, **kwargs):
         """
@@ -813,8 +888,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         Load the definitions into each block if lazy is in kwargs and is False;
         otherwise, do not load the definitions - they'll be loaded later when needed.
+        If prefetch_definitions is in kwargs and is True, the definitions of the
+        blocks out to depth that are not loaded yet are loaded with a single query,
+        even if the blocks were cached by a previous lazy load.
         """
         lazy = kwargs.pop('lazy', True)
+        prefetch_definitions = kwargs.pop('prefetch_definitions', False)
         should_cache_items = not lazy
 
         runtime = self._get_cache(course_entry.structure['_id'])
@@ -825,6 +904,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         if should_cache_items:
             self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy)
+        if lazy and prefetch_definitions:
+            self.prefetch_definitions(runtime, block_keys, course_entry.course_key, depth)
 
         with self.bulk_operations(course_entry.course_key, emit_signals=False):
             return [runtime.load_item(block_key, course_entry, **kwargs) for block_key in block_keys]
@@ -1226,6 +1307,50 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 log.debug("Found more than one item for '{}'".format(usage_key))
             return items[0]
 
+    def get_items_by_keys(self, usage_keys, depth=0, **kwargs):
+        """
+        Returns a dict mapping each of the given usage keys which is found to its
+        XModuleDescriptor. Keys which aren't found are omitted.
+
+        The keys are grouped by course version, and the items of each group are
+        loaded from a single lookup of the course's structure. If lazy is passed as
+        False or prefetch_definitions as True, the definitions of the items and
+        their descendants out to depth are loaded by a single query per group;
+        otherwise they're loaded when first needed.
+
+        Args:
+            usage_keys (list): the :class:`.UsageKey` of each item to load
+            depth (int): how deep below each item to prefetch descendants, as for get_item
+        """
+        keys_by_course = OrderedDict()
+        for usage_key in usage_keys:
+            if not isinstance(usage_key, BlockUsageLocator) or usage_key.deprecated:
+                # The supplied UsageKey is of the wrong type, so it can't possibly be stored in this modulestore.
+                continue
+            if usage_key.block_id is None:
+                raise InsufficientSpecificationError(usage_key)
+            keys_by_course.setdefault(usage_key.course_key, []).append(usage_key)
+
+        items = {}
+        for course_key, course_usage_keys in keys_by_course.iteritems():
+            with self.bulk_operations(course_key):
+                try:
+                    course = self._lookup_course(course_key)
+                except ItemNotFoundError:
+                    continue
+                found_keys = OrderedDict()
+                for usage_key in course_usage_keys:
+                    block_key = BlockKey.from_usage_key(usage_key)
+                    if self._get_block_from_structure(course.structure, block_key) is not None:
+                        found_keys.setdefault(block_key, []).append(usage_key)
+                if not found_keys:
+                    continue
+                course_items = self._load_items(course, list(found_keys), depth, **kwargs)
+                for block_usage_keys, item in zip(found_keys.itervalues(), course_items):
+                    for usage_key in block_usage_keys:
+                        items[usage_key] = item
+        return items
+
     def get_items(self, course_locator, settings=None, content=None, qualifiers=None, include_orphans=True, **kwargs):
         """
         Returns:
@@ -1362,9 +1487,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return path_cache[block_key]
 
         if parents_cache is None:
-            xblock_parents = self._get_parents_from_structure(block_key, course.structure)
-        else:
-            xblock_parents = parents_cache[block_key]
+            has_path = self.get_structure_index(course.structure).has_path_to_root(block_key)
+            if path_cache is not None:
+                path_cache[block_key] = has_path
+            return has_path
+
+        xblock_parents = parents_cache[block_key]
 
         if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
             # Found, xblock has the path to the root
@@ -1396,25 +1524,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
-
-        # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
+        # The alphabetically least of the parents which are not orphans, i.e. which have a path
         # to the course root
-        parent_ids = [
-            valid_parent
-            for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
-        ]
-
-        if len(parent_ids) == 0:
+        parent_id = self.get_structure_index(course.structure).get_parent(
+            BlockKey.from_usage_key(locator)
+        )
+        if parent_id is None:
             return None
 
-        # find alphabetically least
-        parent_ids.sort(key=lambda parent: (parent.type, parent.id))
         return BlockUsageLocator.make_relative(
             locator,
-            block_type=parent_ids[0].type,
-            block_id=parent_ids[0].id,
+            block_type=parent_id.type,
+            block_id=parent_id.id,
         )
 
     def get_orphans(self, course_key, **kwargs):
@@ -1615,6 +1736,56 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return usage_key, block.edit_info.original_usage_version
         return None, None
 
+    def get_changed_blocks_since_version(self, course_key, previous_version):
+        """
+        Compares the current structure of the given course with the structure
+        of previous_version and returns the blocks that were changed in between.
+
+        A block is considered changed if it was added or if any of its settings,
+        children, definition or defaults differ between the two structures.
+
+        Returns a (changed, removed) tuple of sets of BlockUsageLocators, where
+        changed contains the added and modified blocks and removed contains the
+        blocks that are only in the previous structure.
+
+        Raises ItemNotFoundError if the structure for previous_version is not found.
+        """
+        current_blocks = self._lookup_course(course_key).structure['blocks']
+        previous_structure = self.get_structure(course_key, course_key.as_object_id(previous_version))
+        if previous_structure is None:
+            raise ItemNotFoundError('Structure: {}'.format(previous_version))
+        previous_blocks = previous_structure['blocks']
+
+        def _has_changed(block_key, block_data):
+            """
+            Returns whether the given block differs from its previous version.
+            """
+            previous_block_data = previous_blocks.get(block_key)
+            if previous_block_data is None:
+                return True
+            return any(
+                getattr(block_data, attr) != getattr(previous_block_data, attr)
+                for attr in ('fields', 'block_type', 'definition', 'defaults')
+            )
+
+        def _make_usage_key(block_key):
+            """
+            Returns the usage key for the given block key in the given course.
+            """
+            return course_key.make_usage_key(block_key.type, block_key.id)
+
+        changed = {
+            _make_usage_key(block_key)
+            for block_key, block_data in current_blocks.iteritems()
+            if _has_changed(block_key, block_data)
+        }
+        removed = {
+            _make_usage_key(block_key)
+            for block_key in previous_blocks
+            if block_key not in current_blocks
+        }
+        return changed, removed
+
     def create_definition_from_data(self, course_key, new_def_data, category, user_id):
         """
         Pull the definition fields out of descriptor and save to the db as a new definition
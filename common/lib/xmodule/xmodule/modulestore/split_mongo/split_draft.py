@@ -1,6 +1,7 @@
 """
 Module for the dual-branch fall-back Draft->Published Versioning ModuleStore
 """
+from collections import OrderedDict
 
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore, EXCLUDE_ALL
 from xmodule.exceptions import InvalidVersionError
@@ -9,7 +10,7 @@ from xmodule.modulestore.exceptions import InsufficientSpecificationError, ItemN
 from xmodule.modulestore.draft_and_published import (
     ModuleStoreDraftAndPublished, DIRECT_ONLY_CATEGORIES, UnsupportedRevisionError
 )
-from opaque_keys.edx.locator import CourseLocator, LibraryLocator, LibraryUsageLocator
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator, LibraryLocator, LibraryUsageLocator
 from xmodule.modulestore.split_mongo import BlockKey
 from contracts import contract
 
@@ -279,6 +280,26 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         usage_key = self._map_revision_to_branch(usage_key, revision=revision)
         return super(DraftVersioningModuleStore, self).get_item(usage_key, depth=depth, **kwargs)
 
+    def get_items_by_keys(self, usage_keys, depth=0, revision=None, **kwargs):
+        """
+        Returns a dict mapping each of the given usage keys which is found to its
+        XModuleDescriptor, for the given revision.
+        """
+        mapped_keys = OrderedDict(
+            (usage_key, self._map_revision_to_branch(usage_key, revision=revision))
+            for usage_key in usage_keys
+            # Keys of the wrong type can't possibly be stored in this modulestore.
+            if isinstance(usage_key, BlockUsageLocator) and not usage_key.deprecated
+        )
+        items = super(DraftVersioningModuleStore, self).get_items_by_keys(
+            list(set(mapped_keys.itervalues())), depth=depth, **kwargs
+        )
+        return {
+            usage_key: items[mapped_key]
+            for usage_key, mapped_key in mapped_keys.iteritems()
+            if mapped_key in items
+        }
+
     def get_items(self, course_locator, revision=None, **kwargs):
         """
         Returns a list of XModuleDescriptor instances for the matching items within the course with
@@ -313,6 +334,13 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         usage_key = self._map_revision_to_branch(usage_key)
         return super(DraftVersioningModuleStore, self).get_block_original_usage(usage_key)
 
+    def get_changed_blocks_since_version(self, course_key, previous_version):
+        """
+        See :py:meth `xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.get_changed_blocks_since_version`
+        """
+        course_key = self._map_revision_to_branch(course_key)
+        return super(DraftVersioningModuleStore, self).get_changed_blocks_since_version(course_key, previous_version)
+
     def get_orphans(self, course_key, **kwargs):
         course_key = self._map_revision_to_branch(course_key)
         return super(DraftVersioningModuleStore, self).get_orphans(course_key, **kwargs)
@@ -0,0 +1,110 @@
+"""
+Index of the parent/child relationships of a split modulestore structure.
+
+Finding the parents of a block in a structure requires scanning the children
+of every block, and finding whether a block has a path to the course root
+requires repeating that scan for each of its ancestors.  A StructureIndex is
+built with a single pass over the structure, and answers those queries from a
+parent map and the set of the blocks reachable from the root.
+
+A saved structure is never modified, so the index of a saved structure is
+built once and shared, keyed by the id of the structure.
+"""
+from collections import OrderedDict
+from threading import Lock
+
+
+# Block types of the root blocks of structures.
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+# Maximum number of indexes of saved structures kept by get_structure_index.
+MAX_CACHED_INDEXES = 64
+
+
+class StructureIndex(object):
+    """
+    The parent map of a structure, and the set of its blocks which have a path
+    to a root.
+    """
+    def __init__(self, structure):
+        """
+        Arguments:
+            structure (dict): The structure to index, whose 'blocks' map
+                BlockKeys to BlockData.  It must not be modified while the
+                index is in use.
+        """
+        blocks = structure['blocks']
+
+        self._parents = {}
+        for parent_key, block in blocks.iteritems():
+            for child_key in block.fields.get('children', []):
+                self._parents.setdefault(child_key, []).append(parent_key)
+
+        self._reachable = set()
+        pending = [
+            root_key for root_key in blocks
+            if root_key.type in ROOT_BLOCK_TYPES and root_key not in self._parents
+        ]
+        while pending:
+            block_key = pending.pop()
+            if block_key in self._reachable:
+                continue
+            self._reachable.add(block_key)
+            block = blocks.get(block_key)
+            if block is not None:
+                pending.extend(block.fields.get('children', []))
+
+    def get_parents(self, block_key):
+        """
+        Return the list of the keys of the parents of the given block.
+        """
+        return list(self._parents.get(block_key, []))
+
+    def get_parent(self, block_key, require_path_to_root=True):
+        """
+        Return the key of the parent of the given block, or None if it has no
+        parent.  Of multiple parents, the least by (type, id) is chosen.
+
+        Arguments:
+            require_path_to_root (bool): Whether to consider only parents which
+                have a path to the root, so that orphaned parents are ignored.
+        """
+        parent_keys = self._parents.get(block_key, [])
+        if require_path_to_root:
+            parent_keys = [parent_key for parent_key in parent_keys if self.has_path_to_root(parent_key)]
+        if not parent_keys:
+            return None
+        return min(parent_keys, key=lambda parent_key: (parent_key.type, parent_key.id))
+
+    def has_path_to_root(self, block_key):
+        """
+        Return whether the given block is the root, or has a path to it.
+        """
+        return block_key in self._reachable or (
+            block_key.type in ROOT_BLOCK_TYPES and block_key not in self._parents
+        )
+
+
+_cached_indexes = OrderedDict()  # pylint: disable=invalid-name
+_cached_indexes_lock = Lock()  # pylint: disable=invalid-name
+
+
+def get_structure_index(structure):
+    """
+    Return the StructureIndex of the given saved structure, building it only
+    if it's not among the most recently used indexes.  Since saved structures
+    are never modified, the index is shared by all users of the structure.
+    """
+    structure_id = structure['_id']
+    with _cached_indexes_lock:
+        index = _cached_indexes.pop(structure_id, None)
+        if index is not None:
+            _cached_indexes[structure_id] = index
+            return index
+
+    index = StructureIndex(structure)
+    with _cached_indexes_lock:
+        _cached_indexes[structure_id] = index
+        while len(_cached_indexes) > MAX_CACHED_INDEXES:
+            _cached_indexes.popitem(last=False)
+    return index
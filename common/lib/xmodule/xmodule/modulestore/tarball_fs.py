@@ -0,0 +1,193 @@
+"""
+A write-only filesystem which streams the files written to it into a
+gzipped tar archive, for exporting courses without an intermediate
+directory on disk.
+"""
+import io
+import tarfile
+import time
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+
+from fs import errors
+from fs.base import FS
+from fs.info import Info
+from fs.mode import Mode
+from fs.path import dirname, relpath
+
+# Default size, in bytes, up to which each file being written is buffered
+# in memory before it is spilled to a temporary file.
+DEFAULT_SPOOL_SIZE = 1024 * 1024
+
+
+class TarballFS(FS):
+    """
+    A pyfilesystem to which directories and files can only be written, each
+    of which is added to a streamed, gzipped tar archive once it is closed.
+
+    Files can be written concurrently from multiple threads; each one is
+    buffered until it is closed, in memory up to spool_size bytes and in a
+    temporary file beyond that, so the memory used is bounded by the number
+    of files open at a time.  Files can't be read back or removed, and a
+    file that is written twice is added to the archive twice, the later copy
+    replacing the earlier one when the archive is extracted.
+    """
+    _meta = {
+        'case_insensitive': False,
+        'invalid_path_chars': '\0',
+        'network': False,
+        'read_only': False,
+        'thread_safe': True,
+        'unicode_paths': True,
+        'virtual': False,
+    }
+
+    def __init__(self, fileobj, spool_size=DEFAULT_SPOOL_SIZE):
+        """
+        Arguments:
+            fileobj (file): The file to write the archive to.  It is not
+                closed when the filesystem is closed.
+            spool_size (int): The size up to which each file being written
+                is buffered in memory.
+        """
+        super(TarballFS, self).__init__()
+        self._spool_size = spool_size
+        self._tar_file = tarfile.open(fileobj=fileobj, mode='w|gz')
+        self._tar_lock = Lock()
+        self._directories = {u'/'}
+        self._file_sizes = {}
+
+    def getinfo(self, path, namespaces=None):
+        _path = self.validatepath(path)
+        with self._lock:
+            if _path in self._directories:
+                is_dir, size = True, 0
+            elif _path in self._file_sizes:
+                is_dir, size = False, self._file_sizes[_path]
+            else:
+                raise errors.ResourceNotFound(path)
+
+        info = {'basic': {'name': _path.rsplit(u'/', 1)[-1], 'is_dir': is_dir}}
+        if 'details' in (namespaces or ()):
+            info['details'] = {'type': 1 if is_dir else 2, 'size': size}
+        return Info(info)
+
+    def listdir(self, path):
+        _path = self.validatepath(path)
+        with self._lock:
+            if _path not in self._directories:
+                if _path in self._file_sizes:
+                    raise errors.DirectoryExpected(path)
+                raise errors.ResourceNotFound(path)
+            return [
+                child_path.rsplit(u'/', 1)[-1]
+                for child_path in list(self._directories) + list(self._file_sizes)
+                if child_path != u'/' and dirname(child_path) == _path
+            ]
+
+    def makedir(self, path, permissions=None, recreate=False):
+        _path = self.validatepath(path)
+        with self._lock:
+            if _path in self._directories or _path in self._file_sizes:
+                if not recreate or _path in self._file_sizes:
+                    raise errors.DirectoryExists(path)
+                return self.opendir(_path)
+            if dirname(_path) not in self._directories:
+                raise errors.ResourceNotFound(path)
+            self._directories.add(_path)
+
+        tar_info = self._tar_info(_path)
+        tar_info.type = tarfile.DIRTYPE
+        tar_info.mode = 0o755
+        with self._tar_lock:
+            self._tar_file.addfile(tar_info)
+        return self.opendir(_path)
+
+    def openbin(self, path, mode='r', buffering=-1, **options):
+        _mode = Mode(mode)
+        _mode.validate_bin()
+        _path = self.validatepath(path)
+        if _mode.reading or _mode.appending:
+            raise errors.Unsupported(u'files can only be written to a TarballFS')
+
+        with self._lock:
+            if _path in self._directories:
+                raise errors.FileExpected(path)
+            if _mode.exclusive and _path in self._file_sizes:
+                raise errors.FileExists(path)
+            if dirname(_path) not in self._directories:
+                raise errors.ResourceNotFound(path)
+            self._file_sizes.setdefault(_path, 0)
+        return _TarballFile(self, _path)
+
+    def remove(self, path):
+        raise errors.Unsupported(u'files can not be removed from a TarballFS')
+
+    def removedir(self, path):
+        raise errors.Unsupported(u'directories can not be removed from a TarballFS')
+
+    def setinfo(self, path, info):
+        self.getinfo(path)
+
+    def close(self):
+        """
+        Finish the archive.  The files which are still open are not added to it.
+        """
+        if not self.isclosed():
+            with self._tar_lock:
+                self._tar_file.close()
+        super(TarballFS, self).close()
+
+    def _add_file(self, path, data_file, size):
+        """
+        Add the file at the given path, with the given size, to the archive,
+        reading its content from data_file.
+        """
+        tar_info = self._tar_info(path)
+        tar_info.size = size
+        tar_info.mode = 0o644
+        with self._tar_lock:
+            self._tar_file.addfile(tar_info, data_file)
+        with self._lock:
+            self._file_sizes[path] = size
+
+    @staticmethod
+    def _tar_info(path):
+        """
+        Return a TarInfo for a member of the archive at the given path.
+        """
+        tar_info = tarfile.TarInfo(relpath(path).encode('utf-8'))
+        tar_info.mtime = time.time()
+        return tar_info
+
+
+class _TarballFile(io.RawIOBase):
+    """
+    A file being written to a TarballFS, which is added to the archive when
+    it is closed.
+    """
+    def __init__(self, tarball_fs, path):
+        super(_TarballFile, self).__init__()
+        self._tarball_fs = tarball_fs
+        self._path = path
+        self._buffer = SpooledTemporaryFile(max_size=tarball_fs._spool_size)  # pylint: disable=protected-access
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        self._buffer.write(data)
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            size = self._buffer.tell()
+            self._buffer.seek(0)
+            self._tarball_fs._add_file(self._path, self._buffer, size)  # pylint: disable=protected-access
+        finally:
+            self._buffer.close()
+            super(_TarballFile, self).close()
@@ -1,6 +1,9 @@
 """
  Test contentstore.mongo functionality
 """
+import datetime
+import hashlib
+import json
 import logging
 from uuid import uuid4
 import unittest
@@ -9,6 +12,14 @@ from tempfile import mkdtemp
 import path
 import shutil
 
+import pymongo
+
+from bson.binary import Binary
+from bson.objectid import ObjectId
+from fs.osfs import OSFS
+from gridfs.errors import FileExists
+from mock import patch
+
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
 from xmodule.tests import DATA_DIR
@@ -51,13 +62,13 @@ class TestContentstore(unittest.TestCase):
             del CourseLocator.deprecated
         return super(TestContentstore, cls).tearDownClass()
 
-    def set_up_assets(self, deprecated):
+    def set_up_assets(self, deprecated, content_addressed=False):
         """
         Setup contentstore w/ proper overriding of deprecated.
         """
         # since MongoModuleStore and MongoContentStore are basically assumed to be together, create this class
         # as well
-        self.contentstore = MongoContentStore(HOST, DB, port=PORT)
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, content_addressed=content_addressed)
         self.addCleanup(self.contentstore._drop_database)  # pylint: disable=protected-access
 
         AssetLocator.deprecated = deprecated
@@ -146,6 +157,31 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(True, False)
+    def test_export_for_course_to_fs(self, deprecated):
+        """
+        Test export to a pyfilesystem
+        """
+        self.set_up_assets(deprecated)
+        root_dir = path.Path(mkdtemp())
+        try:
+            export_fs = OSFS(root_dir)
+            export_fs.makedir(u'policies')
+            self.contentstore.export_all_for_course_to_fs(
+                self.course1_key, export_fs, u'static', u'policies/assets.json', max_workers=2,
+            )
+            for filename in self.course1_files:
+                filepath = path.Path(root_dir / 'static' / filename)
+                self.assertTrue(filepath.isfile(), "{} is not a file".format(filepath))
+            for filename in self.course2_files:
+                if filename not in self.course1_files:
+                    filepath = path.Path(root_dir / 'static' / filename)
+                    self.assertFalse(filepath.isfile(), "{} is unexpected exported a file".format(filepath))
+            with open(root_dir / 'policies' / 'assets.json') as policy_file:
+                self.assertEqual(set(json.load(policy_file)), set(self.course1_files))
+        finally:
+            shutil.rmtree(root_dir)
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
@@ -166,6 +202,38 @@ class TestContentstore(unittest.TestCase):
         self.assertEqual(count, 0)
         self.assertEqual(course_assets, [])
 
+    @ddt.data(True, False)
+    def test_get_asset_page(self, deprecated):
+        """
+        Test paging through the asset index with get_asset_page
+        """
+        self.set_up_assets(deprecated)
+        sort = [('displayname', pymongo.ASCENDING)]
+        assets, count, cursor = self.contentstore.get_asset_page(self.course1_key, 2, sort=sort)
+        self.assertEqual(count, len(self.course1_files))
+        self.assertEqual([asset['displayname'] for asset in assets], self.course1_files[:2])
+        self.assertEqual(assets[0]['asset_key'], self.course1_key.make_asset_key('asset', self.course1_files[0]))
+
+        assets, count, cursor = self.contentstore.get_asset_page(self.course1_key, 2, cursor=cursor, sort=sort)
+        self.assertEqual(count, len(self.course1_files))
+        self.assertEqual([asset['displayname'] for asset in assets], self.course1_files[2:])
+        self.assertIsNone(cursor)
+
+        # The index is kept up to date as assets are saved and deleted.
+        self.contentstore.delete(self.course1_key.make_asset_key('asset', self.course1_files[0]))
+        new_key = self.course1_key.make_asset_key('asset', self.course2_files[2])
+        self.save_asset(self.course2_files[2], new_key, self.course2_files[2], False)
+        assets, count, __ = self.contentstore.get_asset_page(
+            self.course1_key, 10, sort=sort, filter_params={'contentType': 'image/jpeg'}
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual([asset['displayname'] for asset in assets], self.course1_files[1:])
+        __, count, __ = self.contentstore.get_asset_page(self.course1_key, 10)
+        self.assertEqual(count, len(self.course1_files))
+
+        fake_course = CourseLocator('test', 'fake', 'non')
+        self.assertEqual(self.contentstore.get_asset_page(fake_course, 10), ([], 0, None))
+
     @ddt.data(True, False)
     def test_attrs(self, deprecated):
         """
@@ -197,6 +265,143 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    @patch('xmodule.contentstore.mongo.ASSET_COPY_BATCH_SIZE', 2)
+    @patch('xmodule.contentstore.mongo.CHUNK_COPY_BATCH_BYTES', 1)
+    def test_copy_assets_in_batches(self, deprecated):
+        """
+        copy_all_course_assets copies the assets and their chunks in batches, and reports its progress
+        """
+        self.set_up_assets(deprecated)
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        progress = []
+        self.contentstore.copy_all_course_assets(
+            self.course1_key, dest_course, max_workers=1, progress_callback=lambda *args: progress.append(args)
+        )
+        self.assertEqual(progress, [(2, 3), (3, 3)])
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename))
+            self.assertEqual(copied.data, source.data)
+            self.assertEqual(copied.content_digest, source.content_digest)
+
+        __, count, __ = self.contentstore.get_asset_page(dest_course, page_size=10)
+        self.assertEqual(count, len(self.course1_files))
+
+        # Copies which already exist aren't overwritten, nor are their chunks copied again.
+        chunk_count = self.contentstore.chunks.count()
+        with self.assertRaises(FileExists):
+            self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assertEqual(self.contentstore.chunks.count(), chunk_count)
+
+    @ddt.data(True, False)
+    def test_content_addressed_copy_assets(self, deprecated):
+        """
+        copy_all_course_assets and delete_all_course_assets of a content addressed store
+        """
+        self.set_up_assets(deprecated, content_addressed=True)
+        # picture1.jpg is in both courses, so its data is only stored once.
+        self.assertEqual(self.contentstore.blobs_files.count(), 5)
+        self.assertEqual(self.contentstore.chunks.count(), 0)
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assertEqual(self.contentstore.blobs_files.count(), 5)
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename), as_stream=True)
+            self.assertEqual(''.join(copied.stream_data()), source.data)
+            for propname in ['name', 'content_type', 'length', 'locked', 'content_digest']:
+                self.assertEqual(getattr(source, propname), getattr(copied, propname))
+
+        # The blobs are only deleted once no course references them.
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.assertEqual(self.contentstore.blobs_files.count(), 5)
+        self.contentstore.delete_all_course_assets(dest_course)
+        self.assertEqual(
+            sorted(blob['refcount'] for blob in self.contentstore.blobs_files.find()), [1, 1, 1]
+        )
+        self.contentstore.delete_all_course_assets(self.course2_key)
+        self.assertEqual(self.contentstore.blobs_files.count(), 0)
+        self.assertEqual(self.contentstore.blobs_chunks.count(), 0)
+
+    def _mark_blob_deleted(self, asset_key, marked_on):
+        """
+        Remove the asset's document and mark its blob as being deleted since marked_on, as a process
+        releasing the blob's last reference does before it removes the blob's chunks. Returns the blob's id.
+        """
+        content_id = self.contentstore.asset_db_key(asset_key)[0]
+        blob_id = self.contentstore.fs_files.find_one({'_id': content_id})['blob_id']
+        self.contentstore.fs_files.remove({'_id': content_id})
+        self.contentstore.blobs_files.update(
+            {'_id': blob_id}, {'$set': {'refcount': 0, 'deleting': ObjectId.from_datetime(marked_on)}},
+        )
+        return blob_id
+
+    def test_content_addressed_delete_in_progress(self):
+        """
+        A blob being deleted isn't referenced again, nor is its data stored again until it's deleted
+        """
+        self.set_up_assets(False, content_addressed=True)
+        filename = self.course1_files[0]
+        blob_id = self._mark_blob_deleted(
+            self.course1_key.make_asset_key('asset', filename), datetime.datetime.utcnow(),
+        )
+
+        with patch('xmodule.contentstore.mongo.time.sleep') as mock_sleep:
+            with self.assertRaises(FileExists):
+                self.save_asset(filename, self.course1_key.make_asset_key('asset', filename), filename, False)
+        self.assertTrue(mock_sleep.called)
+        self.assertEqual(self.contentstore.blobs_files.find_one({'_id': blob_id})['refcount'], 0)
+
+    def test_content_addressed_concurrent_upload(self):
+        """
+        Data which another process is uploading is referenced once its blob is uploaded
+        """
+        self.set_up_assets(False, content_addressed=True)
+        data = 'data being uploaded by another process'
+        blob_id = hashlib.sha256(data).hexdigest()
+        # The other process has stored the blob's first chunk, but not its document yet.
+        self.contentstore.blobs_chunks.insert({'files_id': blob_id, 'n': 0, 'data': Binary(data)})
+
+        def finish_upload(_seconds):
+            """
+            The other process finishes uploading the blob while this one waits.
+            """
+            if self.contentstore.blobs_files.find_one({'_id': blob_id}) is None:
+                self.contentstore.blobs_chunks.remove({'files_id': blob_id})
+                self.contentstore.blobs.put(data, _id=blob_id, refcount=1)
+
+        with patch('xmodule.contentstore.mongo.time.sleep', side_effect=finish_upload) as mock_sleep:
+            blob = self.contentstore._store_blob(data)  # pylint: disable=protected-access
+        self.assertTrue(mock_sleep.called)
+        self.assertEqual(blob['_id'], blob_id)
+        self.assertEqual(blob['refcount'], 2)
+        self.assertEqual(self.contentstore.blobs.get(blob_id).read(), data)
+
+    def test_content_addressed_delete_abandoned(self):
+        """
+        The deletion of a blob which was abandoned is finished before its data is stored again
+        """
+        self.set_up_assets(False, content_addressed=True)
+        filename = self.course1_files[0]
+        asset_key = self.course1_key.make_asset_key('asset', filename)
+        blob_id = self._mark_blob_deleted(asset_key, datetime.datetime.utcnow() - datetime.timedelta(hours=1))
+        # The process deleting the blob stopped after removing some of its chunks.
+        self.contentstore.blobs_chunks.remove({'files_id': blob_id, 'n': 0})
+
+        self.save_asset(filename, asset_key, filename, False)
+        blob = self.contentstore.blobs_files.find_one({'_id': blob_id})
+        self.assertEqual(blob['refcount'], 1)
+        self.assertNotIn('deleting', blob)
+        with open("{}/static/{}".format(DATA_DIR, filename), "rb") as f:
+            self.assertEqual(self.contentstore.find(asset_key).data, f.read())
+
+        # Releasing the last reference deletes the blob's chunks and then its document.
+        self.contentstore.delete(self.contentstore.asset_db_key(asset_key)[0])
+        self.assertIsNone(self.contentstore.blobs_files.find_one({'_id': blob_id}))
+        self.assertEqual(self.contentstore.blobs_chunks.find({'files_id': blob_id}).count(), 0)
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
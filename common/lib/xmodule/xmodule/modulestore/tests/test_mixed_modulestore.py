@@ -414,6 +414,42 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
         with self.assertRaises(UnsupportedRevisionError):
             self.store.get_item(self.fake_location, revision=ModuleStoreEnum.RevisionOption.draft_preferred)
 
+    # split:
+    #   active_versions, structure (for all the items of the course at once)
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_get_items_by_keys(self, default_ms):
+        self.initdb(default_ms)
+        self._create_block_hierarchy()
+
+        usage_keys = [self.problem_x1a_1, self.problem_x1a_2, self.vertical_x1a, self.fake_location]
+        if default_ms == ModuleStoreEnum.Type.split:
+            with check_mongo_calls(2):
+                items = self.store.get_items_by_keys(usage_keys)
+        else:
+            items = self.store.get_items_by_keys(usage_keys)
+
+        self.assertEqual(set(items), {self.problem_x1a_1, self.problem_x1a_2, self.vertical_x1a})
+        for usage_key, item in items.iteritems():
+            self.assertEqual(item.location, usage_key)
+        self.assertEqual(self.store.get_items_by_keys([]), {})
+
+    def test_get_items_by_keys_split_revision(self):
+        self.initdb(ModuleStoreEnum.Type.split)
+        self._create_block_hierarchy()
+
+        # The keys returned by the mixed modulestore have no branch.
+        usage_keys = [self.problem_x1a_1, self.vertical_x1a]
+        self.assertEqual({usage_key.branch for usage_key in usage_keys}, {None})
+
+        items = self.store.get_items_by_keys(usage_keys, revision=ModuleStoreEnum.RevisionOption.draft_only)
+        self.assertEqual(set(items), set(usage_keys))
+        for usage_key, item in items.iteritems():
+            self.assertEqual(item.location, usage_key)
+
+        # None of the blocks have been published.
+        items = self.store.get_items_by_keys(usage_keys, revision=ModuleStoreEnum.RevisionOption.published_only)
+        self.assertEqual(items, {})
+
     # Draft:
     #    wildcard query, 6! load pertinent items for inheritance calls, load parents, course root fetch (why)
     # Split:
@@ -193,3 +193,23 @@ class CountMongoCallsCourseTraversal(TestCase):
                     # and then subsequently retrieved with the lazy and depth=None values
                     course = modulestore.get_item(course.location, depth=None, lazy=False)
                     self._traverse_blocks_in_course(course, access_all_block_fields=True)
+
+    @ddt.data(
+        (MIXED_OLD_MONGO_MODULESTORE_BUILDER, 176),
+        (MIXED_SPLIT_MODULESTORE_BUILDER, 5),
+    )
+    @ddt.unpack
+    def test_prefetch_definitions_when_course_previously_cached(self, store_builder, num_mongo_calls):
+        request_cache = MemoryCache()
+        with store_builder.build(request_cache=request_cache) as (content_store, modulestore):
+            course_key = self._import_course(content_store, modulestore)
+
+            with check_mongo_calls(num_mongo_calls):
+                with modulestore.bulk_operations(course_key):
+                    # assume the course was retrieved earlier
+                    course = modulestore.get_course(course_key, depth=0, lazy=True)
+
+                    # and then subsequently retrieved lazily, but with all definitions
+                    # prefetched in a single query
+                    course = modulestore.get_item(course.location, depth=None, prefetch_definitions=True)
+                    self._traverse_blocks_in_course(course, access_all_block_fields=True)
@@ -0,0 +1,181 @@
+"""
+Tests for the old Mongo modulestore's MetadataInheritanceTree.
+"""
+import datetime
+import pickle
+from unittest import TestCase
+
+from mock import patch
+from nose.plugins.attrib import attr
+from pytz import UTC
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.mongo.inheritance_tree import MetadataInheritanceTree
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from xmodule.modulestore.tests.utils import MongoModulestoreBuilder, PureModulestoreTestCase
+
+
+@attr(shard=2)
+class TestMetadataInheritanceTree(TestCase):
+    """
+    Tests for MetadataInheritanceTree.
+    """
+    BRANCH = 'draft-preferred'
+
+    def setUp(self):
+        super(TestMetadataInheritanceTree, self).setUp()
+        #        course (graded)
+        #        /          \
+        #  chapter (due)    chapter2
+        #       |              |
+        #  sequential       problem2
+        #     /    \
+        # problem  html
+        self.tree = MetadataInheritanceTree(self.BRANCH, 'course', {
+            'course': (['chapter', 'chapter2'], {'graded': True}),
+            'chapter': (['sequential'], {'due': 'tomorrow'}),
+            'chapter2': (['problem2'], {}),
+            'sequential': (['problem', 'html'], {}),
+            'orphan': (['orphan_problem'], {'due': 'never'}),
+        })
+
+    def test_inherited_metadata(self):
+        self.assertNotIn('course', self.tree)
+        self.assertNotIn('orphan_problem', self.tree)
+        self.assertEqual(self.tree['chapter2'], {'graded': True})
+        self.assertEqual(self.tree['problem2'], {'graded': True})
+        self.assertEqual(self.tree['sequential'], {'graded': True, 'due': 'tomorrow'})
+        self.assertEqual(self.tree['problem'], {'graded': True, 'due': 'tomorrow'})
+        self.assertIs(self.tree['problem'], self.tree['html'])
+
+    def test_parents(self):
+        self.assertEqual(self.tree.get_parent('problem', self.BRANCH), 'sequential')
+        self.assertEqual(self.tree.get_parent('chapter', self.BRANCH), 'course')
+        self.assertIsNone(self.tree.get_parent('problem', 'published-only'))
+        self.assertIsNone(self.tree.get_parent('orphan_problem', self.BRANCH))
+
+    def test_update_metadata(self):
+        version = self.tree.version
+        problem2_metadata = self.tree['problem2']
+        self.assertTrue(self.tree.update_container('chapter', ['sequential'], {'due': 'today'}))
+        self.assertNotEqual(self.tree.version, version)
+        self.assertEqual(self.tree['problem'], {'graded': True, 'due': 'today'})
+        self.assertIs(self.tree['problem2'], problem2_metadata)
+
+        self.assertTrue(self.tree.update_container('course', ['chapter', 'chapter2'], {'graded': False}))
+        self.assertEqual(self.tree['problem'], {'graded': False, 'due': 'today'})
+        self.assertEqual(self.tree['problem2'], {'graded': False})
+
+    def test_add_children(self):
+        self.assertTrue(self.tree.update_container('vertical', ['new_problem'], {'due': 'later'}))
+        self.assertNotIn('new_problem', self.tree)
+
+        self.assertTrue(self.tree.update_container('sequential', ['problem', 'html', 'vertical'], {}))
+        self.assertEqual(self.tree['new_problem'], {'graded': True, 'due': 'later'})
+        self.assertEqual(self.tree.get_parent('new_problem', self.BRANCH), 'vertical')
+        self.assertEqual(self.tree.get_parent('vertical', self.BRANCH), 'sequential')
+
+    def test_remove_children(self):
+        version = self.tree.version
+        self.assertFalse(self.tree.update_container('sequential', ['problem'], {'due': 'today'}))
+        self.assertEqual(self.tree.version, version)
+        self.assertEqual(self.tree.children['sequential'], ['problem', 'html'])
+        self.assertEqual(self.tree['problem'], {'graded': True, 'due': 'tomorrow'})
+
+    def test_update(self):
+        other_tree = MetadataInheritanceTree(self.BRANCH, 'other_course', {
+            'other_course': (['other_chapter'], {}),
+        })
+        self.tree.update(other_tree)
+        self.assertEqual(self.tree.get_parent('other_chapter', self.BRANCH), 'other_course')
+        self.assertEqual(self.tree.get_parent('chapter', self.BRANCH), 'course')
+
+    def test_pickle(self):
+        tree = pickle.loads(pickle.dumps(self.tree, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(tree, self.tree)
+        self.assertEqual(tree.version, self.tree.version)
+        self.assertIs(tree['problem'], tree['html'])
+        self.assertTrue(tree.update_container('chapter', ['sequential'], {}))
+        self.assertEqual(tree['problem'], {'graded': True})
+
+
+@attr(shard=2)
+@attr('mongo')
+class TestMetadataInheritanceTreeUpdates(PureModulestoreTestCase):
+    """
+    Tests that the old Mongo modulestore's updates of its cached MetadataInheritanceTree match the tree
+    recomputed from the modulestore.
+    """
+    MODULESTORE = MongoModulestoreBuilder()
+
+    def setUp(self):
+        super(TestMetadataInheritanceTreeUpdates, self).setUp()
+        self.course = CourseFactory.create(modulestore=self.store)
+        self.chapter = ItemFactory.create(
+            parent_location=self.course.location, category='chapter', modulestore=self.store,
+        )
+        self.sequential = ItemFactory.create(
+            parent_location=self.chapter.location, category='sequential', modulestore=self.store,
+        )
+        self.problem = ItemFactory.create(
+            parent_location=self.sequential.location, category='problem', modulestore=self.store,
+        )
+        self.cache = self.store.metadata_inheritance_cache_subsystem
+
+    def get_cached_tree(self):
+        """
+        Returns the course's tree in the metadata inheritance cache.
+        """
+        return self.cache.get(unicode(self.course.id))
+
+    def update_chapter_due(self):
+        """
+        Changes the due date of the chapter, and returns it as it's stored in the tree.
+        """
+        chapter = self.store.get_item(self.chapter.location)
+        chapter.due = datetime.datetime(2030, 1, 1, tzinfo=UTC)
+        self.store.update_item(chapter, ModuleStoreEnum.UserID.test)
+        return chapter.fields['due'].read_json(chapter)
+
+    def assert_tree_matches_recompute(self):
+        """
+        Verifies that the cached tree equals the tree recomputed from the modulestore.
+        """
+        cached_tree = self.get_cached_tree()
+        computed_tree = self.store._compute_metadata_inheritance_tree(self.course.id)  # pylint: disable=protected-access
+        self.assertEqual(cached_tree, computed_tree)
+        self.assertEqual(
+            {url: set(children) for url, children in cached_tree.children.iteritems()},
+            {url: set(children) for url, children in computed_tree.children.iteritems()},
+        )
+
+    def test_update_in_place(self):
+        version = self.get_cached_tree().version
+        with patch.object(
+            self.store, '_compute_metadata_inheritance_tree', wraps=self.store._compute_metadata_inheritance_tree,
+        ) as mock_compute:
+            due = self.update_chapter_due()
+        self.assertFalse(mock_compute.called)
+
+        tree = self.get_cached_tree()
+        self.assertNotEqual(tree.version, version)
+        self.assertEqual(tree[unicode(self.problem.location)]['due'], due)
+        self.assert_tree_matches_recompute()
+
+    def test_conflicting_update(self):
+        # another process has already updated the version of the tree being updated
+        version = self.get_cached_tree().version
+        self.cache.add(
+            self.store._metadata_inheritance_tree_version_key(  # pylint: disable=protected-access
+                self.course.id, version, 'claimed'
+            ),
+            'other',
+        )
+        with patch.object(
+            self.store, '_compute_metadata_inheritance_tree', wraps=self.store._compute_metadata_inheritance_tree,
+        ) as mock_compute:
+            due = self.update_chapter_due()
+        self.assertTrue(mock_compute.called)
+
+        self.assertEqual(self.get_cached_tree()[unicode(self.problem.location)]['due'], due)
+        self.assert_tree_matches_recompute()
@@ -2,6 +2,7 @@
     Test split modulestore w/o using any django stuff.
 """
 from mock import patch
+import copy
 import datetime
 from importlib import import_module
 from path import Path as path
@@ -16,6 +17,7 @@ from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
 
 from openedx.core.lib import tempdir
+from openedx.core.lib.chunked_storage import Manifest
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
 from xmodule.course_module import CourseDescriptor
 from xmodule.modulestore import ModuleStoreEnum
@@ -32,6 +34,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache, StructureProcessCache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -976,6 +979,67 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_chunked(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        structure = self._get_structure(self.new_course)
+
+        course_structure_cache = CourseStructureCache()
+        course_structure_cache.chunked_cache.average_chunk_size = 64
+        course_structure_cache.set('test_structure', structure)
+        self.assertEqual(course_structure_cache.get('test_structure'), structure)
+
+        # a structure missing any of its chunks is a cache miss
+        self.cache.delete_many(
+            'chunk.{}'.format(digest)
+            for digest in Manifest.deserialize(self.cache.get('test_structure')).digests
+        )
+        self.assertIsNone(course_structure_cache.get('test_structure'))
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_structure_process_cache')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_process_cache(self, mock_get_cache, mock_get_structure_process_cache):
+        mock_get_cache.return_value = self.cache
+        process_cache = StructureProcessCache(max_size=16 * 1024 * 1024)
+        mock_get_structure_process_cache.return_value = process_cache
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the structure is still read from the process cache when the django cache loses it,
+        # as a copy of its own
+        self.cache.clear()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        self.assertEqual(cached_structure, not_cached_structure)
+        self.assertIsNot(cached_structure, not_cached_structure)
+
+        # modifying a structure that was read doesn't modify the cached structure
+        cached_structure['blocks'].clear()
+        self.assertEqual(self._get_structure(self.new_course), not_cached_structure)
+        self.assertEqual(process_cache.stats()['hits'], 2)
+        self.assertEqual(len(process_cache), 1)
+
+    def test_structure_process_cache_eviction(self):
+        process_cache = StructureProcessCache(max_size=100)
+        process_cache.set('first', {'_id': 'first'}, 40)
+        process_cache.set('second', {'_id': 'second'}, 40)
+
+        # the least recently used structure is evicted
+        self.assertEqual(process_cache.get('first'), {'_id': 'first'})
+        self.assertEqual(process_cache.set('third', {'_id': 'third'}, 40), 1)
+        self.assertIsNone(process_cache.get('second'))
+        self.assertEqual(process_cache.size, 80)
+
+        # structures larger than the cache are not cached
+        self.assertEqual(process_cache.set('huge', {'_id': 'huge'}, 101), 0)
+        self.assertIsNone(process_cache.get('huge'))
+        self.assertEqual(
+            process_cache.stats(),
+            dict(hits=1, misses=2, evictions=1, num_entries=2, size=80, max_size=100),
+        )
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
     def test_course_structure_cache_no_cache_configured(self, mock_get_cache):
         mock_get_cache.side_effect = InvalidCacheBackendError
@@ -1012,6 +1076,70 @@ class TestCourseStructureCache(SplitModuleTest):
         )
 
 
+@attr(shard=2)
+class TestStructureProcessCache(SplitModuleTest):
+    """
+    Tests that changing a course doesn't modify the structures kept in
+    the process cache.
+    """
+    def setUp(self):
+        super(TestStructureProcessCache, self).setUp()
+        self.process_cache = StructureProcessCache(max_size=16 * 1024 * 1024)
+        patcher = patch(
+            'xmodule.modulestore.split_mongo.mongo_connection.get_structure_process_cache',
+            return_value=self.process_cache,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.course = modulestore().create_course(
+            'org', 'course', 'process_cache_run', 'testbot', BRANCH_NAME_DRAFT,
+        )
+        self.chapter = modulestore().create_child(
+            'testbot', self.course.location, 'chapter', block_id='chapter1', fields={'display_name': 'chapter 1'},
+        )
+        modulestore().create_child(
+            'testbot', self.chapter.location, 'sequential', block_id='sequential1',
+        )
+
+    def _get_structure(self, version_guid):
+        """
+        Returns the structure with the given version.
+        """
+        return modulestore().db_connection.get_structure(version_guid)
+
+    def test_mutate_after_read(self):
+        # read the course, so that its structure and blocks are cached
+        chapter = modulestore().get_item(self.chapter.location.version_agnostic(), depth=None)
+        version_guid = chapter.location.version_guid
+        structure = self._get_structure(version_guid)
+        self.assertEqual(self._get_structure(version_guid), structure)
+        self.assertIsNot(self._get_structure(version_guid), structure)
+        original_structure = copy.deepcopy(structure)
+
+        chapter.display_name = 'chapter 1 updated'
+        updated_chapter = modulestore().update_item(chapter, 'testbot')
+        modulestore().create_child('testbot', updated_chapter.location.version_agnostic(), 'sequential')
+        modulestore().delete_item(
+            self.course.id.version_agnostic().make_usage_key('sequential', 'sequential1'), 'testbot',
+        )
+
+        # the cached structure of the version that was read is unchanged
+        self.assertEqual(self._get_structure(version_guid), original_structure)
+        versioned_chapter_key = BlockUsageLocator(CourseLocator(version_guid=version_guid), 'chapter', 'chapter1')
+        self.assertEqual(modulestore().get_item(versioned_chapter_key).display_name, 'chapter 1')
+
+        # reads of the current version match reads without the process cache
+        current_chapter = modulestore().get_item(self.chapter.location.version_agnostic(), depth=None)
+        self.process_cache.clear()
+        uncached_chapter = modulestore().get_item(self.chapter.location.version_agnostic(), depth=None)
+        self.assertEqual(current_chapter.display_name, 'chapter 1 updated')
+        self.assertEqual(uncached_chapter.display_name, 'chapter 1 updated')
+        self.assertEqual(current_chapter.children, uncached_chapter.children)
+        self.assertEqual(len(current_chapter.children), 1)
+        self.assertNotIn('sequential1', [child.block_id for child in current_chapter.children])
+
+
 @attr(shard=2)
 class SplitModuleItemTests(SplitModuleTest):
     '''
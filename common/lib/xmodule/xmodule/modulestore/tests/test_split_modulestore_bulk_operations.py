@@ -7,8 +7,10 @@ import ddt
 import unittest
 from bson.objectid import ObjectId
 from mock import MagicMock, Mock, call
+from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.modulestore.split_mongo.split import SplitBulkWriteMixin
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.tests.test_split_structure_index import make_structure
 
 from opaque_keys.edx.locator import CourseLocator
 
@@ -735,6 +737,25 @@ class TestBulkWriteMixinOpen(TestBulkWriteMixin):
         )
         self.conn.get_course_index.assert_called_once_with(self.course_key, ignore_case=False)
 
+    def test_structure_index_kept_until_update(self):
+        # The index of a structure being edited is built once, until the structure is updated
+        structure = make_structure(ObjectId(), {'course': ['a'], 'a': []})
+        self.bulk.update_structure(self.course_key, structure)
+        index = self.bulk.get_structure_index(structure)
+        self.assertIs(self.bulk.get_structure_index(structure), index)
+
+        structure['blocks'][BlockKey('course', 'course')].fields['children'] = []
+        self.bulk.update_structure(self.course_key, structure)
+        updated_index = self.bulk.get_structure_index(structure)
+        self.assertIsNot(updated_index, index)
+        self.assertFalse(updated_index.has_path_to_root(BlockKey('vertical', 'a')))
+
+        # A structure replaced in the bulk operation isn't answered from the previous structure's index
+        replacement = copy.deepcopy(structure)
+        self.bulk.update_structure(self.course_key, replacement)
+        self.assertIs(self.bulk.get_structure_index(replacement), self.bulk.get_structure_index(replacement))
+        self.assertIsNot(self.bulk.get_structure_index(replacement), updated_index)
+
 
 class TestBulkWriteMixinOpenAfterPrevTransaction(TestBulkWriteMixinOpen, TestBulkWriteMixinPreviousTransaction):
     """
@@ -0,0 +1,94 @@
+"""
+Tests for the split modulestore StructureIndex.
+"""
+from unittest import TestCase
+
+import ddt
+from nose.plugins.attrib import attr
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, get_structure_index
+
+
+def make_structure(structure_id, children_map):
+    """
+    Return a structure with the given id whose blocks have the children in the
+    given map of block id to list of child ids.  Block 'course' is the root.
+    """
+    return {
+        '_id': structure_id,
+        'root': BlockKey('course', 'course'),
+        'blocks': {
+            BlockKey('course' if block_id == 'course' else 'vertical', block_id): BlockData(
+                block_type='course' if block_id == 'course' else 'vertical',
+                fields={'children': [BlockKey('vertical', child_id) for child_id in children]},
+            )
+            for block_id, children in children_map.iteritems()
+        },
+    }
+
+
+def vertical(block_id):
+    """
+    Return the key of the vertical with the given id.
+    """
+    return BlockKey('vertical', block_id)
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestStructureIndex(TestCase):
+    """
+    Tests for StructureIndex.
+    """
+    COURSE = BlockKey('course', 'course')
+
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        #        course
+        #       /      \
+        #      a        b        orphan
+        #     / \      /           |
+        #    c   d    e          shared
+        #             |   \        /
+        #             f    shared
+        self.index = StructureIndex(make_structure('structure', {
+            'course': ['a', 'b'],
+            'a': ['c', 'd'],
+            'b': ['e'],
+            'c': [],
+            'd': [],
+            'e': ['f', 'shared'],
+            'f': [],
+            'orphan': ['shared'],
+            'shared': [],
+        }))
+
+    def test_parents(self):
+        self.assertEqual(self.index.get_parents(vertical('e')), [vertical('b')])
+        self.assertEqual(set(self.index.get_parents(vertical('shared'))), {vertical('e'), vertical('orphan')})
+        self.assertEqual(self.index.get_parents(self.COURSE), [])
+
+    def test_parent_ignores_orphans(self):
+        self.assertEqual(self.index.get_parent(vertical('shared')), vertical('e'))
+        self.assertEqual(self.index.get_parent(vertical('shared'), require_path_to_root=False), vertical('e'))
+        self.assertIsNone(self.index.get_parent(self.COURSE))
+
+    @ddt.data(
+        ('course', True),
+        ('f', True),
+        ('shared', True),
+        ('orphan', False),
+        ('missing', False),
+    )
+    @ddt.unpack
+    def test_has_path_to_root(self, block_id, expected):
+        block_key = self.COURSE if block_id == 'course' else vertical(block_id)
+        self.assertEqual(self.index.has_path_to_root(block_key), expected)
+
+    def test_shared_index(self):
+        structure = make_structure('shared_structure', {'course': ['a'], 'a': []})
+        index = get_structure_index(structure)
+        self.assertIs(get_structure_index(structure), index)
+        self.assertIsNot(get_structure_index(make_structure('other_structure', {'course': []})), index)
@@ -0,0 +1,106 @@
+"""
+Tests for TarballFS.
+"""
+import tarfile
+from io import BytesIO
+from threading import Thread
+from unittest import TestCase
+
+import ddt
+from fs import errors
+from nose.plugins.attrib import attr
+
+from xmodule.modulestore.tarball_fs import TarballFS
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestTarballFS(TestCase):
+    """
+    Tests for TarballFS.
+    """
+    def setUp(self):
+        super(TestTarballFS, self).setUp()
+        self.tarball = BytesIO()
+        self.tarball_fs = TarballFS(self.tarball, spool_size=16)
+        self.addCleanup(self.tarball_fs.close)
+
+    def read_tarball(self):
+        """
+        Close the filesystem, and return a map of the names of the members of
+        the archive to their content, or None for directories.
+        """
+        self.tarball_fs.close()
+        self.tarball.seek(0)
+        with tarfile.open(fileobj=self.tarball, mode='r:gz') as tar_file:
+            return {
+                member.name: tar_file.extractfile(member).read() if member.isfile() else None
+                for member in tar_file.getmembers()
+            }
+
+    @ddt.data(b'', b'small', b'larger than the spool size' * 10)
+    def test_write_files(self, content):
+        self.tarball_fs.makedirs(u'course/static/images')
+        with self.tarball_fs.open(u'course/course.xml', 'wb') as course_file:
+            course_file.write(b'<course/>')
+        with self.tarball_fs.opendir(u'course/static/images').open(u'image.jpg', 'wb') as image_file:
+            image_file.write(content)
+
+        self.assertTrue(self.tarball_fs.isdir(u'course/static'))
+        self.assertEqual(self.tarball_fs.getsize(u'course/static/images/image.jpg'), len(content))
+        self.assertEqual(sorted(self.tarball_fs.listdir(u'course')), [u'course.xml', u'static'])
+
+        self.assertEqual(self.read_tarball(), {
+            'course': None,
+            'course/static': None,
+            'course/static/images': None,
+            'course/course.xml': b'<course/>',
+            'course/static/images/image.jpg': content,
+        })
+
+    def test_write_files_concurrently(self):
+        self.tarball_fs.makedir(u'static')
+
+        def write_file(index):
+            """
+            Write a file whose content spans several spool sizes.
+            """
+            self.tarball_fs.makedirs(u'static/{}'.format(index % 3), recreate=True)
+            with self.tarball_fs.open(u'static/{}/{}.txt'.format(index % 3, index), 'wb') as text_file:
+                for __ in range(10):
+                    text_file.write(u'{}\n'.format(index).encode('utf-8') * 5)
+
+        threads = [Thread(target=write_file, args=(index,)) for index in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        members = self.read_tarball()
+        for index in range(12):
+            self.assertEqual(
+                members['static/{}/{}.txt'.format(index % 3, index)],
+                u'{}\n'.format(index).encode('utf-8') * 50,
+            )
+
+    @ddt.data('rb', 'ab', 'r+b')
+    def test_read_unsupported(self, mode):
+        with self.tarball_fs.open(u'file.txt', 'wb') as text_file:
+            text_file.write(b'text')
+        with self.assertRaises(errors.Unsupported):
+            self.tarball_fs.openbin(u'file.txt', mode)
+
+    def test_remove_unsupported(self):
+        self.tarball_fs.makedir(u'static')
+        with self.tarball_fs.open(u'static/file.txt', 'wb') as text_file:
+            text_file.write(b'text')
+        with self.assertRaises(errors.Unsupported):
+            self.tarball_fs.remove(u'static/file.txt')
+        with self.assertRaises(errors.Unsupported):
+            self.tarball_fs.removedir(u'static')
+
+    def test_missing_directory(self):
+        with self.assertRaises(errors.ResourceNotFound):
+            self.tarball_fs.open(u'missing/file.txt', 'wb')
+        with self.assertRaises(errors.ResourceNotFound):
+            self.tarball_fs.makedir(u'missing/directory')
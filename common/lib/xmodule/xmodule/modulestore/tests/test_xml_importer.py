@@ -378,6 +378,23 @@ class StaticContentImporterTest(unittest.TestCase):
                 'static/inner/file1.txt', base_dir=expected_base_dir
             )
 
+    def test_import_static_content_directory_concurrently(self):
+        mocked_os_walk_yield = [
+            ('static', None, ['file{}.txt'.format(index) for index in range(10)]),
+        ]
+        with mock.patch(
+            'xmodule.modulestore.xml_importer.os.walk',
+            return_value=mocked_os_walk_yield
+        ), mock.patch.object(
+            self.static_content_importer, 'import_static_file',
+            side_effect=lambda file_path, base_dir: (file_path, 'asset ' + file_path),
+        ):
+            remap_dict = self.static_content_importer.import_static_content_directory('static', max_workers=3)
+            self.assertEqual(
+                remap_dict,
+                {'static/file{}.txt'.format(index): 'asset static/file{}.txt'.format(index) for index in range(10)},
+            )
+
     def test_import_static_file(self):
         base_dir = path('/path/to/dir')
         full_file_path = os.path.join(base_dir, 'static/some_file.txt')
@@ -193,6 +193,22 @@ class MemoryCache(object):
         """
         self.data[key] = value
 
+    def add(self, key, value):
+        """
+        Set a key in the cache, if it isn't set already.
+
+        Args:
+            key: The key to add.
+            value: The value to add the key with.
+
+        Returns:
+            Whether the key was added.
+        """
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
 
 class MongoContentstoreBuilder(object):
     """
@@ -28,6 +28,7 @@ import mimetypes
 from path import Path as path
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from lxml import etree
 
 from xblock.fields import XBlockMixin
@@ -37,7 +38,7 @@ from xblock.runtime import KvsFieldData, DictKeyValueStore
 from xmodule.x_module import XModuleDescriptor, XModuleMixin
 from opaque_keys.edx.keys import UsageKey
 from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
-from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.content import StaticContent, ThumbnailRenderer
 from .inheritance import own_metadata
 from xmodule.errortracker import make_error_tracker
 from .store_utilities import rewrite_nonportable_content_links
@@ -56,6 +57,9 @@ log = logging.getLogger(__name__)
 
 DEFAULT_STATIC_CONTENT_SUBDIR = 'static'
 
+# Default maximum number of static files to import concurrently.
+DEFAULT_STATIC_CONTENT_WORKERS = 4
+
 
 class LocationMixin(XBlockMixin):
     """
@@ -83,6 +87,8 @@ class StaticContentImporter:
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        # The renderer of the thumbnails of the images being imported, if they're being imported in a batch.
+        self.thumbnail_renderer = None
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -95,10 +101,19 @@ class StaticContentImporter:
         mimetypes.add_type('application/octet-stream', '.srt')
         self.mimetypes_list = mimetypes.types_map.values()
 
-    def import_static_content_directory(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
+    def import_static_content_directory(
+            self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False,
+            max_workers=DEFAULT_STATIC_CONTENT_WORKERS,
+    ):
+        """
+        Import all files in the content_subdir directory, uploading up to
+        max_workers of them to the content store at a time, and rendering up to
+        max_workers thumbnails at a time in a pool of processes.
+        """
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        file_paths = []
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -109,15 +124,27 @@ class StaticContentImporter:
                         log.debug('skipping static content %s...', file_path)
                     continue
 
-                if verbose:
-                    log.debug('importing static content %s...', file_path)
+                file_paths.append(file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+        def import_file(file_path):
+            """
+            Import the static file at file_path.
+            """
+            if verbose:
+                log.debug('importing static content %s...', file_path)
 
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+            return self.import_static_file(file_path, base_dir=static_dir)
+
+        with ThumbnailRenderer(max_workers=max_workers) as self.thumbnail_renderer:
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    for imported_file_attrs in executor.map(import_file, file_paths):
+                        if imported_file_attrs:
+                            # store the remapping information which will be needed
+                            # to subsitute in the module data
+                            remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+            finally:
+                self.thumbnail_renderer = None
 
         return remap_dict
 
@@ -159,7 +186,9 @@ class StaticContentImporter:
         )
 
         # first let's save a thumbnail so we can get back a thumbnail location
-        thumbnail_content, thumbnail_location = self.static_content_store.generate_thumbnail(content)
+        thumbnail_content, thumbnail_location = self.static_content_store.generate_thumbnail(
+            content, renderer=self.thumbnail_renderer
+        )
 
         if thumbnail_content is not None:
             content.thumbnail_location = thumbnail_location
@@ -216,6 +245,9 @@ class ImportManager(object):
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        static_content_workers: The maximum number of static files to upload to static_content_store
+            at a time.  The static files are uploaded while the blocks are imported.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -229,6 +261,7 @@ class ImportManager(object):
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_content_workers=DEFAULT_STATIC_CONTENT_WORKERS,
     ):
         self.store = store
         self.user_id = user_id
@@ -244,6 +277,7 @@ class ImportManager(object):
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.static_content_workers = static_content_workers
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -282,7 +316,8 @@ class ImportManager(object):
                 log.debug("Importing static content and python library")
             # first pass to find everything in the static content directory
             static_content_importer.import_static_content_directory(
-                content_subdir=self.static_content_subdir, verbose=self.verbose
+                content_subdir=self.static_content_subdir, verbose=self.verbose,
+                max_workers=self.static_content_workers,
             )
         elif self.do_import_python_lib and self.python_lib_filename:
             if self.verbose:
@@ -311,7 +346,8 @@ class ImportManager(object):
             if self.verbose:
                 log.debug("Importing %s directory", simport)
             static_content_importer.import_static_content_directory(
-                content_subdir=simport, verbose=self.verbose
+                content_subdir=simport, verbose=self.verbose,
+                max_workers=self.static_content_workers,
             )
 
     def import_asset_metadata(self, data_dir, course_id):
@@ -499,14 +535,18 @@ class ImportManager(object):
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                # Import all static pieces in the background, since they go to the
+                # static content store rather than to the modulestore.
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    static_import = executor.submit(self.import_static, data_path, dest_id)
+
+                    # Import asset metadata stored in XML.
+                    self.import_asset_metadata(data_path, dest_id)
 
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                    # Import all children
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                    static_import.result()
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
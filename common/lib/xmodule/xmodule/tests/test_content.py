@@ -2,12 +2,16 @@
 
 import os
 import unittest
+from StringIO import StringIO
+
 import ddt
+from concurrent.futures import ThreadPoolExecutor
 from mock import Mock, patch
 from path import Path as path
+from PIL import Image
 
 from xmodule.contentstore.content import StaticContent, StaticContentStream
-from xmodule.contentstore.content import ContentStore
+from xmodule.contentstore.content import ContentStore, render_thumbnail
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import AssetLocator, CourseLocator
 from xmodule.static_content import _write_js, _list_descriptors
@@ -160,6 +164,31 @@ class ContentTest(unittest.TestCase):
             thumbnail_file_location
         )
 
+    @patch('xmodule.contentstore.content.ProcessPoolExecutor', ThreadPoolExecutor)
+    @patch('xmodule.contentstore.content.render_thumbnail', wraps=render_thumbnail)
+    def test_generate_thumbnails(self, render_thumbnail_mock):
+        # Identical images should only be rendered once at each size, however many times they're uploaded.
+        content_store = ContentStore()
+        content_store.save = Mock()
+        image_data = StringIO()
+        Image.new('RGB', size=(256, 256), color=(255, 0, 0)).save(image_data, 'JPEG')
+        contents = []
+        for name in (u'red.jpg', u'copy_of_red.jpg'):
+            content = Content(AssetLocator(CourseLocator(u'mitX', u'800', u'ignore_run'), u'asset', name),
+                              'image/jpeg')
+            content.data = image_data.getvalue()
+            contents.append(content)
+
+        thumbnails = content_store.generate_thumbnails(contents, dimensions_list=[None, [64, 64]])
+        self.assertEqual(
+            [thumbnail_location.block_id for __, thumbnail_location in thumbnails],
+            [u'red.jpg', u'copy_of_red.jpg']
+        )
+        self.assertEqual(render_thumbnail_mock.call_count, 2)
+        self.assertEqual(content_store.save.call_count, 4)
+        saved_names = sorted(call[0][0].location.block_id for call in content_store.save.call_args_list)
+        self.assertEqual(saved_names, [u'copy_of_red-64x64.jpg', u'copy_of_red.jpg', u'red-64x64.jpg', u'red.jpg'])
+
     def test_compute_location(self):
         # We had a bug that __ got converted into a single _. Make sure that substitution of INVALID_CHARS (like space)
         # still happen.
@@ -14,6 +14,7 @@ class BlockCompletionTransformer(BlockStructureTransformer):
     """
     READ_VERSION = 1
     WRITE_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
     COMPLETION = 'completion'
 
     @classmethod
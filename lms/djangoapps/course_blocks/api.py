@@ -2,6 +2,8 @@
 API entry point to the course_blocks app with top-level
 get_course_blocks function.
 """
+from collections import OrderedDict
+
 from django.conf import settings
 
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
@@ -83,3 +85,67 @@ def get_course_blocks(
         starting_block_usage_key,
         collected_block_structure,
     )
+
+
+def get_course_blocks_for_users(
+        users,
+        starting_block_usage_key,
+        transformers=None,
+        collected_block_structure=None,
+):
+    """
+    Similar to get_course_blocks, but returns transformed block
+    structures for each of the given users.
+
+    Users are grouped by the transformers' usage equivalence keys (for
+    example, by staff access, beta tester status and partition groups),
+    so that the transformers are run only once for each group of users
+    who would get the same transformed block structure.
+
+    Arguments:
+        users (list[django.contrib.auth.models.User]) - User objects
+            for which the block structure is to be transformed.
+
+        starting_block_usage_key, transformers,
+        collected_block_structure - See the description in
+            get_course_blocks.
+
+    Returns:
+        list[(list[User], BlockStructureBlockData)] - Pairs of a group
+            of the given users and the transformed block structure
+            shared by all users in the group.  Each user is in exactly
+            one group.  The shared block structure should not be
+            modified by the caller.
+    """
+    if not transformers:
+        transformers = BlockStructureTransformers(get_course_block_access_transformers())
+    course_key = starting_block_usage_key.course_key
+    block_structure_manager = get_block_structure_manager(course_key)
+    if collected_block_structure is None:
+        collected_block_structure = block_structure_manager.get_collected()
+
+    def _transform(usage_info):
+        """
+        Returns the block structure transformed for the given usage_info.
+        """
+        transformers.usage_info = usage_info
+        return block_structure_manager.get_transformed(
+            transformers,
+            starting_block_usage_key,
+            collected_block_structure,
+        )
+
+    usage_infos_by_key = OrderedDict()
+    results = []
+    for user in users:
+        usage_info = CourseUsageInfo(course_key, user)
+        transformers.usage_info = usage_info
+        equivalence_key = transformers.usage_equivalence_key(collected_block_structure)
+        if equivalence_key is None:
+            results.append(([user], _transform(usage_info)))
+        else:
+            usage_infos_by_key.setdefault(equivalence_key, []).append(usage_info)
+
+    for usage_infos in usage_infos_by_key.itervalues():
+        results.append(([usage_info.user for usage_info in usage_infos], _transform(usage_infos[0])))
+    return results
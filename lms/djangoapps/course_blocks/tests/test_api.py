@@ -0,0 +1,42 @@
+"""
+Tests for course_blocks API
+"""
+from nose.plugins.attrib import attr
+
+from student.tests.factories import UserFactory
+
+from ..api import get_course_blocks, get_course_blocks_for_users
+from ..transformers.tests.helpers import BlockParentsMapTestCase, publish_course, update_block
+
+
+@attr(shard=3)
+class GetCourseBlocksForUsersTestCase(BlockParentsMapTestCase):
+    """
+    Tests for get_course_blocks_for_users
+    """
+    def setUp(self):
+        super(GetCourseBlocksForUsersTestCase, self).setUp()
+        block = self.get_block(2)
+        block.visible_to_staff_only = True
+        update_block(block)
+        publish_course(self.course)
+
+        self.other_student = UserFactory.create(is_staff=False, username='other_student')
+
+    def test_users_grouped_by_access(self):
+        users = [self.student, self.staff, self.other_student]
+        grouped_structures = get_course_blocks_for_users(users, self.course.location)
+
+        self.assertEquals(
+            sorted(sorted(user.username for user in grouped_users) for grouped_users, _ in grouped_structures),
+            [['other_student', 'test_student'], ['test_staff']],
+        )
+        for grouped_users, block_structure in grouped_structures:
+            for user in grouped_users:
+                self.assertEquals(
+                    set(block_structure.get_block_keys()),
+                    set(get_course_blocks(user, self.course.location).get_block_keys()),
+                )
+
+    def test_no_users(self):
+        self.assertEquals(get_course_blocks_for_users([], self.course.location), [])
@@ -3,20 +3,21 @@ Visibility Transformer implementation.
 """
 from datetime import datetime
 
+import numpy
 from pytz import utc
 
 from openedx.core.djangoapps.content.block_structure.transformer import (
-    BlockStructureTransformer,
-    FilteringTransformerMixin
+    BatchFilteringTransformerMixin,
+    BlockStructureTransformer
 )
 from xmodule.seq_module import SequenceModule
 
-from .utils import collect_merged_boolean_field, collect_merged_date_field
+from .utils import collect_merged_boolean_field, collect_merged_date_field, get_timestamp, get_timestamp_array
 
 MAXIMUM_DATE = utc.localize(datetime.max)
 
 
-class HiddenContentTransformer(FilteringTransformerMixin, BlockStructureTransformer):
+class HiddenContentTransformer(BatchFilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that enforces the hide_after_due field on
     blocks by removing children blocks from the block structure for
@@ -31,6 +32,7 @@ class HiddenContentTransformer(FilteringTransformerMixin, BlockStructureTransfor
     """
     WRITE_VERSION = 2
     READ_VERSION = 2
+    SUPPORTS_INCREMENTAL_COLLECT = True
     MERGED_DUE_DATE = 'merged_due_date'
     MERGED_HIDE_AFTER_DUE = 'merged_hide_after_due'
 
@@ -88,6 +90,9 @@ class HiddenContentTransformer(FilteringTransformerMixin, BlockStructureTransfor
 
         block_structure.request_xblock_fields(u'self_paced', u'end')
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        return usage_info.has_staff_access
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
@@ -99,6 +104,25 @@ class HiddenContentTransformer(FilteringTransformerMixin, BlockStructureTransfor
             ),
         ]
 
+    def transform_block_masks(self, usage_info, block_structure, block_index):
+        # Users with staff access bypass the Visibility check.
+        if usage_info.has_staff_access:
+            return []
+
+        hide_after_due = block_index.get_transformer_block_field_array(self, self.MERGED_HIDE_AFTER_DUE, False)
+        root_block = block_structure[block_structure.root_block_usage_key]
+        if root_block.self_paced:
+            hidden_dates = get_timestamp_array([root_block.end] * len(block_index), missing_value=numpy.inf)
+        else:
+            hidden_dates = get_timestamp_array(
+                block_structure.get_transformer_block_field_values(
+                    block_index.block_keys, self, self.MERGED_DUE_DATE, False,
+                ),
+                missing_value=numpy.inf,
+            )
+        now = get_timestamp(datetime.now(utc))
+        return [block_index.create_removal_mask(hide_after_due & (hidden_dates <= now))]
+
     def _is_block_hidden(self, block_structure, block_key):
         """
         Returns whether the block with the given block_key should
@@ -26,6 +26,7 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -62,11 +63,35 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
                 filter_func=lambda block_key: block_key.block_type == 'library_content',
                 yield_descendants_of_unyielded=True,
         ):
-            xblock = block_structure.get_xblock(block_key)
-            for child_key in xblock.children:
+            for child_key in block_structure.get_children(block_key):
                 summary = summarize_block(child_key)
                 block_structure.set_transformer_block_field(child_key, cls, 'block_analytics_summary', summary)
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        selections = []
+        for block_key in block_structure:
+            if block_key.block_type != 'library_content':
+                continue
+            library_children = block_structure.get_children(block_key)
+            if not library_children:
+                continue
+            max_count = block_structure.get_xblock_field(block_key, 'max_count')
+
+            state_dict = get_student_module_as_dict(usage_info.user, usage_info.course_key, block_key)
+            selected = frozenset(tuple(selected_block) for selected_block in state_dict.get('selected', []))
+
+            # Unless the user's selection is already complete and valid, the
+            # transform updates it and publishes events for the user.
+            if any(
+                    usage_info.course_key.make_usage_key(*selected_block) not in library_children
+                    for selected_block in selected
+            ):
+                return None
+            if len(selected) > max_count or len(selected) < min(max_count, len(library_children)):
+                return None
+            selections.append((block_key, selected))
+        return tuple(selections)
+
     def transform_block_filters(self, usage_info, block_structure):
         all_library_children = set()
         all_selected_children = set()
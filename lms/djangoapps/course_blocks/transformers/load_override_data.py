@@ -56,6 +56,7 @@ class OverrideDataTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -73,6 +74,17 @@ class OverrideDataTransformer(BlockStructureTransformer):
         # collect basic xblock fields
         block_structure.request_xblock_fields(*REQUESTED_FIELDS)
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        """
+        Users with individual overrides in the course do not share
+        transforms with other users.
+        """
+        has_overrides = StudentFieldOverride.objects.filter(
+            course_id=usage_info.course_key,
+            student=usage_info.user,
+        ).exists()
+        return usage_info.user.id if has_overrides else ()
+
     def transform(self, usage_info, block_structure):
         """
         loads override data into blocks
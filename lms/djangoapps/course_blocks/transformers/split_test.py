@@ -2,12 +2,12 @@
 Split Test Block Transformer
 """
 from openedx.core.djangoapps.content.block_structure.transformer import (
-    BlockStructureTransformer,
-    FilteringTransformerMixin
+    BatchFilteringTransformerMixin,
+    BlockStructureTransformer
 )
 
 
-class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer):
+class SplitTestTransformer(BatchFilteringTransformerMixin, BlockStructureTransformer):
     """
     A nested transformer of the UserPartitionTransformer that honors the
     block structure pathways created by split_test modules.
@@ -24,6 +24,7 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -67,11 +68,14 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
 
             # Set group access for each child using its group_access
             # field so the user partitions transformer enforces it.
-            for child_location in xblock.children:
+            for child_location in block_structure.get_children(block_key):
                 child = block_structure.get_xblock(child_location)
                 group = child_to_group.get(child_location, None)
                 child.group_access[partition_for_this_block.id] = [group] if group is not None else []
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        return ()
+
     def transform_block_filters(self, usage_info, block_structure):
         """
         Mutates block_structure based on the given usage_info.
@@ -85,3 +89,14 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
                 keep_descendants=True,
             )
         ]
+
+    def transform_block_masks(self, usage_info, block_structure, block_index):
+        """
+        Returns removal masks for the given usage_info.
+        """
+        return [
+            block_index.create_removal_mask(
+                block_index.create_array(block_key.block_type == 'split_test' for block_key in block_index.block_keys),
+                keep_descendants=True,
+            )
+        ]
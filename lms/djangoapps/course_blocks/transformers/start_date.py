@@ -1,17 +1,24 @@
 """
 Start Date Transformer implementation.
 """
-from lms.djangoapps.courseware.access_utils import check_start_date
+from datetime import datetime
+
+import numpy
+from pytz import UTC
+
+from lms.djangoapps.courseware.access_utils import check_start_date, check_start_dates
+from lms.djangoapps.courseware.masquerade import is_masquerading_as_student
 from openedx.core.djangoapps.content.block_structure.transformer import (
-    BlockStructureTransformer,
-    FilteringTransformerMixin
+    BatchFilteringTransformerMixin,
+    BlockStructureTransformer
 )
+from student.roles import CourseBetaTesterRole
 from xmodule.course_metadata_utils import DEFAULT_START_DATE
 
-from .utils import collect_merged_date_field
+from .utils import collect_merged_date_field, get_timestamp, get_timestamp_array
 
 
-class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer):
+class StartDateTransformer(BatchFilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that enforces the 'start' and 'days_early_for_beta'
     fields on blocks by removing blocks from the block structure for
@@ -29,6 +36,7 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
     MERGED_START_DATE = 'merged_start_date'
 
     @classmethod
@@ -67,6 +75,14 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             func_merge_ancestors=max,
         )
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        if usage_info.has_staff_access:
+            return 'staff'
+        return (
+            CourseBetaTesterRole(usage_info.course_key).has_user(usage_info.user),
+            is_masquerading_as_student(usage_info.user, usage_info.course_key),
+        )
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Start Date check.
         if usage_info.has_staff_access:
@@ -79,3 +95,30 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             usage_info.course_key,
         )
         return [block_structure.create_removal_filter(removal_condition)]
+
+    def transform_block_masks(self, usage_info, block_structure, block_index):
+        # Users with staff access bypass the Start Date check.
+        if usage_info.has_staff_access:
+            return []
+
+        days_early_for_beta = block_index.create_array(
+            (
+                numpy.nan if days is None else days
+                for days in block_structure.get_xblock_field_values(block_index.block_keys, 'days_early_for_beta')
+            ),
+            dtype=float,
+        )
+        starts = get_timestamp_array(
+            block_structure.get_transformer_block_field_values(
+                block_index.block_keys, self, self.MERGED_START_DATE, False,
+            ),
+            missing_value=-numpy.inf,
+        )
+        access_granted = check_start_dates(
+            usage_info.user,
+            days_early_for_beta,
+            starts,
+            get_timestamp(datetime.now(UTC)),
+            usage_info.course_key,
+        )
+        return [block_index.create_removal_mask(~access_granted)]
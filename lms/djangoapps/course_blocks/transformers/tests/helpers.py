@@ -5,6 +5,7 @@ from mock import patch
 
 from course_modes.models import CourseMode
 from lms.djangoapps.courseware.access import has_access
+from openedx.core.djangoapps.content.block_structure.config import BATCH_FILTERING, waffle
 from openedx.core.djangoapps.content.block_structure.tests.helpers import clear_registered_transformers_cache
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
@@ -36,6 +37,18 @@ class TransformerRegistryTestMixin(object):
         clear_registered_transformers_cache()
 
 
+class BatchFilteringTestMixin(object):
+    """
+    Test mixin that enables batch filtering, so that transformers are
+    applied using their transform_block_masks method.
+    """
+    def setUp(self, **kwargs):
+        super(BatchFilteringTestMixin, self).setUp(**kwargs)
+        batch_filtering = waffle().override(BATCH_FILTERING, active=True)
+        batch_filtering.__enter__()
+        self.addCleanup(batch_filtering.__exit__, None, None, None)
+
+
 class CourseStructureTestCase(TransformerRegistryTestMixin, ModuleStoreTestCase):
     """
     Helper for test cases that need to build course structures.
@@ -8,7 +8,7 @@ from django.utils.timezone import now
 from nose.plugins.attrib import attr
 
 from ..hidden_content import HiddenContentTransformer
-from .helpers import BlockParentsMapTestCase, update_block
+from .helpers import BatchFilteringTestMixin, BlockParentsMapTestCase, update_block
 
 
 @attr(shard=3)
@@ -82,3 +82,11 @@ class HiddenContentTransformerTestCase(BlockParentsMapTestCase):
             blocks_with_differing_access=None,
             transformers=self.transformers,
         )
+
+
+@attr(shard=3)
+class HiddenContentTransformerBatchFilteringTestCase(BatchFilteringTestMixin, HiddenContentTransformerTestCase):
+    """
+    HiddenContentTransformer Test with batch filtering
+    """
+    pass
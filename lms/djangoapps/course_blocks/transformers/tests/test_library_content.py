@@ -2,13 +2,21 @@
 Tests for ContentLibraryTransformer.
 """
 
+import json
+
+from mock import patch
+
+from courseware.models import StudentModule
 from openedx.core.djangoapps.content.block_structure.api import clear_course_from_cache
+from openedx.core.djangoapps.content.block_structure.config import BATCH_FILTERING, waffle
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from student.tests.factories import CourseEnrollmentFactory
 
 from ...api import get_course_blocks
+from ...usage_info import CourseUsageInfo
 from ..library_content import ContentLibraryTransformer
-from .helpers import CourseStructureTestCase
+from ..visibility import VisibilityTransformer
+from .helpers import CourseStructureTestCase, update_block
 
 
 class MockedModule(object):
@@ -165,3 +173,61 @@ class ContentLibraryTransformerTestCase(CourseStructureTestCase):
                 ),
                 "Expected 'selected' equality failed in iteration {}.".format(i)
             )
+
+    def test_usage_equivalence_key(self):
+        """
+        Test that users share a usage equivalence key only while their
+        library content selections are complete and valid.
+        """
+        library_key = self.blocks['library_content1'].location
+        get_course_blocks(self.user, self.course.location, self.transformers)
+        block_structure = get_course_blocks(
+            self.user,
+            self.course.location,
+            transformers=BlockStructureTransformers(),
+        )
+        usage_info = CourseUsageInfo(self.course.id, self.user)
+        transformer = ContentLibraryTransformer()
+        selected = json.loads(
+            StudentModule.objects.get(student=self.user, module_state_key=library_key).state
+        )['selected']
+        self.assertEqual(
+            transformer.usage_equivalence_key(usage_info, block_structure),
+            ((library_key, frozenset(tuple(selected_block) for selected_block in selected)),),
+        )
+
+        # A selected block which is no longer in the library is removed by the transform.
+        StudentModule.objects.filter(student=self.user, module_state_key=library_key).update(
+            state=json.dumps({'selected': selected + [['vertical', 'removed_vertical']]}),
+        )
+        self.assertIsNone(transformer.usage_equivalence_key(usage_info, block_structure))
+
+    def test_selection_hidden_by_removal_mask(self):
+        """
+        Test that a selected block which is removed by a batch filtering
+        transformer's removal mask is kept in the stored selection.
+        """
+        library_key = self.blocks['library_content1'].location
+        get_course_blocks(self.user, self.course.location, self.transformers)
+        state = StudentModule.objects.get(student=self.user, module_state_key=library_key).state
+        selected_block_key = library_key.course_key.make_usage_key(*json.loads(state)['selected'][0])
+        selected_block = next(block for block in self.blocks.itervalues() if block.location == selected_block_key)
+
+        selected_block.visible_to_staff_only = True
+        update_block(selected_block)
+        clear_course_from_cache(self.course.id)
+
+        transformers = BlockStructureTransformers([VisibilityTransformer(), ContentLibraryTransformer()])
+        with patch(
+            'openedx.core.djangoapps.content.block_structure.transformer_registry.'
+            'TransformerRegistry.get_registered_transformers',
+            return_value={VisibilityTransformer, ContentLibraryTransformer},
+        ):
+            with waffle().override(BATCH_FILTERING, active=True):
+                block_structure = get_course_blocks(self.user, self.course.location, transformers)
+
+        self.assertNotIn(selected_block.location, set(block_structure.get_block_keys()))
+        self.assertEqual(
+            StudentModule.objects.get(student=self.user, module_state_key=library_key).state,
+            state,
+        )
@@ -11,7 +11,7 @@ from nose.plugins.attrib import attr
 from courseware.tests.factories import BetaTesterFactory
 
 from ..start_date import DEFAULT_START_DATE, StartDateTransformer
-from .helpers import BlockParentsMapTestCase, update_block
+from .helpers import BatchFilteringTestMixin, BlockParentsMapTestCase, update_block
 
 
 @attr(shard=3)
@@ -121,3 +121,11 @@ class StartDateTransformerTestCase(BlockParentsMapTestCase):
             blocks_with_differing_student_access,
             self.transformers,
         )
+
+
+@attr(shard=3)
+class StartDateTransformerBatchFilteringTestCase(BatchFilteringTestMixin, StartDateTransformerTestCase):
+    """
+    StartDateTransformer Test with batch filtering
+    """
+    pass
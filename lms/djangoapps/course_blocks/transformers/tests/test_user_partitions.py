@@ -18,7 +18,7 @@ from xmodule.partitions.partitions import Group, UserPartition
 
 from ...api import get_course_blocks
 from ..user_partitions import UserPartitionTransformer, _MergedGroupAccess
-from .helpers import CourseStructureTestCase, update_block
+from .helpers import BatchFilteringTestMixin, CourseStructureTestCase, update_block
 
 
 class UserPartitionTestMixin(object):
@@ -242,6 +242,14 @@ class UserPartitionTransformerTestCase(UserPartitionTestMixin, CourseStructureTe
         )
 
 
+@attr(shard=3)
+class UserPartitionTransformerBatchFilteringTestCase(BatchFilteringTestMixin, UserPartitionTransformerTestCase):
+    """
+    UserPartitionTransformer Test with batch filtering
+    """
+    pass
+
+
 @attr(shard=3)
 @ddt.ddt
 class MergedGroupAccessTestData(UserPartitionTestMixin, CourseStructureTestCase):
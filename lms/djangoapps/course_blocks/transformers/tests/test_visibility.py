@@ -5,7 +5,7 @@ import ddt
 from nose.plugins.attrib import attr
 
 from ..visibility import VisibilityTransformer
-from .helpers import BlockParentsMapTestCase, update_block
+from .helpers import BatchFilteringTestMixin, BlockParentsMapTestCase, update_block
 
 
 @attr(shard=3)
@@ -45,3 +45,11 @@ class VisibilityTransformerTestCase(BlockParentsMapTestCase):
             blocks_with_differing_access,
             self.transformers,
         )
+
+
+@attr(shard=3)
+class VisibilityTransformerBatchFilteringTestCase(BatchFilteringTestMixin, VisibilityTransformerTestCase):
+    """
+    VisibilityTransformer Test with batch filtering
+    """
+    pass
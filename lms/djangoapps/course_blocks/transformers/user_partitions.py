@@ -3,8 +3,8 @@ User Partitions Transformer
 """
 from lms.djangoapps.courseware.access import has_access
 from openedx.core.djangoapps.content.block_structure.transformer import (
-    BlockStructureTransformer,
-    FilteringTransformerMixin
+    BatchFilteringTransformerMixin,
+    BlockStructureTransformer
 )
 from xmodule.partitions.partitions_service import get_all_partitions_for_course
 
@@ -12,7 +12,7 @@ from .split_test import SplitTestTransformer
 from .utils import get_field_on_block
 
 
-class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransformer):
+class UserPartitionTransformer(BatchFilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that enforces the group access rules on course blocks,
     by honoring their user_partitions and group_access fields, and
@@ -23,6 +23,7 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -70,6 +71,17 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
             merged_group_access = _MergedGroupAccess(user_partitions, xblock, merged_parent_access_list)
             block_structure.set_transformer_block_field(block_key, cls, 'merged_group_access', merged_group_access)
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        user_partitions = block_structure.get_transformer_data(self, 'user_partitions')
+        if not user_partitions:
+            return ()
+
+        if has_access(usage_info.user, 'staff', block_structure.root_block_usage_key):
+            return 'staff'
+
+        user_groups = _get_user_partition_groups(usage_info.course_key, user_partitions, usage_info.user)
+        return tuple(sorted((partition_id, group.id) for partition_id, group in user_groups.iteritems()))
+
     def transform_block_filters(self, usage_info, block_structure):
         user = usage_info.user
         result_list = SplitTestTransformer().transform_block_filters(usage_info, block_structure)
@@ -92,6 +104,33 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
         result_list.append(group_access_filter)
         return result_list
 
+    def transform_block_masks(self, usage_info, block_structure, block_index):
+        user = usage_info.user
+        result_list = SplitTestTransformer().transform_block_masks(usage_info, block_structure, block_index)
+
+        user_partitions = block_structure.get_transformer_data(self, 'user_partitions')
+        if not user_partitions:
+            return []
+
+        # Staff access is course-wide, so it is checked once rather than
+        # for each block.
+        if has_access(user, 'staff', block_structure.root_block_usage_key):
+            return result_list
+
+        user_groups = _get_user_partition_groups(usage_info.course_key, user_partitions, user)
+        merged_group_accesses = block_structure.get_transformer_block_field_values(
+            block_index.block_keys, self, 'merged_group_access',
+        )
+        result_list.append(
+            block_index.create_removal_mask(
+                block_index.create_array(
+                    not merged_group_access.check_group_access(user_groups)
+                    for merged_group_access in merged_group_accesses
+                ),
+            )
+        )
+        return result_list
+
 
 class _MergedGroupAccess(object):
     """
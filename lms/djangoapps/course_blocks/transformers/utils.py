@@ -1,6 +1,12 @@
 """
 Common Helper utilities for transformers
 """
+from datetime import datetime
+
+import numpy
+from pytz import utc
+
+EPOCH = utc.localize(datetime(1970, 1, 1))
 
 
 def get_field_on_block(block, field_name, default_value=None):
@@ -147,3 +153,23 @@ def collect_merged_date_field(
             merged_field_name,
             merged_date_value
         )
+
+
+def get_timestamp(date):
+    """
+    Returns the given timezone-aware datetime as seconds since the epoch.
+    """
+    return (date - EPOCH).total_seconds()
+
+
+def get_timestamp_array(dates, missing_value):
+    """
+    Returns a float array of the given timezone-aware datetimes as
+    seconds since the epoch, with missing_value for any date that
+    isn't set.
+    """
+    return numpy.fromiter(
+        (get_timestamp(date) if date else missing_value for date in dates),
+        dtype=float,
+        count=len(dates),
+    )
@@ -2,14 +2,14 @@
 Visibility Transformer implementation.
 """
 from openedx.core.djangoapps.content.block_structure.transformer import (
-    BlockStructureTransformer,
-    FilteringTransformerMixin
+    BatchFilteringTransformerMixin,
+    BlockStructureTransformer
 )
 
 from .utils import collect_merged_boolean_field
 
 
-class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer):
+class VisibilityTransformer(BatchFilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that enforces the visible_to_staff_only field on
     blocks by removing blocks from the block structure for which the
@@ -24,6 +24,7 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     MERGED_VISIBLE_TO_STAFF_ONLY = 'merged_visible_to_staff_only'
 
@@ -59,6 +60,9 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
             merged_field_name=cls.MERGED_VISIBLE_TO_STAFF_ONLY,
         )
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        return usage_info.has_staff_access
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
@@ -69,3 +73,14 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
                 lambda block_key: self._get_visible_to_staff_only(block_structure, block_key),
             )
         ]
+
+    def transform_block_masks(self, usage_info, block_structure, block_index):
+        # Users with staff access bypass the Visibility check.
+        if usage_info.has_staff_access:
+            return []
+
+        return [
+            block_index.create_removal_mask(
+                block_index.get_transformer_block_field_array(self, self.MERGED_VISIBLE_TO_STAFF_ONLY, False),
+            )
+        ]
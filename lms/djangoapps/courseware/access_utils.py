@@ -6,6 +6,7 @@ It allows us to share code between access.py and block transformers.
 from datetime import datetime, timedelta
 from logging import getLogger
 
+import numpy
 from django.conf import settings
 from pytz import UTC
 
@@ -21,6 +22,8 @@ log = getLogger(__name__)
 ACCESS_GRANTED = AccessResponse(True)
 ACCESS_DENIED = AccessResponse(False)
 
+SECONDS_PER_DAY = 24 * 60 * 60
+
 
 def debug(*args, **kwargs):
     """
@@ -75,6 +78,42 @@ def check_start_date(user, days_early_for_beta, start, course_key):
         return StartDateError(start)
 
 
+def check_start_dates(user, days_early_for_beta, starts, now, course_key):
+    """
+    Verifies, as check_start_date does for a single block, whether the
+    given user is allowed access to each of a number of blocks given
+    their start dates and Beta offsets for the given course.
+
+    Arguments:
+        days_early_for_beta (numpy.ndarray) - Float array of the Beta
+            offset for each block in days, NaN where none is set.
+        starts (numpy.ndarray) - Float array of the start date for each
+            block in seconds since the epoch, -inf where none is set.
+        now (float) - The current time in seconds since the epoch.
+
+    Returns:
+        numpy.ndarray: Boolean array that is True for each block to
+            which access is granted.
+    """
+    access_granted = numpy.ones(len(starts), dtype=bool)
+
+    start_dates_disabled = settings.FEATURES['DISABLE_START_DATES']
+    if start_dates_disabled and not is_masquerading_as_student(user, course_key):
+        return access_granted
+
+    if in_preview_mode():
+        return access_granted
+
+    has_beta_offset = ~numpy.isnan(days_early_for_beta)
+    effective_starts = starts
+    if has_beta_offset.any() and CourseBetaTesterRole(course_key).has_user(user):
+        debug("Adjust start time: user in beta role for %s", course_key)
+        effective_starts = starts - numpy.where(has_beta_offset, days_early_for_beta, 0) * SECONDS_PER_DAY
+
+    access_granted &= now > effective_starts
+    return access_granted
+
+
 def in_preview_mode():
     """
     Returns whether the user is in preview mode or not.
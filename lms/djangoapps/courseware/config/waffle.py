@@ -0,0 +1,18 @@
+"""
+This module contains various configuration settings via
+waffle switches for the courseware app.
+"""
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'courseware'
+
+# Switches
+BUFFER_STUDENT_MODULE_WRITES = u'buffer_student_module_writes'
+
+
+def waffle():
+    """
+    Returns the namespaced, cached, audited Waffle class for Courseware.
+    """
+    return WaffleSwitchNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'Courseware: ')
@@ -1,12 +1,23 @@
 """
 Middleware for the courseware app
 """
+import logging
 
+from django.core.signals import request_finished
+from django.dispatch import receiver
 from django.shortcuts import redirect
 
+from courseware.config.waffle import BUFFER_STUDENT_MODULE_WRITES, waffle
+from courseware.user_state_buffer import (
+    buffered_student_module_writes,
+    end_buffered_student_module_writes,
+    get_write_buffer,
+)
 from lms.djangoapps.courseware.exceptions import Redirect
 from util.request import COURSE_REGEX
 
+log = logging.getLogger(__name__)
+
 
 class RedirectMiddleware(object):
     """
@@ -35,3 +46,61 @@ class CacheCourseIdMiddleware(object):
 
             if course_id and course_id != request.session.get('course_id'):
                 request.session['course_id'] = course_id
+
+
+class StudentModuleWriteBufferMiddleware(object):
+    """
+    Middleware that buffers the StudentModule state written during each request, while the
+    courseware.buffer_student_module_writes waffle switch is on, and writes it before the
+    response is returned.
+
+    If the view raises an exception, the buffered state is discarded, as the request's transaction
+    is rolled back. If an exception in a later middleware skips process_response, the buffered
+    state is written when the request finishes, or at the latest when the next request on the
+    thread starts.
+    """
+
+    def process_request(self, request):
+        """
+        Start buffering the state written during the request.
+        """
+        if get_write_buffer() is not None:
+            log.warning(u"StudentModuleWriteBufferMiddleware: writing the buffer left active by a previous request")
+            end_buffered_student_module_writes()
+
+        if waffle().is_enabled(BUFFER_STUDENT_MODULE_WRITES):
+            request.student_module_writes = buffered_student_module_writes()
+            request.student_module_writes.__enter__()
+
+    def process_exception(self, request, exception):  # pylint: disable=unused-argument
+        """
+        Discard the state buffered during the request, when the view raised an exception.
+        """
+        self._end_writes(request, discard=True)
+
+    def process_response(self, request, response):
+        """
+        Write the state buffered during the request.
+        """
+        self._end_writes(request)
+        return response
+
+    @staticmethod
+    def _end_writes(request, discard=False):
+        """
+        Stop buffering the state written during the request, and write it, unless discard is True.
+        """
+        writes = getattr(request, 'student_module_writes', None)
+        if writes is not None:
+            del request.student_module_writes
+            if discard:
+                get_write_buffer().discard()
+            writes.__exit__(None, None, None)
+
+
+@receiver(request_finished)
+def end_request_student_module_writes(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Write any state still buffered when a request finishes.
+    """
+    end_buffered_student_module_writes()
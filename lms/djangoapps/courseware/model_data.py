@@ -36,6 +36,7 @@ from xblock.exceptions import InvalidScopeError, KeyValueMultiSaveError
 from xblock.fields import Scope, UserScope
 from xblock.runtime import KeyValueStore
 
+from courseware.user_state_buffer import flush_student_module_writes
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.django import modulestore
 
@@ -994,6 +995,8 @@ def set_score(user_id, usage_key, score, max_score):
     """
     Set the score and max_score for the specified user and xblock usage.
     """
+    # Write any buffered state first, so that the history saved with the score includes it.
+    flush_student_module_writes(user_id=user_id)
     created = False
     kwargs = {"student_id": user_id, "module_state_key": usage_key, "course_id": usage_key.course_key}
     try:
@@ -1026,6 +1029,7 @@ def get_score(user_id, usage_key):
     Get the score and max_score for the specified user and xblock usage.
     Returns None if not found.
     """
+    flush_student_module_writes(user_id=user_id)
     try:
         student_module = StudentModule.objects.get(
             student_id=user_id,
@@ -26,6 +26,7 @@ from six import text_type
 
 import coursewarehistoryextended
 from opaque_keys.edx.django.models import BlockTypeKeyField, CourseKeyField, UsageKeyField
+from util.query import iterate_in_pk_order, use_read_replica_if_available
 
 log = logging.getLogger("edx.courseware")
 
@@ -128,10 +129,16 @@ class StudentModule(models.Model):
             module_type='problem',
             grade__isnull=False
         )
-        if "read_replica" in settings.DATABASES:
-            return queryset.using("read_replica")
-        else:
-            return queryset
+        return use_read_replica_if_available(queryset)
+
+    @classmethod
+    def iter_all_submitted_problems_read_only(cls, course_id):
+        """
+        Yield the model instances of all_submitted_problems_read_only in order
+        of their ids, reading USER_STATE_BATCH_SIZE of them at a time, so that
+        the problems of large courses aren't all held in memory at once.
+        """
+        return iterate_in_pk_order(cls.all_submitted_problems_read_only(course_id), settings.USER_STATE_BATCH_SIZE)
 
     def __repr__(self):
         return 'StudentModule<%r>' % (
@@ -149,6 +156,16 @@ class StudentModule(models.Model):
     def __unicode__(self):
         return unicode(repr(self))
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(StudentModule, cls).from_db(db, field_names, values)
+        # Remember the state as it was read, and when it was written, so that the history of the
+        # next save can record only what changed. They're left unset if the fields were deferred.
+        if 'state' in instance.__dict__ and 'modified' in instance.__dict__:
+            instance.stored_state = instance.state
+            instance.stored_modified = instance.modified
+        return instance
+
     @classmethod
     def get_state_by_params(cls, course_id, module_state_keys, student_id=None):
         """
@@ -162,6 +179,15 @@ class StudentModule(models.Model):
         return module_states
 
 
+def csmh_deltas_enabled():
+    """
+    Return whether StudentModule history is written to (and read from) the delta table of the
+    extended history app. That requires the extended history table to be enabled too, since the
+    history is otherwise written to StudentModuleHistory by the post_save signal.
+    """
+    return bool(settings.FEATURES.get('ENABLE_CSMH_DELTAS') and settings.FEATURES.get('ENABLE_CSMH_EXTENDED'))
+
+
 class BaseStudentModuleHistory(models.Model):
     """Abstract class containing most fields used by any class
     storing Student Module History"""
@@ -195,6 +221,13 @@ class BaseStudentModuleHistory(models.Model):
         """
 
         history_entries = []
+        delta_entries = []
+
+        if csmh_deltas_enabled():
+            # The entries are read newest first along the (student_module, id) index.
+            delta_entries = list(coursewarehistoryextended.models.StudentModuleHistoryDelta.objects.filter(
+                student_module__in=[module.id for module in student_modules]
+            ).order_by('-id'))
 
         if settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
             history_entries += coursewarehistoryextended.models.StudentModuleHistoryExtended.objects.filter(
@@ -211,6 +244,12 @@ class BaseStudentModuleHistory(models.Model):
                 student_module__in=student_modules
             ).order_by('-id')
 
+        if delta_entries:
+            # The delta entries were all written after the entries in the other tables, which
+            # hold the states that the oldest deltas apply to.
+            coursewarehistoryextended.models.StudentModuleHistoryDelta.resolve_states(delta_entries, history_entries)
+            history_entries = delta_entries + history_entries
+
         return history_entries
 
 
@@ -27,6 +27,7 @@ from courseware.tests.factories import (
     course_id,
     location
 )
+from courseware.user_state_client import MAX_BLOCK_KEYS_PER_QUERY
 from student.tests.factories import UserFactory
 
 
@@ -434,3 +435,31 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr(shard=1)
+class TestFieldDataCacheQueries(TestCase):
+    """Tests of the queries made to fill a FieldDataCache"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestFieldDataCacheQueries, self).setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
+
+    def test_user_state_of_many_blocks(self):
+        descriptors = []
+        for index in range(2 * MAX_BLOCK_KEYS_PER_QUERY + 1):
+            descriptor = mock_descriptor([mock_field(Scope.user_state, 'a_field')])
+            usage_id = 'usage_id' if index == 0 else 'other_{}'.format(index)
+            descriptor.scope_ids = ScopeIds('user1', 'mock_problem', location('def_id'), location(usage_id))
+            descriptors.append(descriptor)
+
+        # The user's state of the blocks is read with one query, rather than one per chunk of blocks
+        with self.assertNumQueries(1):
+            field_data_cache = FieldDataCache(descriptors, course_id, self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEquals('a_value', DjangoKeyValueStore(field_data_cache).get(user_state_key('a_field')))
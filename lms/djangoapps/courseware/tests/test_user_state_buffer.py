@@ -0,0 +1,182 @@
+"""
+Tests of the write-behind buffer of StudentModule state.
+"""
+import json
+
+from django.db import connections
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from courseware.config.waffle import BUFFER_STUDENT_MODULE_WRITES, waffle
+from courseware.middleware import StudentModuleWriteBufferMiddleware, end_request_student_module_writes
+from courseware.model_data import set_score
+from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.tests import test_user_state_client
+from courseware.tests.factories import UserFactory
+from courseware.user_state_buffer import buffered_student_module_writes, get_write_buffer
+from courseware.user_state_client import DjangoXBlockUserStateClient
+
+
+class TestBufferedDjangoUserStateClient(test_user_state_client.TestDjangoUserStateClient):
+    """
+    Tests of the DjangoUserStateClient backend, while its writes are buffered.
+    It reuses all tests from :class:`~UserStateClientTestBase`.
+    """
+    shard = 4
+    __test__ = True
+
+    def setUp(self):
+        super(TestBufferedDjangoUserStateClient, self).setUp()
+        writes = buffered_student_module_writes()
+        writes.__enter__()
+        self.addCleanup(writes.__exit__, None, None, None)
+
+
+class TestStudentModuleWriteBuffer(TestCase):
+    """
+    Tests of buffering the writes of DjangoXBlockUserStateClient.
+    """
+    shard = 4
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestStudentModuleWriteBuffer, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.problem_keys = [self.course_key.make_usage_key('problem', 'problem_{}'.format(i)) for i in range(5)]
+        self.video_key = self.course_key.make_usage_key('video', 'video')
+
+    def get_state(self, usage_key):
+        """
+        Return the stored state of the user's block.
+        """
+        return json.loads(StudentModule.objects.get(student=self.user, module_state_key=usage_key).state)
+
+    def test_coalesce_writes(self):
+        with buffered_student_module_writes():
+            for position in range(10):
+                self.client.set_many(self.user.username, {self.video_key: {'position': position}})
+            self.client.set_many(self.user.username, {self.video_key: {'speed': 2}})
+            self.assertFalse(StudentModule.objects.filter(student=self.user).exists())
+
+        self.assertEqual(self.get_state(self.video_key), {'position': 9, 'speed': 2})
+
+    def test_bulk_writes(self):
+        with buffered_student_module_writes():
+            self.client.set_many(self.user.username, {usage_key: {'attempts': 1} for usage_key in self.problem_keys})
+        for usage_key in self.problem_keys:
+            self.assertEqual(self.get_state(usage_key), {'attempts': 1})
+
+        with buffered_student_module_writes():
+            for usage_key in self.problem_keys:
+                self.client.set_many(self.user.username, {usage_key: {'attempts': 2, 'done': True}})
+            # Read the existing rows, and update them all at once.
+            with CaptureQueriesContext(connections['default']) as queries:
+                get_write_buffer().flush()
+            self.assertEqual(
+                [query['sql'].split()[0] for query in queries.captured_queries
+                 if '"courseware_studentmodule"' in query['sql']],
+                ['SELECT', 'UPDATE'],
+            )
+
+        for usage_key in self.problem_keys:
+            self.assertEqual(self.get_state(usage_key), {'attempts': 2, 'done': True})
+            student_module = StudentModule.objects.get(student=self.user, module_state_key=usage_key)
+            history = BaseStudentModuleHistory.get_history([student_module])
+            self.assertEqual(
+                [json.loads(entry.state) for entry in history],
+                [{'attempts': 2, 'done': True}, {'attempts': 1}],
+            )
+
+    def test_read_flushes_writes(self):
+        with buffered_student_module_writes():
+            self.client.set_many(self.user.username, {self.video_key: {'position': 10}})
+            self.assertEqual(self.client.get(self.user.username, self.video_key).state, {'position': 10})
+            self.assertEqual(len(get_write_buffer()), 0)
+
+    def test_set_score_flushes_writes(self):
+        with buffered_student_module_writes():
+            self.client.set_many(self.user.username, {self.problem_keys[0]: {'attempts': 1}})
+            set_score(self.user.id, self.problem_keys[0], 1, 2)
+            self.assertEqual(len(get_write_buffer()), 0)
+
+        student_module = StudentModule.objects.get(student=self.user, module_state_key=self.problem_keys[0])
+        self.assertEqual((student_module.grade, student_module.max_grade), (1, 2))
+        self.assertEqual(json.loads(student_module.state), {'attempts': 1})
+
+    def test_concurrent_insert(self):
+        StudentModule.objects.create(
+            student=self.user, course_id=self.course_key, module_state_key=self.video_key,
+            module_type='video', state=json.dumps({'speed': 2}),
+        )
+        with buffered_student_module_writes():
+            self.client.set_many(self.user.username, {self.video_key: {'position': 10}})
+            # Another process creates the row after the buffer reads the existing rows.
+            with patch.object(StudentModule.objects, 'chunked_filter', return_value=[]):
+                get_write_buffer().flush()
+
+        self.assertEqual(self.get_state(self.video_key), {'position': 10, 'speed': 2})
+
+    def test_middleware(self):
+        middleware = StudentModuleWriteBufferMiddleware()
+        request = RequestFactory().get('dummy_url')
+        with waffle().override(BUFFER_STUDENT_MODULE_WRITES, active=True):
+            middleware.process_request(request)
+        self.client.set_many(self.user.username, {self.video_key: {'position': 10}})
+        self.assertFalse(StudentModule.objects.filter(student=self.user).exists())
+
+        middleware.process_response(request, HttpResponse())
+        self.assertIsNone(get_write_buffer())
+        self.assertEqual(self.get_state(self.video_key), {'position': 10})
+
+    def test_middleware_response_skipped(self):
+        middleware = StudentModuleWriteBufferMiddleware()
+        with waffle().override(BUFFER_STUDENT_MODULE_WRITES, active=True):
+            middleware.process_request(RequestFactory().get('dummy_url'))
+        self.client.set_many(self.user.username, {self.video_key: {'position': 10}})
+
+        # An exception in a later middleware skips process_response, so the next request
+        # on the thread writes the state left in the buffer.
+        with waffle().override(BUFFER_STUDENT_MODULE_WRITES, active=False):
+            middleware.process_request(RequestFactory().get('dummy_url'))
+        self.assertIsNone(get_write_buffer())
+        self.assertEqual(self.get_state(self.video_key), {'position': 10})
+
+    def test_middleware_request_finished(self):
+        middleware = StudentModuleWriteBufferMiddleware()
+        with waffle().override(BUFFER_STUDENT_MODULE_WRITES, active=True):
+            middleware.process_request(RequestFactory().get('dummy_url'))
+        self.client.set_many(self.user.username, {self.video_key: {'position': 10}})
+
+        # The request_finished receiver; sending the signal itself would close the test's connections.
+        end_request_student_module_writes(sender=None)
+        self.assertIsNone(get_write_buffer())
+        self.assertEqual(self.get_state(self.video_key), {'position': 10})
+
+    def test_middleware_exception(self):
+        self.client.set_many(self.user.username, {self.video_key: {'position': 5}})
+        middleware = StudentModuleWriteBufferMiddleware()
+        request = RequestFactory().get('dummy_url')
+        with waffle().override(BUFFER_STUDENT_MODULE_WRITES, active=True):
+            middleware.process_request(request)
+        self.client.set_many(self.user.username, {self.video_key: {'position': 10}, self.problem_keys[0]: {'a': 1}})
+
+        # The view raised an exception, so its buffered state is discarded.
+        self.assertIsNone(middleware.process_exception(request, ValueError()))
+        self.assertIsNone(get_write_buffer())
+        self.assertEqual(self.get_state(self.video_key), {'position': 5})
+        self.assertEqual(StudentModule.objects.filter(student=self.user).count(), 1)
+
+    def test_middleware_disabled(self):
+        middleware = StudentModuleWriteBufferMiddleware()
+        request = RequestFactory().get('dummy_url')
+        with waffle().override(BUFFER_STUDENT_MODULE_WRITES, active=False):
+            middleware.process_request(request)
+        self.assertIsNone(get_write_buffer())
+        middleware.process_response(request, HttpResponse())
@@ -3,13 +3,17 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
 from collections import defaultdict
 from unittest import skip
 
 from django.test import TestCase
+from django.test.utils import override_settings
 from edx_user_state_client.tests import UserStateClientTestBase
+from opaque_keys.edx.locator import CourseLocator
 
-from courseware.tests.factories import UserFactory
+from courseware.models import StudentModule
+from courseware.tests.factories import StudentModuleFactory, UserFactory
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
@@ -36,3 +40,58 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
         super(TestDjangoUserStateClient, self).setUp()
         self.client = DjangoXBlockUserStateClient()
         self.users = defaultdict(UserFactory.create)
+
+
+@override_settings(USER_STATE_BATCH_SIZE=2)
+class TestDjangoUserStateClientIterAll(TestCase):
+    """
+    Tests of reading all of the state of a course or block in batches.
+    """
+    shard = 4
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestDjangoUserStateClientIterAll, self).setUp()
+        self.client = DjangoXBlockUserStateClient()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.problem_key = self.course_key.make_usage_key('problem', 'problem')
+        self.student_modules = [
+            StudentModuleFactory.create(
+                course_id=self.course_key,
+                module_state_key=self.problem_key,
+                state=json.dumps({'index': index}),
+                grade=index % 2 or None,
+            )
+            for index in range(5)
+        ]
+
+    def test_iter_all_for_course(self):
+        # Three batches of up to two StudentModules, each with its user
+        with self.assertNumQueries(3):
+            states = list(self.client.iter_all_for_course(self.course_key))
+        self.assertEqual(
+            [(state.username, state.state) for state in states],
+            [(student_module.student.username, {'index': index})
+             for index, student_module in enumerate(self.student_modules)],
+        )
+
+    def test_iter_all_for_block(self):
+        # StudentModules without state are skipped
+        StudentModuleFactory.create(course_id=self.course_key, module_state_key=self.problem_key, state=None)
+        StudentModuleFactory.create(course_id=self.course_key, module_state_key=self.problem_key, state='{}')
+        StudentModuleFactory.create(
+            course_id=self.course_key,
+            module_state_key=self.course_key.make_usage_key('problem', 'other'),
+            state=json.dumps({'index': 5}),
+        )
+        self.assertEqual(
+            [state.state for state in self.client.iter_all_for_block(self.problem_key)],
+            [{'index': index} for index in range(5)],
+        )
+
+    def test_iter_all_submitted_problems_read_only(self):
+        self.assertEqual(
+            list(StudentModule.iter_all_submitted_problems_read_only(self.course_key)),
+            self.student_modules[1::2],
+        )
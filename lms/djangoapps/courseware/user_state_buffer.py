@@ -0,0 +1,271 @@
+"""
+A write-behind buffer for the StudentModule state written by DjangoXBlockUserStateClient.set_many.
+
+While a buffer is active in the current thread, set_many only records the updates of each user's
+state of each block, merging repeated updates of the same block. The updates of a user are written
+before that user's state is next read, deleted or scored, and all of the updates are written when
+the buffer is deactivated, at the latest. Each flush reads the existing rows with one query per
+course, inserts the new rows with one bulk insert, updates the existing rows with one bulk update,
+and inserts their history with one bulk insert.
+
+StudentModuleWriteBufferMiddleware activates a buffer for each request while the
+courseware.buffer_student_module_writes waffle switch is on, and writes its updates before the
+response is returned, so that no update outlives its request unwritten. The updates of a request
+whose view raised an exception are discarded, as the request's other writes are rolled back.
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, TextField, Value, When
+from django.utils.timezone import now
+
+from courseware.models import (
+    BaseStudentModuleHistory,
+    StudentModule,
+    StudentModuleHistory,
+    chunks,
+    csmh_deltas_enabled,
+)
+
+log = logging.getLogger(__name__)
+
+# The number of rows updated by each UPDATE statement of a flush.
+UPDATE_CHUNK_SIZE = 500
+
+
+class _WriteBuffers(threading.local):
+    """
+    A thread-local for storing the active write buffer.
+    """
+    def __init__(self):
+        super(_WriteBuffers, self).__init__()
+        self.active = None
+
+
+_WRITE_BUFFERS = _WriteBuffers()
+
+
+def get_write_buffer():
+    """
+    Return the write buffer active in the current thread, or None if writes aren't being buffered.
+    """
+    return _WRITE_BUFFERS.active
+
+
+@contextmanager
+def buffered_student_module_writes():
+    """
+    Buffer the StudentModule state written in the current thread within the context, and write it
+    on leaving the context, even if the context raised an exception. Nested contexts share the
+    outermost context's buffer.
+    """
+    if _WRITE_BUFFERS.active is not None:
+        yield _WRITE_BUFFERS.active
+        return
+
+    write_buffer = _WRITE_BUFFERS.active = StudentModuleWriteBuffer()
+    try:
+        yield write_buffer
+    finally:
+        _WRITE_BUFFERS.active = None
+        write_buffer.flush()
+
+
+def end_buffered_student_module_writes():
+    """
+    Deactivate the write buffer active in the current thread, if any, and write its updates.
+
+    This ends a buffer which outlived the context that activated it, such as a request whose
+    response middleware didn't run, so that it isn't reused by later contexts in the thread.
+    """
+    write_buffer = _WRITE_BUFFERS.active
+    if write_buffer is not None:
+        _WRITE_BUFFERS.active = None
+        write_buffer.flush()
+
+
+def flush_student_module_writes(username=None, user_id=None):
+    """
+    Write the buffered state of the given user (by username or id), or of all users if neither is
+    given, if writes are being buffered.
+    """
+    write_buffer = get_write_buffer()
+    if write_buffer is not None:
+        write_buffer.flush(username=username, user_id=user_id)
+
+
+class StudentModuleWriteBuffer(object):
+    """
+    Collects updates of the state of StudentModules, and writes them in bulk.
+    """
+    def __init__(self):
+        # Maps the (user id, usage key) of each updated block to the user and the merged updates of its state.
+        self._pending = OrderedDict()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, user, usage_key, state):
+        """
+        Record an update of the user's state of the block with the given usage key, which overlays
+        the fields of state over the stored state, as DjangoXBlockUserStateClient.set_many does.
+        """
+        __, pending_state = self._pending.setdefault((user.id, usage_key), (user, {}))
+        pending_state.update(state)
+
+    def flush(self, username=None, user_id=None):
+        """
+        Write the buffered updates of the given user (by username or id), or of all users if neither
+        is given.
+        """
+        by_course = OrderedDict()
+        for key, (user, state) in self._pending.items():
+            if username is not None and user.username != username:
+                continue
+            if user_id is not None and user.id != user_id:
+                continue
+            del self._pending[key]
+            usage_key = key[1]
+            by_course.setdefault((user, usage_key.course_key), OrderedDict())[usage_key] = state
+
+        for (user, course_key), updates in by_course.iteritems():
+            try:
+                with transaction.atomic():
+                    self._write_course_updates(user, course_key, updates)
+            except IntegrityError:
+                # Another process created some of the rows since they were read; so, write each
+                # row on its own, as set_many does when writes aren't buffered.
+                log.warning(
+                    u"StudentModuleWriteBuffer: IntegrityError for student %s - course_id %s; writing rows one by one",
+                    user, course_key
+                )
+                for usage_key, state in updates.iteritems():
+                    self._write_update(user, usage_key, state)
+
+    def discard(self):
+        """
+        Drop all of the buffered updates without writing them.
+        """
+        if self._pending:
+            log.info(u"StudentModuleWriteBuffer: discarding %d buffered updates", len(self._pending))
+        self._pending.clear()
+
+    def _write_course_updates(self, user, course_key, updates):
+        """
+        Write the updates of the user's state of blocks in the given course, which map usage keys
+        to the updates of their state, with bulk queries.
+        """
+        modified = now()
+        existing = {
+            student_module.module_state_key.map_into_course(course_key): student_module
+            for student_module in StudentModule.objects.chunked_filter(
+                'module_state_key__in', list(updates.keys()), student=user, course_id=course_key,
+            )
+        }
+
+        new_modules = []
+        updated_modules = []
+        previous_states = {}
+        for usage_key, state in updates.iteritems():
+            student_module = existing.get(usage_key)
+            if student_module is None:
+                new_modules.append(StudentModule(
+                    student=user,
+                    course_id=course_key,
+                    module_state_key=usage_key,
+                    module_type=usage_key.block_type,
+                    state=json.dumps(state),
+                ))
+            else:
+                previous_states[student_module.id] = (student_module.state, student_module.modified)
+                current_state = json.loads(student_module.state) if student_module.state is not None else {}
+                current_state.update(state)
+                student_module.state = json.dumps(current_state)
+                student_module.modified = modified
+                updated_modules.append(student_module)
+
+        if new_modules:
+            StudentModule.objects.bulk_create(new_modules)
+        for chunk in chunks(updated_modules, UPDATE_CHUNK_SIZE):
+            StudentModule.objects.filter(id__in=[student_module.id for student_module in chunk]).update(
+                state=Case(
+                    *[When(id=student_module.id, then=Value(student_module.state)) for student_module in chunk],
+                    output_field=TextField()
+                ),
+                modified=modified,
+            )
+
+        history_keys = [
+            student_module.module_state_key for student_module in new_modules
+            if student_module.module_type in BaseStudentModuleHistory.HISTORY_SAVING_TYPES
+        ]
+        history_modules = [
+            student_module for student_module in updated_modules
+            if student_module.module_type in BaseStudentModuleHistory.HISTORY_SAVING_TYPES
+        ]
+        if history_keys:
+            # Bulk inserts don't return the ids of the new rows on every database, so read them back.
+            history_modules.extend(StudentModule.objects.chunked_filter(
+                'module_state_key__in', history_keys, student=user, course_id=course_key,
+            ))
+        if history_modules:
+            history_model = _history_model()
+            if csmh_deltas_enabled():
+                history_entries = history_model.for_student_modules(history_modules, previous_states)
+            else:
+                history_entries = [
+                    history_model(
+                        student_module_id=student_module.id,
+                        version=None,
+                        created=student_module.modified,
+                        state=student_module.state,
+                        grade=student_module.grade,
+                        max_grade=student_module.max_grade,
+                    )
+                    for student_module in history_modules
+                ]
+            history_model.objects.bulk_create(history_entries)
+
+    def _write_update(self, user, usage_key, state):
+        """
+        Write a single update of the user's state of a block, saving its history through the
+        StudentModule post_save signal.
+        """
+        try:
+            student_module, created = StudentModule.objects.get_or_create(
+                student=user,
+                course_id=usage_key.course_key,
+                module_state_key=usage_key,
+                defaults={
+                    'state': json.dumps(state),
+                    'module_type': usage_key.block_type,
+                },
+            )
+        except IntegrityError:
+            log.warning(u"StudentModuleWriteBuffer: IntegrityError for student %s - usage key %s", user, usage_key)
+            return
+
+        if not created:
+            current_state = json.loads(student_module.state) if student_module.state is not None else {}
+            current_state.update(state)
+            student_module.state = json.dumps(current_state)
+            student_module.save(force_update=True)
+
+
+def _history_model():
+    """
+    Return the model to which StudentModule history is saved, as the post_save signal of
+    StudentModule would save it.
+    """
+    if csmh_deltas_enabled():
+        from coursewarehistoryextended.models import StudentModuleHistoryDelta
+        return StudentModuleHistoryDelta
+    if settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
+        from coursewarehistoryextended.models import StudentModuleHistoryExtended
+        return StudentModuleHistoryExtended
+    return StudentModuleHistory
@@ -9,7 +9,6 @@ from operator import attrgetter
 from time import time
 
 from django.conf import settings
-from django.core.paginator import Paginator
 from django.contrib.auth.models import User
 from django.db import transaction
 from django.db.utils import IntegrityError
@@ -18,7 +17,9 @@ from xblock.fields import Scope
 
 import dogstats_wrapper as dog_stats_api
 from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.user_state_buffer import flush_student_module_writes, get_write_buffer
 from openedx.core.djangoapps import monitoring_utils
+from util.query import iterate_in_pk_order, use_read_replica_if_available
 
 try:
     import simplejson as json
@@ -28,6 +29,10 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+# The number of blocks of a course beyond which a user's state of the blocks is read with
+# one query for all of the user's state in the course, rather than with chunked queries.
+MAX_BLOCK_KEYS_PER_QUERY = 500
+
 
 class DjangoXBlockUserStateClient(XBlockUserStateClient):
     """
@@ -94,15 +99,28 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         )
 
         for course_key, usage_keys in by_course:
-            query = StudentModule.objects.chunked_filter(
-                'module_state_key__in',
-                usage_keys,
-                student__username=username,
-                course_id=course_key,
-            )
+            usage_keys = list(usage_keys)
+            if len(usage_keys) > MAX_BLOCK_KEYS_PER_QUERY:
+                # Scan the user's rows of the course on the (student, module_state_key, course_id)
+                # index once, and skip those of the blocks that weren't requested.
+                requested_keys = set(usage_keys)
+                query = StudentModule.objects.filter(
+                    student__username=username,
+                    course_id=course_key,
+                )
+            else:
+                requested_keys = None
+                query = StudentModule.objects.chunked_filter(
+                    'module_state_key__in',
+                    usage_keys,
+                    student__username=username,
+                    course_id=course_key,
+                )
 
             for student_module in query:
                 usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+                if requested_keys is not None and usage_key not in requested_keys:
+                    continue
                 yield (student_module, usage_key)
 
     def _ddog_increment(self, evt_time, evt_name):
@@ -198,6 +216,9 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'get_many.blks_requested', len(block_keys))
         self._nr_stat_accumulate('get_many', 'blocks_requested', len(block_keys))
 
+        # Read the user's buffered writes back from the database.
+        flush_student_module_writes(username=username)
+
         modules = self._get_student_modules(username, block_keys)
         for module, usage_key in modules:
             if module.state is None:
@@ -272,6 +293,15 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        write_buffer = get_write_buffer()
+        if write_buffer is not None:
+            # Leave the writes to the buffer, which merges repeated writes of the same block.
+            for usage_key, state in block_keys_to_state.items():
+                write_buffer.add(user, usage_key, state)
+            self._ddog_histogram(evt_time, 'set_many.blks_buffered', len(block_keys_to_state))
+            self._nr_stat_accumulate('set_many', 'blocks_buffered', len(block_keys_to_state))
+            return
+
         for usage_key, state in block_keys_to_state.items():
             try:
                 student_module, created = StudentModule.objects.get_or_create(
@@ -370,6 +400,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         self._ddog_histogram(evt_time, 'delete_many.block_count', len(block_keys))
 
+        flush_student_module_writes(username=username)
         student_modules = self._get_student_modules(username, block_keys)
         for student_module, _ in student_modules:
             if fields is None:
@@ -408,6 +439,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
+        flush_student_module_writes(username=username)
         student_modules = list(
             student_module
             for student_module, usage_id
@@ -459,19 +491,9 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_student_module_writes()
         results = StudentModule.objects.filter(module_state_key=block_key)
-        p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
-
-        for page_number in p.page_range:
-            page = p.page(page_number)
-
-            for sm in page.object_list:
-                state = json.loads(sm.state)
-
-                if state == {}:
-                    continue
-
-                yield XBlockUserState(sm.student.username, sm.module_state_key, state, sm.modified, scope)
+        return self._iter_all(results, scope)
 
     def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state):
         """
@@ -491,19 +513,26 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_student_module_writes()
         results = StudentModule.objects.filter(course_id=course_key)
         if block_type:
             results = results.filter(module_type=block_type)
 
-        p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
+        return self._iter_all(results, scope)
 
-        for page_number in p.page_range:
-            page = p.page(page_number)
+    def _iter_all(self, student_modules, scope):
+        """
+        Yield an :class:`~XBlockUserState` for each of the ``student_modules`` which has stored
+        state, reading them from the read replica if there is one, USER_STATE_BATCH_SIZE at a time.
+        """
+        student_modules = use_read_replica_if_available(student_modules.select_related('student'))
+        for sm in iterate_in_pk_order(student_modules, settings.USER_STATE_BATCH_SIZE):
+            if sm.state is None:
+                continue
 
-            for sm in page.object_list:
-                state = json.loads(sm.state)
+            state = json.loads(sm.state)
 
-                if state == {}:
-                    continue
+            if state == {}:
+                continue
 
-                yield XBlockUserState(sm.student.username, sm.module_state_key, state, sm.modified, scope)
+            yield XBlockUserState(sm.student.username, sm.module_state_key, state, sm.modified, scope)
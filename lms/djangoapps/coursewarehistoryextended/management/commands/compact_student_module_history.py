@@ -0,0 +1,68 @@
+"""
+Compact the StudentModule history stored as deltas, by replacing each module's
+entries older than a number of days with a single snapshot of the latest of them.
+
+Example usage:
+    $ ./manage.py lms compact_student_module_history --days 180 --settings=devstack
+"""
+from __future__ import unicode_literals
+
+import logging
+from datetime import timedelta
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils.timezone import now
+
+from coursewarehistoryextended.models import StudentModuleHistoryDelta
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days',
+                            type=int,
+                            default=180,
+                            help='compact the history entries older than this many days')
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help='number of StudentModules to look up at a time')
+
+    def handle(self, *args, **options):
+        before = now() - timedelta(days=options['days'])
+        compacted_modules = removed_entries = 0
+        last_student_module_id = 0
+        while True:
+            # Walk the StudentModules with more than one old entry in order of their ids.
+            student_module_ids = list(
+                StudentModuleHistoryDelta.objects.filter(
+                    created__lt=before,
+                    student_module_id__gt=last_student_module_id,
+                ).values('student_module_id').annotate(
+                    num_entries=Count('id'),
+                ).filter(
+                    num_entries__gt=1,
+                ).order_by('student_module_id').values_list('student_module_id', flat=True)[:options['batch_size']]
+            )
+            if not student_module_ids:
+                break
+
+            for student_module_id in student_module_ids:
+                removed = StudentModuleHistoryDelta.compact(student_module_id, before)
+                if removed:
+                    compacted_modules += 1
+                    removed_entries += removed
+            last_student_module_id = student_module_ids[-1]
+            log.info(
+                'Compacted the history of %d StudentModules, removing %d entries, up to StudentModule %d',
+                compacted_modules, removed_entries, last_student_module_id,
+            )
+
+        return 'Compacted the history of {} StudentModules, removing {} entries.\n'.format(
+            compacted_modules, removed_entries
+        )
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import coursewarehistoryextended.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0001_initial'),
+        ('coursewarehistoryextended', '0002_force_studentmodule_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentModuleHistoryDelta',
+            fields=[
+                ('version', models.CharField(db_index=True, max_length=255, null=True, blank=True)),
+                ('created', models.DateTimeField(db_index=True)),
+                ('state', models.TextField(null=True, blank=True)),
+                ('grade', models.FloatField(null=True, blank=True)),
+                ('max_grade', models.FloatField(null=True, blank=True)),
+                ('id', coursewarehistoryextended.fields.UnsignedBigIntAutoField(serialize=False, primary_key=True)),
+                ('is_delta', models.BooleanField(default=False)),
+                ('student_module', models.ForeignKey(to='courseware.StudentModule', on_delete=django.db.models.deletion.DO_NOTHING, db_constraint=False, db_index=False)),
+            ],
+            options={
+                'get_latest_by': 'created',
+            },
+        ),
+        migrations.AlterIndexTogether(
+            name='studentmodulehistorydelta',
+            index_together=set([('student_module', 'id')]),
+        ),
+    ]
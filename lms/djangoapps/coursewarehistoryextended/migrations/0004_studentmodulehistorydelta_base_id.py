@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coursewarehistoryextended', '0003_studentmodulehistorydelta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentmodulehistorydelta',
+            name='base_id',
+            field=models.BigIntegerField(null=True, blank=True),
+        ),
+    ]
@@ -12,11 +12,13 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
-from django.db import models
+import json
+
+from django.db import models, router, transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.models import BaseStudentModuleHistory, StudentModule, StudentModuleHistory, csmh_deltas_enabled
 from coursewarehistoryextended.fields import UnsignedBigIntAutoField
 
 
@@ -44,7 +46,18 @@ class StudentModuleHistoryExtended(BaseStudentModuleHistory):
         StudentModuleHistoryExtended entry if the module_type is one that
         we save.
         """
-        if instance.module_type in StudentModuleHistoryExtended.HISTORY_SAVING_TYPES:
+        if instance.module_type not in StudentModuleHistoryExtended.HISTORY_SAVING_TYPES:
+            return
+
+        if csmh_deltas_enabled():
+            StudentModuleHistoryDelta.for_student_module(
+                instance,
+                previous_state=getattr(instance, 'stored_state', None),
+                previous_modified=getattr(instance, 'stored_modified', None),
+            ).save()
+            instance.stored_state = instance.state
+            instance.stored_modified = instance.modified
+        else:
             history_entry = StudentModuleHistoryExtended(student_module=instance,
                                                          version=None,
                                                          created=instance.modified,
@@ -60,6 +73,192 @@ class StudentModuleHistoryExtended(BaseStudentModuleHistory):
         on_delete=DO_NOTHING and then listen for post_delete so we can clean up the CSMHE rows.
         """
         StudentModuleHistoryExtended.objects.filter(student_module=instance).all().delete()
+        StudentModuleHistoryDelta.objects.filter(student_module=instance).all().delete()
 
     def __unicode__(self):
         return unicode(repr(self))
+
+
+class StudentModuleHistoryDelta(BaseStudentModuleHistory):
+    """Keeps the history of state changes for a given XModule for a given
+    Student, as the changes between states rather than as a copy of the
+    whole state in each entry.
+
+    The state of an entry is either a snapshot of the whole state, or (if
+    is_delta) a JSON dict {"set": {field: value}, "unset": [field]} of the
+    changes to the state of its base entry: the entry written with the state
+    that the saving process read. Concurrent writers of a module read the same
+    state, so their deltas share a base rather than applying to each other.
+    get_history resolves the deltas into whole states, so its callers see no
+    difference."""
+
+    class Meta(object):
+        app_label = 'coursewarehistoryextended'
+        get_latest_by = "created"
+        index_together = [('student_module', 'id')]
+
+    id = UnsignedBigIntAutoField(primary_key=True)  # pylint: disable=invalid-name
+
+    student_module = models.ForeignKey(StudentModule, db_index=False, db_constraint=False, on_delete=models.DO_NOTHING)
+    is_delta = models.BooleanField(default=False)
+    # The id of the entry a delta applies to. Deltas written without one apply to the previous entry.
+    base_id = models.BigIntegerField(null=True, blank=True)
+
+    @classmethod
+    def for_student_module(cls, student_module, previous_state=None, previous_modified=None):
+        """
+        Return an unsaved entry of the current state of ``student_module``, given the serialized
+        state it had before the change and the time that state was written, as for_student_modules does.
+        """
+        previous_states = {student_module.id: (previous_state, previous_modified)}
+        return cls.for_student_modules([student_module], previous_states)[0]
+
+    @classmethod
+    def for_student_modules(cls, student_modules, previous_states):
+        """
+        Return an unsaved entry of the current state of each of ``student_modules``.
+
+        ``previous_states`` maps the id of each StudentModule that was read before it was changed
+        to its serialized state and modified time as they were read. The entry is a delta from the
+        entry written at that time, if there is one and the delta is smaller than the state, and
+        otherwise a snapshot of the whole state.
+        """
+        bases = {}
+        previous_modified = [modified for __, modified in previous_states.itervalues() if modified is not None]
+        if previous_modified:
+            # One query looks up the entries which the previous states were written with.
+            for student_module_id, created, entry_id in cls.objects.filter(
+                    student_module_id__in=list(previous_states),
+                    created__in=previous_modified,
+            ).values_list('student_module_id', 'created', 'id'):
+                key = (student_module_id, created)
+                bases[key] = max(entry_id, bases.get(key, entry_id))
+
+        entries = []
+        for student_module in student_modules:
+            previous_state, modified = previous_states.get(student_module.id, (None, None))
+            base_id = bases.get((student_module.id, modified))
+            delta = _state_delta(previous_state, student_module.state) if base_id is not None else None
+            entries.append(cls(
+                student_module_id=student_module.id,
+                version=None,
+                created=student_module.modified,
+                is_delta=delta is not None,
+                base_id=base_id if delta is not None else None,
+                state=student_module.state if delta is None else delta,
+                grade=student_module.grade,
+                max_grade=student_module.max_grade,
+            ))
+        return entries
+
+    @staticmethod
+    def resolve_states(entries, base_entries=()):
+        """
+        Replace the state of each delta in ``entries`` with the whole state it produces.
+
+        Both ``entries`` and ``base_entries`` are ordered newest first, as get_history orders
+        them, and ``base_entries`` are entries with whole states from the other history tables,
+        which are all older than ``entries``. A delta without a base_id applies to the state of
+        the module's previous entry.
+        """
+        states_by_id = {}
+        latest_states = {}
+        for entry in reversed(base_entries):
+            latest_states[entry.student_module_id] = entry.state
+        for entry in reversed(entries):
+            if entry.is_delta:
+                if entry.base_id is not None:
+                    base_state = states_by_id.get(entry.base_id)
+                else:
+                    base_state = latest_states.get(entry.student_module_id)
+                entry.state = _apply_state_delta(base_state, entry.state)
+                entry.is_delta = False
+            states_by_id[entry.id] = latest_states[entry.student_module_id] = entry.state
+
+    @classmethod
+    def compact(cls, student_module_id, before):
+        """
+        Replace the entries of the StudentModule with id ``student_module_id`` that were created
+        before the datetime ``before`` with a single snapshot of the latest of them, and return
+        the number of entries removed. Later entries are left as they are, except for deltas
+        from a removed entry, which are rewritten as deltas from the snapshot.
+        """
+        with transaction.atomic(using=router.db_for_write(cls)):
+            entries = list(cls.objects.select_for_update().filter(
+                student_module_id=student_module_id,
+            ).order_by('-id'))
+            old_entries = [entry for entry in entries if entry.created < before]
+            if len(old_entries) < 2:
+                return 0
+            stored = {entry.id: (entry.is_delta, entry.base_id) for entry in entries}
+
+            base_entries = []
+            if entries[-1].is_delta:
+                # The oldest delta applies to the latest state in the other history tables.
+                base_entry = (
+                    StudentModuleHistoryExtended.objects.filter(
+                        student_module_id=student_module_id
+                    ).order_by('-id').first() or
+                    StudentModuleHistory.objects.filter(
+                        student_module_id=student_module_id
+                    ).order_by('-id').first()
+                )
+                if base_entry is not None:
+                    base_entries.append(base_entry)
+            cls.resolve_states(entries, base_entries)
+
+            latest = old_entries[0]
+            latest.base_id = None
+            latest.save(update_fields=['is_delta', 'base_id', 'state'])
+            removed_ids = set(entry.id for entry in old_entries[1:])
+            for entry in entries:
+                is_delta, base_id = stored[entry.id]
+                if entry.id in removed_ids or entry is latest or not is_delta:
+                    continue
+                if base_id in removed_ids or (base_id is None and entry.id < latest.id):
+                    delta = _state_delta(latest.state, entry.state)
+                    entry.is_delta = delta is not None
+                    entry.base_id = latest.id if delta is not None else None
+                    entry.state = entry.state if delta is None else delta
+                    entry.save(update_fields=['is_delta', 'base_id', 'state'])
+            cls.objects.filter(id__in=removed_ids).delete()
+            return len(removed_ids)
+
+
+def _state_delta(previous_state, state):
+    """
+    Return the serialized delta which changes the serialized ``previous_state`` into
+    ``state``, or None if either isn't a serialized dict or the delta isn't smaller than
+    ``state``.
+    """
+    if previous_state is None or state is None:
+        return None
+
+    previous_fields = json.loads(previous_state)
+    fields = json.loads(state)
+    if not isinstance(previous_fields, dict) or not isinstance(fields, dict):
+        return None
+
+    delta = json.dumps({
+        'set': {
+            name: value for name, value in fields.iteritems()
+            if name not in previous_fields or previous_fields[name] != value
+        },
+        'unset': [name for name in previous_fields if name not in fields],
+    })
+    if len(delta) >= len(state):
+        return None
+    return delta
+
+
+def _apply_state_delta(state, delta):
+    """
+    Return the serialized state produced by applying the serialized ``delta`` to the
+    serialized ``state``.
+    """
+    fields = json.loads(state) if state is not None else {}
+    delta = json.loads(delta)
+    fields.update(delta['set'])
+    for name in delta['unset']:
+        fields.pop(name, None)
+    return json.dumps(fields)
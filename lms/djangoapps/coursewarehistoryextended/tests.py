@@ -6,15 +6,18 @@ backend tables.
 """
 
 import json
+from datetime import timedelta
 from unittest import skipUnless
 
 from django.conf import settings
+from django.core.management import call_command
 from django.test import TestCase
 from mock import patch
 from nose.plugins.attrib import attr
 
-from courseware.models import BaseStudentModuleHistory, StudentModule, StudentModuleHistory
+from courseware.models import BaseStudentModuleHistory, StudentModule, StudentModuleHistory, csmh_deltas_enabled
 from courseware.tests.factories import StudentModuleFactory, course_id, location
+from coursewarehistoryextended.models import StudentModuleHistoryDelta, StudentModuleHistoryExtended
 
 
 @attr(shard=1)
@@ -79,3 +82,135 @@ class TestStudentModuleHistoryBackends(TestCase):
         student_module = StudentModule.objects.all()
         history = BaseStudentModuleHistory.get_history(student_module)
         self.assertEquals(len(history), 0)
+
+
+@attr(shard=1)
+@skipUnless(settings.FEATURES["ENABLE_CSMH_EXTENDED"], "CSMH Extended needs to be enabled")
+@patch.dict("django.conf.settings.FEATURES", {"ENABLE_CSMH_DELTAS": True})
+class TestStudentModuleHistoryDeltas(TestCase):
+    """ Tests of the history stored as deltas in CSMHD """
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    # A field large enough that changing the other fields is stored as a delta
+    ANSWER = 'answer ' * 20
+
+    def save_states(self, states):
+        """
+        Save each of ``states`` in turn to a StudentModule, as set_many saves them, and return the StudentModule.
+        """
+        student_module = StudentModuleFactory.create(
+            module_state_key=location('usage_id'),
+            course_id=course_id,
+            state=json.dumps(states[0]),
+        )
+        for state in states[1:]:
+            student_module = StudentModule.objects.get(pk=student_module.pk)
+            student_module.state = json.dumps(state)
+            student_module.save()
+        return student_module
+
+    def get_history_states(self, student_module):
+        """
+        Return the states of the history of ``student_module``, newest first.
+        """
+        return [json.loads(entry.state) for entry in BaseStudentModuleHistory.get_history([student_module])]
+
+    def test_get_history(self):
+        states = [
+            {'answer': self.ANSWER},
+            {'answer': self.ANSWER, 'attempts': 1},
+            {'answer': self.ANSWER, 'attempts': 2, 'done': True},
+            {'answer': self.ANSWER, 'done': True},
+        ]
+        student_module = self.save_states(states)
+
+        self.assertEquals(
+            [entry.is_delta for entry in StudentModuleHistoryDelta.objects.order_by('id')],
+            [False, True, True, True],
+        )
+        self.assertFalse(StudentModuleHistoryExtended.objects.exists())
+        self.assertEquals(self.get_history_states(student_module), states[::-1])
+
+    def test_get_history_after_extended(self):
+        with patch.dict("django.conf.settings.FEATURES", {"ENABLE_CSMH_DELTAS": False}):
+            student_module = self.save_states([{'answer': self.ANSWER}])
+        student_module = StudentModule.objects.get(pk=student_module.pk)
+        student_module.state = json.dumps({'answer': self.ANSWER, 'attempts': 1})
+        student_module.save()
+
+        # The state was read from an entry outside of the delta table, so it's stored whole.
+        self.assertFalse(StudentModuleHistoryDelta.objects.get().is_delta)
+        self.assertEquals(
+            self.get_history_states(student_module),
+            [{'answer': self.ANSWER, 'attempts': 1}, {'answer': self.ANSWER}],
+        )
+
+    def test_compact(self):
+        states = [{'answer': self.ANSWER, 'attempts': attempts} for attempts in range(5)]
+        student_module = self.save_states(states)
+        entry_ids = list(StudentModuleHistoryDelta.objects.order_by('id').values_list('id', flat=True))
+        StudentModuleHistoryDelta.objects.filter(id__in=entry_ids[:3]).update(
+            created=student_module.modified - timedelta(days=200)
+        )
+
+        call_command('compact_student_module_history', days=180)
+
+        self.assertEquals(StudentModuleHistoryDelta.objects.count(), 3)
+        self.assertEquals(self.get_history_states(student_module), states[:1:-1])
+        self.assertFalse(StudentModuleHistoryDelta.objects.get(id=entry_ids[2]).is_delta)
+
+    def save_concurrently(self, student_module, states):
+        """
+        Save each of ``states`` to ``student_module`` from a separate read of it, as concurrent
+        requests save them.
+        """
+        readers = [StudentModule.objects.get(pk=student_module.pk) for __ in states]
+        for reader, state in zip(readers, states):
+            reader.state = json.dumps(state)
+            reader.save()
+
+    def test_concurrent_writes(self):
+        states = [
+            {'answer': self.ANSWER},
+            {'answer': self.ANSWER, 'attempts': 1},
+        ]
+        student_module = self.save_states(states)
+        concurrent_states = [
+            {'answer': self.ANSWER, 'attempts': 2},
+            {'answer': self.ANSWER, 'attempts': 1, 'done': True},
+        ]
+        self.save_concurrently(student_module, concurrent_states)
+
+        entries = list(StudentModuleHistoryDelta.objects.order_by('id'))
+        self.assertEquals([entry.is_delta for entry in entries], [False, True, True, True])
+        self.assertEquals([entry.base_id for entry in entries[2:]], [entries[1].id, entries[1].id])
+        self.assertEquals(self.get_history_states(student_module), (states + concurrent_states)[::-1])
+
+    def test_compact_concurrent_writes(self):
+        states = [
+            {'answer': self.ANSWER},
+            {'answer': self.ANSWER, 'attempts': 1},
+        ]
+        student_module = self.save_states(states)
+        concurrent_states = [
+            {'answer': self.ANSWER, 'attempts': 2},
+            {'answer': self.ANSWER, 'attempts': 1, 'done': True},
+        ]
+        self.save_concurrently(student_module, concurrent_states)
+        entry_ids = list(StudentModuleHistoryDelta.objects.order_by('id').values_list('id', flat=True))
+        StudentModuleHistoryDelta.objects.filter(id__in=entry_ids[:3]).update(
+            created=student_module.modified - timedelta(days=200)
+        )
+
+        call_command('compact_student_module_history', days=180)
+
+        # The last delta applied to a removed entry, so it now applies to the compacted entry.
+        self.assertEquals(StudentModuleHistoryDelta.objects.count(), 2)
+        self.assertEquals(StudentModuleHistoryDelta.objects.get(id=entry_ids[3]).base_id, entry_ids[2])
+        self.assertEquals(self.get_history_states(student_module), concurrent_states[::-1])
+
+    def test_deltas_require_extended(self):
+        with patch.dict("django.conf.settings.FEATURES", {"ENABLE_CSMH_EXTENDED": False}):
+            self.assertFalse(csmh_deltas_enabled())
+        self.assertTrue(csmh_deltas_enabled())
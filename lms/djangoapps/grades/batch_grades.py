@@ -0,0 +1,380 @@
+"""
+Computes the course grades of many users at once, for course-wide recomputes.
+
+The per-user path (CourseGradeFactory, SubsectionGradeFactory and the course's
+grader) builds a ProblemScore for each block and each user, and aggregates them in
+Python loops. BatchGradeCalculator instead loads the scores of a chunk of users who
+see the same course structure into arrays indexed by user and block, and computes
+the subsection, assignment type and course percentages with array operations over
+all of the users at once.
+
+The arrays are summed in the same order as the per-user path sums its scores, so
+that the results are exactly the same. The grades are computed as
+CourseGradeFactory.update computes them when forced to update the subsection
+grades, except that subsection grade overrides replace the subsection totals, as
+they do in persisted subsection grades. Nothing is persisted.
+"""
+from collections import namedtuple
+
+import numpy
+
+from courseware.models import StudentModule
+from lms.djangoapps.course_blocks.api import get_course_blocks_for_users
+from student.models import anonymous_id_for_user
+from submissions import api as submissions_api
+from xmodule.graders import AssignmentFormatGrader, WeightedSubsectionsGrader
+
+from .config import assume_zero_if_absent
+from .course_data import CourseData
+from .course_grade import CourseGrade, _uniqueify_and_keep_order
+from .models import PersistentSubsectionGradeOverride
+from .scores import _get_explicit_graded, possibly_scored
+from .transformer import GradesTransformer
+
+# Number of users whose grades are computed together.
+DEFAULT_CHUNK_SIZE = 200
+
+BatchCourseGrade = namedtuple('BatchCourseGrade', ['user', 'percent', 'letter_grade', 'passed', 'attempted'])
+
+
+def iter_course_grades(users, course_key, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield a BatchCourseGrade for each of the given users in the course.
+
+    The users are grouped by the course structure they see, and the grades
+    of up to chunk_size users of a group are computed together.
+    """
+    course_data = CourseData(user=None, course_key=course_key)
+    grouped_structures = get_course_blocks_for_users(
+        list(users),
+        course_data.location,
+        collected_block_structure=course_data.collected_structure,
+    )
+    for grouped_users, course_structure in grouped_structures:
+        for start in range(0, len(grouped_users), chunk_size):
+            calculator = BatchGradeCalculator(
+                grouped_users[start:start + chunk_size], course_data.course, course_structure,
+            )
+            for course_grade in calculator.compute():
+                yield course_grade
+
+
+class BatchGradeCalculator(object):
+    """
+    Computes the course grades of users who all see the same course structure.
+
+    After compute() is called, the subsection totals are available in arrays indexed
+    by user (in the order of ``users``) and subsection (in the order of
+    ``subsection_keys``): ``earned_all``, ``possible_all``, ``earned_graded``,
+    ``possible_graded`` and ``percent_graded``.
+    """
+    def __init__(self, users, course, course_structure):
+        self.users = list(users)
+        self.course = course
+        self.course_key = course.id
+        self.course_structure = course_structure
+
+        grader = CourseGrade._prep_course_for_grading(course).grader  # pylint: disable=protected-access
+        if not isinstance(grader, WeightedSubsectionsGrader) or not all(
+                isinstance(subgrader, AssignmentFormatGrader) for subgrader, __, __ in grader.subgraders
+        ):
+            raise ValueError(u"Course {} doesn't have a grader that can grade in batches.".format(self.course_key))
+        self.grader = grader
+
+        self._index_course_structure()
+
+    def compute(self):
+        """
+        Return a BatchCourseGrade for each of the users.
+        """
+        earned, possible, scored, graded, attempted = self._load_scores()
+        self._aggregate_subsections(earned, possible, scored, graded)
+        self._apply_overrides()
+
+        total_percent = numpy.zeros(len(self.users))
+        for subgrader, __, weight in self.grader.subgraders:
+            total_percent = total_percent + self._assignment_type_percent(subgrader) * weight
+
+        if assume_zero_if_absent(self.course_key):
+            attempted = numpy.ones(len(self.users), dtype=bool)
+        else:
+            attempted = (scored & attempted)[:, self._subsection_block_indices()].any(axis=1)
+        grade_cutoffs = self.course.grade_cutoffs
+        course_grades = []
+        for index, user in enumerate(self.users):
+            # The course percentage is rounded with Python's round, exactly as CourseGrade rounds it.
+            grader_result = {'percent': float(total_percent[index])}
+            percent = CourseGrade._compute_percent(grader_result)  # pylint: disable=protected-access
+            course_grades.append(BatchCourseGrade(
+                user,
+                percent,
+                CourseGrade._compute_letter_grade(grade_cutoffs, percent),  # pylint: disable=protected-access
+                CourseGrade._compute_passed(grade_cutoffs, percent),  # pylint: disable=protected-access
+                bool(attempted[index]),
+            ))
+        return course_grades
+
+    def _index_course_structure(self):
+        """
+        Index the subsections of the course, and the scored blocks within them, as
+        CourseGrade and CreateSubsectionGrade traverse them.
+        """
+        structure = self.course_structure
+        self.subsection_keys = []
+        self._subsection_blocks = []
+        self.block_keys = []
+        block_indices = {}
+        for chapter_key in structure.get_children(structure.root_block_usage_key):
+            for subsection_key in _uniqueify_and_keep_order(structure.get_children(chapter_key)):
+                if subsection_key in self.subsection_keys:
+                    continue
+                blocks = []
+                for block_key in structure.post_order_traversal(filter_func=possibly_scored, start_node=subsection_key):
+                    if not getattr(structure[block_key], 'has_score', False):
+                        continue
+                    if block_key not in block_indices:
+                        block_indices[block_key] = len(self.block_keys)
+                        self.block_keys.append(block_key)
+                    if block_indices[block_key] not in blocks:
+                        blocks.append(block_indices[block_key])
+                self.subsection_keys.append(subsection_key)
+                self._subsection_blocks.append(blocks)
+
+        # The location which ScoresClient looks up the CSM score of each block by.
+        self._block_indices_by_location = {
+            block_key.replace(version=None, branch=None): index for index, block_key in enumerate(self.block_keys)
+        }
+
+    def _subsection_block_indices(self):
+        """
+        Return the indices of all of the blocks within subsections.
+        """
+        return sorted(set(index for blocks in self._subsection_blocks for index in blocks))
+
+    def _load_scores(self):
+        """
+        Return arrays of the weighted earned and possible score of each user for
+        each block, and of whether the score exists, is graded and was attempted,
+        following the precedence of scores.get_score: Submissions API scores,
+        then CSM scores, then the latest content of the block.
+        """
+        num_users, num_blocks = len(self.users), len(self.block_keys)
+        blocks = [self.course_structure[block_key] for block_key in self.block_keys]
+
+        # Each block's values from its latest content, as nan where they're None.
+        weights = numpy.array([_nan_if_none(getattr(block, 'weight', None)) for block in blocks])
+        content_possible = numpy.array([
+            _nan_if_none(block.transformer_data[GradesTransformer].max_score) for block in blocks
+        ])
+        explicit_graded = numpy.array([_get_explicit_graded(block) for block in blocks], dtype=bool)
+
+        earned = numpy.zeros((num_users, num_blocks))
+        possible = numpy.zeros((num_users, num_blocks))
+        scored = numpy.zeros((num_users, num_blocks), dtype=bool)
+        attempted = numpy.zeros((num_users, num_blocks), dtype=bool)
+
+        # The latest content of the block, with nothing earned.
+        raw_earned, raw_possible = numpy.zeros(num_blocks), content_possible
+        block_earned, block_possible = _weighted_score(raw_earned, raw_possible, weights)
+        earned[:] = block_earned
+        possible[:] = block_possible
+        scored[:] = ~numpy.isnan(content_possible)
+
+        # CSM scores, which have a possible score.
+        user_indices, block_indices, correct, total = self._read_csm_scores()
+        if len(user_indices):
+            raw_earned = numpy.where(numpy.isnan(correct), 0.0, correct)
+            csm_earned, csm_possible = _weighted_score(raw_earned, total, weights[block_indices])
+            earned[user_indices, block_indices] = csm_earned
+            possible[user_indices, block_indices] = csm_possible
+            scored[user_indices, block_indices] = True
+            attempted[user_indices, block_indices] = ~numpy.isnan(correct)
+
+        # Submissions API scores.
+        user_indices, block_indices, points_earned, points_possible, created = self._read_submissions_scores()
+        if len(user_indices):
+            earned[user_indices, block_indices] = points_earned
+            possible[user_indices, block_indices] = points_possible
+            scored[user_indices, block_indices] = True
+            attempted[user_indices, block_indices] = created
+
+        graded = scored & (possible > 0.0) & explicit_graded
+        return earned, possible, scored, graded, attempted
+
+    def _read_csm_scores(self):
+        """
+        Return arrays of the user index, block index, grade (nan if None) and max
+        grade of each StudentModule of the users' blocks which has a max grade.
+        """
+        user_indices_by_id = {user.id: index for index, user in enumerate(self.users)}
+        rows = StudentModule.objects.chunked_filter(
+            'module_state_key__in',
+            self.block_keys,
+            student_id__in=list(user_indices_by_id),
+            course_id=self.course_key,
+        ).values_list('student_id', 'module_state_key', 'grade', 'max_grade')
+
+        user_indices, block_indices, correct, total = [], [], [], []
+        for student_id, location, grade, max_grade in rows:
+            block_index = self._block_indices_by_location.get(location.map_into_course(self.course_key))
+            if block_index is None or max_grade is None:
+                continue
+            user_indices.append(user_indices_by_id[student_id])
+            block_indices.append(block_index)
+            correct.append(_nan_if_none(grade))
+            total.append(max_grade)
+        return (
+            numpy.array(user_indices, dtype=int),
+            numpy.array(block_indices, dtype=int),
+            numpy.array(correct, dtype=float),
+            numpy.array(total, dtype=float),
+        )
+
+    def _read_submissions_scores(self):
+        """
+        Return arrays of the user index, block index, points earned, points possible
+        and whether it was attempted, of each of the users' Submissions API scores.
+
+        The Submissions API only reads the scores of one user at a time.
+        """
+        block_indices_by_id = {unicode(block_key): index for index, block_key in enumerate(self.block_keys)}
+        user_indices, block_indices, points_earned, points_possible, created = [], [], [], [], []
+        for user_index, user in enumerate(self.users):
+            anonymous_user_id = anonymous_id_for_user(user, self.course_key)
+            scores = submissions_api.get_scores(str(self.course_key), anonymous_user_id)
+            for block_id, score in scores.iteritems():
+                if not score or block_id not in block_indices_by_id:
+                    continue
+                user_indices.append(user_index)
+                block_indices.append(block_indices_by_id[block_id])
+                points_earned.append(score['points_earned'])
+                points_possible.append(score['points_possible'])
+                created.append(bool(score['created_at']))
+        return (
+            numpy.array(user_indices, dtype=int),
+            numpy.array(block_indices, dtype=int),
+            numpy.array(points_earned, dtype=float),
+            numpy.array(points_possible, dtype=float),
+            numpy.array(created, dtype=bool),
+        )
+
+    def _aggregate_subsections(self, earned, possible, scored, graded):
+        """
+        Sum the scores of the blocks of each subsection, in the order in which
+        aggregate_scores sums them.
+        """
+        shape = (len(self.users), len(self.subsection_keys))
+        self.earned_all, self.possible_all = numpy.zeros(shape), numpy.zeros(shape)
+        self.earned_graded, self.possible_graded = numpy.zeros(shape), numpy.zeros(shape)
+        for subsection_index, blocks in enumerate(self._subsection_blocks):
+            for block_index in blocks:
+                # Adding 0.0 for the blocks without a score leaves the sums exactly as they are.
+                self.earned_all[:, subsection_index] += numpy.where(scored[:, block_index], earned[:, block_index], 0.0)
+                self.possible_all[:, subsection_index] += numpy.where(
+                    scored[:, block_index], possible[:, block_index], 0.0
+                )
+                self.earned_graded[:, subsection_index] += numpy.where(
+                    graded[:, block_index], earned[:, block_index], 0.0
+                )
+                self.possible_graded[:, subsection_index] += numpy.where(
+                    graded[:, block_index], possible[:, block_index], 0.0
+                )
+        self._compute_percent_graded()
+
+    def _apply_overrides(self):
+        """
+        Replace the subsection totals which are overridden for the users.
+        """
+        user_indices_by_id = {user.id: index for index, user in enumerate(self.users)}
+        subsection_indices = {subsection_key: index for index, subsection_key in enumerate(self.subsection_keys)}
+        overrides = PersistentSubsectionGradeOverride.objects.select_related('grade').filter(
+            grade__course_id=self.course_key,
+            grade__user_id__in=list(user_indices_by_id),
+        )
+        for override in overrides:
+            subsection_index = subsection_indices.get(override.grade.full_usage_key)
+            if subsection_index is None:
+                continue
+            index = (user_indices_by_id[override.grade.user_id], subsection_index)
+            for totals, value in (
+                    (self.earned_all, override.earned_all_override),
+                    (self.possible_all, override.possible_all_override),
+                    (self.earned_graded, override.earned_graded_override),
+                    (self.possible_graded, override.possible_graded_override),
+            ):
+                if value is not None:
+                    totals[index] = value
+        self._compute_percent_graded()
+
+    def _compute_percent_graded(self):
+        """
+        Compute the graded percentage of each subsection, as compute_percent does.
+        """
+        has_possible = self.possible_graded > 0
+        self.percent_graded = numpy.where(
+            has_possible,
+            numpy.around(self.earned_graded / numpy.where(has_possible, self.possible_graded, 1.0), decimals=2),
+            0.0,
+        )
+
+    def _assignment_type_percent(self, subgrader):
+        """
+        Return the percentage of each user for the assignment type of the given
+        AssignmentFormatGrader, dropping the lowest scores as it does.
+        """
+        num_users = len(self.users)
+        columns = [
+            index for index, subsection_key in enumerate(self.subsection_keys)
+            if getattr(self.course_structure[subsection_key], 'graded', False)
+            if getattr(self.course_structure[subsection_key], 'format', '') == subgrader.type
+        ]
+        # A subsection is only passed to the grader when the user can earn points in it.
+        included = self.possible_graded[:, columns] > 0
+        percents = self.percent_graded[:, columns]
+
+        # Line up each user's included subsections to the left, followed by the
+        # placeholder scores of 0 up to the grader's min_count.
+        num_scores = numpy.maximum(included.sum(axis=1), subgrader.min_count)
+        width = max(len(columns), subgrader.min_count)
+        breakdown = numpy.zeros((num_users, width))
+        user_indices, column_indices = numpy.nonzero(included)
+        positions = numpy.cumsum(included, axis=1) - 1
+        breakdown[user_indices, positions[user_indices, column_indices]] = percents[user_indices, column_indices]
+        in_breakdown = numpy.arange(width) < num_scores[:, numpy.newaxis]
+
+        # Drop the lowest scores, the latest of equal scores first, as total_with_drops does.
+        dropped = numpy.zeros((num_users, width), dtype=bool)
+        if subgrader.drop_count > 0 and width:
+            order = numpy.lexsort(
+                (-numpy.tile(numpy.arange(width), (num_users, 1)), numpy.where(in_breakdown, breakdown, numpy.inf)),
+                axis=1,
+            )[:, :subgrader.drop_count]
+            dropped[numpy.arange(num_users)[:, numpy.newaxis], order] = True
+            dropped &= in_breakdown
+
+        total = numpy.zeros(num_users)
+        for position in range(width):
+            total = total + numpy.where(in_breakdown[:, position] & ~dropped[:, position], breakdown[:, position], 0.0)
+        num_kept = num_scores - subgrader.drop_count
+        return numpy.where(num_kept > 0, total / numpy.where(num_kept > 0, num_kept, 1), total)
+
+
+def _weighted_score(raw_earned, raw_possible, weights):
+    """
+    Return arrays of the weighted earned and possible scores, as
+    scores.weighted_score computes them for each element.
+    """
+    use_weight = ~numpy.isnan(weights) & (raw_possible != 0) & ~numpy.isnan(raw_possible)
+    safe_possible = numpy.where(use_weight, raw_possible, 1.0)
+    weighted_earned = numpy.where(
+        use_weight, raw_earned * numpy.where(use_weight, weights, 0.0) / safe_possible, raw_earned,
+    )
+    weighted_possible = numpy.where(use_weight, weights, raw_possible)
+    return weighted_earned, weighted_possible
+
+
+def _nan_if_none(value):
+    """
+    Return the value as a float, or nan if it's None.
+    """
+    return numpy.nan if value is None else float(value)
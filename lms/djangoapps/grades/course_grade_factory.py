@@ -7,6 +7,7 @@ from logging import getLogger
 import dogstats_wrapper as dog_stats_api
 from six import text_type
 
+from lms.djangoapps.course_blocks.api import get_course_blocks_for_users
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE_GRADE_NOW_PASSED
 
 from .config import assume_zero_if_absent, should_persist_grades
@@ -83,6 +84,7 @@ class CourseGradeFactory(object):
             collected_block_structure=None,
             course_key=None,
             force_update=False,
+            share_course_structures=False,
     ):
         """
         Given a course and an iterable of students (User), yield a GradeResult
@@ -92,6 +94,10 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        If share_course_structures is True, the course structure is
+        transformed once for each group of students who see the same
+        course structure, rather than once for each student.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -102,16 +108,53 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
+        course_structures = {}
+        if share_course_structures:
+            users = list(users)
+            course_structures = self._get_course_structures(users, course_data)
+
         for user in users:
             with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                yield self._iter_grade_result(user, course_data, force_update)
+                yield self._iter_grade_result(user, course_data, force_update, course_structures.get(user.id))
+
+    @staticmethod
+    def _get_course_structures(users, course_data):
+        """
+        Returns a dict of user id to the transformed course structure
+        for each of the given users, where users who see the same course
+        structure share a single transformed structure.
+
+        If the structures cannot be computed together, returns an empty
+        dict so that each user's structure is computed, and any error
+        is reported, individually.
+        """
+        try:
+            grouped_structures = get_course_blocks_for_users(
+                users,
+                course_data.location,
+                collected_block_structure=course_data.collected_structure,
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot compute shared course structures in course %s because of exception: %s',
+                course_data.course_key,
+                text_type(exc)
+            )
+            return {}
+
+        return {
+            user.id: course_structure
+            for grouped_users, course_structure in grouped_structures
+            for user in grouped_users
+        }
 
-    def _iter_grade_result(self, user, course_data, force_update):
+    def _iter_grade_result(self, user, course_data, force_update, course_structure=None):
         try:
             kwargs = {
                 'user': user,
                 'course': course_data.course,
                 'collected_block_structure': course_data.collected_structure,
+                'course_structure': course_structure,
                 'course_key': course_data.course_key
             }
             if force_update:
@@ -0,0 +1,135 @@
+"""
+Tests of computing the course grades of users in batches.
+"""
+import ddt
+from courseware.tests.factories import StudentModuleFactory
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from mock import PropertyMock, patch
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.course_module import CourseDescriptor
+
+from ..batch_grades import BatchGradeCalculator, iter_course_grades
+from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentSubsectionGrade, PersistentSubsectionGradeOverride
+from ..subsection_grade_factory import SubsectionGradeFactory
+from .base import GradeTestBase
+
+
+@ddt.ddt
+class TestBatchGradeCalculator(GradeTestBase):
+    """
+    Test that course grades computed in batches match the grades computed user by user.
+    """
+    shard = 4
+
+    def setUp(self):
+        super(TestBatchGradeCalculator, self).setUp()
+        self.users = [UserFactory.create() for __ in range(4)]
+        for user in self.users:
+            CourseEnrollment.enroll(user, self.course.id)
+
+    def _set_score(self, user, problem, grade, max_grade):
+        """
+        Stores the user's CSM score of the problem.
+        """
+        StudentModuleFactory.create(
+            student=user,
+            course_id=self.course.id,
+            module_state_key=problem.location,
+            grade=grade,
+            max_grade=max_grade,
+        )
+
+    def _set_scores(self):
+        """
+        Stores a different combination of scores for each of the users.
+        """
+        self._set_score(self.users[0], self.problem, 1, 1)
+        self._set_score(self.users[0], self.problem2, 0, 1)
+        self._set_score(self.users[1], self.problem, 0, 1)
+        self._set_score(self.users[1], self.problem2, 1, 1)
+        self._set_score(self.users[2], self.problem, None, 1)
+        # users[3] hasn't attempted any problems.
+
+    def _assert_grades_match(self, batch_grades):
+        """
+        Asserts that the batch grades match the grades computed by CourseGradeFactory.
+        """
+        self.assertEqual([batch_grade.user for batch_grade in batch_grades], self.users)
+        for batch_grade in batch_grades:
+            course_grade = CourseGradeFactory().update(batch_grade.user, self.course, force_update_subsections=True)
+            self.assertEqual(batch_grade.percent, course_grade.percent)
+            self.assertEqual(batch_grade.letter_grade, course_grade.letter_grade)
+            self.assertEqual(bool(batch_grade.passed), bool(course_grade.passed))
+            self.assertEqual(batch_grade.attempted, course_grade.attempted)
+
+    @ddt.data((1, 0), (2, 1), (3, 1), (1, 3))
+    @ddt.unpack
+    def test_grades_match(self, min_count, drop_count):
+        self.grading_policy['GRADER'][0].update(min_count=min_count, drop_count=drop_count)
+        self.course.set_grading_policy(self.grading_policy)
+        self.store.update_item(self.course, 0)
+        self._set_scores()
+
+        self._assert_grades_match(list(iter_course_grades(self.users, self.course.id)))
+
+    def test_chunks(self):
+        self._set_scores()
+        self._assert_grades_match(list(iter_course_grades(self.users, self.course.id, chunk_size=3)))
+
+    def test_subsection_totals(self):
+        self._set_scores()
+        course_structure = get_course_blocks(self.users[0], self.course.location)
+        calculator = BatchGradeCalculator(self.users, self.course, course_structure)
+        calculator.compute()
+
+        self.assertEqual(calculator.subsection_keys, [self.sequence.location, self.sequence2.location])
+        for user_index, user in enumerate(self.users):
+            subsection_grade_factory = SubsectionGradeFactory(user, self.course, course_structure)
+            for subsection_index, subsection in enumerate((self.sequence, self.sequence2)):
+                subsection_grade = subsection_grade_factory.update(
+                    course_structure[subsection.location], persist_grade=False,
+                )
+                self.assertEqual(
+                    (
+                        calculator.earned_all[user_index, subsection_index],
+                        calculator.possible_all[user_index, subsection_index],
+                        calculator.earned_graded[user_index, subsection_index],
+                        calculator.possible_graded[user_index, subsection_index],
+                        calculator.percent_graded[user_index, subsection_index],
+                    ),
+                    (
+                        subsection_grade.all_total.earned,
+                        subsection_grade.all_total.possible,
+                        subsection_grade.graded_total.earned,
+                        subsection_grade.graded_total.possible,
+                        subsection_grade.percent_graded,
+                    ),
+                )
+
+    def test_override(self):
+        user = self.users[3]
+        course_structure = get_course_blocks(user, self.course.location)
+        subsection_grade = SubsectionGradeFactory(user, self.course, course_structure).update(
+            course_structure[self.sequence.location], persist_grade=False,
+        )
+        grade = PersistentSubsectionGrade.update_or_create_grade(
+            **subsection_grade._persisted_model_params(user)  # pylint: disable=protected-access
+        )
+        PersistentSubsectionGradeOverride.objects.create(
+            grade=grade, earned_all_override=1.0, earned_graded_override=1.0,
+        )
+
+        calculator = BatchGradeCalculator([user], self.course, course_structure)
+        batch_grade, = calculator.compute()
+        self.assertEqual(calculator.earned_graded[0, 0], 1.0)
+        self.assertEqual(calculator.percent_graded[0, 0], 1.0)
+        self.assertEqual(batch_grade.percent, 0.5)
+        self.assertEqual(batch_grade.letter_grade, u'Pass')
+
+    def test_unsupported_grader(self):
+        course_structure = get_course_blocks(self.users[0], self.course.location)
+        with patch.object(CourseDescriptor, 'grader', new_callable=PropertyMock, return_value=object()):
+            with self.assertRaises(ValueError):
+                BatchGradeCalculator(self.users, self.course, course_structure)
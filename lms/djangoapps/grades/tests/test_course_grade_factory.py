@@ -5,6 +5,7 @@ import ddt
 import django
 from courseware.access import has_access
 from django.conf import settings
+from lms.djangoapps.course_blocks.api import get_course_blocks_for_users
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from mock import patch
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
@@ -323,6 +324,24 @@ class TestGradeIteration(SharedModuleStoreTestCase):
             self.assertIsNone(course_grade.letter_grade)
             self.assertEqual(course_grade.percent, 0.0)
 
+    def test_share_course_structures(self):
+        expected_grades = {
+            student: course_grade.percent
+            for student, course_grade, _ in CourseGradeFactory().iter(self.students, self.course)
+        }
+        with patch(
+            'lms.djangoapps.grades.course_grade_factory.get_course_blocks_for_users',
+            wraps=get_course_blocks_for_users,
+        ) as mock_get_course_blocks_for_users:
+            shared_grades = {
+                student: course_grade.percent
+                for student, course_grade, _ in CourseGradeFactory().iter(
+                    self.students, self.course, share_course_structures=True,
+                )
+            }
+            self.assertEquals(mock_get_course_blocks_for_users.call_count, 1)
+        self.assertEqual(shared_grades, expected_grades)
+
     @patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.read')
     def test_grading_exception(self, mock_course_grade):
         """Test that we correctly capture exception messages that bubble up from
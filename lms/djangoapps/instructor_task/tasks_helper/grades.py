@@ -16,6 +16,7 @@ from courseware.courses import get_course_by_id
 from instructor_analytics.basic import list_problem_responses
 from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
+from lms.djangoapps.grades.config.waffle import SHARE_COURSE_STRUCTURES, waffle as grades_waffle
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
@@ -432,6 +433,7 @@ class CourseGradeReport(object):
                 course=context.course,
                 collected_block_structure=context.course_structure,
                 course_key=context.course_id,
+                share_course_structures=grades_waffle().is_enabled(SHARE_COURSE_STRUCTURES),
             ):
                 if not course_grade:
                     # An empty gradeset means we failed to grade a student.
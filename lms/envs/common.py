@@ -349,6 +349,11 @@ FEATURES = {
     # extended history table.
     'ENABLE_CSMH_EXTENDED': False,
 
+    # Write new CSM history to the delta table of the extended history
+    # app, as the changes between successive states rather than as
+    # copies of the whole state. Requires ENABLE_CSMH_EXTENDED.
+    'ENABLE_CSMH_DELTAS': False,
+
     # Read from both the CSMH and CSMHE history tables.
     # This is the default, but can be disabled if all history
     # lives in the Extended table, saving the frontend from
@@ -864,6 +869,10 @@ MODULESTORE = {
     }
 }
 
+# Maximum total size, in bytes of pickled data, of the split modulestore course
+# structures kept in each process's in-memory cache.  0 disables the cache.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE = 0
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -944,6 +953,14 @@ DEFAULT_COURSE_ABOUT_IMAGE_URL = 'images/pencils.jpg'
 MEDIA_ROOT = '/edx/var/edxapp/media/'
 MEDIA_URL = '/media/'
 
+# Local disk cache of the chunks of course assets too large to cache whole, used by the
+# StaticContentServer middleware.  Disabled unless DIRECTORY is set.
+COURSE_ASSETS_CHUNK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_BYTES': 1024 * 1024 * 1024,
+    'CHUNK_SIZE': 1024 * 1024,
+}
+
 # Locale/Internationalization
 TIME_ZONE = 'America/New_York'  # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 LANGUAGE_CODE = 'en'  # http://www.i18nguy.com/unicode/language-identifiers.html
@@ -1287,6 +1304,9 @@ MIDDLEWARE_CLASSES = [
     'courseware.middleware.CacheCourseIdMiddleware',
     'courseware.middleware.RedirectMiddleware',
 
+    # Coalesce and bulk write the StudentModule state written during each request
+    'courseware.middleware.StudentModuleWriteBufferMiddleware',
+
     'course_wiki.middleware.WikiAccessMiddleware',
 
     'openedx.core.djangoapps.theming.middleware.CurrentSiteThemeMiddleware',
@@ -1941,6 +1961,16 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total size, in bytes of serialized data, of the block
+    # structures kept in each process's in-memory cache.
+    MEMORY_CACHE_MAX_SIZE=64 * 1024 * 1024,
+
+    # Average size, in bytes, of the content-addressed chunks in which
+    # block structures are stored when chunked storage is enabled, and
+    # the maximum number of chunks to read or write concurrently.
+    AVERAGE_CHUNK_SIZE=128 * 1024,
+    CHUNK_WORKERS=8,
 )
 
 ################################ Bulk Email ###################################
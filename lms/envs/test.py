@@ -219,6 +219,10 @@ CACHES = {
     },
 }
 
+# Don't share course structures between tests through the in-process cache, which would change
+# the mongo queries counted by tests; TestStructureProcessCache enables it to test its behavior.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_SIZE = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
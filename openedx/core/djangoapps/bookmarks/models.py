@@ -172,16 +172,20 @@ class Bookmark(TimeStampedModel):
                 log.error(u'No path to block with usage_key: %s.', usage_key)
                 return []
 
+            ancestor_usage_keys = [
+                ancestor_usage_key for ancestor_usage_key in path
+                if ancestor_usage_key != usage_key and ancestor_usage_key.block_type != 'course'  # pylint: disable=no-member
+            ]
+            blocks = modulestore().get_items_by_keys(ancestor_usage_keys)
+
             path_data = []
-            for ancestor_usage_key in path:
-                if ancestor_usage_key != usage_key and ancestor_usage_key.block_type != 'course':  # pylint: disable=no-member
-                    try:
-                        block = modulestore().get_item(ancestor_usage_key)
-                    except ItemNotFoundError:
-                        return []  # No valid path can be found.
-                    path_data.append(
-                        PathItem(usage_key=block.location, display_name=block.display_name_with_default)
-                    )
+            for ancestor_usage_key in ancestor_usage_keys:
+                block = blocks.get(ancestor_usage_key)
+                if block is None:
+                    return []  # No valid path can be found.
+                path_data.append(
+                    PathItem(usage_key=block.location, display_name=block.display_name_with_default)
+                )
 
         return path_data
 
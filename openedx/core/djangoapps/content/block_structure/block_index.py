@@ -0,0 +1,139 @@
+"""
+Module for evaluating filtering transformers over all blocks at once.
+
+A BlockIndex assigns each block reachable from the root of a block
+structure a position in a topological order, so that per-block values
+can be held in NumPy arrays.  Transformers that implement
+BatchFilteringTransformerMixin return removal masks over a BlockIndex,
+which are combined and applied to the block structure in a single pass
+instead of calling a filter function for each block.
+"""
+from collections import namedtuple
+
+import numpy
+
+
+# A boolean array over the positions of a BlockIndex that is True for
+# each block to be removed.  See the description of keep_descendants
+# in BlockStructureBlockData.remove_block.
+RemovalMask = namedtuple('RemovalMask', ['mask', 'keep_descendants'])
+
+
+class BlockIndex(object):
+    """
+    A topologically ordered index of the blocks in a block structure.
+    """
+    def __init__(self, block_structure):
+        self.block_structure = block_structure
+
+        # Usage keys of the blocks in topological order.
+        self.block_keys = list(block_structure.topological_traversal())
+
+        # Map of usage key to position in block_keys.
+        self._positions = {block_key: position for position, block_key in enumerate(self.block_keys)}
+
+        # Positions of each block's parents, all of which precede the
+        # block in a topological order.
+        self._parent_positions = [
+            [self._positions[parent_key] for parent_key in block_structure.get_parents(block_key)]
+            for block_key in self.block_keys
+        ]
+
+    def __len__(self):
+        return len(self.block_keys)
+
+    def position(self, usage_key):
+        """
+        Returns the position of the block with the given usage key.
+        """
+        return self._positions[usage_key]
+
+    def get_xblock_field_array(self, field_name, default=None, dtype=bool):
+        """
+        Returns an array of the given dtype of the values of the given
+        xBlock field for all blocks in the index.
+        """
+        return self.create_array(
+            self.block_structure.get_xblock_field_values(self.block_keys, field_name, default),
+            dtype,
+        )
+
+    def get_transformer_block_field_array(self, transformer, key, default=None, dtype=bool):
+        """
+        Returns an array of the given dtype of the values of the given
+        transformer's block field for all blocks in the index.
+        """
+        return self.create_array(
+            self.block_structure.get_transformer_block_field_values(self.block_keys, transformer, key, default),
+            dtype,
+        )
+
+    def create_array(self, values, dtype=bool):
+        """
+        Returns an array of the given dtype of the given values, one
+        for each block in the index.
+        """
+        return numpy.fromiter(values, dtype=dtype, count=len(self))
+
+    def create_removal_mask(self, removal_condition, keep_descendants=False):
+        """
+        Returns a removal mask that removes the blocks for which the
+        given boolean array is True.
+
+        Arguments:
+            removal_condition (numpy.ndarray) - A boolean array over the
+                positions of this index that is True for each block to
+                be removed from the block structure.
+
+            keep_descendants (bool) - See the description in
+                BlockStructureBlockData.remove_block.
+        """
+        return RemovalMask(numpy.asarray(removal_condition, dtype=bool), keep_descendants)
+
+    def apply_removal_masks(self, removal_masks):
+        """
+        Removes the blocks selected by the given removal masks from the
+        block structure, in a single topological pass.
+
+        The result is the same as that of filter_topological_traversal
+        with the masks' removal filters chained in the given order: a
+        block is removed only if it is visited, and it is visited only
+        if one of its parents was retained, or was removed while keeping
+        its descendants.  Blocks that are no longer visited are left for
+        _prune_unreachable.
+        """
+        if not removal_masks or not len(self):
+            return
+
+        # A block removed by more than one mask is removed by the first
+        # of them, as with chained filters.
+        removed = numpy.zeros(len(self), dtype=bool)
+        removed_keeping_descendants = numpy.zeros(len(self), dtype=bool)
+        for removal_mask in removal_masks:
+            newly_removed = removal_mask.mask & ~removed
+            if removal_mask.keep_descendants:
+                removed_keeping_descendants |= newly_removed
+            removed |= newly_removed
+
+        # Whether the descendants of each block are visited: True if
+        # the block is visited and either retained or removed while
+        # keeping its descendants.
+        removed = removed.tolist()
+        keeps_descendants = removed_keeping_descendants.tolist()
+        visits_descendants = [False] * len(self)
+
+        removals = []
+        for position, parent_positions in enumerate(self._parent_positions):
+            if position and not any(visits_descendants[parent] for parent in parent_positions):
+                continue
+            if removed[position]:
+                removals.append(position)
+                visits_descendants[position] = keeps_descendants[position]
+            else:
+                visits_descendants[position] = True
+
+        for position in removals:
+            self.block_structure.remove_block(
+                self.block_keys[position],
+                keep_descendants=keeps_descendants[position],
+            )
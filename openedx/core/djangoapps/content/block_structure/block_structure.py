@@ -466,6 +466,23 @@ class BlockStructureBlockData(BlockStructure):
         block_data = self._block_data_map.get(usage_key)
         return getattr(block_data, field_name, default) if block_data else default
 
+    def get_xblock_field_values(self, usage_keys, field_name, default=None):
+        """
+        Returns a list of the collected values of the xBlock field for
+        the requested blocks, in the given order; see get_xblock_field.
+
+        Arguments:
+            usage_keys ([UsageKey]) - Usage keys of the blocks whose
+                xBlock field is requested.
+
+            field_name (string) - The name of the field that is
+                requested.
+
+            default (any type) - The value to return for a block whose
+                field value is not found.
+        """
+        return [self.get_xblock_field(usage_key, field_name, default) for usage_key in usage_keys]
+
     def override_xblock_field(self, usage_key, field_name, override_data):
         """
         Set value of the XBlock field for the requested block for the requested field_name;
@@ -556,6 +573,30 @@ class BlockStructureBlockData(BlockStructure):
             return default
         return getattr(transformer_data, key, default)
 
+    def get_transformer_block_field_values(self, usage_keys, transformer, key, default=None):
+        """
+        Returns a list of the values associated with the given key for
+        the given transformer for the requested blocks, in the given
+        order; see get_transformer_block_field.
+
+        Arguments:
+            usage_keys ([UsageKey]) - Usage keys of the blocks whose
+                transformer data is requested.
+
+            transformer (BlockStructureTransformer) - The transformer
+                whose dictionary data is requested.
+
+            key (string) - A dictionary key to the transformer's data
+                that is requested.
+
+            default (any type) - The value to return for a block whose
+                dictionary entry is not found.
+        """
+        return [
+            self.get_transformer_block_field(usage_key, transformer, key, default)
+            for usage_key in usage_keys
+        ]
+
     def set_transformer_block_field(self, usage_key, transformer, key, value):
         """
         Updates the given transformer's data dictionary with the given
@@ -750,6 +791,50 @@ class BlockStructureBlockData(BlockStructure):
             raise TransformerException('Version attributes are not set on transformer {0}.', transformer.name())
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.WRITE_VERSION)
 
+    def _replace_subtrees(self, partial_block_structure, subtree_usage_keys):
+        """
+        Mutates this block structure by replacing the subtrees starting at
+        the given subtree_usage_keys with those in the given partial block
+        structure, which was collected by an incremental collect.
+
+        The block data of all blocks in the partial block structure,
+        including the ancestors of the subtrees, and its transformer data
+        replace those in this block structure.  Blocks that are no longer
+        reachable are removed.
+
+        Arguments:
+            partial_block_structure (BlockStructureBlockData) - A block
+                structure containing the new subtrees and their ancestors.
+
+            subtree_usage_keys (set(UsageKey)) - The usage keys for the
+                roots of the subtrees that are to be replaced.
+        """
+        # Detach the blocks of the current subtrees from their children.
+        for subtree_usage_key in subtree_usage_keys:
+            for block_key in list(self.post_order_traversal(start_node=subtree_usage_key)):
+                for child_key in self._block_relations[block_key].children:
+                    self._block_relations[child_key].parents.remove(block_key)
+                self._block_relations[block_key].children = []
+
+        # Attach the blocks of the new subtrees to their children.
+        for subtree_usage_key in subtree_usage_keys:
+            for block_key in partial_block_structure.post_order_traversal(start_node=subtree_usage_key):
+                for child_key in partial_block_structure.get_children(block_key):
+                    self._add_relation(block_key, child_key)
+
+        # Skip any block data that transformers set for blocks outside of
+        # the partial block structure, such as the other children of its
+        # ancestors.
+        for block_key, block_data in partial_block_structure.iteritems():
+            if block_key in partial_block_structure:
+                self._block_data_map[block_key] = block_data
+        self.transformer_data = partial_block_structure.transformer_data
+
+        self._prune_unreachable()
+        for block_key in list(self._block_data_map):
+            if block_key not in self:
+                self._block_data_map.pop(block_key)
+
     def _get_or_create_block(self, usage_key):
         """
         Returns the BlockData associated with the given usage_key.
@@ -0,0 +1,489 @@
+"""
+Module for the columnar serialization format of BlockStructure objects.
+
+Rather than pickling the entire block structure as a single object
+graph, the columnar format stores the structure as a set of
+independently encoded sections:
+
+    keys - Table of the structure's usage keys.  Every block is
+        interned and subsequently referred to by its index in
+        this table.
+
+    children.offsets, children.indices - The structure's relations
+        as integer adjacency arrays (compressed sparse row layout).
+
+    transformer_data - The structure-wide transformer data.
+
+    field.<name> - A column with the collected values of a single
+        xBlock field, keyed by block index.
+
+    transformer.<name> - A column with the block-specific data of a
+        single transformer, keyed by block index.
+
+A fixed-size header and a section directory precede the sections so a
+reader can locate and decode only the sections it needs.  The reader
+works on any object supporting the buffer protocol, including
+an mmap.mmap of a stored file, without copying the entire buffer.
+
+The deserialized structure does not materialize any BlockData until
+it is accessed.  Field columns are decoded only on first access of
+the corresponding field.
+"""
+# pylint: disable=protected-access
+from array import array
+import cPickle as pickle
+import struct
+import zlib
+
+from .block_structure import (
+    BlockData,
+    BlockStructureBlockData,
+    TransformerData,
+    TransformerDataMap,
+    _BlockRelations,
+)
+
+
+# Magic prefix identifying serialized data in the columnar format.
+MAGIC = 'BSCF'
+
+# The latest version of the columnar format.  Incrementally update this
+# value whenever the layout of the format changes.
+FORMAT_VERSION = 1
+
+# Header: magic, format version, number of sections.
+_HEADER = struct.Struct('<4sHI')
+
+# Section directory entry: length of section name, section offset, section length.
+_DIRECTORY_ENTRY = struct.Struct('<HII')
+
+# Type code of the integer adjacency arrays.
+_ARRAY_TYPECODE = 'i'
+
+_KEYS_SECTION = 'keys'
+_CHILDREN_OFFSETS_SECTION = 'children.offsets'
+_CHILDREN_INDICES_SECTION = 'children.indices'
+_TRANSFORMER_DATA_SECTION = 'transformer_data'
+_FIELD_SECTION_PREFIX = 'field.'
+_TRANSFORMER_SECTION_PREFIX = 'transformer.'
+
+
+class ColumnarFormatError(Exception):
+    """
+    Exception class for serialized data that is not in a
+    readable columnar format.
+    """
+    pass
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data is in the columnar format.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Returns the given block structure serialized in the columnar format.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            that is to be serialized.
+    """
+    block_keys = list(block_structure.topological_traversal())
+    traversed_keys = set(block_keys)
+    block_keys.extend(key for key in block_structure.get_block_keys() if key not in traversed_keys)
+    index_of = {block_key: index for index, block_key in enumerate(block_keys)}
+
+    offsets = array(_ARRAY_TYPECODE, [0])
+    indices = array(_ARRAY_TYPECODE)
+    for block_key in block_keys:
+        indices.extend(index_of[child] for child in block_structure.get_children(block_key))
+        offsets.append(len(indices))
+
+    field_columns = {}
+    transformer_columns = {}
+    for block_key, block_data in block_structure.iteritems():
+        if block_key not in index_of:
+            continue
+        index = index_of[block_key]
+        for field_name, value in block_data.fields.iteritems():
+            field_columns.setdefault(field_name, {})[index] = value
+        for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+            transformer_columns.setdefault(transformer_name, {})[index] = transformer_data.fields
+
+    sections = [
+        (_KEYS_SECTION, _encode(block_keys)),
+        (_CHILDREN_OFFSETS_SECTION, offsets.tostring()),
+        (_CHILDREN_INDICES_SECTION, indices.tostring()),
+        (_TRANSFORMER_DATA_SECTION, _encode(dict(block_structure.transformer_data))),
+    ]
+    sections.extend(
+        (_FIELD_SECTION_PREFIX + field_name, _encode(column))
+        for field_name, column in sorted(field_columns.iteritems())
+    )
+    sections.extend(
+        (_TRANSFORMER_SECTION_PREFIX + transformer_name, _encode(column))
+        for transformer_name, column in sorted(transformer_columns.iteritems())
+    )
+    return _pack(sections)
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Returns the block structure parsed from the given data in
+    the columnar format.
+
+    Arguments:
+        serialized_data (buffer) - Data previously returned by
+            serialize, or a buffer (such as an mmap) containing it.
+
+        root_block_usage_key (UsageKey) - The usage_key for the root
+            of the block structure.
+
+    Raises:
+        ColumnarFormatError if the data is not in a readable columnar
+        format.
+    """
+    reader = ColumnarBlockStructureReader(serialized_data)
+
+    block_structure = BlockStructureBlockData(root_block_usage_key)
+    block_structure._block_relations = reader.build_block_relations()
+    block_structure.transformer_data = reader.transformer_data()
+    block_structure._block_data_map = _LazyBlockDataMap(reader)
+    return block_structure
+
+
+class ColumnarBlockStructureReader(object):
+    """
+    Reader for block structures serialized in the columnar format.
+
+    Sections are located through the section directory and decoded
+    lazily, each at most once.
+    """
+    def __init__(self, serialized_data):
+        self._data = serialized_data
+
+        # Map of a section's name to its (offset, length) in the data.
+        # dict {string: (int, int)}
+        self._directory = self._read_directory()
+
+        # Map of a section's name to its decoded value.
+        # dict {string: any type}
+        self._decoded_sections = {}
+
+    @property
+    def block_keys(self):
+        """
+        Returns the table of usage keys, in block index order.
+        """
+        return self._decoded_section(_KEYS_SECTION)
+
+    @property
+    def field_names(self):
+        """
+        Returns the names of the xBlock fields with a stored column.
+        """
+        return self._section_names_with_prefix(_FIELD_SECTION_PREFIX)
+
+    @property
+    def transformer_names(self):
+        """
+        Returns the names of the transformers with stored block data.
+        """
+        return self._section_names_with_prefix(_TRANSFORMER_SECTION_PREFIX)
+
+    def children_adjacency(self):
+        """
+        Returns the (offsets, indices) integer arrays of the
+        structure's children relations.  The children of the block with
+        index i are indices[offsets[i]:offsets[i + 1]].
+        """
+        return (
+            self._decoded_array(_CHILDREN_OFFSETS_SECTION),
+            self._decoded_array(_CHILDREN_INDICES_SECTION),
+        )
+
+    def build_block_relations(self):
+        """
+        Returns the structure's relations as a map of usage key
+        to _BlockRelations.
+        """
+        block_keys = self.block_keys
+        offsets, indices = self.children_adjacency()
+
+        block_relations = {}
+        for block_key in block_keys:
+            block_relations[block_key] = _BlockRelations()
+
+        for parent_index, parent_key in enumerate(block_keys):
+            parent_relations = block_relations[parent_key]
+            for child_index in indices[offsets[parent_index]:offsets[parent_index + 1]]:
+                child_key = block_keys[child_index]
+                parent_relations.children.append(child_key)
+                block_relations[child_key].parents.append(parent_key)
+        return block_relations
+
+    def transformer_data(self):
+        """
+        Returns a new TransformerDataMap with the structure-wide
+        transformer data.
+        """
+        return TransformerDataMap(self._decoded_section(_TRANSFORMER_DATA_SECTION))
+
+    def field_column(self, field_name):
+        """
+        Returns the column of values for the given xBlock field as
+        a map of block index to value.  Returns an empty map if the
+        field was not collected.
+        """
+        return self._decoded_section(_FIELD_SECTION_PREFIX + field_name, default={})
+
+    def transformer_column(self, transformer_name):
+        """
+        Returns the block-specific data of the given transformer as a
+        map of block index to a dict of the transformer's fields.
+        """
+        return self._decoded_section(_TRANSFORMER_SECTION_PREFIX + transformer_name, default={})
+
+    def _section_names_with_prefix(self, prefix):
+        """
+        Returns the names of sections with the given prefix, with the
+        prefix removed.
+        """
+        return [name[len(prefix):] for name in self._directory if name.startswith(prefix)]
+
+    def _raw_section(self, name):
+        """
+        Returns the undecoded bytes of the given section.
+        """
+        offset, length = self._directory[name]
+        return self._data[offset:offset + length]
+
+    def _decoded_section(self, name, default=None):
+        """
+        Returns the decoded value of the given pickled section,
+        decoding it if not already decoded.
+        """
+        if name not in self._directory:
+            return default
+        if name not in self._decoded_sections:
+            self._decoded_sections[name] = _decode(self._raw_section(name))
+        return self._decoded_sections[name]
+
+    def _decoded_array(self, name):
+        """
+        Returns the decoded integer array of the given section,
+        decoding it if not already decoded.
+        """
+        if name not in self._decoded_sections:
+            decoded = array(_ARRAY_TYPECODE)
+            decoded.fromstring(self._raw_section(name))
+            self._decoded_sections[name] = decoded
+        return self._decoded_sections[name]
+
+    def _read_directory(self):
+        """
+        Parses the header and the section directory of the data.
+        """
+        if len(self._data) < _HEADER.size:
+            raise ColumnarFormatError('Serialized data is too short to contain a header.')
+
+        magic, version, num_sections = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ColumnarFormatError('Serialized data is not in the columnar format.')
+        if version != FORMAT_VERSION:
+            raise ColumnarFormatError(
+                'Unsupported columnar format version {}; expected {}.'.format(version, FORMAT_VERSION)
+            )
+
+        directory = {}
+        position = _HEADER.size
+        for _ in xrange(num_sections):
+            name_length, offset, length = _DIRECTORY_ENTRY.unpack_from(self._data, position)
+            position += _DIRECTORY_ENTRY.size
+            name = self._data[position:position + name_length].decode('utf-8')
+            position += name_length
+            directory[name] = (offset, length)
+        return directory
+
+
+class _ColumnarBlockData(BlockData):
+    """
+    BlockData whose xBlock fields are read lazily from the columns
+    of a ColumnarBlockStructureReader.
+    """
+    def class_field_names(self):
+        return super(_ColumnarBlockData, self).class_field_names() + ['_reader', '_index', '_removed_fields']
+
+    def __init__(self, usage_key, reader, index):
+        super(_ColumnarBlockData, self).__init__(usage_key)
+        self._reader = reader
+        self._index = index
+
+        # Set of names of fields deleted from this block, which are
+        # not to be read again from the reader's columns.
+        self._removed_fields = set()
+
+    def __getattr__(self, field_name):
+        if self._is_own_field(field_name):
+            raise AttributeError("Field {0} does not exist".format(field_name))
+        if field_name in self.fields:
+            return self.fields[field_name]
+        if field_name not in self._removed_fields:
+            column = self._reader.field_column(field_name)
+            if self._index in column:
+                self.fields[field_name] = column[self._index]
+                return self.fields[field_name]
+        raise AttributeError("Field {0} does not exist".format(field_name))
+
+    def __delattr__(self, field_name):
+        if not self._is_own_field(field_name):
+            getattr(self, field_name)
+            self._removed_fields.add(field_name)
+        super(_ColumnarBlockData, self).__delattr__(field_name)
+
+    def to_block_data(self):
+        """
+        Returns a plain BlockData with a copy of all of this block's data.
+        """
+        block_data = BlockData(self.location)
+        for field_name in self._reader.field_names:
+            if field_name not in self._removed_fields and self._index in self._reader.field_column(field_name):
+                block_data.fields[field_name] = self._reader.field_column(field_name)[self._index]
+        block_data.fields.update(self.fields)
+        block_data.transformer_data = self.transformer_data
+        return block_data
+
+    def __reduce__(self):
+        """
+        Pickles (and copies) as a plain BlockData so the reader
+        is not carried along.
+        """
+        return self.to_block_data().__reduce_ex__(1)
+
+
+class _LazyBlockDataMap(dict):
+    """
+    Map of a block's usage key to its BlockData that materializes each
+    BlockData from a ColumnarBlockStructureReader on first access.
+    """
+    def __init__(self, reader):
+        super(_LazyBlockDataMap, self).__init__()
+        self._reader = reader
+
+        # Map of usage key to block index for blocks that have not
+        # been materialized nor removed.
+        # dict {UsageKey: int}
+        self._pending = {block_key: index for index, block_key in enumerate(reader.block_keys)}
+
+    def _materialize(self, usage_key):
+        """
+        Creates and stores the BlockData for the given pending usage_key.
+        """
+        index = self._pending.pop(usage_key)
+        block_data = _ColumnarBlockData(usage_key, self._reader, index)
+        for transformer_name in self._reader.transformer_names:
+            column = self._reader.transformer_column(transformer_name)
+            if index in column:
+                transformer_data = TransformerData()
+                transformer_data.fields = dict(column[index])
+                block_data.transformer_data[transformer_name] = transformer_data
+        dict.__setitem__(self, usage_key, block_data)
+        return block_data
+
+    def _materialize_all(self):
+        """
+        Materializes all pending blocks.
+        """
+        for usage_key in self._pending.keys():
+            self._materialize(usage_key)
+
+    def __getitem__(self, usage_key):
+        if usage_key in self._pending:
+            return self._materialize(usage_key)
+        return dict.__getitem__(self, usage_key)
+
+    def __setitem__(self, usage_key, block_data):
+        self._pending.pop(usage_key, None)
+        dict.__setitem__(self, usage_key, block_data)
+
+    def __delitem__(self, usage_key):
+        if self._pending.pop(usage_key, None) is None:
+            dict.__delitem__(self, usage_key)
+
+    def __contains__(self, usage_key):
+        return usage_key in self._pending or dict.__contains__(self, usage_key)
+
+    def __len__(self):
+        return len(self._pending) + dict.__len__(self)
+
+    def __iter__(self):
+        return self.iterkeys()
+
+    def get(self, usage_key, default=None):
+        return self[usage_key] if usage_key in self else default
+
+    def pop(self, usage_key, *args):
+        if usage_key in self._pending:
+            self._materialize(usage_key)
+        return dict.pop(self, usage_key, *args)
+
+    def iterkeys(self):
+        self._materialize_all()
+        return dict.iterkeys(self)
+
+    def itervalues(self):
+        self._materialize_all()
+        return dict.itervalues(self)
+
+    def iteritems(self):
+        self._materialize_all()
+        return dict.iteritems(self)
+
+    def keys(self):
+        return list(self.iterkeys())
+
+    def values(self):
+        return list(self.itervalues())
+
+    def items(self):
+        return list(self.iteritems())
+
+    def __reduce__(self):
+        """
+        Pickles (and copies) as a plain dict of plain BlockData.
+        """
+        return dict, (self.items(),)
+
+
+def _encode(value):
+    """
+    Returns the compressed pickled encoding of the given value.
+    """
+    return zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _decode(data):
+    """
+    Returns the value decoded from the given compressed pickled data.
+    """
+    return pickle.loads(zlib.decompress(data))
+
+
+def _pack(sections):
+    """
+    Returns the header, section directory and section data for the
+    given list of (name, bytes) sections.
+    """
+    encoded_names = [name.encode('utf-8') for name, _ in sections]
+    offset = _HEADER.size + sum(_DIRECTORY_ENTRY.size + len(name) for name in encoded_names)
+
+    directory = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(sections))]
+    for encoded_name, (_, section_data) in zip(encoded_names, sections):
+        directory.append(_DIRECTORY_ENTRY.pack(len(encoded_name), offset, len(section_data)))
+        directory.append(encoded_name)
+        offset += len(section_data)
+
+    return ''.join(directory + [section_data for _, section_data in sections])
@@ -32,33 +32,93 @@ class BlockStructureFactory(object):
                 root_block_usage_key is not found in the modulestore.
         """
         block_structure = BlockStructureModulestoreData(root_block_usage_key)
-        blocks_visited = set()
+        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
+        cls._add_xblock_subtree(block_structure, root_xblock, set())
+        return block_structure
 
-        def build_block_structure(xblock):
-            """
-            Recursively update the block structure with the given xBlock
-            and its descendants.
-            """
-            # Check if the xblock was already visited (can happen in
-            # DAGs).
-            if xblock.location in blocks_visited:
-                return
-
-            # Add the xBlock.
-            blocks_visited.add(xblock.location)
-            block_structure._add_xblock(xblock.location, xblock)  # pylint: disable=protected-access
-
-            # Add relations with its children and recurse.
-            for child in xblock.get_children():
-                block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
-                build_block_structure(child)
+    @classmethod
+    def create_partial_from_modulestore(cls, root_block_usage_key, modulestore, subtree_usage_keys, get_parents):
+        """
+        Creates and returns a partial block structure from the modulestore
+        containing the subtrees starting at the given subtree_usage_keys,
+        along with all of the ancestors of their blocks up to
+        root_block_usage_key.
+        Other blocks, including siblings of the ancestors, are excluded.
 
-        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
-        build_block_structure(root_xblock)
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the block structure that is to be created.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the data for the xBlocks within the block
+                structure.
+
+            subtree_usage_keys (set(UsageKey)) - The usage_keys for the
+                roots of the subtrees to include.
+
+            get_parents ((UsageKey)->[UsageKey]) - Function that returns
+                the usage keys of the parents of the given block, used to
+                find the ancestors of each subtree.
+
+        Returns:
+            BlockStructureModulestoreData - The created partial block
+                structure with instantiated xBlocks from the given
+                modulestore.
+        """
+        block_structure = BlockStructureModulestoreData(root_block_usage_key)
+        blocks_visited = set()
+
+        for subtree_usage_key in subtree_usage_keys:
+            subtree_xblock = modulestore.get_item(subtree_usage_key, depth=None, lazy=False)
+            cls._add_xblock_subtree(block_structure, subtree_xblock, blocks_visited)
+
+        # Add the ancestors of the subtrees, without their other children.
+        # In DAGs, blocks within a subtree may also have parents outside of
+        # it, which are added along with their ancestors.
+        subtree_blocks = set(blocks_visited)
+        relations_visited = set()
+        ancestors_to_visit = list(subtree_blocks)
+        while ancestors_to_visit:
+            child_key = ancestors_to_visit.pop()
+            for parent_key in get_parents(child_key):
+                if parent_key in subtree_blocks or (parent_key, child_key) in relations_visited:
+                    continue
+                relations_visited.add((parent_key, child_key))
+                block_structure._add_relation(parent_key, child_key)  # pylint: disable=protected-access
+                if parent_key not in blocks_visited:
+                    blocks_visited.add(parent_key)
+                    block_structure._add_xblock(parent_key, modulestore.get_item(parent_key))  # pylint: disable=protected-access
+                    ancestors_to_visit.append(parent_key)
+
+        if root_block_usage_key not in blocks_visited:
+            block_structure._add_xblock(  # pylint: disable=protected-access
+                root_block_usage_key,
+                modulestore.get_item(root_block_usage_key),
+            )
         return block_structure
 
     @classmethod
-    def create_from_store(cls, root_block_usage_key, block_structure_store):
+    def _add_xblock_subtree(cls, block_structure, xblock, blocks_visited):
+        """
+        Recursively updates the block structure with the given xBlock
+        and its descendants, skipping any in blocks_visited.
+        """
+        # Check if the xblock was already visited (can happen in
+        # DAGs).
+        if xblock.location in blocks_visited:
+            return
+
+        # Add the xBlock.
+        blocks_visited.add(xblock.location)
+        block_structure._add_xblock(xblock.location, xblock)  # pylint: disable=protected-access
+
+        # Add relations with its children and recurse.
+        for child in xblock.get_children():
+            block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
+            cls._add_xblock_subtree(block_structure, child, blocks_visited)
+
+    @classmethod
+    def create_from_store(cls, root_block_usage_key, block_structure_store, indexed=False):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given store, if it's found in the store.
@@ -75,6 +135,9 @@ class BlockStructureFactory(object):
                 store from which the block structure is to be
                 deserialized.
 
+            indexed (bool) - Whether to return the block structure as
+                an IndexedBlockStructureBlockData.
+
         Returns:
             BlockStructure - The deserialized block structure starting
                 at root_block_usage_key, if found in the cache.
@@ -83,7 +146,7 @@ class BlockStructureFactory(object):
             BlockStructureNotFound - If the root_block_usage_key is not found
                 in the store.
         """
-        return block_structure_store.get(root_block_usage_key)
+        return block_structure_store.get(root_block_usage_key, indexed=indexed)
 
     @classmethod
     def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map):
@@ -0,0 +1,662 @@
+"""
+Module for an integer-indexed implementation of BlockStructureBlockData.
+
+IndexedBlockStructureBlockData provides the same interface as
+BlockStructureBlockData, but internally assigns each block a dense
+integer index.  Relations are stored as lists of integer indices, and
+xBlock fields and transformer block fields are stored in per-field
+columns indexed by block, rather than in per-block dicts keyed by
+usage keys.  Relation updates and traversals then operate on integers,
+avoiding repeated hashing of usage keys.
+
+BlockData objects are replaced by lightweight __slots__ views onto the
+columns, which support the same attribute access as BlockData.
+
+Since the per-block data is held in a small number of columns, copies
+made with copy_on_write share the columns of the original, and a column
+is only copied once either of them writes to it.
+"""
+# pylint: disable=protected-access
+from copy import deepcopy
+
+from openedx.core.lib.graph_traversals import traverse_topologically, traverse_post_order
+
+from .block_structure import BlockStructureBlockData, TransformerDataMap
+
+
+# Sentinel for a field that has no value for a block.
+_MISSING = object()
+
+
+def _transformer_name(transformer):
+    """
+    Returns the name of the given transformer, which may be given
+    either as the transformer's class or name.
+    """
+    try:
+        return transformer.name()
+    except AttributeError:
+        return transformer
+
+
+class _ColumnsView(object):
+    """
+    Attribute access onto a single block's values in a map of columns.
+    Base class for the views that stand in for FieldData objects.
+    """
+    __slots__ = ('_structure', '_columns', '_index')
+
+    def __init__(self, structure, columns, index):
+        object.__setattr__(self, '_structure', structure)
+        object.__setattr__(self, '_columns', columns)
+        object.__setattr__(self, '_index', index)
+
+    @property
+    def fields(self):
+        """
+        Returns a dict of the field names and values set for this block.
+        """
+        return {
+            field_name: column[self._index]
+            for field_name, column in self._columns.iteritems()
+            if column[self._index] is not _MISSING
+        }
+
+    def __getattr__(self, field_name):
+        column = self._columns.get(field_name)
+        if column is None or column[self._index] is _MISSING:
+            raise AttributeError("Field {0} does not exist".format(field_name))
+        return column[self._index]
+
+    def __setattr__(self, field_name, field_value):
+        self._structure._column(self._columns, field_name)[self._index] = field_value
+
+    def __delattr__(self, field_name):
+        column = self._columns.get(field_name)
+        if column is None or column[self._index] is _MISSING:
+            raise KeyError(field_name)
+        self._structure._column(self._columns, field_name)[self._index] = _MISSING
+
+
+class _TransformerDataView(_ColumnsView):
+    """
+    View of a single block's data for a single transformer, standing in
+    for TransformerData.
+    """
+    __slots__ = ()
+
+
+class _TransformerDataMapView(object):
+    """
+    View of a single block's data for all transformers, standing in for
+    TransformerDataMap.
+    """
+    __slots__ = ('_structure', '_index')
+
+    def __init__(self, structure, index):
+        self._structure = structure
+        self._index = index
+
+    def __getitem__(self, transformer):
+        transformer_name = _transformer_name(transformer)
+        if not self._structure._has_transformer_block_data(self._index, transformer_name):
+            raise KeyError(transformer_name)
+        return self._structure._transformer_data_view(self._index, transformer_name)
+
+    def __contains__(self, transformer):
+        return self._structure._has_transformer_block_data(self._index, _transformer_name(transformer))
+
+    def get_or_create(self, transformer):
+        """
+        Returns the data for the given transformer.
+        """
+        return self._structure._transformer_data_view(self._index, _transformer_name(transformer))
+
+    def iteritems(self):
+        """
+        Returns iterator of (transformer name, transformer data) pairs
+        for all transformers with data for this block.
+        """
+        for transformer_name in self._structure._transformer_columns:
+            if self._structure._has_transformer_block_data(self._index, transformer_name):
+                yield transformer_name, self._structure._transformer_data_view(self._index, transformer_name)
+
+
+class _BlockDataView(_ColumnsView):
+    """
+    View of a single block's collected data, standing in for BlockData.
+    """
+    __slots__ = ('location', 'transformer_data')
+
+    def __init__(self, structure, index):
+        super(_BlockDataView, self).__init__(structure, structure._field_columns, index)
+        object.__setattr__(self, 'location', structure._keys[index])
+        object.__setattr__(self, 'transformer_data', _TransformerDataMapView(structure, index))
+
+
+class IndexedBlockStructureBlockData(BlockStructureBlockData):
+    """
+    Integer-indexed implementation of BlockStructureBlockData.
+    """
+    def __init__(self, root_block_usage_key):  # pylint: disable=super-init-not-called
+
+        # List of the usage keys of all blocks, in index order.
+        # list [UsageKey]
+        self._keys = []
+
+        # Map of a block's usage key to its index.
+        # dict {UsageKey: int}
+        self._key_index = {}
+
+        # Lists of indices of each block's parents and children.
+        # list [list [int]]
+        self._parents = []
+        self._children = []
+
+        # Flags of whether each block is in the structure's relations.
+        # bytearray
+        self._in_structure = bytearray()
+
+        # Flags of whether each block has collected data.
+        # bytearray
+        self._has_data = bytearray()
+
+        # Map of an xBlock field's name to its column of values.
+        # dict {string: list [any picklable type]}
+        self._field_columns = {}
+
+        # Map of a transformer's name to the columns of its block data.
+        # dict {string: dict {string: list [any picklable type]}}
+        self._transformer_columns = {}
+
+        # Ids of the columns that are shared with other block
+        # structures by copy_on_write, and so are to be copied before
+        # they are written to.
+        # set {int}
+        self._shared_column_ids = set()
+
+        # Map of a transformer's name to its non-block-specific data.
+        self.transformer_data = TransformerDataMap()
+
+        self._root_index = self._add_block_index(root_block_usage_key)
+        self._in_structure[self._root_index] = 1
+
+    @classmethod
+    def create_from_block_structure(cls, block_structure):
+        """
+        Returns a new IndexedBlockStructureBlockData with the contents of
+        the given BlockStructureBlockData.
+        """
+        indexed = cls(block_structure.root_block_usage_key)
+        for block_key in block_structure.topological_traversal():
+            indexed._add_to_structure(block_key)
+        for block_key in block_structure.get_block_keys():
+            indexed._add_to_structure(block_key)
+        for block_key in block_structure.get_block_keys():
+            for child_key in block_structure.get_children(block_key):
+                indexed._add_relation(block_key, child_key)
+
+        for block_key, block_data in block_structure.iteritems():
+            index = indexed._add_block_index(block_key)
+            indexed._has_data[index] = 1
+            for field_name, value in block_data.fields.iteritems():
+                indexed._field_column(field_name)[index] = value
+            for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+                transformer_columns = indexed._transformer_columns.setdefault(transformer_name, {})
+                for field_name, value in transformer_data.fields.iteritems():
+                    indexed._column(transformer_columns, field_name)[index] = value
+
+        indexed.transformer_data = deepcopy(block_structure.transformer_data)
+        return indexed
+
+    @classmethod
+    def create_from_columnar(cls, reader, root_block_usage_key):
+        """
+        Returns a new IndexedBlockStructureBlockData from the given
+        ColumnarBlockStructureReader, without materializing any
+        per-block objects.
+        """
+        indexed = cls(root_block_usage_key)
+        block_keys = reader.block_keys
+        num_blocks = len(block_keys)
+
+        indexed._keys = list(block_keys)
+        indexed._key_index = {block_key: index for index, block_key in enumerate(block_keys)}
+        indexed._in_structure = bytearray([1]) * num_blocks
+        indexed._has_data = bytearray([1]) * num_blocks
+        indexed._root_index = indexed._key_index[root_block_usage_key]
+
+        offsets, indices = reader.children_adjacency()
+        indexed._children = [list(indices[offsets[index]:offsets[index + 1]]) for index in xrange(num_blocks)]
+        indexed._parents = [[] for _ in xrange(num_blocks)]
+        for parent_index, children in enumerate(indexed._children):
+            for child_index in children:
+                indexed._parents[child_index].append(parent_index)
+
+        for field_name in reader.field_names:
+            indexed._field_columns[field_name] = cls._column_from_map(reader.field_column(field_name), num_blocks)
+
+        for transformer_name in reader.transformer_names:
+            fields_by_index = {}
+            for index, fields in reader.transformer_column(transformer_name).iteritems():
+                for field_name, value in fields.iteritems():
+                    fields_by_index.setdefault(field_name, {})[index] = value
+            indexed._transformer_columns[transformer_name] = {
+                field_name: cls._column_from_map(values_by_index, num_blocks)
+                for field_name, values_by_index in fields_by_index.iteritems()
+            }
+
+        indexed.transformer_data = reader.transformer_data()
+        return indexed
+
+    @property
+    def root_block_usage_key(self):
+        """
+        The usage key of the root block for this structure.
+        """
+        return self._keys[self._root_index]
+
+    def __len__(self):
+        return sum(self._in_structure)
+
+    #--- Block structure relation methods ---#
+
+    def get_parents(self, usage_key):
+        index = self._structure_index(usage_key)
+        return [self._keys[parent] for parent in self._parents[index]] if index is not None else []
+
+    def get_children(self, usage_key):
+        index = self._structure_index(usage_key)
+        return [self._keys[child] for child in self._children[index]] if index is not None else []
+
+    def set_root_block(self, usage_key):
+        self._root_index = self._key_index[usage_key]
+        self._parents[self._root_index] = []
+
+    def __contains__(self, usage_key):
+        return self._structure_index(usage_key) is not None
+
+    def get_block_keys(self):
+        return (self._keys[index] for index in self._iter_structure_indices())
+
+    #--- Block structure traversal methods ---#
+
+    def topological_traversal(
+            self,
+            filter_func=None,
+            yield_descendants_of_unyielded=False,
+            start_node=None,
+    ):
+        keys = self._keys
+        return (
+            keys[index]
+            for index in traverse_topologically(
+                start_node=self._key_index[start_node] if start_node else self._root_index,
+                get_parents=self._parents.__getitem__,
+                get_children=self._children.__getitem__,
+                filter_func=(lambda index: filter_func(keys[index])) if filter_func else None,
+                yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+            )
+        )
+
+    def post_order_traversal(
+            self,
+            filter_func=None,
+            start_node=None,
+    ):
+        keys = self._keys
+        return (
+            keys[index]
+            for index in traverse_post_order(
+                start_node=self._key_index[start_node] if start_node else self._root_index,
+                get_children=self._children.__getitem__,
+                filter_func=(lambda index: filter_func(keys[index])) if filter_func else None,
+            )
+        )
+
+    #--- Block data methods ---#
+
+    def copy(self):
+        """
+        Returns a new instance of IndexedBlockStructureBlockData with a
+        deep-copy of this instance's contents.
+        """
+        new_copy = self._copy_relations()
+        new_copy._field_columns = deepcopy(self._field_columns)
+        new_copy._transformer_columns = deepcopy(self._transformer_columns)
+        new_copy._shared_column_ids = set()
+        return new_copy
+
+    def copy_on_write(self):
+        """
+        Returns a new instance of IndexedBlockStructureBlockData with the
+        same contents as this instance, which shares the columns of
+        block data with this instance until either of them writes to
+        them.
+
+        The block relations and the non-block-specific transformer data
+        are copied, as they are comparatively small.
+        """
+        new_copy = self._copy_relations()
+        new_copy._field_columns = dict(self._field_columns)
+        new_copy._transformer_columns = {
+            transformer_name: dict(transformer_columns)
+            for transformer_name, transformer_columns in self._transformer_columns.iteritems()
+        }
+
+        shared_column_ids = {id(column) for column in self._iter_columns()}
+        self._shared_column_ids |= shared_column_ids
+        new_copy._shared_column_ids = shared_column_ids
+        return new_copy
+
+    def iteritems(self):
+        for index in self._iter_data_indices():
+            yield self._keys[index], _BlockDataView(self, index)
+
+    def itervalues(self):
+        for index in self._iter_data_indices():
+            yield _BlockDataView(self, index)
+
+    def __getitem__(self, usage_key):
+        index = self._key_index.get(usage_key)
+        if index is None or not self._has_data[index]:
+            raise KeyError(usage_key)
+        return _BlockDataView(self, index)
+
+    def get_xblock_field(self, usage_key, field_name, default=None):
+        index = self._key_index.get(usage_key)
+        column = self._field_columns.get(field_name)
+        if index is None or column is None or not self._has_data[index]:
+            return default
+        value = column[index]
+        return default if value is _MISSING else value
+
+    def get_xblock_field_values(self, usage_keys, field_name, default=None):
+        return self._column_values(self._field_columns.get(field_name), usage_keys, default)
+
+    def override_xblock_field(self, usage_key, field_name, override_data):
+        self._field_column(field_name)[self._key_index[usage_key]] = override_data
+
+    def get_transformer_block_data(self, usage_key, transformer):
+        return self[usage_key].transformer_data[transformer]
+
+    def get_transformer_block_field(self, usage_key, transformer, key, default=None):
+        index = self._key_index.get(usage_key)
+        if index is None or not self._has_data[index]:
+            return default
+        column = self._transformer_columns.get(_transformer_name(transformer), {}).get(key)
+        if column is None:
+            return default
+        value = column[index]
+        return default if value is _MISSING else value
+
+    def get_transformer_block_field_values(self, usage_keys, transformer, key, default=None):
+        column = self._transformer_columns.get(_transformer_name(transformer), {}).get(key)
+        return self._column_values(column, usage_keys, default)
+
+    def set_transformer_block_field(self, usage_key, transformer, key, value):
+        index = self._add_block_index(usage_key)
+        self._has_data[index] = 1
+        transformer_columns = self._transformer_columns.setdefault(_transformer_name(transformer), {})
+        self._column(transformer_columns, key)[index] = value
+
+    def remove_transformer_block_field(self, usage_key, transformer, key):
+        index = self._key_index.get(usage_key)
+        transformer_columns = self._transformer_columns.get(_transformer_name(transformer), {})
+        if index is not None and key in transformer_columns:
+            self._column(transformer_columns, key)[index] = _MISSING
+
+    def remove_block(self, usage_key, keep_descendants):
+        index = self._key_index[usage_key]
+        if not self._in_structure[index]:
+            raise KeyError(usage_key)
+        children = self._children[index]
+        parents = self._parents[index]
+
+        # Remove block from its children.
+        for child in children:
+            self._parents[child].remove(index)
+
+        # Remove block from its parents.
+        for parent in parents:
+            self._children[parent].remove(index)
+
+        # Remove block.
+        self._children[index] = []
+        self._parents[index] = []
+        self._in_structure[index] = 0
+        self._has_data[index] = 0
+
+        # Recreate the graph connections if descendants are to be kept.
+        if keep_descendants:
+            for child in children:
+                for parent in parents:
+                    self._add_index_relation(parent, child)
+
+    #--- Internal methods ---#
+    # To be used within the block_structure framework or by tests.
+
+    def _prune_unreachable(self):
+        reachable = bytearray(len(self._keys))
+        for index in traverse_post_order(start_node=self._root_index, get_children=self._children.__getitem__):
+            reachable[index] = 1
+
+        for index in xrange(len(self._keys)):
+            if reachable[index]:
+                self._children[index] = [child for child in self._children[index] if reachable[child]]
+                self._parents[index] = [parent for parent in self._parents[index] if reachable[parent]]
+            else:
+                self._children[index] = []
+                self._parents[index] = []
+        self._in_structure = reachable
+
+    def _replace_subtrees(self, partial_block_structure, subtree_usage_keys):
+        # Detach the blocks of the current subtrees from their children.
+        for subtree_usage_key in subtree_usage_keys:
+            for index in list(traverse_post_order(
+                    start_node=self._key_index[subtree_usage_key],
+                    get_children=self._children.__getitem__,
+            )):
+                for child in self._children[index]:
+                    self._parents[child].remove(index)
+                self._children[index] = []
+
+        # Attach the blocks of the new subtrees to their children.
+        for subtree_usage_key in subtree_usage_keys:
+            for block_key in partial_block_structure.post_order_traversal(start_node=subtree_usage_key):
+                for child_key in partial_block_structure.get_children(block_key):
+                    self._add_relation(block_key, child_key)
+
+        # Skip any block data that transformers set for blocks outside of
+        # the partial block structure, such as the other children of its
+        # ancestors.
+        for block_key, block_data in partial_block_structure.iteritems():
+            if block_key in partial_block_structure:
+                self._replace_block_data(self._add_block_index(block_key), block_data)
+        self.transformer_data = partial_block_structure.transformer_data
+
+        self._prune_unreachable()
+        for index in xrange(len(self._keys)):
+            if not self._in_structure[index]:
+                self._has_data[index] = 0
+
+    def _replace_block_data(self, index, block_data):
+        """
+        Replaces the xBlock fields and transformer block data of the
+        block with the given index with those of the given block data.
+        """
+        for columns in [self._field_columns] + self._transformer_columns.values():
+            for field_name, column in columns.items():
+                if column[index] is not _MISSING:
+                    self._column(columns, field_name)[index] = _MISSING
+
+        self._has_data[index] = 1
+        for field_name, value in block_data.fields.iteritems():
+            self._field_column(field_name)[index] = value
+        for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+            transformer_columns = self._transformer_columns.setdefault(transformer_name, {})
+            for field_name, value in transformer_data.fields.iteritems():
+                self._column(transformer_columns, field_name)[index] = value
+
+    def _add_relation(self, parent_key, child_key):
+        self._add_index_relation(self._add_to_structure(parent_key), self._add_to_structure(child_key))
+
+    def _add_index_relation(self, parent_index, child_index):
+        """
+        Adds a parent to child relationship between the blocks
+        with the given indices.
+        """
+        self._parents[child_index].append(parent_index)
+        self._children[parent_index].append(child_index)
+
+    def _get_or_create_block(self, usage_key):
+        index = self._add_block_index(usage_key)
+        self._has_data[index] = 1
+        return _BlockDataView(self, index)
+
+    def _add_to_structure(self, usage_key):
+        """
+        Adds the given usage_key to this block structure's relations,
+        returning its index.
+        """
+        index = self._add_block_index(usage_key)
+        self._in_structure[index] = 1
+        return index
+
+    def _add_block_index(self, usage_key):
+        """
+        Returns the index of the given usage_key, assigning it the next
+        index if it is not yet indexed.
+        """
+        index = self._key_index.get(usage_key)
+        if index is None:
+            index = len(self._keys)
+            self._keys.append(usage_key)
+            self._key_index[usage_key] = index
+            self._parents.append([])
+            self._children.append([])
+            self._in_structure.append(0)
+            self._has_data.append(0)
+            for columns in [self._field_columns] + self._transformer_columns.values():
+                for field_name in columns:
+                    self._column(columns, field_name).append(_MISSING)
+        return index
+
+    def _copy_relations(self):
+        """
+        Returns a new instance of IndexedBlockStructureBlockData with a
+        copy of this instance's keys, relations and non-block-specific
+        transformer data, but without any columns of block data.
+        """
+        new_copy = IndexedBlockStructureBlockData.__new__(IndexedBlockStructureBlockData)
+        new_copy._keys = list(self._keys)
+        new_copy._key_index = dict(self._key_index)
+        new_copy._parents = [list(parents) for parents in self._parents]
+        new_copy._children = [list(children) for children in self._children]
+        new_copy._in_structure = bytearray(self._in_structure)
+        new_copy._has_data = bytearray(self._has_data)
+        new_copy.transformer_data = deepcopy(self.transformer_data)
+        new_copy._root_index = self._root_index
+        return new_copy
+
+    def _structure_index(self, usage_key):
+        """
+        Returns the index of the given usage_key if the block is in this
+        block structure's relations, else None.
+        """
+        index = self._key_index.get(usage_key)
+        return index if index is not None and self._in_structure[index] else None
+
+    def _iter_structure_indices(self):
+        """
+        Returns iterator of the indices of blocks in this block
+        structure's relations.
+        """
+        return (index for index, in_structure in enumerate(self._in_structure) if in_structure)
+
+    def _iter_data_indices(self):
+        """
+        Returns iterator of the indices of blocks with collected data.
+        """
+        return (index for index, has_data in enumerate(self._has_data) if has_data)
+
+    def _field_column(self, field_name):
+        """
+        Returns the column for the given xBlock field, for writing to.
+        """
+        return self._column(self._field_columns, field_name)
+
+    def _column(self, columns, field_name):
+        """
+        Returns the column for the given field in the given map of
+        columns, for writing to.  The column is created if needed, and
+        copied if it is shared with another block structure.
+        """
+        column = columns.get(field_name)
+        if column is None:
+            column = columns[field_name] = [_MISSING] * len(self._keys)
+        elif self._shared_column_ids and id(column) in self._shared_column_ids:
+            self._shared_column_ids.discard(id(column))
+            column = columns[field_name] = list(column)
+        return column
+
+    def _iter_columns(self):
+        """
+        Returns iterator of all columns of xBlock fields and transformer
+        block fields.
+        """
+        for column in self._field_columns.itervalues():
+            yield column
+        for transformer_columns in self._transformer_columns.itervalues():
+            for column in transformer_columns.itervalues():
+                yield column
+
+    def _column_values(self, column, usage_keys, default):
+        """
+        Returns a list of the values in the given column for the given
+        blocks, substituting default for missing values.
+        """
+        if column is None:
+            return [default] * len(usage_keys)
+        key_index = self._key_index
+        has_data = self._has_data
+        values = []
+        for usage_key in usage_keys:
+            index = key_index.get(usage_key)
+            value = column[index] if index is not None and has_data[index] else _MISSING
+            values.append(default if value is _MISSING else value)
+        return values
+
+    def _has_transformer_block_data(self, index, transformer_name):
+        """
+        Returns whether the block with the given index has any data for
+        the given transformer.
+        """
+        if not self._has_data[index]:
+            return False
+        return any(
+            column[index] is not _MISSING
+            for column in self._transformer_columns.get(transformer_name, {}).itervalues()
+        )
+
+    def _transformer_data_view(self, index, transformer_name):
+        """
+        Returns a view of the given transformer's data for the block with
+        the given index.
+        """
+        return _TransformerDataView(
+            self,
+            self._transformer_columns.setdefault(transformer_name, {}),
+            index,
+        )
+
+    @staticmethod
+    def _column_from_map(values_by_index, num_blocks):
+        """
+        Returns a column of the given length with the values in the
+        given map of block index to value.
+        """
+        column = [_MISSING] * num_blocks
+        for index, value in values_by_index.iteritems():
+            column[index] = value
+        return column
@@ -4,9 +4,12 @@ BlockStructures.
 """
 from contextlib import contextmanager
 
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
 from . import config
 from .exceptions import UsageKeyNotInBlockStructure, TransformerDataIncompatible, BlockStructureNotFound
 from .factory import BlockStructureFactory
+from .indexed import IndexedBlockStructureBlockData
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
@@ -60,7 +63,12 @@ class BlockStructureManager(object):
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        if collected_block_structure:
+            block_structure = collected_block_structure.copy()
+        else:
+            block_structure = self.get_collected(
+                indexed=config.waffle().is_enabled(config.INDEXED_BLOCK_STRUCTURE),
+            )
 
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
@@ -76,7 +84,7 @@ class BlockStructureManager(object):
         transformers.transform(block_structure)
         return block_structure
 
-    def get_collected(self):
+    def get_collected(self, indexed=False):
         """
         Returns the collected Block Structure for the root_block_usage_key,
         getting block data from the cache and modulestore, as needed.
@@ -85,6 +93,11 @@ class BlockStructureManager(object):
         the modulestore is accessed if needed (at cache miss), and the
         transformers data is collected if needed.
 
+        Arguments:
+            indexed (bool) - Whether to return the block structure as
+                an IndexedBlockStructureBlockData, whose integer-indexed
+                internals are faster to transform.
+
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
@@ -94,6 +107,7 @@ class BlockStructureManager(object):
             block_structure = BlockStructureFactory.create_from_store(
                 self.root_block_usage_key,
                 self.store,
+                indexed=indexed,
             )
             BlockStructureTransformers.verify_versions(block_structure)
 
@@ -102,6 +116,8 @@ class BlockStructureManager(object):
                 raise
             else:
                 block_structure = self._update_collected()
+                if indexed:
+                    block_structure = IndexedBlockStructureBlockData.create_from_block_structure(block_structure)
 
         return block_structure
 
@@ -112,7 +128,8 @@ class BlockStructureManager(object):
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                if self._update_collected_incrementally() is None:
+                    self._update_collected()
 
     def _update_collected(self):
         """
@@ -128,6 +145,83 @@ class BlockStructureManager(object):
             self.store.add(block_structure)
             return block_structure
 
+    def _update_collected_incrementally(self):
+        """
+        The store is updated with newly collected transformers data for
+        only those blocks that changed in the modulestore since the
+        stored block structure was collected, along with their
+        descendants and ancestors.
+
+        Returns:
+            BlockStructureBlockData - The updated collected block
+                structure, or None if an incremental update is not
+                possible and a full collect is needed instead.
+        """
+        if not config.waffle().is_enabled(config.INCREMENTAL_COLLECT):
+            return None
+
+        if not BlockStructureTransformers.supports_incremental_collect():
+            return None
+
+        previous_version = self.store.get_collected_data_version(self.root_block_usage_key)
+        if previous_version is None:
+            return None
+
+        with self._bulk_operations():
+            try:
+                block_structure = self.store.get(self.root_block_usage_key)
+                BlockStructureTransformers.verify_versions(block_structure)
+                changed_keys, _ = self.modulestore.get_changed_blocks_since_version(
+                    self.root_block_usage_key.course_key,
+                    previous_version,
+                )
+            except (BlockStructureNotFound, TransformerDataIncompatible, ItemNotFoundError, NotImplementedError):
+                return None
+
+            if self.root_block_usage_key in changed_keys:
+                return None
+
+            subtree_keys = self._get_changed_subtree_roots(block_structure, changed_keys)
+            partial_block_structure = BlockStructureFactory.create_partial_from_modulestore(
+                self.root_block_usage_key,
+                self.modulestore,
+                subtree_keys,
+                block_structure.get_parents,
+            )
+            BlockStructureTransformers.collect(partial_block_structure)
+            block_structure._replace_subtrees(partial_block_structure, subtree_keys)  # pylint: disable=protected-access
+            self.store.add(block_structure)
+            return block_structure
+
+    @staticmethod
+    def _get_changed_subtree_roots(block_structure, changed_keys):
+        """
+        Returns the changed blocks in the given block structure that
+        have no changed ancestors.  Changed blocks that are not in the
+        block structure are either orphans or are new blocks, which are
+        children of changed blocks.
+        """
+        def has_changed_ancestor(block_key):
+            """
+            Returns whether any ancestor of the given block is changed.
+            """
+            visited = set()
+            to_visit = list(block_structure.get_parents(block_key))
+            while to_visit:
+                ancestor_key = to_visit.pop()
+                if ancestor_key in changed_keys:
+                    return True
+                if ancestor_key not in visited:
+                    visited.add(ancestor_key)
+                    to_visit.extend(block_structure.get_parents(ancestor_key))
+            return False
+
+        return {
+            block_key
+            for block_key in changed_keys
+            if block_key in block_structure and not has_changed_ancestor(block_key)
+        }
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
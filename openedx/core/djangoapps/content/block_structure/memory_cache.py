@@ -0,0 +1,167 @@
+"""
+Module for the in-process cache of collected BlockStructure objects.
+
+The Django cache and storage backing of the BlockStructureStore are
+shared across processes, but every read from them has to deserialize
+the block structure anew.  BlockStructureMemoryCache is a size-bounded
+LRU cache, local to the process, of deserialized collected block
+structures.  The cached structures are never modified; readers are
+handed copy-on-write views of them instead.
+"""
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+from threading import Lock
+
+from django.conf import settings
+
+from openedx.core.djangoapps.monitoring_utils import increment, set_custom_metric
+
+
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Default maximum total size, in bytes, of the cached block structures.
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+_CacheEntry = namedtuple('_CacheEntry', ['block_structure', 'size'])
+
+
+class BlockStructureMemoryCache(object):
+    """
+    A least-recently-used cache of collected block structures, bounded
+    by the total size of its entries.
+
+    The size of an entry is approximated by the size of the serialized
+    data from which its block structure was deserialized, which is
+    known without walking the structure.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int) - The maximum total size of the entries in
+                the cache.  Least recently used entries are evicted to
+                stay within it.
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """
+        The total size of the entries in the cache.
+        """
+        return self._size
+
+    def get(self, cache_key):
+        """
+        Returns the cached block structure for the given cache_key, or
+        None if it is not cached.  The returned block structure must
+        not be modified.
+        """
+        with self._lock:
+            entry = self._entries.pop(cache_key, None)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries[cache_key] = entry
+                self.hits += 1
+
+        if entry is None:
+            increment('block_structure.memory_cache.miss')
+            return None
+
+        increment('block_structure.memory_cache.hit')
+        return entry.block_structure
+
+    def set(self, cache_key, block_structure, size):
+        """
+        Caches the given block structure for the given cache_key,
+        evicting least recently used entries as needed.  The given
+        block structure must not be modified after it is cached.
+
+        Block structures larger than the maximum size of the cache are
+        not cached.
+        """
+        if size > self.max_size:
+            logger.info("BlockStructure: Too large for memory cache; %s, size: %d", cache_key, size)
+            return
+
+        evicted_keys = []
+        with self._lock:
+            self._remove(cache_key)
+            while self._entries and self._size + size > self.max_size:
+                evicted_key, evicted_entry = self._entries.popitem(last=False)
+                evicted_keys.append(evicted_key)
+                self._size -= evicted_entry.size
+            self._entries[cache_key] = _CacheEntry(block_structure, size)
+            self._size += size
+            self.evictions += len(evicted_keys)
+            total_size = self._size
+
+        for evicted_key in evicted_keys:
+            increment('block_structure.memory_cache.eviction')
+            logger.info("BlockStructure: Evicted from memory cache; %s.", evicted_key)
+        set_custom_metric('block_structure.memory_cache.size', total_size)
+
+    def delete(self, cache_key):
+        """
+        Removes the entry for the given cache_key, if any.
+        """
+        with self._lock:
+            self._remove(cache_key)
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics of the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dict of the statistics of the cache.
+        """
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                num_entries=len(self._entries),
+                size=self._size,
+                max_size=self.max_size,
+            )
+
+    def _remove(self, cache_key):
+        """
+        Removes the entry for the given cache_key, if any.  Must be
+        called with the lock held.
+        """
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+
+_memory_cache = None  # pylint: disable=invalid-name
+
+
+def get_memory_cache():
+    """
+    Returns the process-wide BlockStructureMemoryCache, creating it
+    with the configured maximum size on first use.
+    """
+    global _memory_cache  # pylint: disable=global-statement
+    if _memory_cache is None:
+        _memory_cache = BlockStructureMemoryCache(
+            settings.BLOCK_STRUCTURES_SETTINGS.get('MEMORY_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE),
+        )
+    return _memory_cache
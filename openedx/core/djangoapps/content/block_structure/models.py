@@ -12,6 +12,7 @@ from logging import getLogger
 
 from model_utils.models import TimeStampedModel
 from openedx.core.djangoapps.xmodule_django.models import UsageKeyWithRunField
+from openedx.core.lib import chunked_storage
 from openedx.core.storage import get_storage
 
 from . import config
@@ -42,6 +43,14 @@ def _directory_name(data_usage_key):
     )
 
 
+def _chunk_directory_name(data_usage_key):
+    """
+    Returns the directory name for the content-addressed
+    chunks of the given data_usage_key.
+    """
+    return _create_path(_directory_name(data_usage_key), 'chunks')
+
+
 def _path_name(bs_model, filename):  # pylint:disable=unused-argument
     """
     Returns path name to use for the given
@@ -172,6 +181,8 @@ class BlockStructureModel(TimeStampedModel):
         operation = u'Read'
         with _storage_error_handling(self, operation, is_read_operation=True):
             serialized_data = self.data.read()
+            if chunked_storage.is_manifest(serialized_data):
+                serialized_data = self._read_chunks(chunked_storage.Manifest.deserialize(serialized_data))
 
         self._log(self, operation, serialized_data)
         return serialized_data
@@ -197,13 +208,18 @@ class BlockStructureModel(TimeStampedModel):
         uploading serialized_data as the content data.
         """
         # Use an atomic transaction so the model isn't updated
-        # unless the file is successfully persisted.
+        # unless the file is successfully persisted, and so that
+        # its row stays locked against _prune_files until then.
         with transaction.atomic():
             bs_model, created = cls.objects.update_or_create(defaults=kwargs, data_usage_key=data_usage_key)
             operation = u'Created' if created else u'Updated'
 
             with _storage_error_handling(bs_model, operation):
-                bs_model.data.save('', ContentFile(serialized_data))
+                if config.waffle().is_enabled(config.CHUNKED_STORAGE):
+                    manifest = cls._write_chunks(data_usage_key, serialized_data)
+                    bs_model.data.save('', ContentFile(manifest.serialize()))
+                else:
+                    bs_model.data.save('', ContentFile(serialized_data))
 
         cls._log(bs_model, operation, serialized_data)
 
@@ -221,6 +237,78 @@ class BlockStructureModel(TimeStampedModel):
             for field_name in self.UNIQUENESS_FIELDS
         )
 
+    def _read_chunks(self, manifest):
+        """
+        Returns the data of the given manifest, reassembled from its
+        chunks, which are read concurrently from storage.
+
+        Raises:
+            IOError if any of the chunks is not found.
+        """
+        storage = _bs_model_storage()
+        directory = _chunk_directory_name(self.data_usage_key)
+
+        def _read_chunk(digest):
+            """
+            Returns the given chunk's content, read from storage.
+            """
+            with storage.open(_create_path(directory, digest)) as chunk_file:
+                return chunk_file.read()
+
+        digests = sorted(set(manifest.digests))
+        chunks = chunked_storage.map_concurrently(_read_chunk, digests, self._max_chunk_workers())
+        try:
+            return chunked_storage.assemble(manifest, dict(zip(digests, chunks)))
+        except chunked_storage.MissingChunksError as error:
+            raise IOError(unicode(error))
+
+    @classmethod
+    def _write_chunks(cls, data_usage_key, serialized_data):
+        """
+        Splits the given serialized_data into content-addressed chunks,
+        concurrently writing to storage only those chunks not already
+        stored for previous versions of the data.
+
+        Returns:
+            Manifest - The manifest of the chunks of the data.
+        """
+        manifest, chunks_by_digest = chunked_storage.split(
+            serialized_data,
+            settings.BLOCK_STRUCTURES_SETTINGS.get(
+                'AVERAGE_CHUNK_SIZE',
+                chunked_storage.DEFAULT_AVERAGE_CHUNK_SIZE,
+            ),
+        )
+        storage = _bs_model_storage()
+        directory = _chunk_directory_name(data_usage_key)
+
+        def _write_chunk(digest):
+            """
+            Writes the given chunk to storage, if not already stored.
+            Returns whether it was written.
+            """
+            path = _create_path(directory, digest)
+            if storage.exists(path):
+                return False
+            storage.save(path, ContentFile(chunks_by_digest[digest]))
+            return True
+
+        written = chunked_storage.map_concurrently(_write_chunk, chunks_by_digest, cls._max_chunk_workers())
+        log.info(
+            u'BlockStructure: Wrote %d out of %d distinct chunks to store; data_usage_key: %s.',
+            sum(written),
+            len(chunks_by_digest),
+            data_usage_key,
+        )
+        return manifest
+
+    @staticmethod
+    def _max_chunk_workers():
+        """
+        Returns the maximum number of chunks to read or write concurrently.
+        """
+        return settings.BLOCK_STRUCTURES_SETTINGS.get('CHUNK_WORKERS', chunked_storage.DEFAULT_MAX_WORKERS)
+
     @classmethod
     def _prune_files(cls, data_usage_key, num_to_keep=None):
         """
@@ -233,9 +321,16 @@ class BlockStructureModel(TimeStampedModel):
             num_to_keep = config.num_versions_to_keep()
 
         try:
-            all_files_by_date = sorted(cls._get_all_files(data_usage_key))
-            files_to_delete = all_files_by_date[:-num_to_keep] if num_to_keep > 0 else all_files_by_date
-            cls._delete_files(files_to_delete)
+            # Lock the entry for data_usage_key, as update_or_create does
+            # from before it checks for existing chunks until its manifest
+            # is saved, so that the files are listed only while no save
+            # is relying on chunks that its manifest does not yet name.
+            with transaction.atomic():
+                list(cls.objects.select_for_update().filter(data_usage_key=data_usage_key))
+                all_files_by_date = sorted(cls._get_all_files(data_usage_key))
+                files_to_delete = all_files_by_date[:-num_to_keep] if num_to_keep > 0 else all_files_by_date
+                cls._delete_files(files_to_delete)
+                cls._prune_chunks(data_usage_key, all_files_by_date[len(files_to_delete):])
             log.info(
                 u'BlockStructure: Deleted %d out of total %d files in store; data_usage_key: %s, num_to_keep: %d.',
                 len(files_to_delete),
@@ -247,6 +342,33 @@ class BlockStructureModel(TimeStampedModel):
         except Exception:  # pylint: disable=broad-except
             log.exception(u'BlockStructure: Exception when deleting old files; data_usage_key: %s.', data_usage_key)
 
+    @classmethod
+    def _prune_chunks(cls, data_usage_key, files_to_keep):
+        """
+        Deletes the chunks for data_usage_key that are not referenced
+        by the manifests in any of the given files.
+        """
+        storage = _bs_model_storage()
+        directory = _chunk_directory_name(data_usage_key)
+        try:
+            _, digests = storage.listdir(directory)
+        except OSError:
+            # No chunks have been stored for data_usage_key.
+            return
+
+        referenced_digests = set()
+        for file_to_keep in files_to_keep:
+            with storage.open(file_to_keep) as stored_file:
+                data = stored_file.read()
+            if chunked_storage.is_manifest(data):
+                referenced_digests.update(chunked_storage.Manifest.deserialize(data).digests)
+
+        cls._delete_files(
+            _create_path(directory, digest)
+            for digest in digests
+            if digest and not digest.startswith('.') and digest not in referenced_digests
+        )
+
     @classmethod
     def _delete_files(cls, files):
         """
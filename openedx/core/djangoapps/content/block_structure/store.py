@@ -5,11 +5,14 @@ Module for the Storage of BlockStructure objects.
 from logging import getLogger
 
 from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.chunked_storage import ChunkedCache
 
-from . import config
+from . import columnar, config
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
+from .indexed import IndexedBlockStructureBlockData
+from .memory_cache import get_memory_cache
 from .models import BlockStructureModel
 from .transformer_registry import TransformerRegistry
 
@@ -48,6 +51,7 @@ class BlockStructureStore(object):
                 is to be serialized.
         """
         self._cache = cache
+        self._chunked_cache = ChunkedCache(cache)
 
     def add(self, block_structure):
         """
@@ -66,7 +70,7 @@ class BlockStructureStore(object):
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, indexed=False):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key, if found in the cache or storage.
@@ -79,6 +83,12 @@ class BlockStructureStore(object):
                 root of the block structure that is to be retrieved
                 from the store.
 
+            indexed (bool) - Whether to return the block structure as
+                an IndexedBlockStructureBlockData.  Indexed block
+                structures are also kept in the in-process memory
+                cache, if it is enabled, and returned as copy-on-write
+                views of the cached structure.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found.
@@ -89,13 +99,24 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
 
+        use_memory_cache = indexed and _is_memory_cache_enabled()
+        if use_memory_cache:
+            block_structure = get_memory_cache().get(self._encode_root_cache_key(bs_model))
+            if block_structure is not None:
+                logger.info("BlockStructure: Read from memory cache; %s.", bs_model)
+                return block_structure.copy_on_write()
+
         try:
             serialized_data = self._get_from_cache(bs_model)
         except BlockStructureNotFound:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key, indexed)
+        if use_memory_cache:
+            get_memory_cache().set(self._encode_root_cache_key(bs_model), block_structure, len(serialized_data))
+            return block_structure.copy_on_write()
+        return block_structure
 
     def delete(self, root_block_usage_key):
         """
@@ -108,6 +129,7 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        get_memory_cache().delete(self._encode_root_cache_key(bs_model))
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -126,6 +148,25 @@ class BlockStructureStore(object):
 
         return False
 
+    def get_collected_data_version(self, root_block_usage_key):
+        """
+        Returns the version of the modulestore data from which the
+        stored block structure for the given key was collected, or None
+        if storage backing is disabled, the block structure is not found,
+        or it was collected with an outdated schema.
+        """
+        if _is_storage_backing_enabled():
+            try:
+                bs_model = self._get_model(root_block_usage_key)
+            except BlockStructureNotFound:
+                return None
+
+            current_schema_data = self._schema_version_data()
+            if all(getattr(bs_model, field_name) == value for field_name, value in current_schema_data.iteritems()):
+                return bs_model.data_version
+
+        return None
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -157,7 +198,10 @@ class BlockStructureStore(object):
         to the cache.
         """
         cache_key = self._encode_root_cache_key(bs_model)
-        self._cache.set(cache_key, serialized_data, timeout=config.cache_timeout_in_seconds())
+        if config.waffle().is_enabled(config.CHUNKED_STORAGE):
+            self._chunked_cache.set(cache_key, serialized_data, timeout=config.cache_timeout_in_seconds())
+        else:
+            self._cache.set(cache_key, serialized_data, timeout=config.cache_timeout_in_seconds())
         logger.info("BlockStructure: Added to cache; %s, size: %d", bs_model, len(serialized_data))
 
     def _get_from_cache(self, bs_model):
@@ -168,7 +212,7 @@ class BlockStructureStore(object):
              BlockStructureNotFound if not found.
         """
         cache_key = self._encode_root_cache_key(bs_model)
-        serialized_data = self._cache.get(cache_key)
+        serialized_data = self._chunked_cache.get(cache_key)
 
         if not serialized_data:
             logger.info("BlockStructure: Not found in cache; %s.", bs_model)
@@ -193,6 +237,9 @@ class BlockStructureStore(object):
         """
         Serializes the data for the given block_structure.
         """
+        if config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION):
+            return columnar.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -200,17 +247,30 @@ class BlockStructureStore(object):
         )
         return zpickle(data_to_cache)
 
-    def _deserialize(self, serialized_data, root_block_usage_key):
+    def _deserialize(self, serialized_data, root_block_usage_key, indexed=False):
         """
         Deserializes the given data and returns the parsed block_structure.
+        The format of the data is detected, so data serialized in either
+        the columnar or the pickled format can be read.
         """
+        if columnar.is_columnar(serialized_data):
+            if indexed:
+                return IndexedBlockStructureBlockData.create_from_columnar(
+                    columnar.ColumnarBlockStructureReader(serialized_data),
+                    root_block_usage_key,
+                )
+            return columnar.deserialize(serialized_data, root_block_usage_key)
+
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
-        return BlockStructureFactory.create_new(
+        block_structure = BlockStructureFactory.create_new(
             root_block_usage_key,
             block_relations,
             transformer_data,
             block_data_map,
         )
+        if indexed:
+            return IndexedBlockStructureBlockData.create_from_block_structure(block_structure)
+        return block_structure
 
     @staticmethod
     def _encode_root_cache_key(bs_model):
@@ -233,9 +293,20 @@ class BlockStructureStore(object):
         Returns the version-relevant data for the given block, including the
         current schema state of the Transformers and BlockStructure classes.
         """
-        return dict(
+        version_data = dict(
             data_version=getattr(root_block, 'course_version', None),
             data_edit_timestamp=getattr(root_block, 'subtree_edited_on', None),
+        )
+        version_data.update(BlockStructureStore._schema_version_data())
+        return version_data
+
+    @staticmethod
+    def _schema_version_data():
+        """
+        Returns the current schema state of the Transformers and
+        BlockStructure classes.
+        """
+        return dict(
             transformers_schema_version=TransformerRegistry.get_write_version_hash(),
             block_structure_schema_version=unicode(BlockStructureBlockData.VERSION),
         )
@@ -256,3 +327,13 @@ def _is_storage_backing_enabled():
     Returns whether storage backing for Block Structures is enabled.
     """
     return config.waffle().is_enabled(config.STORAGE_BACKING_FOR_CACHE)
+
+
+def _is_memory_cache_enabled():
+    """
+    Returns whether the in-process memory cache for Block Structures is
+    enabled.  It is only used with storage backing, whose cache keys
+    include the versions of the data, since entries in the memory cache
+    are not invalidated across processes.
+    """
+    return _is_storage_backing_enabled() and config.waffle().is_enabled(config.MEMORY_CACHE)
@@ -134,6 +134,20 @@ class MockCache(object):
         """
         return self.map.get(key, default)
 
+    def set_many(self, data, timeout):
+        """
+        Associates each of the given keys with its value in the cache.
+        """
+        for key, val in data.iteritems():
+            self.set(key, val, timeout)
+
+    def get_many(self, keys):
+        """
+        Returns a dict of the given keys found in the cache and their
+        values.
+        """
+        return {key: self.map[key] for key in keys if key in self.map}
+
     def delete(self, key):
         """
         Deletes the given key from the cache.
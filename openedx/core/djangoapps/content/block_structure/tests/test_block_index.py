@@ -0,0 +1,80 @@
+"""
+Tests for block_structure/block_index.py
+"""
+# pylint: disable=protected-access
+import ddt
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from ..block_index import BlockIndex
+from ..block_structure import BlockStructureBlockData
+from ..indexed import IndexedBlockStructureBlockData
+from .helpers import ChildrenMapTestMixin
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestBlockIndex(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockIndex.
+    """
+    def test_topological_positions(self):
+        block_structure = self.create_block_structure(self.DAG_CHILDREN_MAP)
+        block_index = BlockIndex(block_structure)
+        self.assertEquals(len(block_index), len(self.DAG_CHILDREN_MAP))
+        for block_key in block_index.block_keys:
+            for parent_key in block_structure.get_parents(block_key):
+                self.assertLess(block_index.position(parent_key), block_index.position(block_key))
+
+    def test_field_arrays(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        for block_key in (1, 3):
+            block_structure.set_transformer_block_field(block_key, 'transformer', 'flag', True)
+        block_index = BlockIndex(block_structure)
+        flags = block_index.get_transformer_block_field_array('transformer', 'flag', False)
+        self.assertEquals(
+            {block_key for block_key, flag in zip(block_index.block_keys, flags.tolist()) if flag},
+            {1, 3},
+        )
+
+    @ddt.data(
+        *[
+            (block_structure_cls, children_map, removed_blocks, keep_descendants)
+            for block_structure_cls in (BlockStructureBlockData, IndexedBlockStructureBlockData)
+            for children_map, removed_blocks in (
+                (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, [{1}, {2, 3}]),
+                (ChildrenMapTestMixin.LINEAR_CHILDREN_MAP, [{2}, {1, 3}]),
+                (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [{1}, {2, 6}]),
+                (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [{2, 3}, {4}]),
+                (ChildrenMapTestMixin.DAG_CHILDREN_MAP, [{0}, {}]),
+            )
+            for keep_descendants in ([False, False], [True, False], [False, True])
+        ]
+    )
+    @ddt.unpack
+    def test_apply_removal_masks(self, block_structure_cls, children_map, removed_blocks, keep_descendants):
+        expected = self.create_block_structure(children_map, block_structure_cls)
+        removal_filters = [
+            expected.create_removal_filter(lambda block_key, removed=removed: block_key in removed, keep)
+            for removed, keep in zip(removed_blocks, keep_descendants)
+        ]
+        expected.filter_topological_traversal(
+            lambda block_key: all(removal_filter(block_key) for removal_filter in removal_filters)
+        )
+        expected._prune_unreachable()
+
+        block_structure = self.create_block_structure(children_map, block_structure_cls)
+        block_index = BlockIndex(block_structure)
+        block_index.apply_removal_masks([
+            block_index.create_removal_mask(
+                block_index.create_array(block_key in removed for block_key in block_index.block_keys),
+                keep_descendants=keep,
+            )
+            for removed, keep in zip(removed_blocks, keep_descendants)
+        ])
+        block_structure._prune_unreachable()
+
+        self.assertEquals(set(block_structure.get_block_keys()), set(expected.get_block_keys()))
+        for block_key in expected.get_block_keys():
+            self.assertEquals(set(block_structure.get_children(block_key)), set(expected.get_children(block_key)))
+            self.assertEquals(set(block_structure.get_parents(block_key)), set(expected.get_parents(block_key)))
@@ -264,6 +264,27 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         block_structure.remove_block_traversal(lambda block: block == 2)
         self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
 
+    def test_replace_subtrees(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        for block in range(5):
+            block_structure.set_transformer_block_field(block, 'transformer', 'test_key', 'old')
+
+        # block 1 now has only block 5 as its child; blocks 3 and 4 are removed
+        partial_block_structure = self.create_block_structure([[1], [5], [], [], [], []])
+        for block in [0, 1, 5]:
+            partial_block_structure.set_transformer_block_field(block, 'transformer', 'test_key', 'new')
+
+        block_structure._replace_subtrees(partial_block_structure, {1})
+        self.assert_block_structure(
+            block_structure, [[1, 2], [5], [], [], [], []], missing_blocks=[3, 4],
+        )
+        for block, expected_value in [(0, 'new'), (1, 'new'), (2, 'old'), (5, 'new')]:
+            self.assertEquals(
+                block_structure.get_transformer_block_field(block, 'transformer', 'test_key'),
+                expected_value,
+            )
+        self.assertNotIn(3, block_structure._block_data_map)
+
     def test_copy(self):
         def _set_value(structure, value):
             """
@@ -0,0 +1,94 @@
+"""
+Tests for block_structure/columnar.py
+"""
+# pylint: disable=protected-access
+from copy import deepcopy
+import ddt
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from ..columnar import ColumnarFormatError, deserialize, is_columnar, serialize
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestColumnarFormat(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar serialization format.
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        collected xBlock fields and transformer data.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_structure._get_or_create_block(block_key).display_name = 'Block {}'.format(block_id)
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_id)
+        return block_structure
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        serialized_data = serialize(block_structure)
+        self.assertTrue(is_columnar(serialized_data))
+
+        deserialized = deserialize(serialized_data, block_structure.root_block_usage_key)
+        self.assert_block_structure(deserialized, children_map)
+        self.assertEquals(deserialized._get_transformer_data_version(MockTransformer), MockTransformer.WRITE_VERSION)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEquals(deserialized.get_xblock_field(block_key, 'display_name'), 'Block {}'.format(block_id))
+            self.assertEquals(deserialized.get_transformer_block_field(block_key, MockTransformer, 'test'), block_id)
+            self.assertIsNone(deserialized.get_xblock_field(block_key, 'nonexistent_field'))
+
+    def test_blocks_materialized_on_access(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        self.assertEquals(len(deserialized._block_data_map), len(self.SIMPLE_CHILDREN_MAP))
+        self.assertEquals(dict.__len__(deserialized._block_data_map), 0)
+
+        deserialized.get_xblock_field(self.block_key_factory(1), 'display_name')
+        self.assertEquals(dict.__len__(deserialized._block_data_map), 1)
+
+    def test_remove_block(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        deserialized.remove_block(self.block_key_factory(1), keep_descendants=False)
+        deserialized._prune_unreachable()
+        self.assert_block_structure(deserialized, [[2], [], [], [], []], missing_blocks=[1, 3, 4])
+        self.assertNotIn(self.block_key_factory(1), deserialized._block_data_map)
+
+    def test_override_and_delete_field(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        block_key = self.block_key_factory(2)
+
+        deserialized.override_xblock_field(block_key, 'display_name', 'Overridden')
+        self.assertEquals(deserialized.get_xblock_field(block_key, 'display_name'), 'Overridden')
+
+        delattr(deserialized[block_key], 'display_name')
+        self.assertIsNone(deserialized.get_xblock_field(block_key, 'display_name'))
+
+    def test_copy(self):
+        block_structure = self.create_collected_block_structure(self.DAG_CHILDREN_MAP)
+        deserialized = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        copied = deserialized.copy()
+        self.assert_block_structure(copied, self.DAG_CHILDREN_MAP)
+        self.assertIs(type(copied._block_data_map), dict)
+        self.assertEquals(copied.get_xblock_field(self.block_key_factory(6), 'display_name'), 'Block 6')
+
+        copied_map = deepcopy(deserialized._block_data_map)
+        self.assertEquals(copied_map[self.block_key_factory(3)].display_name, 'Block 3')
+
+    def test_invalid_data(self):
+        self.assertFalse(is_columnar('not columnar'))
+        with self.assertRaises(ColumnarFormatError):
+            deserialize('BSCF', self.block_key_factory(0))
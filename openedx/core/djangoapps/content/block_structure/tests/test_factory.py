@@ -36,6 +36,34 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
                 modulestore=self.modulestore,
             )
 
+    def test_partial_from_modulestore(self):
+        full_block_structure = self.create_block_structure(self.children_map)
+        block_structure = BlockStructureFactory.create_partial_from_modulestore(
+            root_block_usage_key=0,
+            modulestore=self.modulestore,
+            subtree_usage_keys={1},
+            get_parents=full_block_structure.get_parents,
+        )
+        self.assert_block_structure(block_structure, [[1], [3, 4], [], [], []], missing_blocks=[2])
+        for block_key in [0, 1, 3, 4]:
+            self.assertIsNotNone(block_structure.get_xblock(block_key))
+
+    def test_partial_from_modulestore_dag(self):
+        children_map = self.DAG_CHILDREN_MAP
+        modulestore = MockModulestoreFactory.create(children_map, self.block_key_factory)
+        full_block_structure = self.create_block_structure(children_map)
+        block_structure = BlockStructureFactory.create_partial_from_modulestore(
+            root_block_usage_key=0,
+            modulestore=modulestore,
+            subtree_usage_keys={2},
+            get_parents=full_block_structure.get_parents,
+        )
+        # Block 3 in the subtree has parent 1 outside of it, which is
+        # included along with its ancestors.
+        self.assert_block_structure(block_structure, [[1, 2], [3], [3, 4], [5, 6], [], [], []])
+        for block_key in range(len(children_map)):
+            self.assertIsNotNone(block_structure.get_xblock(block_key))
+
     def test_from_cache(self):
         store = BlockStructureStore(MockCache())
         block_structure = self.create_block_structure(self.children_map)
@@ -0,0 +1,180 @@
+"""
+Tests for block_structure/indexed.py
+"""
+# pylint: disable=protected-access
+import ddt
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from ..columnar import ColumnarBlockStructureReader, serialize
+from ..indexed import IndexedBlockStructureBlockData
+from .helpers import ChildrenMapTestMixin
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestIndexedBlockStructureBlockData(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for IndexedBlockStructureBlockData
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns an indexed block structure for the given children_map
+        with collected xBlock fields and transformer data.
+        """
+        block_structure = self.create_block_structure(children_map, IndexedBlockStructureBlockData)
+        for block in range(len(children_map)):
+            block_structure._get_or_create_block(block).display_name = 'Block {}'.format(block)
+            block_structure.set_transformer_block_field(block, 'transformer', 'test_key', block)
+        return block_structure
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_relations(self, children_map):
+        block_structure = self.create_block_structure(children_map, IndexedBlockStructureBlockData)
+        self.assert_block_structure(block_structure, children_map)
+        self.assertEquals(len(block_structure), len(children_map))
+        self.assertNotIn(len(children_map) + 1, block_structure)
+
+    def test_block_data(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        self.assertEquals(block_structure.get_xblock_field(1, 'display_name'), 'Block 1')
+        self.assertIsNone(block_structure.get_xblock_field(1, 'nonexistent_field'))
+        self.assertEquals(block_structure[2].display_name, 'Block 2')
+        self.assertEquals(block_structure[2].location, 2)
+        self.assertEquals(block_structure[3].transformer_data['transformer'].test_key, 3)
+        self.assertEquals(block_structure.get_transformer_block_field(4, 'transformer', 'test_key'), 4)
+
+        with self.assertRaises(KeyError):
+            block_structure.get_transformer_block_data(4, 'other_transformer')
+
+        block_structure.override_xblock_field(1, 'display_name', 'Overridden')
+        self.assertEquals(block_structure[1].display_name, 'Overridden')
+
+        block_structure.remove_transformer_block_field(4, 'transformer', 'test_key')
+        self.assertIsNone(block_structure.get_transformer_block_field(4, 'transformer', 'test_key'))
+
+    @ddt.data(True, False)
+    def test_remove_block(self, keep_descendants):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.remove_block(1, keep_descendants)
+        block_structure._prune_unreachable()
+
+        if keep_descendants:
+            self.assert_block_structure(block_structure, [[2, 3, 4], [], [], [], []], missing_blocks=[1])
+        else:
+            self.assert_block_structure(block_structure, [[2], [], [], [], []], missing_blocks=[1, 3, 4])
+        self.assertIsNone(block_structure.get_xblock_field(1, 'display_name'))
+        with self.assertRaises(KeyError):
+            block_structure[1]  # pylint: disable=pointless-statement
+
+    def test_remove_block_traversal(self):
+        block_structure = self.create_block_structure(self.LINEAR_CHILDREN_MAP, IndexedBlockStructureBlockData)
+        block_structure.remove_block_traversal(lambda block: block == 2)
+        self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
+
+    def test_set_root_block(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, IndexedBlockStructureBlockData)
+        block_structure.set_root_block(1)
+        block_structure._prune_unreachable()
+        self.assertEquals(block_structure.root_block_usage_key, 1)
+        self.assert_block_structure(block_structure, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+
+    def test_copy(self):
+        block_structure = self.create_collected_block_structure(self.LINEAR_CHILDREN_MAP)
+        new_copy = block_structure.copy()
+
+        block_structure.remove_block(2, keep_descendants=True)
+        block_structure.set_transformer_block_field(1, 'transformer', 'test_key', 'edited')
+        self.assert_block_structure(block_structure, [[1], [3], [], []], missing_blocks=[2])
+        self.assert_block_structure(new_copy, self.LINEAR_CHILDREN_MAP)
+        self.assertEquals(new_copy.get_transformer_block_field(1, 'transformer', 'test_key'), 1)
+
+    def test_copy_on_write(self):
+        block_structure = self.create_collected_block_structure(self.LINEAR_CHILDREN_MAP)
+        first_copy = block_structure.copy_on_write()
+        second_copy = block_structure.copy_on_write()
+        self.assertIs(first_copy._field_columns['display_name'], block_structure._field_columns['display_name'])
+
+        first_copy.remove_block(2, keep_descendants=True)
+        first_copy.set_transformer_block_field(1, 'transformer', 'test_key', 'edited')
+        first_copy[3].display_name = 'Edited'
+        first_copy.set_transformer_block_field(4, 'transformer', 'test_key', 'new block')
+        second_copy.override_xblock_field(1, 'display_name', 'Overridden')
+        second_copy.remove_transformer_block_field(0, 'transformer', 'test_key')
+
+        self.assert_block_structure(first_copy, [[1], [3], [], []], missing_blocks=[2])
+        self.assertEquals(first_copy.get_transformer_block_field(1, 'transformer', 'test_key'), 'edited')
+        self.assertEquals(first_copy.get_xblock_field(3, 'display_name'), 'Edited')
+        self.assertEquals(first_copy.get_transformer_block_field(4, 'transformer', 'test_key'), 'new block')
+        self.assertEquals(second_copy.get_xblock_field(1, 'display_name'), 'Overridden')
+        self.assertIsNone(second_copy.get_transformer_block_field(0, 'transformer', 'test_key'))
+        self.assertEquals(second_copy.get_xblock_field(3, 'display_name'), 'Block 3')
+
+        self.assert_block_structure(block_structure, self.LINEAR_CHILDREN_MAP)
+        for block in range(len(self.LINEAR_CHILDREN_MAP)):
+            self.assertEquals(block_structure.get_xblock_field(block, 'display_name'), 'Block {}'.format(block))
+            self.assertEquals(block_structure.get_transformer_block_field(block, 'transformer', 'test_key'), block)
+        self.assertNotIn(4, block_structure._key_index)
+
+    def test_replace_subtrees(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        copied_block_structure = block_structure.copy_on_write()
+
+        # block 1 now has only block 5 as its child; blocks 3 and 4 are removed
+        partial_block_structure = self.create_block_structure([[1], [5], [], [], [], []])
+        for block in [0, 1, 5]:
+            partial_block_structure.set_transformer_block_field(block, 'transformer', 'test_key', 'new')
+
+        block_structure._replace_subtrees(partial_block_structure, {1})
+        self.assert_block_structure(
+            block_structure, [[1, 2], [5], [], [], [], []], missing_blocks=[3, 4],
+        )
+        for block, expected_value in [(0, 'new'), (1, 'new'), (2, 2), (5, 'new')]:
+            self.assertEquals(
+                block_structure.get_transformer_block_field(block, 'transformer', 'test_key'),
+                expected_value,
+            )
+        # the block data of replaced blocks doesn't keep any of their previous fields
+        self.assertIsNone(block_structure.get_xblock_field(1, 'display_name'))
+        self.assertEquals(block_structure.get_xblock_field(2, 'display_name'), 'Block 2')
+        self.assertNotIn(3, dict(block_structure.iteritems()))
+
+        # a copy sharing the columns of the block structure is unchanged
+        self.assert_block_structure(copied_block_structure, self.SIMPLE_CHILDREN_MAP)
+        self.assertEquals(copied_block_structure.get_xblock_field(1, 'display_name'), 'Block 1')
+        self.assertEquals(copied_block_structure.get_transformer_block_field(1, 'transformer', 'test_key'), 1)
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_create_from_block_structure(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        for block in range(len(children_map)):
+            block_structure.set_transformer_block_field(block, 'transformer', 'test_key', block)
+
+        indexed = IndexedBlockStructureBlockData.create_from_block_structure(block_structure)
+        self.assert_block_structure(indexed, children_map)
+        self.assertEquals(
+            list(indexed.topological_traversal()),
+            list(block_structure.topological_traversal()),
+        )
+        for block in range(len(children_map)):
+            self.assertEquals(indexed.get_transformer_block_field(block, 'transformer', 'test_key'), block)
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_create_from_columnar(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        reader = ColumnarBlockStructureReader(serialize(block_structure))
+        indexed = IndexedBlockStructureBlockData.create_from_columnar(reader, 0)
+        self.assert_block_structure(indexed, children_map)
+        for block in range(len(children_map)):
+            self.assertEquals(indexed.get_xblock_field(block, 'display_name'), 'Block {}'.format(block))
+            self.assertEquals(indexed.get_transformer_block_field(block, 'transformer', 'test_key'), block)
@@ -3,11 +3,13 @@ Tests for manager.py
 """
 import ddt
 from django.test import TestCase
+from mock import Mock, patch
 from nose.plugins.attrib import attr
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import INCREMENTAL_COLLECT, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import UsageKeyNotInBlockStructure, BlockStructureNotFound
+from ..factory import BlockStructureFactory
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
 from .helpers import (
@@ -89,6 +91,26 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class TestIncrementalTransformer(MockTransformer):
+    """
+    Test Transformer class that collects the values of each block and of
+    its ancestors, and so supports incremental collects.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects the set of values of each block and its ancestors.
+        """
+        block_structure.request_xblock_fields('course_version', 'value')
+        for block_key in block_structure.topological_traversal():
+            values = {block_structure.get_xblock(block_key).value}
+            for parent_key in block_structure.get_parents(block_key):
+                values |= block_structure.get_transformer_block_field(parent_key, cls, 'values')
+            block_structure.set_transformer_block_field(block_key, cls, 'values', values)
+
+
 @attr(shard=2)
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
@@ -219,3 +241,99 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+
+@attr(shard=2)
+class TestBlockStructureManagerIncrementalCollect(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Test class for incremental collects by BlockStructureManager.
+    """
+    def setUp(self):
+        super(TestBlockStructureManagerIncrementalCollect, self).setUp()
+        self.registered_transformers = [TestIncrementalTransformer()]
+        self.children_map = self.DAG_CHILDREN_MAP
+        self.modulestore = MockModulestoreFactory.create(self.children_map, self.block_key_factory)
+        for block_id in range(len(self.children_map)):
+            self.modulestore.blocks[self.block_key_factory(block_id)].field_map['value'] = block_id
+        self.root_block = self.modulestore.blocks[self.block_key_factory(0)]
+        self.root_block.field_map['course_version'] = u'version1'
+        self.bs_manager = BlockStructureManager(self.block_key_factory(0), self.modulestore, MockCache())
+
+        for switch in (STORAGE_BACKING_FOR_CACHE, INCREMENTAL_COLLECT):
+            override = waffle().override(switch, active=True)
+            override.__enter__()
+            self.addCleanup(override.__exit__, None, None, None)
+
+    def update_block(self, block_id, value, children):
+        """
+        Changes the value and children of the given block in a new
+        version of the course, and returns its usage key.
+        """
+        block_key = self.block_key_factory(block_id)
+        block = self.modulestore.blocks[block_key]
+        block.field_map['value'] = value
+        block.children = [self.block_key_factory(child) for child in children]
+        self.root_block.field_map['course_version'] = u'version2'
+        return block_key
+
+    def assert_matches_full_collect(self, block_structure):
+        """
+        Verifies that the given block structure equals a block structure
+        fully collected from the modulestore.
+        """
+        full_block_structure = BlockStructureFactory.create_from_modulestore(
+            self.block_key_factory(0), self.modulestore,
+        )
+        BlockStructureTransformers.collect(full_block_structure)
+
+        self.assertEqual(set(block_structure), set(full_block_structure))
+        for block_key in full_block_structure:
+            self.assertEqual(
+                set(block_structure.get_children(block_key)),
+                set(full_block_structure.get_children(block_key)),
+            )
+            self.assertEqual(
+                block_structure.get_xblock_field(block_key, 'value'),
+                full_block_structure.get_xblock_field(block_key, 'value'),
+            )
+            self.assertEqual(
+                block_structure.get_transformer_block_field(block_key, TestIncrementalTransformer, 'values'),
+                full_block_structure.get_transformer_block_field(block_key, TestIncrementalTransformer, 'values'),
+            )
+
+    def test_incremental_collect(self):
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+
+            # Block 2 shares its child 3 with block 1, which is outside of
+            # the changed subtree, and no longer has child 4.
+            changed_key = self.update_block(2, u'changed', [3])
+            self.modulestore.get_changed_blocks_since_version = Mock(return_value=({changed_key}, set()))
+            with patch.object(BlockStructureManager, '_update_collected') as mock_update_collected:
+                self.bs_manager.update_collected_if_needed()
+            self.assertFalse(mock_update_collected.called)
+            self.modulestore.get_changed_blocks_since_version.assert_called_once_with(self.course_key, u'version1')
+
+            block_structure = self.bs_manager.get_collected()
+
+        self.assert_block_structure(block_structure, [[1, 2], [3], [3], [5, 6], [], [], []], missing_blocks=[4])
+        self.assertEqual(
+            block_structure.get_transformer_block_field(self.block_key_factory(3), TestIncrementalTransformer, 'values'),
+            {0, 1, 3, u'changed'},
+        )
+        self.assert_matches_full_collect(block_structure)
+
+    def test_incremental_collect_not_supported(self):
+        TestIncrementalTransformer.SUPPORTS_INCREMENTAL_COLLECT = False
+        self.addCleanup(setattr, TestIncrementalTransformer, 'SUPPORTS_INCREMENTAL_COLLECT', True)
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+
+            self.update_block(2, u'changed', [3, 4])
+            self.modulestore.get_changed_blocks_since_version = Mock()
+            self.bs_manager.update_collected_if_needed()
+            self.assertFalse(self.modulestore.get_changed_blocks_since_version.called)
+
+            block_structure = self.bs_manager.get_collected()
+
+        self.assert_matches_full_collect(block_structure)
@@ -0,0 +1,61 @@
+"""
+Tests for block_structure/memory_cache.py
+"""
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from ..memory_cache import BlockStructureMemoryCache
+
+
+@attr(shard=2)
+class TestBlockStructureMemoryCache(TestCase):
+    """
+    Tests for BlockStructureMemoryCache
+    """
+    def setUp(self):
+        super(TestBlockStructureMemoryCache, self).setUp()
+        self.memory_cache = BlockStructureMemoryCache(max_size=10)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.memory_cache.get('a'))
+        self.memory_cache.set('a', 'structure a', 4)
+        self.assertEquals(self.memory_cache.get('a'), 'structure a')
+        self.assertEquals(self.memory_cache.size, 4)
+
+        self.memory_cache.set('a', 'new structure a', 6)
+        self.assertEquals(self.memory_cache.get('a'), 'new structure a')
+        self.assertEquals(self.memory_cache.size, 6)
+        self.assertEquals(
+            self.memory_cache.stats(),
+            dict(hits=2, misses=1, evictions=0, num_entries=1, size=6, max_size=10),
+        )
+
+    def test_eviction(self):
+        self.memory_cache.set('a', 'structure a', 4)
+        self.memory_cache.set('b', 'structure b', 4)
+        self.memory_cache.get('a')
+        self.memory_cache.set('c', 'structure c', 4)
+
+        self.assertIsNone(self.memory_cache.get('b'))
+        self.assertEquals(self.memory_cache.get('a'), 'structure a')
+        self.assertEquals(self.memory_cache.get('c'), 'structure c')
+        self.assertEquals(self.memory_cache.size, 8)
+        self.assertEquals(self.memory_cache.evictions, 1)
+
+    def test_too_large(self):
+        self.memory_cache.set('a', 'structure a', 4)
+        self.memory_cache.set('b', 'structure b', 11)
+        self.assertIsNone(self.memory_cache.get('b'))
+        self.assertEquals(self.memory_cache.get('a'), 'structure a')
+
+    def test_delete_and_clear(self):
+        self.memory_cache.set('a', 'structure a', 4)
+        self.memory_cache.set('b', 'structure b', 4)
+        self.memory_cache.delete('a')
+        self.assertIsNone(self.memory_cache.get('a'))
+        self.assertEquals(self.memory_cache.size, 4)
+
+        self.memory_cache.clear()
+        self.assertEquals(len(self.memory_cache), 0)
+        self.assertEquals(self.memory_cache.size, 0)
+        self.assertEquals(self.memory_cache.hits, 0)
@@ -9,12 +9,20 @@ from django.test import TestCase
 from django.utils.timezone import now
 from itertools import product
 from mock import patch, Mock
+import os
 from uuid import uuid4
 
 from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
 
+from ..config import CHUNKED_STORAGE, waffle
 from ..exceptions import BlockStructureNotFound
-from ..models import BlockStructureModel, _directory_name, _storage_error_handling
+from ..models import (
+    BlockStructureModel,
+    _bs_model_storage,
+    _chunk_directory_name,
+    _directory_name,
+    _storage_error_handling,
+)
 
 
 @ddt.ddt
@@ -51,6 +59,15 @@ class BlockStructureModelTestCase(TestCase):
         """
         self.assertEqual(len(BlockStructureModel._get_all_files(self.usage_key)), expected_count)
 
+    def _get_chunk_files(self):
+        """
+        Returns the names of the chunk files for self.usage_key.
+        """
+        try:
+            return set(_bs_model_storage().listdir(_chunk_directory_name(self.usage_key))[1])
+        except OSError:
+            return set()
+
     def _create_bsm_params(self):
         """
         Returns the parameters for creating a BlockStructureModel.
@@ -170,3 +187,33 @@ class BlockStructureModelTestCase(TestCase):
             found_bsm = BlockStructureModel.get(self.usage_key)
 
         self._assert_bsm_fields(found_bsm, serialized_data)
+
+    @patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'AVERAGE_CHUNK_SIZE': 1024})
+    @patch('openedx.core.djangoapps.content.block_structure.config.num_versions_to_keep', Mock(return_value=1))
+    def test_chunked_storage(self):
+        serialized_data = os.urandom(32 * 1024)
+        with waffle().override(CHUNKED_STORAGE, active=True):
+            self._verify_update_or_create_call(serialized_data, expect_created=True)
+            initial_chunk_files = self._get_chunk_files()
+            self.assertGreater(len(initial_chunk_files), 1)
+
+            # Only the chunks around the edit are written, and chunks
+            # no longer referenced are pruned.
+            self.params.update(dict(data_version='new version'))
+            updated_serialized_data = serialized_data[:16 * 1024] + 'edit' + serialized_data[16 * 1024:]
+            self._verify_update_or_create_call(updated_serialized_data, expect_created=False)
+            updated_chunk_files = self._get_chunk_files()
+            self.assertLessEqual(len(updated_chunk_files - initial_chunk_files), 3)
+            self.assertLessEqual(len(initial_chunk_files - updated_chunk_files), 3)
+
+        # Chunked data is readable regardless of the switch.
+        self._assert_bsm_fields(BlockStructureModel.get(self.usage_key), updated_serialized_data)
+
+    def test_chunked_storage_missing_chunk(self):
+        with waffle().override(CHUNKED_STORAGE, active=True):
+            bsm = self._verify_update_or_create_call('test data', expect_created=True)
+
+        for chunk_file in self._get_chunk_files():
+            _bs_model_storage().delete('{}/{}'.format(_chunk_directory_name(self.usage_key), chunk_file))
+        with self.assertRaises(BlockStructureNotFound):
+            bsm.get_serialized_data()
@@ -6,9 +6,10 @@ from nose.plugins.attrib import attr
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import CHUNKED_STORAGE, COLUMNAR_SERIALIZATION, MEMORY_CACHE, STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
+from ..memory_cache import get_memory_cache
 from ..store import BlockStructureStore
 from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockCache, MockTransformer
 
@@ -31,6 +32,9 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.mock_cache = MockCache()
         self.store = BlockStructureStore(self.mock_cache)
 
+        get_memory_cache().clear()
+        self.addCleanup(get_memory_cache().clear)
+
     def add_transformers(self):
         """
         Add each registered transformer to the block structure.
@@ -67,6 +71,28 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             with self.assertRaises(BlockStructureNotFound):
                 self.store.get(self.block_structure.root_block_usage_key)
 
+    @ddt.data(True, False)
+    def test_add_and_get_columnar(self, with_storage_backing):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with waffle().override(COLUMNAR_SERIALIZATION, active=True):
+                self.store.add(self.block_structure)
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+            self.assertEquals(
+                stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+                '{} val'.format(MockTransformer.name()),
+            )
+
+    @ddt.data(True, False)
+    def test_add_and_get_chunked(self, with_storage_backing):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with waffle().override(CHUNKED_STORAGE, active=True):
+                self.store._chunked_cache.average_chunk_size = 16  # pylint: disable=protected-access
+                self.store.add(self.block_structure)
+            self.assertGreater(len(self.mock_cache.map), 1)
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+
     def test_uncached_without_storage(self):
         self.store.add(self.block_structure)
         self.mock_cache.map.clear()
@@ -90,3 +116,32 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+    @ddt.data(True, False)
+    def test_memory_cache(self, with_storage_backing):
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with waffle().override(MEMORY_CACHE, active=True):
+                self.store.add(self.block_structure)
+                first_value = self.store.get(root_block_usage_key, indexed=True)
+                first_value.remove_block(self.block_key_factory(1), keep_descendants=False)
+                first_value.set_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test', 'edited')
+
+                self.mock_cache.map.clear()
+                if with_storage_backing:
+                    second_value = self.store.get(root_block_usage_key, indexed=True)
+                    self.assert_block_structure(second_value, self.children_map)
+                    self.assertEquals(
+                        second_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+                        '{} val'.format(MockTransformer.name()),
+                    )
+                else:
+                    with self.assertRaises(BlockStructureNotFound):
+                        self.store.get(root_block_usage_key, indexed=True)
+
+                stats = get_memory_cache().stats()
+                self.assertEquals(stats['hits'], 1 if with_storage_backing else 0)
+                self.assertEquals(stats['num_entries'], 1 if with_storage_backing else 0)
+
+                self.store.delete(root_block_usage_key)
+                self.assertEquals(len(get_memory_cache()), 0)
@@ -71,6 +71,18 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.transformers.transform(block_structure=MagicMock())
             self.assertTrue(mock_transform_call.called)
 
+    def test_usage_equivalence_key(self):
+        self.add_mock_transformer()
+        block_structure = MagicMock()
+        self.assertIsNone(self.transformers.usage_equivalence_key(block_structure))
+
+        with patch.object(MockTransformer, 'usage_equivalence_key', return_value='key'):
+            with patch.object(MockFilteringTransformer, 'usage_equivalence_key', return_value=()):
+                self.assertEquals(
+                    self.transformers.usage_equivalence_key(block_structure),
+                    (('MockFilteringTransformer', ()), ('MockTransformer', 'key')),
+                )
+
     def test_verify_versions(self):
         block_structure = self.create_block_structure(
             self.SIMPLE_CHILDREN_MAP,
@@ -55,6 +55,23 @@ class BlockStructureTransformer(object):
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the transformer's collect method can be run on a partial
+    # block structure during an incremental collect.  A partial block
+    # structure contains only the subtrees of changed blocks, their
+    # ancestors and the root block.
+    #
+    # A transformer may set this to True only if the data it collects
+    # for a block depends solely on that block and its ancestors, and
+    # any structure-wide data it collects depends solely on the root
+    # block.  Transformers that aggregate data from descendants or
+    # siblings must leave this False, since the partial block structure
+    # does not contain them.
+    #
+    # An incremental collect is only performed when all registered
+    # transformers support it.
+    #
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
@@ -155,6 +172,35 @@ class BlockStructureTransformer(object):
         """
         raise NotImplementedError
 
+    def usage_equivalence_key(self, usage_info, block_structure):
+        """
+        Returns a hashable key that identifies the parts of the given
+        usage_info that the transform method depends on, so that a
+        single transform can be shared by all usage_infos with equal
+        keys.
+
+        Transforming the given block_structure for two usage_infos with
+        equal keys must produce equal results.  For example, a
+        transformer that only distinguishes staff from non-staff users
+        may return whether the user has staff access.
+
+        Like the transform method, this method should not access the
+        modulestore nor instantiate xBlocks.
+
+        Arguments:
+            usage_info (any negotiated type) - See the description in
+                transform.
+
+            block_structure (BlockStructureBlockData) - A block
+                structure, with already collected data for the
+                transformer, that is to be transformed.
+
+        Returns:
+            A hashable key, or None if the transform is specific to the
+            usage_info and cannot be shared, which is the default.
+        """
+        return None
+
 
 class FilteringTransformerMixin(BlockStructureTransformer):
     """
@@ -207,3 +253,39 @@ class FilteringTransformerMixin(BlockStructureTransformer):
                 transformer, that is to be transformed in place.
         """
         raise NotImplementedError
+
+
+class BatchFilteringTransformerMixin(FilteringTransformerMixin):
+    """
+    Filtering transformers may optionally implement this mixin if their
+    removal conditions can be evaluated for all blocks at once, as
+    NumPy boolean arrays over a BlockIndex.
+
+    When batch filtering is enabled, the removal masks returned by all
+    such transformers are combined and applied in a single pass over the
+    block structure, rather than evaluating a filter function per block.
+    Implementations should produce the same result as their
+    transform_block_filters method.
+    """
+
+    @abstractmethod
+    def transform_block_masks(self, usage_info, block_structure, block_index):
+        """
+        This is an alternative to the transform_block_filters method.
+
+        Returns a list of removal masks for the blocks in the given
+        block_index.  Removal masks are created with
+        block_index.create_removal_mask.  An empty list retains all
+        blocks.
+
+        Arguments:
+            usage_info (any negotiated type) - See the description in
+                transform_block_filters.
+
+            block_structure (BlockStructureBlockData) - See the
+                description in transform_block_filters.
+
+            block_index (BlockIndex) - A topologically ordered index of
+                the blocks in the given block_structure.
+        """
+        raise NotImplementedError
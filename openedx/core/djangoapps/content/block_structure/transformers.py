@@ -4,8 +4,10 @@ Module for a collection of BlockStructureTransformers.
 import functools
 from logging import getLogger
 
+from . import config
+from .block_index import BlockIndex
 from .exceptions import TransformerException, TransformerDataIncompatible
-from .transformer import FilteringTransformerMixin
+from .transformer import BatchFilteringTransformerMixin, FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
 
 
@@ -82,6 +84,17 @@ class BlockStructureTransformers(object):
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def supports_incremental_collect(cls):
+        """
+        Returns whether all registered transformers support collecting
+        data on a partial block structure.
+        """
+        return all(
+            transformer.SUPPORTS_INCREMENTAL_COLLECT
+            for transformer in TransformerRegistry.get_registered_transformers()
+        )
+
     @classmethod
     def verify_versions(cls, block_structure):
         """
@@ -105,6 +118,23 @@ class BlockStructureTransformers(object):
             )
         return True
 
+    def usage_equivalence_key(self, block_structure):
+        """
+        Returns a hashable key such that transforming the given
+        block_structure for any usage_info with an equal key produces
+        an equal result, or None if the transform for this collection's
+        usage_info cannot be shared.
+
+        See BlockStructureTransformer.usage_equivalence_key.
+        """
+        transformer_keys = []
+        for transformer in self._transformers['supports_filter'] + self._transformers['no_filter']:
+            transformer_key = transformer.usage_equivalence_key(self.usage_info, block_structure)
+            if transformer_key is None:
+                return None
+            transformer_keys.append((transformer.name(), transformer_key))
+        return tuple(transformer_keys)
+
     def transform(self, block_structure):
         """
         The given block structure is transformed by each transformer in the
@@ -126,10 +156,22 @@ class BlockStructureTransformers(object):
         if not self._transformers['supports_filter']:
             return
 
+        block_index, removal_masks, filtering_transformers = self._get_removal_masks(block_structure)
+
+        # All filters are collected before any removal mask is applied,
+        # since transform_block_filters may act on the blocks it sees
+        # (e.g. persisting a library's selected children), and must see
+        # the same structure as when batch filtering is disabled.
         filters = []
-        for transformer in self._transformers['supports_filter']:
+        for transformer in filtering_transformers:
             filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
 
+        if removal_masks:
+            block_index.apply_removal_masks(removal_masks)
+
+        if not filters:
+            return
+
         combined_filters = functools.reduce(
             self._filter_chain,
             filters,
@@ -137,6 +179,33 @@ class BlockStructureTransformers(object):
         )
         block_structure.filter_topological_traversal(combined_filters)
 
+    def _get_removal_masks(self, block_structure):
+        """
+        Returns the removal masks from the transform_block_masks method
+        of those of the given transformers that support it, when batch
+        filtering is enabled, as a tuple of (BlockIndex, removal masks,
+        filtering transformers), where the filtering transformers are
+        those that remain to be applied using their
+        transform_block_filters method.
+        """
+        filtering_transformers = self._transformers['supports_filter']
+        batch_transformers = [
+            transformer for transformer in filtering_transformers
+            if isinstance(transformer, BatchFilteringTransformerMixin)
+        ]
+        if not batch_transformers or not config.waffle().is_enabled(config.BATCH_FILTERING):
+            return None, [], filtering_transformers
+
+        block_index = BlockIndex(block_structure)
+        removal_masks = []
+        for transformer in batch_transformers:
+            removal_masks.extend(transformer.transform_block_masks(self.usage_info, block_structure, block_index))
+
+        return block_index, removal_masks, [
+            transformer for transformer in filtering_transformers
+            if not isinstance(transformer, BatchFilteringTransformerMixin)
+        ]
+
     def _filter_chain(self, accumulated, additional):
         """
         Given two functions that take a block_key and return a boolean, yield
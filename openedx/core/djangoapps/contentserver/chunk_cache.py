@@ -0,0 +1,178 @@
+"""
+A cache on local disk of the chunks of course assets which are too large to cache whole.
+
+Each chunk is stored in its own file, named for the asset's location and version and the
+index of the chunk, so a new version of an asset never reads the chunks of an old one.
+The cache evicts the least recently used chunks once its files exceed a budget of bytes.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+_CHUNK_CACHES = {}
+_CHUNK_CACHES_LOCK = threading.Lock()
+
+
+def get_chunk_cache():
+    """
+    Return the chunk cache configured by the COURSE_ASSETS_CHUNK_CACHE setting, or None if the
+    setting doesn't name a directory.
+    """
+    config = getattr(settings, 'COURSE_ASSETS_CHUNK_CACHE', None) or {}
+    directory = config.get('DIRECTORY')
+    if not directory:
+        return None
+
+    cache_config = (
+        directory,
+        config.get('MAX_BYTES', DEFAULT_MAX_BYTES),
+        config.get('CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+    )
+    with _CHUNK_CACHES_LOCK:
+        if cache_config not in _CHUNK_CACHES:
+            _CHUNK_CACHES[cache_config] = AssetChunkCache(*cache_config)
+        return _CHUNK_CACHES[cache_config]
+
+
+class AssetChunkCache(object):
+    """
+    Reads byte ranges of course assets a chunk at a time, from local disk if the chunk has been
+    read before, and otherwise from the contentstore.
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        # Maps the path of each cached chunk to its size, from the least to the most recently used.
+        self._chunks = OrderedDict()
+        self._total_bytes = 0
+        self._load_chunks()
+
+    def read_range(self, content, first_byte, last_byte, open_stream):
+        """
+        Yield the data of content between first_byte and last_byte (included).
+
+        Arguments:
+            content (StaticContent): The asset, whose data needn't be loaded.
+            first_byte (int): The offset of the first byte to read.
+            last_byte (int): The offset of the last byte to read.
+            open_stream: A function which returns a StaticContentStream of the asset, called only
+                if a chunk isn't cached.
+        """
+        stream = None
+        try:
+            for index in range(first_byte // self.chunk_size, last_byte // self.chunk_size + 1):
+                chunk_start = index * self.chunk_size
+                chunk_end = min(chunk_start + self.chunk_size, content.length) - 1
+
+                path = self._chunk_path(content, index)
+                data = self._read_chunk(path, chunk_end - chunk_start + 1)
+                if data is None:
+                    if stream is None:
+                        stream = open_stream()
+                    data = b''.join(stream.stream_data_in_range(chunk_start, chunk_end))
+                    self._write_chunk(path, data)
+
+                yield data[max(first_byte - chunk_start, 0):last_byte - chunk_start + 1]
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def _chunk_path(self, content, index):
+        """
+        Return the path of the file of the chunk with the given index of the given version of
+        the asset.
+        """
+        version = content.content_digest or content.last_modified_at.isoformat()
+        name = hashlib.sha1(u'{}|{}|{}|{}'.format(
+            content.location, version, self.chunk_size, index
+        ).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name[:2], name)
+
+    def _read_chunk(self, path, length):
+        """
+        Return the data of the chunk at path if it's cached with the given length, or None.
+        """
+        try:
+            with open(path, 'rb') as chunk_file:
+                data = chunk_file.read()
+        except (IOError, OSError):
+            return None
+        if len(data) != length:
+            return None
+
+        with self._lock:
+            if path in self._chunks:
+                self._chunks[path] = self._chunks.pop(path)
+            else:
+                # Another process cached the chunk.
+                self._add_chunk(path, length)
+        return data
+
+    def _write_chunk(self, path, data):
+        """
+        Cache the data of the chunk at path, and evict chunks to stay within the byte budget.
+        """
+        if len(data) > self.max_bytes:
+            return
+        try:
+            chunk_dir = os.path.dirname(path)
+            if not os.path.isdir(chunk_dir):
+                os.makedirs(chunk_dir)
+            # Write to a temporary file first, so that the chunk is never read half written.
+            fd, temp_path = tempfile.mkstemp(dir=chunk_dir)
+            with os.fdopen(fd, 'wb') as chunk_file:
+                chunk_file.write(data)
+            os.rename(temp_path, path)
+        except (IOError, OSError):
+            log.exception(u"Unable to cache asset chunk at %s", path)
+            return
+
+        with self._lock:
+            if path not in self._chunks:
+                self._add_chunk(path, len(data))
+
+    def _add_chunk(self, path, length):
+        """
+        Record that the chunk at path is cached, evicting the least recently used chunks if the
+        cache is over its byte budget.  Must be called holding the lock.
+        """
+        self._chunks[path] = length
+        self._total_bytes += length
+        while self._total_bytes > self.max_bytes and self._chunks:
+            evicted_path, evicted_length = self._chunks.popitem(last=False)
+            self._total_bytes -= evicted_length
+            try:
+                os.remove(evicted_path)
+            except OSError:
+                pass
+
+    def _load_chunks(self):
+        """
+        Record the chunks left in the cache directory by earlier processes, from the least to the
+        most recently modified.
+        """
+        chunks = []
+        for dir_path, __, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                chunks.append((stat.st_mtime, path, stat.st_size))
+
+        with self._lock:
+            for __, path, length in sorted(chunks):
+                self._add_chunk(path, length)
@@ -16,12 +16,13 @@ from six import text_type
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
 from .caching import get_cached_content, set_cached_content
+from .chunk_cache import get_chunk_cache
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -32,6 +33,11 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Assets smaller than this are cached whole. We cap this at 1MB because it's the default
+# for memcached and also we don't want to do too much buffering in memory when we're
+# serving an actual request.
+MAX_CACHED_CONTENT_LENGTH = 1048576
+
 
 class StaticContentServer(object):
     """
@@ -108,12 +114,12 @@ class StaticContentServer(object):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
-            # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            # if this asset has changed since then.  The content of a large asset is only
+            # read once we know that the client needs it.
+            if self.is_not_modified(request, content):
+                response = HttpResponseNotModified()
+                self.set_etag_header(content, response)
+                return response
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -123,10 +129,6 @@ class StaticContentServer(object):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -151,7 +153,7 @@ class StaticContentServer(object):
 
                         if 0 <= first <= last < content.length:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            response = HttpResponse(self.read_range(content, loc, first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
@@ -169,7 +171,10 @@ class StaticContentServer(object):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if content.data is not None:
+                    response = HttpResponse(content.stream_data())
+                else:
+                    response = HttpResponse(self.read_range(content, loc, 0, content.length - 1))
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -214,12 +219,74 @@ class StaticContentServer(object):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        self.set_etag_header(content, response)
 
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
         # caches a version of the response without CORS headers, in turn breaking XHR requests.
         force_header_for_response(response, 'Vary', 'Origin')
 
+    @staticmethod
+    def get_etag(content):
+        """
+        Returns the entity tag of the given content, or None if it has no digest.
+        """
+        content_digest = getattr(content, "content_digest", None)
+        if not content_digest:
+            return None
+        return '"{}"'.format(content_digest)
+
+    def set_etag_header(self, content, response):
+        """
+        Sets the ETag header of the response, if the content has a digest.
+        """
+        etag = self.get_etag(content)
+        if etag is not None:
+            response['ETag'] = etag
+
+    def is_not_modified(self, request, content):
+        """
+        Determines whether the client sent a conditional request which the given content satisfies,
+        so that it can be told that the asset is unchanged.
+
+        If-None-Match takes precedence over If-Modified-Since, as in RFC 7232.
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etag = self.get_etag(content)
+            if etag is None:
+                return False
+            return if_none_match.strip() == '*' or etag in [
+                # Compare weakly, since a compressing proxy may have weakened the tag.
+                tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')
+            ]
+
+        if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+        return if_modified_since == content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+
+    def read_range(self, content, location, first_byte, last_byte):
+        """
+        Returns an iterator over the data of the given content between first_byte and last_byte
+        (included).  Data which isn't held in memory is read through the chunk cache, if one is
+        configured, or else streamed from the contentstore.
+        """
+        if content.data is not None:
+            return [content.data[first_byte:last_byte + 1]]
+
+        def open_stream():
+            """
+            Returns a stream of the asset's data.
+            """
+            if isinstance(content, StaticContentStream):
+                return content
+            return AssetManager.find(location, as_stream=True)
+
+        chunk_cache = get_chunk_cache()
+        if chunk_cache is not None:
+            return chunk_cache.read_range(content, first_byte, last_byte, open_stream)
+
+        return open_stream().stream_data_in_range(first_byte, last_byte)
+
     @staticmethod
     def is_cdn_request(request):
         """
@@ -282,12 +349,14 @@ class StaticContentServer(object):
             except (ItemNotFoundError, NotFoundError):
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            # Now that we fetched it, let's go ahead and try to cache it. Larger assets only
+            # have their attributes cached, so that conditional requests for them can be
+            # answered without going to the contentstore; their data is read in ranges.
+            if content.length is not None and content.length < MAX_CACHED_CONTENT_LENGTH:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            elif content.length is not None:
+                set_cached_content(content.copy_metadata())
 
         return content
 
@@ -0,0 +1,116 @@
+"""
+Tests for the course asset chunk cache.
+"""
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import ddt
+from mock import Mock
+
+from ..chunk_cache import AssetChunkCache
+
+
+class FakeStream(object):
+    """
+    A stand-in for a StaticContentStream, which counts the ranges read from it.
+    """
+    def __init__(self, data):
+        self.data = data
+        self.ranges_read = []
+        self.closed = False
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Yield the data between first_byte and last_byte (included).
+        """
+        self.ranges_read.append((first_byte, last_byte))
+        yield self.data[first_byte:last_byte + 1]
+
+    def close(self):
+        self.closed = True
+
+
+@ddt.ddt
+class AssetChunkCacheTest(unittest.TestCase):
+    """
+    Tests for AssetChunkCache.
+    """
+    def setUp(self):
+        super(AssetChunkCacheTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        self.data = b''.join(chr(index % 256) for index in range(100))
+        self.content = self.make_content('digest')
+        self.stream = FakeStream(self.data)
+
+    def make_content(self, content_digest):
+        """
+        Return a stand-in for the StaticContent of the asset, without its data.
+        """
+        return Mock(
+            location=u'asset-v1:edX+toy+2012_Fall+type@asset+block@video.mp4',
+            content_digest=content_digest,
+            last_modified_at=datetime.datetime(2018, 1, 1),
+            length=len(self.data),
+        )
+
+    def read_range(self, chunk_cache, first_byte, last_byte, content=None):
+        """
+        Read the range through the chunk cache.
+        """
+        return b''.join(chunk_cache.read_range(
+            content or self.content, first_byte, last_byte, lambda: self.stream
+        ))
+
+    @ddt.data((0, 99), (0, 0), (5, 35), (10, 19), (95, 99), (99, 99))
+    @ddt.unpack
+    def test_read_range(self, first_byte, last_byte):
+        chunk_cache = AssetChunkCache(self.directory, max_bytes=1000, chunk_size=10)
+        self.assertEqual(self.read_range(chunk_cache, first_byte, last_byte), self.data[first_byte:last_byte + 1])
+        self.assertTrue(self.stream.closed)
+        self.assertEqual(len(self.stream.ranges_read), last_byte // 10 - first_byte // 10 + 1)
+
+        # The range is now read from disk, without opening the stream.
+        self.stream = None
+        self.assertEqual(self.read_range(chunk_cache, first_byte, last_byte), self.data[first_byte:last_byte + 1])
+
+    def test_read_chunks_once(self):
+        chunk_cache = AssetChunkCache(self.directory, max_bytes=1000, chunk_size=10)
+        self.read_range(chunk_cache, 0, 24)
+        self.read_range(chunk_cache, 15, 44)
+        self.assertEqual(self.stream.ranges_read, [(0, 9), (10, 19), (20, 29), (30, 39), (40, 49)])
+
+    def test_new_version(self):
+        chunk_cache = AssetChunkCache(self.directory, max_bytes=1000, chunk_size=10)
+        self.read_range(chunk_cache, 0, 9)
+        self.read_range(chunk_cache, 0, 9, content=self.make_content('new_digest'))
+        self.assertEqual(self.stream.ranges_read, [(0, 9), (0, 9)])
+
+    def test_evict_least_recently_used(self):
+        chunk_cache = AssetChunkCache(self.directory, max_bytes=30, chunk_size=10)
+        self.read_range(chunk_cache, 0, 29)
+        self.read_range(chunk_cache, 0, 9)
+        self.read_range(chunk_cache, 30, 39)
+
+        # The second chunk was the least recently used, so it was evicted.
+        cached_chunks = [
+            os.path.exists(chunk_cache._chunk_path(self.content, index))  # pylint: disable=protected-access
+            for index in range(4)
+        ]
+        self.assertEqual(cached_chunks, [True, False, True, True])
+
+    def test_load_chunks(self):
+        self.read_range(AssetChunkCache(self.directory, max_bytes=1000, chunk_size=10), 0, 49)
+
+        # A new cache reads the chunks cached by the first.
+        self.stream = None
+        chunk_cache = AssetChunkCache(self.directory, max_bytes=1000, chunk_size=10)
+        self.assertEqual(self.read_range(chunk_cache, 0, 49), self.data[:50])
+
+        # A cache with a smaller budget evicts the chunks it can't fit.
+        AssetChunkCache(self.directory, max_bytes=20, chunk_size=10)
+        self.assertEqual(sum(len(files) for __, __, files in os.walk(self.directory)), 2)
@@ -6,7 +6,9 @@ import copy
 import datetime
 import ddt
 import logging
+import shutil
 import unittest
+from tempfile import mkdtemp
 from uuid import uuid4
 
 from django.conf import settings
@@ -27,6 +29,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
+from ..caching import del_cached_content
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -285,6 +288,53 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_conditional_request_not_modified(self):
+        """
+        Test that a request whose ETag or Last-Modified date matches the asset is answered with
+        304 Not Modified.
+        """
+        resp = self.client.get(self.url_unlocked)
+        etag = resp['ETag']
+        self.assertEqual(resp.status_code, 200)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other", W/{}'.format(etag))
+        self.assertEqual(resp.status_code, 304)
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=resp['Last-Modified'])
+        self.assertEqual(resp.status_code, 304)
+
+        # If-None-Match takes precedence over If-Modified-Since.
+        resp = self.client.get(
+            self.url_unlocked, HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=resp['Last-Modified']
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    @ddt.data(
+        (0, None),
+        (5, 1048576),
+    )
+    @ddt.unpack
+    def test_range_request_large_asset(self, first_byte, last_byte):
+        """
+        Test that a range of an asset too large to cache whole is served, through the chunk cache
+        if one is configured.
+        """
+        last_byte = last_byte or self.length_unlocked - 1
+        del_cached_content(self.unlocked_asset)
+        self.addCleanup(del_cached_content, self.unlocked_asset)
+        with patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0):
+            for chunk_cache_config in [None, {'DIRECTORY': mkdtemp(), 'CHUNK_SIZE': 4}]:
+                with override_settings(COURSE_ASSETS_CHUNK_CACHE=chunk_cache_config):
+                    resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}'.format(
+                        first=first_byte, last=last_byte))
+                    self.assertEqual(resp.status_code, 206)
+                    last = min(last_byte, self.length_unlocked - 1)
+                    self.assertEqual(resp.content, self.contentstore.find(self.unlocked_asset).data[first_byte:last + 1])
+                if chunk_cache_config:
+                    shutil.rmtree(chunk_cache_config['DIRECTORY'])
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
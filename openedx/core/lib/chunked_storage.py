@@ -0,0 +1,334 @@
+"""
+Utilities for storing large blobs as content-addressed chunks.
+
+A blob is split into chunks at content-defined boundaries: a boundary
+is placed after any byte at which a hash of the preceding window of
+bytes matches a bit pattern.  Since the boundaries depend only on the
+nearby content, an edit to one part of a blob changes only the chunks
+around it, and the remaining chunks are identical to those of the
+previous version of the blob.
+
+Each chunk is stored under the SHA-1 digest of its content, so chunks
+that are already stored need not be written again.  The blob itself is
+replaced by a small Manifest listing the digests of its chunks, which
+is used to fetch and reassemble the chunks.
+"""
+import hashlib
+import math
+import struct
+import zlib
+from collections import namedtuple
+
+import numpy
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Magic prefix identifying a serialized manifest.
+MANIFEST_MAGIC = 'CHNK'
+
+# The latest version of the manifest format.
+MANIFEST_VERSION = 1
+
+# Header: magic, format version, number of chunks.
+_MANIFEST_HEADER = struct.Struct('<4sHI')
+
+# Entry for each chunk: SHA-1 digest, chunk size.
+_MANIFEST_ENTRY = struct.Struct('<20sI')
+
+# Default average size, in bytes, of chunks.  Chunks are at least half
+# and at most four times the average size, which keeps them below the
+# default item size limit of memcached.
+DEFAULT_AVERAGE_CHUNK_SIZE = 128 * 1024
+
+# Default maximum number of chunks to read or write concurrently.
+DEFAULT_MAX_WORKERS = 8
+
+# Number of bytes covered by the rolling hash.
+_WINDOW_SIZE = 48
+
+# Number of bytes hashed at a time, to bound the memory used for
+# hashing large blobs.
+_SEGMENT_SIZE = 4 * 1024 * 1024
+
+# A pseudo-random value for each byte value, the sum of which over a
+# window is the rolling hash.  They are derived deterministically so
+# chunk boundaries are the same in every process.
+_BYTE_VALUES = numpy.array(
+    [struct.unpack('<I', hashlib.md5(chr(byte)).digest()[:4])[0] for byte in xrange(256)],
+    dtype=numpy.uint32,
+)
+
+
+class MissingChunksError(Exception):
+    """
+    Exception raised when chunks needed to reassemble a blob are not
+    found.
+    """
+    def __init__(self, digests):
+        super(MissingChunksError, self).__init__(u'Missing chunks: {}'.format(u', '.join(digests)))
+        self.digests = digests
+
+
+class Manifest(namedtuple('Manifest', ['digests', 'sizes'])):
+    """
+    The list of chunks of a blob, as the hex SHA-1 digests and sizes of
+    the chunks in order.
+    """
+    @property
+    def size(self):
+        """
+        The size of the blob.
+        """
+        return sum(self.sizes)
+
+    def serialize(self):
+        """
+        Returns the binary representation of this manifest.
+        """
+        return ''.join(
+            [_MANIFEST_HEADER.pack(MANIFEST_MAGIC, MANIFEST_VERSION, len(self.digests))] +
+            [
+                _MANIFEST_ENTRY.pack(digest.decode('hex'), size)
+                for digest, size in zip(self.digests, self.sizes)
+            ]
+        )
+
+    @classmethod
+    def deserialize(cls, data):
+        """
+        Returns the manifest read from the given binary representation.
+        """
+        magic, version, num_chunks = _MANIFEST_HEADER.unpack_from(data)
+        if magic != MANIFEST_MAGIC or version > MANIFEST_VERSION:
+            raise ValueError(u'Unsupported chunk manifest; magic: {!r}, version: {}'.format(magic, version))
+
+        digests, sizes = [], []
+        for position in xrange(num_chunks):
+            digest, size = _MANIFEST_ENTRY.unpack_from(
+                data,
+                _MANIFEST_HEADER.size + position * _MANIFEST_ENTRY.size,
+            )
+            digests.append(digest.encode('hex'))
+            sizes.append(size)
+        return cls(digests, sizes)
+
+
+def is_manifest(data):
+    """
+    Returns whether the given data is a serialized manifest.
+    """
+    return data[:len(MANIFEST_MAGIC)] == MANIFEST_MAGIC
+
+
+def chunk_digest(chunk):
+    """
+    Returns the hex SHA-1 digest under which the given chunk is stored.
+    """
+    return hashlib.sha1(chunk).hexdigest()
+
+
+def split(data, average_size=DEFAULT_AVERAGE_CHUNK_SIZE):
+    """
+    Splits the given data into chunks at content-defined boundaries.
+
+    Returns:
+        (Manifest, dict {string: string}) - The manifest of the data,
+            and a map of digest to content of its distinct chunks.
+    """
+    digests, sizes, chunks_by_digest = [], [], {}
+    start = 0
+    for end in _chunk_boundaries(data, average_size):
+        chunk = data[start:end]
+        digest = chunk_digest(chunk)
+        digests.append(digest)
+        sizes.append(len(chunk))
+        chunks_by_digest[digest] = chunk
+        start = end
+    return Manifest(digests, sizes), chunks_by_digest
+
+
+def assemble(manifest, chunks_by_digest):
+    """
+    Returns the data of the given manifest, reassembled from the
+    given map of digest to chunk content.
+
+    Raises:
+        MissingChunksError if any of the chunks is not in the map, or
+        does not have the size given in the manifest.
+    """
+    missing_digests = [
+        digest
+        for digest, size in zip(manifest.digests, manifest.sizes)
+        if len(chunks_by_digest.get(digest) or '') != size
+    ]
+    if missing_digests:
+        raise MissingChunksError(missing_digests)
+    return ''.join(chunks_by_digest[digest] for digest in manifest.digests)
+
+
+def map_concurrently(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Returns the list of results of calling func on each of the given
+    items, calling it concurrently on up to max_workers threads.
+    Any exception raised by func is re-raised.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+class ChunkedCache(object):
+    """
+    Wrapper around a django cache object that stores blobs larger than
+    the maximum chunk size as a manifest and content-addressed chunks,
+    which are fetched with a single multi-get.  This keeps every cached
+    item within the item size limit of the cache backend.
+    """
+    def __init__(self, cache, average_chunk_size=DEFAULT_AVERAGE_CHUNK_SIZE, compress_chunks=False):
+        """
+        Arguments:
+            cache (django.core.cache.backends.base.BaseCache) - The
+                cache in which to store blobs and chunks.
+
+            average_chunk_size (int) - The average size of chunks.
+
+            compress_chunks (bool) - Whether to compress blobs and
+                chunks before caching them.
+        """
+        self.cache = cache
+        self.average_chunk_size = average_chunk_size
+        self.compress_chunks = compress_chunks
+
+    def get(self, key):
+        """
+        Returns the blob cached for the given key, or None if it, or
+        any of its chunks, is not in the cache.
+        """
+        return self.get_with_size(key)[0]
+
+    def get_with_size(self, key):
+        """
+        Returns a tuple of the blob cached for the given key, or None if
+        it, or any of its chunks, is not in the cache, and the number of
+        bytes read from the cache for it.
+        """
+        cached_data = self.cache.get(key)
+        if cached_data is None or not is_manifest(cached_data):
+            return self._decode(cached_data), len(cached_data or '')
+
+        manifest = Manifest.deserialize(cached_data)
+        digests = set(manifest.digests)
+        cached_chunks = self.cache.get_many([self._chunk_key(digest) for digest in digests])
+        cached_size = len(cached_data) + sum(len(cached_chunk) for cached_chunk in cached_chunks.itervalues())
+        try:
+            return assemble(
+                manifest,
+                {digest: self._decode(cached_chunks.get(self._chunk_key(digest))) for digest in digests},
+            ), cached_size
+        except MissingChunksError:
+            return None, cached_size
+
+    def set(self, key, data, timeout=None):
+        """
+        Caches the given blob for the given key, as chunks if it is
+        larger than the maximum chunk size.
+
+        Returns:
+            int - The number of bytes written to the cache.
+        """
+        if len(data) <= self.average_chunk_size * 4:
+            cached_data = self._encode(data)
+            self.cache.set(key, cached_data, timeout)
+            return len(cached_data)
+
+        manifest, chunks_by_digest = split(data, self.average_chunk_size)
+        cached_chunks = {
+            self._chunk_key(digest): self._encode(chunk) for digest, chunk in chunks_by_digest.iteritems()
+        }
+        cached_manifest = manifest.serialize()
+        self.cache.set_many(cached_chunks, timeout)
+        self.cache.set(key, cached_manifest, timeout)
+        return len(cached_manifest) + sum(len(cached_chunk) for cached_chunk in cached_chunks.itervalues())
+
+    def delete(self, key):
+        """
+        Removes the blob cached for the given key.  Its chunks, which
+        may be shared with other blobs, are left to expire.
+        """
+        self.cache.delete(key)
+
+    @staticmethod
+    def _chunk_key(digest):
+        """
+        Returns the cache key of the chunk with the given digest.
+        """
+        return 'chunk.{}'.format(digest)
+
+    def _encode(self, data):
+        """
+        Returns the given data as it is to be cached.
+        """
+        return zlib.compress(data, 1) if self.compress_chunks else data
+
+    def _decode(self, cached_data):
+        """
+        Returns the data of the given cached data, if any.
+        """
+        if cached_data is None or not self.compress_chunks:
+            return cached_data
+        return zlib.decompress(cached_data)
+
+
+def _chunk_boundaries(data, average_size):
+    """
+    Returns the list of end offsets of the chunks of the given data.
+    """
+    # A boundary candidate occurs on average every 2**bits bytes, and
+    # only candidates at least min_size past the previous boundary are
+    # used, for an average chunk size of about min_size + 2**bits.
+    bits = max(int(math.log(average_size / 2, 2)), 1)
+    mask = (1 << bits) - 1
+    min_size = average_size / 2
+    max_size = average_size * 4
+
+    boundaries = []
+    start = 0
+    for end in _boundary_candidates(data, mask):
+        while end - start > max_size:
+            start += max_size
+            boundaries.append(start)
+        if end - start >= min_size:
+            boundaries.append(end)
+            start = end
+
+    while len(data) - start > max_size:
+        start += max_size
+        boundaries.append(start)
+    if start < len(data) or not boundaries:
+        boundaries.append(len(data))
+    return boundaries
+
+
+def _boundary_candidates(data, mask):
+    """
+    Yields, in increasing order, the offsets in the given data at which
+    the rolling hash of the preceding window of bytes has all of the
+    bits in the given mask cleared.
+    """
+    for segment_start in xrange(0, len(data), _SEGMENT_SIZE):
+        # Include the window preceding the segment, so that every
+        # offset in the segment is hashed with a full window.
+        low = max(segment_start - _WINDOW_SIZE, 0)
+        high = min(segment_start + _SEGMENT_SIZE, len(data))
+        segment = numpy.frombuffer(data, dtype=numpy.uint8, count=high - low, offset=low)
+
+        # The sum of the values of the bytes in each window, computed
+        # as differences of cumulative sums, wrapping around at 2**32.
+        sums = numpy.cumsum(_BYTE_VALUES[segment], dtype=numpy.uint32)
+        hashes = sums[_WINDOW_SIZE:] - sums[:-_WINDOW_SIZE]
+
+        for position in numpy.flatnonzero((hashes & mask) == 0).tolist():
+            yield low + position + _WINDOW_SIZE + 1
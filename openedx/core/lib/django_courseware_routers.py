@@ -10,13 +10,16 @@ class StudentModuleHistoryExtendedRouter(object):
 
     DATABASE_NAME = 'student_module_history'
 
+    # The models of the coursewarehistoryextended app which are stored in DATABASE_NAME.
+    MODEL_NAMES = ('StudentModuleHistoryExtended', 'StudentModuleHistoryDelta')
+
     def _is_csmh(self, model):
         """
-        Return True if ``model`` is courseware.StudentModuleHistoryExtended.
+        Return True if ``model`` is courseware.StudentModuleHistoryExtended or courseware.StudentModuleHistoryDelta.
         """
         return (
             model._meta.app_label == 'coursewarehistoryextended' and  # pylint: disable=protected-access
-            model.__name__ == 'StudentModuleHistoryExtended'
+            model.__name__ in self.MODEL_NAMES
         )
 
     def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
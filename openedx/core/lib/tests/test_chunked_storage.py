@@ -0,0 +1,101 @@
+"""
+Tests for chunked_storage.py
+"""
+import os
+from unittest import TestCase
+
+import ddt
+from nose.plugins.attrib import attr
+
+from ..chunked_storage import ChunkedCache, Manifest, MissingChunksError, assemble, is_manifest, split
+
+
+class MockCache(object):
+    """
+    An in-memory mock of the parts of a django cache used by ChunkedCache.
+    """
+    def __init__(self):
+        self.map = {}
+
+    def get(self, key):  # pylint: disable=missing-docstring
+        return self.map.get(key)
+
+    def get_many(self, keys):  # pylint: disable=missing-docstring
+        return {key: self.map[key] for key in keys if key in self.map}
+
+    def set(self, key, value, timeout):  # pylint: disable=missing-docstring, unused-argument
+        self.map[key] = value
+
+    def set_many(self, data, timeout):  # pylint: disable=missing-docstring, unused-argument
+        self.map.update(data)
+
+    def delete(self, key):  # pylint: disable=missing-docstring
+        self.map.pop(key, None)
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestChunkedStorage(TestCase):
+    """
+    Tests for splitting and reassembling chunks.
+    """
+    @ddt.data(0, 1, 100, 4 * 1024, 64 * 1024)
+    def test_split_and_assemble(self, data_size):
+        data = os.urandom(data_size)
+        manifest, chunks_by_digest = split(data, average_size=1024)
+        self.assertEquals(manifest.size, data_size)
+        self.assertTrue(all(size <= 4 * 1024 for size in manifest.sizes))
+        self.assertEquals(assemble(manifest, chunks_by_digest), data)
+
+    def test_edit_changes_few_chunks(self):
+        data = os.urandom(64 * 1024)
+        manifest, _ = split(data, average_size=1024)
+        edited_manifest, _ = split(data[:32 * 1024] + 'edit' + data[32 * 1024:], average_size=1024)
+        self.assertGreater(len(manifest.digests), 16)
+        self.assertLessEqual(len(set(edited_manifest.digests) - set(manifest.digests)), 3)
+
+    def test_manifest_serialization(self):
+        manifest, _ = split(os.urandom(16 * 1024), average_size=1024)
+        serialized_manifest = manifest.serialize()
+        self.assertTrue(is_manifest(serialized_manifest))
+        self.assertEquals(Manifest.deserialize(serialized_manifest), manifest)
+
+    def test_missing_chunks(self):
+        manifest, chunks_by_digest = split(os.urandom(16 * 1024), average_size=1024)
+        missing_digest = manifest.digests[1]
+        del chunks_by_digest[missing_digest]
+        with self.assertRaises(MissingChunksError) as context:
+            assemble(manifest, chunks_by_digest)
+        self.assertEquals(context.exception.digests, [missing_digest])
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestChunkedCache(TestCase):
+    """
+    Tests for ChunkedCache.
+    """
+    def setUp(self):
+        super(TestChunkedCache, self).setUp()
+        self.mock_cache = MockCache()
+
+    @ddt.data(True, False)
+    def test_small_data(self, compress_chunks):
+        chunked_cache = ChunkedCache(self.mock_cache, average_chunk_size=1024, compress_chunks=compress_chunks)
+        chunked_cache.set('key', 'small data')
+        self.assertEquals(len(self.mock_cache.map), 1)
+        self.assertEquals(chunked_cache.get('key'), 'small data')
+        self.assertIsNone(chunked_cache.get('other key'))
+
+    @ddt.data(True, False)
+    def test_large_data(self, compress_chunks):
+        chunked_cache = ChunkedCache(self.mock_cache, average_chunk_size=1024, compress_chunks=compress_chunks)
+        data = os.urandom(16 * 1024)
+        cached_size = chunked_cache.set('key', data)
+        self.assertTrue(is_manifest(self.mock_cache.get('key')))
+        self.assertEquals(cached_size, sum(len(cached_data) for cached_data in self.mock_cache.map.itervalues()))
+        self.assertEquals(chunked_cache.get_with_size('key'), (data, cached_size))
+
+        chunk_key = next(key for key in self.mock_cache.map if key != 'key')
+        self.mock_cache.delete(chunk_key)
+        self.assertIsNone(chunked_cache.get('key'))